@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2025-08-10 09:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_academicsession_term'),
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassSessionAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('class_ref', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_assignments', to='academics.class')),
+                ('form_teacher', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='class_assignments', to='users.teacherprofile')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_assignments', to='users.organization')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_assignments', to='academics.academicsession')),
+            ],
+            options={
+                'ordering': ['-session__start_date', 'class_ref__name'],
+                'unique_together': {('organization', 'class_ref', 'session')},
+            },
+        ),
+    ]
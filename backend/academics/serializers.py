@@ -1,4 +1,7 @@
+import logging
+
 from rest_framework import serializers
+from core.serializers import FlexFieldsMixin
 from users.models import Membership
 from .models import (
     Class, 
@@ -7,22 +10,34 @@ from .models import (
     Timetable
 )
 
+logger = logging.getLogger(__name__)
+
 
-class ClassSerializer(serializers.ModelSerializer):
+class ClassSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Class
         fields = ["id", "name", "section", "created_at"]
 
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Subject
         fields = ["id", "name", "code", "created_at"]
 
 
-class ClassSubjectSerializer(serializers.ModelSerializer):
-    teacher_name = serializers.CharField(source="teacher.user.get_full_name", read_only=True)
-    teacher_email = serializers.EmailField(source="teacher.user.email", read_only=True)
+class ClassSubjectSerializer(FlexFieldsMixin, serializers.ModelSerializer):
+    teacher_name = serializers.CharField(source="teacher.membership.user.get_full_name", read_only=True)
+    teacher_email = serializers.EmailField(source="teacher.membership.user.email", read_only=True)
+
+    expandable_fields = {
+        "school_class": ClassSerializer,
+        "subject": SubjectSerializer,
+        "teacher": "teachers.serializers.TeacherProfileSerializer",
+    }
+    field_relations = {
+        "teacher_name": "teacher__membership__user",
+        "teacher_email": "teacher__membership__user",
+    }
 
     class Meta:
         model = ClassSubject
@@ -36,7 +51,7 @@ class ClassSubjectSerializer(serializers.ModelSerializer):
         ]
 
 
-class TimetableSerializer(serializers.ModelSerializer):
+class TimetableSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     subject_name = serializers.CharField(
         source="class_subject.subject.name",
         read_only=True
@@ -47,6 +62,13 @@ class TimetableSerializer(serializers.ModelSerializer):
     )
     teacher_name = serializers.SerializerMethodField()
 
+    expandable_fields = {"class_subject": ClassSubjectSerializer}
+    field_relations = {
+        "subject_name": "class_subject__subject",
+        "class_name": "class_subject__school_class",
+        "teacher_name": "class_subject__teacher__membership__user",
+    }
+
     # teacher_name = serializers.CharField(
     #     source="class_subject.teacher.membership.user.get_full_name",
     #     read_only=True
@@ -85,14 +107,19 @@ class TimetableSerializer(serializers.ModelSerializer):
         end_time = attrs.get("end_time") or getattr(self.instance, "end_time", None)
         room = attrs.get("room") or getattr(self.instance, "room", None)
 
-        print("🔍 Validating timetable:")
-        print(f"   Class: {class_subject.school_class}")
-        print(f"   Teacher: {class_subject.teacher}")
-        print(f"   Day: {day_of_week}, Time: {start_time} - {end_time}, Room: {room}")
+        logger.debug(
+            "Validating timetable slot",
+            extra={
+                "class_subject_id": class_subject.pk,
+                "day_of_week": day_of_week,
+                "start_time": start_time,
+                "end_time": end_time,
+                "room": room,
+            },
+        )
 
         # ⏱️ Time validity
         if start_time and end_time and start_time >= end_time:
-            print("❌ Invalid: Start time is after or equal to end time")
             raise serializers.ValidationError({
                 "non_field_errors": ["Start time must be before end time."]
             })
@@ -105,13 +132,11 @@ class TimetableSerializer(serializers.ModelSerializer):
         )
         if self.instance:
             qs = qs.exclude(pk=self.instance.pk)
-        print(f"   Overlap candidates: {qs.count()}")
 
         errors = []
 
         # 👨‍🏫 Teacher conflict
         if qs.filter(class_subject__teacher=class_subject.teacher).exists():
-            print("❌ Conflict: Teacher is already assigned")
             # raise serializers.ValidationError({
                 # "non_field_errors": ["Teacher is already assigned during this time."]
             # })
@@ -119,7 +144,6 @@ class TimetableSerializer(serializers.ModelSerializer):
         
         # 🏫 Class conflict
         if qs.filter(class_subject__school_class=class_subject.school_class).exists():
-            print("❌ Conflict: Class already has a timetable")
             errors.append("Class already has a timetable during this time.")
             # raise serializers.ValidationError({
             #     "non_field_errors": ["Class already has a timetable during this time."]
@@ -128,16 +152,13 @@ class TimetableSerializer(serializers.ModelSerializer):
 
         # 🚪 Room conflict
         if room and qs.filter(room=room).exists():
-            print(f"❌ Conflict: Room {room} is already occupied")
             errors.append(f"Room '{room}' is already occupied during this time.")
             # raise serializers.ValidationError({
             #     "non_field_errors": [f"Room '{room}' is already occupied during this time."]
             # })
 
         if errors:
-            print(f"❌ Conflicts found: {errors}")
+            logger.debug("Timetable conflicts", extra={"conflicts": errors})
             raise serializers.ValidationError({"non_field_errors": errors})
 
-
-        print("✅ Validation passed — no conflicts found")
         return attrs
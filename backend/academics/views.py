@@ -8,10 +8,11 @@ from .serializers import (
     TimetableSerializer
 )
 from core.permissions import IsAdminOrPrincipal
+from core.serializers import FlexFieldsViewMixin
 from users.models import Membership
 
 
-class ClassViewSet(viewsets.ModelViewSet):
+class ClassViewSet(FlexFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Class.objects.all()
     serializer_class = ClassSerializer
     permission_classes = [IsAdminOrPrincipal]
@@ -20,7 +21,7 @@ class ClassViewSet(viewsets.ModelViewSet):
         org = getattr(self.request, "organization", None)
         serializer.save(organization=org)
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(FlexFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = SubjectSerializer
     permission_classes = [IsAdminOrPrincipal]
 
@@ -67,7 +68,7 @@ class SubjectViewSet(viewsets.ModelViewSet):
         org = getattr(self.request, "organization", None)
         serializer.save(organization=org)
 
-class ClassSubjectViewSet(viewsets.ModelViewSet):
+class ClassSubjectViewSet(FlexFieldsViewMixin, viewsets.ModelViewSet):
     queryset = ClassSubject.objects.all()
     serializer_class = ClassSubjectSerializer
     permission_classes = [IsAdminOrPrincipal]
@@ -76,7 +77,7 @@ class ClassSubjectViewSet(viewsets.ModelViewSet):
         org = getattr(self.request, "organization", None)
         serializer.save(organization=org)
 
-class TimetableViewSet(viewsets.ModelViewSet):
+class TimetableViewSet(FlexFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Timetable.objects.all()
     serializer_class = TimetableSerializer
     filter_backends = [DjangoFilterBackend]
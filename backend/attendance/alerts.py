@@ -0,0 +1,157 @@
+# attendance/alerts.py
+"""
+Chronic-absence detection.
+
+For each organization the recent records are pulled in one ordered query
+and packed into student × school-day matrices. Attendance rates over the
+window and current absence streaks are then computed for every student at
+once with NumPy, and flagged students are written to AttendanceAlert with a
+bulk insert.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+from django.utils.timezone import localdate
+
+from .models import AttendanceSession, AttendanceRecord, AttendanceAlert
+from .services import ATTENDED_STATUSES
+
+DEFAULT_WINDOW_DAYS = 10
+DEFAULT_MIN_RATE = 80
+DEFAULT_CONSECUTIVE_ABSENCES = 3
+EXCUSED_STATUSES = ("EXCUSED",)
+
+
+def alert_settings():
+    """Thresholds, overridable from settings."""
+    return {
+        "window_days": getattr(settings, "ATTENDANCE_ALERT_WINDOW_DAYS", DEFAULT_WINDOW_DAYS),
+        "min_rate": getattr(settings, "ATTENDANCE_ALERT_MIN_RATE", DEFAULT_MIN_RATE),
+        "max_consecutive": getattr(
+            settings, "ATTENDANCE_ALERT_CONSECUTIVE_ABSENCES", DEFAULT_CONSECUTIVE_ABSENCES
+        ),
+    }
+
+
+def _school_days(organization, as_of, count):
+    """The last `count` dates (oldest first) on which the school held sessions."""
+    days = (
+        AttendanceSession.all_objects.filter(organization=organization, date__lte=as_of)
+        .order_by("-date")
+        .values_list("date", flat=True)
+        .distinct()[:count]
+    )
+    return sorted(days)
+
+
+def absence_streaks(absent_day, marked_day):
+    """
+    Length of the absence streak ending at each day column.
+
+    Unmarked days neither extend nor break a streak; a marked day on which
+    the student was not absent resets it.
+    """
+    absent = absent_day.astype(np.int64)
+    running = np.cumsum(absent, axis=1)
+    breaks = marked_day & ~absent_day
+    base = np.maximum.accumulate(np.where(breaks, running, 0), axis=1)
+    return running - base
+
+
+def detect_chronic_absence(organization, as_of=None, window_days=None, min_rate=None,
+                           max_consecutive=None):
+    """
+    Flag students in `organization` whose attendance over the last
+    `window_days` school days is below `min_rate` percent, or who are on a
+    run of `max_consecutive` or more absent school days. Returns the number
+    of new alerts written. A student who still has an open alert of the same
+    kind is not alerted again, so re-running on the same day is a no-op.
+    """
+    defaults = alert_settings()
+    as_of = as_of or localdate()
+    window_days = window_days or defaults["window_days"]
+    min_rate = defaults["min_rate"] if min_rate is None else min_rate
+    max_consecutive = max_consecutive or defaults["max_consecutive"]
+
+    days = _school_days(organization, as_of, window_days)
+    if not days:
+        return 0
+    day_index = {day: index for index, day in enumerate(days)}
+
+    rows = list(
+        AttendanceRecord.all_objects.filter(
+            organization=organization,
+            session__date__range=(days[0], days[-1]),
+        )
+        .order_by("student_id", "session__date", "session__period")
+        .values_list("student_id", "session__class_assignment_id", "session__date", "status")
+    )
+    if not rows:
+        return 0
+
+    student_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    columns = np.fromiter((day_index[row[2]] for row in rows), dtype=np.int64, count=len(rows))
+    statuses = np.array([row[3] for row in rows])
+
+    students, row_of = np.unique(student_ids, return_inverse=True)
+    # Rows are ordered by date, so the last record per student carries their current class.
+    last_row = np.full(len(students), -1)
+    last_row[row_of] = np.arange(len(rows))
+    class_of = [rows[index][1] for index in last_row]
+
+    shape = (len(students), len(days))
+    # Excused marks count neither for nor against the student.
+    counted = ~np.isin(statuses, EXCUSED_STATUSES)
+    marked = np.zeros(shape)
+    present = np.zeros(shape)
+    absent = np.zeros(shape)
+    np.add.at(marked, (row_of, columns), counted)
+    np.add.at(present, (row_of, columns), np.isin(statuses, ATTENDED_STATUSES))
+    np.add.at(absent, (row_of, columns), statuses == "ABSENT")
+
+    present_total = present.sum(axis=1)
+    marked_total = marked.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = np.where(marked_total > 0, present_total / marked_total * 100, np.nan)
+    marked_day = marked > 0
+    absent_day = marked_day & (absent >= marked)  # absent for every counted session
+    # The streak still running on the last school day, not the longest in the window.
+    streaks = absence_streaks(absent_day, marked_day)[:, -1]
+
+    window = {"window_start": days[0], "window_end": days[-1], "detected_on": as_of}
+    alerts = []
+    for index in np.flatnonzero(rates < min_rate):
+        alerts.append(AttendanceAlert(
+            organization=organization,
+            student_id=int(students[index]),
+            class_assignment_id=class_of[index],
+            kind=AttendanceAlert.Kind.LOW_RATE,
+            value=Decimal(f"{rates[index]:.2f}"),
+            threshold=Decimal(min_rate),
+            **window,
+        ))
+    for index in np.flatnonzero(streaks >= max_consecutive):
+        alerts.append(AttendanceAlert(
+            organization=organization,
+            student_id=int(students[index]),
+            class_assignment_id=class_of[index],
+            kind=AttendanceAlert.Kind.CONSECUTIVE_ABSENCES,
+            value=Decimal(int(streaks[index])),
+            threshold=Decimal(max_consecutive),
+            **window,
+        ))
+
+    # Skip students with an open alert of the same kind, and alerts already
+    # raised today; ignore_conflicts still guards a concurrent run.
+    existing = set(
+        AttendanceAlert.all_objects.filter(
+            Q(is_resolved=False) | Q(detected_on=as_of),
+            organization=organization,
+            student_id__in=[alert.student_id for alert in alerts],
+        ).values_list("student_id", "kind")
+    )
+    alerts = [alert for alert in alerts if (alert.student_id, alert.kind) not in existing]
+    AttendanceAlert.all_objects.bulk_create(alerts, ignore_conflicts=True)
+    return len(alerts)
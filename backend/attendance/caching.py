@@ -0,0 +1,154 @@
+# attendance/caching.py
+"""
+HTTP conditional requests and a response cache for the summary endpoints.
+
+Summary tables only change when `services.recompute_*` rewrites them, and
+each rewrite bumps the organization's `SummaryVersion` for that resource
+once the transaction commits. A summary response is therefore fully
+described by (organization, resource, version, caller scope, path and query
+params, format): that tuple is hashed into the ETag and the cache key, so
+a matching If-None-Match is answered 304 without touching the summary
+tables, and a cache hit skips the queryset and serializer. Old entries are
+never read again once the version moves on and simply expire.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import parse_etags
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import SummaryVersion
+
+
+def bump_summary_version(organization_id, resource):
+    """Move `resource` to a new version once the current transaction commits."""
+    def bump():
+        versions = SummaryVersion.all_objects.filter(organization_id=organization_id, resource=resource)
+        now = timezone.now()
+        if not versions.update(version=F("version") + 1, updated_at=now):
+            SummaryVersion.all_objects.bulk_create(
+                [SummaryVersion(organization_id=organization_id, resource=resource)], ignore_conflicts=True
+            )
+            versions.update(version=F("version") + 1, updated_at=now)
+
+    transaction.on_commit(bump)
+
+
+def summary_scope(request):
+    """
+    (kind, profile): which slice of the summaries the caller's active
+    membership in request.organization sees. Students see their own rows
+    ("student", StudentProfile), teachers the classes they are form teacher
+    of ("teacher", TeacherProfile), parents none yet ("none", None) and
+    admins and principals the whole organization ("organization", None).
+    The summary viewsets filter by it and it is part of the ETag and cache
+    key, so callers with different slices never share a response.
+    """
+    scope = getattr(request, "_summary_scope", None)
+    if scope is None:
+        from users.models import Membership
+
+        membership = (
+            Membership.all_objects.select_related("student_profile", "teacher_profile")
+            .filter(user_id=request.user.pk, organization=getattr(request, "organization", None), is_active=True)
+            .first()
+        )
+        role = membership.role if membership else None
+        if role == Membership.RoleChoices.STUDENT:
+            scope = ("student", getattr(membership, "student_profile", None))
+        elif role == Membership.RoleChoices.TEACHER:
+            scope = ("teacher", getattr(membership, "teacher_profile", None))
+        elif role in (Membership.RoleChoices.ADMIN, Membership.RoleChoices.PRINCIPAL):
+            scope = ("organization", None)
+        else:
+            scope = ("none", None)
+        request._summary_scope = scope
+    return scope
+
+
+def scope_summaries(queryset, request):
+    """Filter a student summary queryset down to the caller's `summary_scope`."""
+    kind, profile = summary_scope(request)
+    if kind == "organization":
+        return queryset
+    if profile is None:
+        return queryset.none()
+    if kind == "student":
+        return queryset.filter(student=profile)
+    return queryset.filter(class_assignment__form_teacher=profile)
+
+
+def _not_modified(request, etag, updated_at):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        tags = [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+        return "*" in tags or etag in tags
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and updated_at is not None and int(updated_at.timestamp()) <= since
+
+
+class ConditionalSummaryMixin:
+    """
+    ETag / Last-Modified handling plus a server-side response cache for a
+    read-only summary viewset. Set `summary_resource` to a
+    SummaryVersion.Resource.
+    """
+
+    summary_resource = None
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        organization = getattr(request, "organization", None)
+        if organization is None:
+            return handler(request, *args, **kwargs)
+
+        version, updated_at = (
+            SummaryVersion.all_objects.filter(organization=organization, resource=self.summary_resource)
+            .values_list("version", "updated_at")
+            .first()
+        ) or (0, None)
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        kind, profile = summary_scope(request)
+        fingerprint = hashlib.sha256(
+            "|".join([
+                str(organization.pk),
+                self.summary_resource,
+                str(version),
+                f"{kind}:{getattr(profile, 'pk', '')}",
+                request.path,
+                params,
+                request.accepted_renderer.format,
+            ]).encode()
+        ).hexdigest()
+
+        headers = {"ETag": f'"{fingerprint[:32]}"', "Cache-Control": "private, no-cache"}
+        if updated_at is not None:
+            headers["Last-Modified"] = http_date(updated_at.timestamp())
+        if _not_modified(request, headers["ETag"], updated_at):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache_key = f"attendance-summary:{fingerprint}"
+        data = cache.get(cache_key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(cache_key, response.data, getattr(settings, "SUMMARY_CACHE_SECONDS", 300))
+        else:
+            response = Response(data)
+
+        for header, value in headers.items():
+            response[header] = value
+        return response
@@ -1,4 +1,4 @@
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 import pytest
 from datetime import date
 from django.contrib.auth import get_user_model
@@ -8,12 +8,14 @@ from users.models import (
     StudentProfile, 
     TeacherProfile
 )
-from academics.models import Class, Term, AcademicSession
+from academics.models import Class, Term, AcademicSession, ClassSessionAssignment
 from attendance.models import AttendanceSession, AttendanceRecord
+from students.models import StudentEnrollment
 from tests.utils import (
     create_teacher_with_profile, 
     create_user_with_role,
-    create_school_class
+    create_school_class,
+    login
 )
 User = get_user_model()
 
@@ -46,7 +48,8 @@ def teacher(org):
 
 
 @pytest.fixture
-def student(org, school_class):
+def student(org, class_assignment):
+    """A student enrolled in `class_assignment`."""
     user = create_user_with_role(
         "test123@test.com", 
         role=Membership.RoleChoices.STUDENT,
@@ -58,7 +61,9 @@ def student(org, school_class):
     #     username="student", 
     #     password="pass")
     # Membership.objects.create(user=user, organization=org, role=Membership.RoleChoices.STUDENT)
-    return StudentProfile.objects.create(membership=m1, grade="JSS1")
+    profile = StudentProfile.objects.create(membership=m1, grade="JSS1")
+    StudentEnrollment.objects.create(organization=org, student=profile, class_assignment=class_assignment)
+    return profile
 
 
 @pytest.fixture
@@ -109,14 +114,13 @@ def term(org):
 
 
 @pytest.fixture
-def session(org, school_class, teacher, term):
+def session(org, class_assignment, term):
     return AttendanceSession.objects.create(
         organization=org,
-        class_ref=school_class,
-        date=date.today(),
+        class_assignment=class_assignment,
+        date=date(2025, 2, 3),  # a Monday within `term`
         period="MORNING",
         term=term,
-        form_teacher=teacher,
     )
 
 
@@ -130,6 +134,11 @@ def session_present(org, session, student, teacher):
         marked_by=teacher.membership.user
     )
 
+@pytest.fixture
+def api_rf():
+    return APIRequestFactory()
+
+
 @pytest.fixture
 def api_client_teacher(teacher):
     client = APIClient()
@@ -160,4 +169,33 @@ def students(org, school_class):
         # user = User.objects.create_user(username=f"student{i}", password="pass")
         StudentProfile.objects.create(membership=m1, grade="Grade 12")
         s_list.append(StudentProfile.objects.get(membership=m1))
-    return s_list
\ No newline at end of file
+    return s_list
+
+
+@pytest.fixture
+def class_assignment(org, school_class, teacher, term):
+    return ClassSessionAssignment.objects.create(
+        organization=org,
+        class_ref=school_class,
+        form_teacher=teacher,
+        session=term.session,
+    )
+
+
+@pytest.fixture
+def enrolled_students(org, class_assignment, students):
+    """Enroll the `students` fixture into `class_assignment`."""
+    for student in students:
+        StudentEnrollment.objects.create(
+            organization=org, student=student, class_assignment=class_assignment
+        )
+    return students
+
+
+@pytest.fixture
+def admin_client(org):
+    """APIClient logged in (JWT) as an org admin."""
+    create_user_with_role("admin320@test.com", role=Membership.RoleChoices.ADMIN, org=org)
+    client = APIClient()
+    login(client, "admin320@test.com", "testpass123", org.id)
+    return client
\ No newline at end of file
@@ -0,0 +1,147 @@
+# attendance/cube.py
+"""
+Daily attendance cube.
+
+`DailyAttendanceCube` holds one row per session with a record count per
+status, plus the session's dimensions (class, academic session, term, date,
+month, weekday, period). Whenever records change, only the rows of the
+affected sessions are rebuilt, so the cube stays exact without full
+recomputes. Analytics queries group the cube instead of the raw records: a
+school year is tens of thousands of cube rows against millions of records.
+"""
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import AttendanceSession, AttendanceRecord, DailyAttendanceCube
+from .services import ATTENDED_STATUSES
+
+CUBE_CHUNK_SIZE = 500
+
+# dimension -> [(output key, cube field)]
+DIMENSIONS = {
+    "class_ref": [("class_ref", "class_ref_id"), ("class_name", "class_ref__name")],
+    "class_assignment": [("class_assignment", "class_assignment_id")],
+    "academic_session": [("academic_session", "academic_session_id"), ("academic_session_name", "academic_session__name")],
+    "term": [("term", "term_id"), ("term_name", "term__name")],
+    "date": [("date", "date")],
+    "month": [("month", "month")],
+    "weekday": [("weekday", "weekday")],
+    "period": [("period", "period")],
+}
+
+# filter -> cube lookup
+FILTERS = {
+    "class_ref": "class_ref_id",
+    "class_assignment": "class_assignment_id",
+    "academic_session": "academic_session_id",
+    "term": "term_id",
+    "period": "period",
+    "weekday": "weekday",
+    "start_date": "date__gte",
+    "end_date": "date__lte",
+}
+
+# status -> cube column
+STATUS_COLUMNS = {status: status.lower() for status, _ in AttendanceRecord.STATUS_CHOICES}
+
+
+def refresh_cube_for_sessions(session_ids):
+    """Rebuild the cube rows of the given attendance sessions."""
+    session_ids = list(set(session_ids))
+    for start in range(0, len(session_ids), CUBE_CHUNK_SIZE):
+        _refresh_chunk(session_ids[start:start + CUBE_CHUNK_SIZE])
+
+
+def _refresh_chunk(session_ids):
+    sessions = {
+        row[0]: row
+        for row in AttendanceSession.all_objects.filter(pk__in=session_ids).values_list(
+            "id",
+            "organization_id",
+            "class_assignment_id",
+            "class_assignment__class_ref_id",
+            "class_assignment__session_id",
+            "term_id",
+            "date",
+            "period",
+        )
+    }
+    counts = (
+        AttendanceRecord.all_objects.filter(session_id__in=session_ids)
+        .order_by()
+        .values("session_id")
+        .annotate(
+            total=Count("id"),
+            **{
+                column: Count("id", filter=Q(status=status))
+                for status, column in STATUS_COLUMNS.items()
+            },
+        )
+    )
+
+    rows = []
+    for row in counts:
+        session_id = row.pop("session_id")
+        _, organization_id, ca_id, class_id, academic_session_id, term_id, day, period = sessions[session_id]
+        rows.append(DailyAttendanceCube(
+            organization_id=organization_id,
+            session_id=session_id,
+            class_assignment_id=ca_id,
+            class_ref_id=class_id,
+            academic_session_id=academic_session_id,
+            term_id=term_id,
+            date=day,
+            month=day.replace(day=1),
+            weekday=day.isoweekday(),
+            period=period,
+            **row,
+        ))
+
+    with transaction.atomic():
+        DailyAttendanceCube.all_objects.filter(session_id__in=session_ids).delete()
+        DailyAttendanceCube.all_objects.bulk_create(rows)
+
+
+def rebuild_cube(organization):
+    """Rebuild every cube row of an organization (backfill / repair)."""
+    session_ids = list(
+        AttendanceSession.all_objects.filter(organization=organization).values_list("id", flat=True)
+    )
+    refresh_cube_for_sessions(session_ids)
+    return len(session_ids)
+
+
+def _rate(attended, total):
+    return round(attended / total * 100, 2) if total else 0.0
+
+
+def aggregate_cube(organization, group_by=(), filters=None):
+    """
+    Attendance counts and rate for `organization`, grouped by any of
+    DIMENSIONS and narrowed by any of FILTERS. Returns a list of dicts.
+    """
+    qs = DailyAttendanceCube.all_objects.filter(organization=organization)
+    for name, value in (filters or {}).items():
+        qs = qs.filter(**{FILTERS[name]: value})
+
+    columns = [column for dimension in group_by for column in DIMENSIONS[dimension]]
+    fields = [field for _, field in columns]
+    totals = {
+        column: Coalesce(Sum(column), 0)
+        for column in [*STATUS_COLUMNS.values(), "total"]
+    }
+    if fields:
+        rows = qs.values(*fields).annotate(**totals).order_by(*fields)
+    else:
+        rows = [qs.aggregate(**totals)]
+
+    results = []
+    for row in rows:
+        result = {key: row[field] for key, field in columns}
+        for column in totals:
+            result[column] = row[column]
+        attended = sum(row[STATUS_COLUMNS[status]] for status in ATTENDED_STATUSES)
+        result["attendance_rate"] = _rate(attended, row["total"])
+        results.append(result)
+    return results
@@ -0,0 +1,290 @@
+# attendance/exports.py
+"""
+Row generators for attendance exports.
+
+Each generator yields plain lists (header first) and reads attendance rows
+through a server-side cursor, so memory stays flat no matter how long the
+term is. Pivoting is done on the fly against a sorted record stream.
+"""
+import tempfile
+from datetime import date
+from itertools import groupby
+
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from academics.models import ClassSessionAssignment, Term
+from core.db_routers import use_replica
+from core.exports import iter_export
+from users.models import StudentProfile
+from .models import (
+    AttendanceSession,
+    AttendanceRecord,
+    AttendanceExport,
+    TermAttendanceSummary,
+    TermClassAttendanceSummary,
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+STATUS_CODES = {
+    "PRESENT": "P",
+    "ABSENT": "A",
+    "LATE": "L",
+    "EXCUSED": "E",
+}
+
+STUDENT_ORDERING = (
+    "membership__user__last_name",
+    "membership__user__first_name",
+    "id",
+)
+
+
+def _percentage(attended, total):
+    return round(attended / total * 100, 2) if total else 0.0
+
+
+def iter_class_register(class_assignment, start_date, end_date):
+    """
+    Class × date register: one row per student, one column per session
+    (date + period) between `start_date` and `end_date`.
+    """
+    organization_id = class_assignment.organization_id
+
+    sessions = list(
+        AttendanceSession.all_objects.filter(
+            organization_id=organization_id,
+            class_assignment=class_assignment,
+            date__range=(start_date, end_date),
+        )
+        .order_by("date", "period")
+        .values_list("id", "date", "period")
+    )
+    columns = {session_id: index for index, (session_id, _, _) in enumerate(sessions)}
+
+    yield (
+        ["Admission No.", "Student"]
+        + [f"{day.isoformat()} {period[:2]}" for _, day, period in sessions]
+        + ["Present", "Marked", "Percentage"]
+    )
+
+    # Roster: every enrolled student plus anyone marked in these sessions.
+    roster = (
+        StudentProfile.all_objects.filter(
+            Q(enrollments__class_assignment=class_assignment)
+            | Q(attendance_records__session_id__in=list(columns))
+        )
+        .distinct()
+        .order_by(*STUDENT_ORDERING)
+        .values_list(
+            "id",
+            "admission_number",
+            "membership__user__first_name",
+            "membership__user__last_name",
+        )
+    )
+
+    records = (
+        AttendanceRecord.all_objects.filter(
+            organization_id=organization_id,
+            session_id__in=list(columns),
+        )
+        .order_by(*(f"student__{field}" for field in STUDENT_ORDERING))
+        .values_list("student_id", "session_id", "status")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    grouped = groupby(records, key=lambda row: row[0])
+    pending = next(grouped, None)
+
+    for student_id, admission_number, first_name, last_name in roster.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        cells = [""] * len(columns)
+        present = marked = 0
+
+        if pending is not None and pending[0] == student_id:
+            for _, session_id, status in pending[1]:
+                cells[columns[session_id]] = STATUS_CODES.get(status, status)
+                marked += 1
+                present += status == "PRESENT"
+            pending = next(grouped, None)
+
+        yield (
+            [admission_number or "", f"{first_name} {last_name}".strip()]
+            + cells
+            + [present, marked, _percentage(present, marked)]
+        )
+
+
+def iter_student_history(student, start_date=None, end_date=None):
+    """Every attendance mark for one student, oldest first."""
+    records = AttendanceRecord.all_objects.filter(student=student)
+    if start_date:
+        records = records.filter(session__date__gte=start_date)
+    if end_date:
+        records = records.filter(session__date__lte=end_date)
+
+    yield ["Date", "Period", "Class", "Term", "Status", "Marked At"]
+
+    rows = (
+        records.order_by("session__date", "session__period", "id")
+        .values_list(
+            "session__date",
+            "session__period",
+            "session__class_assignment__class_ref__name",
+            "session__term__name",
+            "status",
+            "marked_at",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for day, period, class_name, term_name, status, marked_at in rows:
+        yield [day, period, class_name, term_name, status, marked_at]
+
+
+def iter_term_summaries(term, class_assignment=None, scope="student"):
+    """
+    Precomputed term summaries, per student (`scope="student"`) or per
+    class (`scope="class"`).
+    """
+    if scope == "class":
+        summaries = TermClassAttendanceSummary.all_objects.filter(
+            organization_id=term.organization_id, term=term
+        )
+        if class_assignment is not None:
+            summaries = summaries.filter(class_assignment=class_assignment)
+
+        yield [
+            "Class",
+            "Total Sessions",
+            "Attended Sessions",
+            "Male Attendance",
+            "Female Attendance",
+            "Average Percentage",
+        ]
+        rows = (
+            summaries.order_by("class_assignment__class_ref__name", "id")
+            .values_list(
+                "class_assignment__class_ref__name",
+                "total_sessions",
+                "attended_sessions",
+                "male_attendance",
+                "female_attendance",
+                "average_percentage",
+            )
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        for row in rows:
+            yield list(row)
+        return
+
+    summaries = TermAttendanceSummary.all_objects.filter(
+        organization_id=term.organization_id, term=term
+    )
+    if class_assignment is not None:
+        summaries = summaries.filter(class_assignment=class_assignment)
+
+    yield [
+        "Class",
+        "Admission No.",
+        "Student",
+        "Total Sessions",
+        "Attended Sessions",
+        "Percentage",
+    ]
+    rows = (
+        summaries.order_by(
+            "class_assignment__class_ref__name",
+            *(f"student__{field}" for field in STUDENT_ORDERING),
+        )
+        .values_list(
+            "class_assignment__class_ref__name",
+            "student__admission_number",
+            "student__membership__user__first_name",
+            "student__membership__user__last_name",
+            "total_sessions",
+            "attended_sessions",
+            "percentage",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for class_name, admission_number, first_name, last_name, total, attended, percentage in rows:
+        yield [
+            class_name,
+            admission_number or "",
+            f"{first_name} {last_name}".strip(),
+            total,
+            attended,
+            percentage,
+        ]
+
+
+def export_rows(organization, kind, params):
+    """
+    Resolve the JSON-safe `params` of an export request within
+    `organization` and return the matching row generator.
+    """
+    def _parse_date(value):
+        return date.fromisoformat(value) if value else None
+
+    term = None
+    if params.get("term"):
+        term = Term.all_objects.get(organization=organization, pk=params["term"])
+    start_date = _parse_date(params.get("start_date")) or (term and term.start_date)
+    end_date = _parse_date(params.get("end_date")) or (term and term.end_date)
+
+    class_assignment = None
+    if params.get("class_assignment"):
+        class_assignment = ClassSessionAssignment.all_objects.get(
+            organization=organization, pk=params["class_assignment"]
+        )
+
+    if kind == AttendanceExport.Kind.REGISTER:
+        return iter_class_register(class_assignment, start_date, end_date)
+
+    if kind == AttendanceExport.Kind.STUDENT_HISTORY:
+        student = StudentProfile.all_objects.get(
+            membership__organization=organization, pk=params["student"]
+        )
+        return iter_student_history(student, start_date, end_date)
+
+    return iter_term_summaries(term, class_assignment, scope=params.get("scope", "student"))
+
+
+def export_filename(kind, params):
+    parts = [kind.lower().replace("_", "-")]
+    for key in ("class_assignment", "student", "term", "start_date", "end_date"):
+        if params.get(key):
+            parts.append(str(params[key]))
+    return "-".join(parts)
+
+
+def write_export(export):
+    """
+    Render an AttendanceExport into its `file` field.
+
+    Chunks are spooled to a temporary file before being handed to storage,
+    so large registers never sit in memory.
+    """
+    export.status = export.Status.RUNNING
+    export.save(update_fields=["status"])
+
+    try:
+        with use_replica(), tempfile.TemporaryFile() as spool:
+            rows = export_rows(export.organization, export.kind, export.params)
+            for chunk in iter_export(rows, export.file_format, sheet_name=export.get_kind_display()):
+                spool.write(chunk)
+            spool.seek(0)
+            filename = f"{export_filename(export.kind, export.params)}.{export.file_format}"
+            export.file.save(filename, File(spool), save=False)
+    except Exception as exc:
+        export.status = export.Status.FAILED
+        export.error = str(exc)
+        export.completed_at = timezone.now()
+        export.save(update_fields=["status", "error", "completed_at"])
+        raise
+
+    export.status = export.Status.COMPLETED
+    export.completed_at = timezone.now()
+    export.save(update_fields=["status", "file", "completed_at"])
+    return export
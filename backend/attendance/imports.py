@@ -0,0 +1,298 @@
+# attendance/imports.py
+"""
+Bulk attendance import from CSV.
+
+The file is read as a stream and processed in chunks. Students, enrollments,
+terms and holidays are resolved through lookup maps built with one query
+each, sessions are resolved (or created) once per chunk, and records are
+written with a batched upsert. The analytics cube is refreshed per chunk and
+summaries are recomputed once per affected (class_assignment, week, term)
+after the last chunk.
+"""
+import csv
+from bisect import bisect_right
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import ClassSessionAssignment, Term
+from students.models import StudentEnrollment
+from users.models import StudentProfile
+from .models import AttendanceSession, AttendanceRecord, Holiday
+from .services import get_week_bounds, recompute_summaries_for_keys
+from .cube import refresh_cube_for_sessions
+from .sync import next_sync_version
+
+IMPORT_COLUMNS = ("admission_number", "date", "period", "status")
+ERROR_REPORT_COLUMNS = ("line", "admission_number", "date", "period", "status", "error")
+IMPORT_CHUNK_SIZE = 2000
+
+PERIODS = {code for code, _ in AttendanceSession.PERIOD_CHOICES}
+STATUSES = {code for code, _ in AttendanceRecord.STATUS_CHOICES}
+STATUS_ALIASES = {code[0]: code for code in STATUSES}  # P/A/L/E
+
+
+class ImportResult:
+    """Counts plus the row-level error report of one import run."""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.sessions_created = 0
+        self.errors = []
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def add_error(self, line, row, message):
+        self.errors.append({
+            "line": line,
+            "admission_number": (row or {}).get("admission_number", ""),
+            "date": (row or {}).get("date", ""),
+            "period": (row or {}).get("period", ""),
+            "status": (row or {}).get("status", ""),
+            "error": message,
+        })
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "sessions_created": self.sessions_created,
+            "errors": self.errors,
+        }
+
+
+class _Lookups:
+    """In-memory maps for one organization, each built with a single query."""
+
+    def __init__(self, organization, class_assignments=None):
+        self.organization = organization
+
+        self.students = dict(
+            StudentProfile.all_objects.filter(
+                membership__organization=organization,
+                admission_number__isnull=False,
+            ).values_list("admission_number", "id")
+        )
+
+        enrollments = StudentEnrollment.all_objects.filter(organization=organization)
+        if class_assignments is not None:
+            enrollments = enrollments.filter(class_assignment__in=class_assignments)
+        # (student_id, academic_session_id) -> class_assignment_id
+        self.enrollments = {
+            (student_id, session_id): class_assignment_id
+            for student_id, class_assignment_id, session_id in enrollments.values_list(
+                "student_id", "class_assignment_id", "class_assignment__session_id"
+            )
+        }
+
+        terms = sorted(
+            Term.all_objects.filter(organization=organization).values_list(
+                "start_date", "end_date", "id", "session_id"
+            )
+        )
+        self._term_starts = [start for start, _, _, _ in terms]
+        self._terms = terms
+
+        self.holidays = set(
+            Holiday.all_objects.filter(organization=organization).values_list("date", flat=True)
+        )
+
+        # (class_assignment_id, date, period) -> (session_id, is_locked)
+        self.sessions = {}
+
+    def term_for(self, day):
+        """(term_id, academic_session_id) for the term containing `day`."""
+        index = bisect_right(self._term_starts, day) - 1
+        if index >= 0:
+            start, end, term_id, session_id = self._terms[index]
+            if start <= day <= end:
+                return term_id, session_id
+        return None
+
+    def load_sessions(self, keys):
+        """Resolve attendance sessions for `keys`, creating missing ones."""
+        missing = {key for key in keys if key[:3] not in self.sessions}
+        if not missing:
+            return 0
+
+        def fetch():
+            found = AttendanceSession.all_objects.filter(
+                organization=self.organization,
+                class_assignment_id__in={key[0] for key in missing},
+                date__in={key[1] for key in missing},
+            ).values_list("class_assignment_id", "date", "period", "id", "is_locked")
+            for class_assignment_id, day, period, session_id, is_locked in found:
+                self.sessions[(class_assignment_id, day, period)] = (session_id, is_locked)
+
+        fetch()
+        to_create = [key for key in missing if key[:3] not in self.sessions]
+        if to_create:
+            with transaction.atomic():
+                version = next_sync_version(self.organization.id)
+                AttendanceSession.all_objects.bulk_create(
+                    [
+                        AttendanceSession(
+                            organization=self.organization,
+                            class_assignment_id=class_assignment_id,
+                            date=day,
+                            period=period,
+                            term_id=term_id,
+                            sync_version=version,
+                        )
+                        for class_assignment_id, day, period, term_id in to_create
+                    ],
+                    ignore_conflicts=True,
+                )
+            fetch()
+        return len(to_create)
+
+
+def _validate_row(row, lookups, result, line):
+    """Return (student_id, class_assignment_id, date, period, status, term_id) or None."""
+    admission_number = (row.get("admission_number") or "").strip()
+    raw_date = (row.get("date") or "").strip()
+    period = (row.get("period") or "").strip().upper()
+    status = (row.get("status") or "").strip().upper()
+    status = STATUS_ALIASES.get(status, status)
+
+    if not admission_number or not raw_date or not period or not status:
+        result.add_error(line, row, "Missing value; every row needs " + ", ".join(IMPORT_COLUMNS) + ".")
+        return None
+
+    student_id = lookups.students.get(admission_number)
+    if student_id is None:
+        result.add_error(line, row, f"Unknown admission number '{admission_number}'.")
+        return None
+
+    try:
+        day = date.fromisoformat(raw_date)
+    except ValueError:
+        result.add_error(line, row, f"Invalid date '{raw_date}', expected YYYY-MM-DD.")
+        return None
+
+    if period not in PERIODS:
+        result.add_error(line, row, f"Invalid period '{period}'.")
+        return None
+    if status not in STATUSES:
+        result.add_error(line, row, f"Invalid status '{status}'.")
+        return None
+    if day.weekday() >= 5:
+        result.add_error(line, row, "Cannot record attendance on weekends.")
+        return None
+    if day in lookups.holidays:
+        result.add_error(line, row, "Cannot record attendance on a holiday.")
+        return None
+
+    term = lookups.term_for(day)
+    if term is None:
+        result.add_error(line, row, "Date does not fall within any term.")
+        return None
+    term_id, academic_session_id = term
+
+    class_assignment_id = lookups.enrollments.get((student_id, academic_session_id))
+    if class_assignment_id is None:
+        result.add_error(line, row, "Student is not enrolled in a class for this session.")
+        return None
+
+    return student_id, class_assignment_id, day, period, status, term_id
+
+
+def _write_chunk(chunk, lookups, result, marked_by, affected):
+    """Resolve sessions for a chunk of validated rows and upsert its records."""
+    result.sessions_created += lookups.load_sessions(
+        {(ca_id, day, period, term_id) for _, (_, ca_id, day, period, _, term_id), _ in chunk}
+    )
+
+    now = timezone.now()
+    records = {}
+    for line, (student_id, ca_id, day, period, status, term_id), row in chunk:
+        session_id, is_locked = lookups.sessions[(ca_id, day, period)]
+        if is_locked:
+            result.add_error(line, row, "This session is locked and cannot be modified.")
+            continue
+        # Later rows for the same student/session win.
+        records[(session_id, student_id)] = AttendanceRecord(
+            organization=lookups.organization,
+            session_id=session_id,
+            student_id=student_id,
+            status=status,
+            marked_at=now,
+            marked_by=marked_by,
+        )
+        affected.add((ca_id, get_week_bounds(day)[0], term_id))
+
+    with transaction.atomic():
+        version = next_sync_version(lookups.organization.id)
+        for record in records.values():
+            record.sync_version = version
+        AttendanceRecord.all_objects.bulk_create(
+            list(records.values()),
+            update_conflicts=True,
+            unique_fields=["organization", "session", "student"],
+            update_fields=["status", "marked_at", "marked_by", "sync_version"],
+        )
+        refresh_cube_for_sessions({session_id for session_id, _ in records})
+    result.imported += len(records)
+
+
+def import_attendance_csv(organization, stream, marked_by=None, class_assignments=None,
+                          chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import attendance rows from a text stream of CSV with the columns
+    admission_number, date, period, status.
+
+    `class_assignments` optionally restricts which classes may be written
+    (e.g. a form teacher's own classes). Returns an `ImportResult`.
+    """
+    result = ImportResult()
+    reader = csv.DictReader(stream)
+    header = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [column for column in IMPORT_COLUMNS if column not in header]
+    if missing:
+        result.add_error(1, None, "Missing column(s): " + ", ".join(missing) + ".")
+        return result
+    reader.fieldnames = header
+
+    lookups = _Lookups(organization, class_assignments)
+    affected = set()
+    chunk = []
+
+    for line, row in enumerate(reader, start=2):
+        result.rows += 1
+        validated = _validate_row(row, lookups, result, line)
+        if validated is None:
+            continue
+        chunk.append((line, validated, row))
+        if len(chunk) >= chunk_size:
+            _write_chunk(chunk, lookups, result, marked_by, affected)
+            chunk = []
+
+    if chunk:
+        _write_chunk(chunk, lookups, result, marked_by, affected)
+
+    if affected:
+        assignments = ClassSessionAssignment.all_objects.in_bulk({key[0] for key in affected})
+        terms = Term.all_objects.in_bulk({key[2] for key in affected})
+        with transaction.atomic():
+            recompute_summaries_for_keys(
+                weekly_keys=[
+                    (assignments[ca_id], week_start, terms[term_id])
+                    for ca_id, week_start, term_id in affected
+                ],
+                term_keys=[(assignments[ca_id], terms[term_id]) for ca_id, _, term_id in affected],
+            )
+
+    result.errors.sort(key=lambda error: error["line"])
+    return result
+
+
+def iter_error_report(result):
+    """Rows (header first) of the error report, for CSV/XLSX writers."""
+    yield list(ERROR_REPORT_COLUMNS)
+    for error in result.errors:
+        yield [error[column] for column in ERROR_REPORT_COLUMNS]
@@ -1,7 +1,6 @@
 from django.core.management.base import BaseCommand
-from academics.models import Term
-from attendance.services import compute_term_summary_for_student
-from users.models import StudentProfile
+from academics.models import Term, ClassSessionAssignment
+from attendance.services import update_term_class_summary
 
 
 class Command(BaseCommand):
@@ -13,13 +12,15 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         term_id = options["term_id"]
         try:
-            term = Term.objects.get(id=term_id)
+            term = Term.all_objects.get(id=term_id)
         except Term.DoesNotExist:
             self.stderr.write(f"❌ Term {term_id} does not exist")
             return
 
-        for student in StudentProfile.objects.filter(organization=term.organization):
-            class_ref = student.school_class
-            compute_term_summary_for_student(student, class_ref, term, term.organization)
+        assignments = ClassSessionAssignment.all_objects.filter(
+            organization=term.organization, session=term.session
+        )
+        for class_assignment in assignments:
+            update_term_class_summary(class_assignment, term)
 
-        self.stdout.write(self.style.SUCCESS(f"✅ Term summaries computed for term {term_id}"))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f"✅ Term summaries computed for term {term_id}"))
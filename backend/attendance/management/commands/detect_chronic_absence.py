@@ -0,0 +1,24 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from attendance.alerts import detect_chronic_absence
+from users.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Flag students with low attendance or consecutive absences"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Only this organization id")
+        parser.add_argument("--as-of", type=date.fromisoformat, help="Detection date (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.all()
+        if options["organization"]:
+            organizations = organizations.filter(pk=options["organization"])
+
+        total = 0
+        for organization in organizations:
+            total += detect_chronic_absence(organization, as_of=options["as_of"])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} attendance alert(s) raised"))
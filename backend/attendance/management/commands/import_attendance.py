@@ -0,0 +1,47 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from attendance.imports import import_attendance_csv, iter_error_report, IMPORT_CHUNK_SIZE
+from users.models import Organization, User
+
+
+class Command(BaseCommand):
+    help = "Bulk import attendance from a CSV of admission_number, date, period, status"
+
+    def add_arguments(self, parser):
+        parser.add_argument("organization_id", type=int, help="ID of the organization")
+        parser.add_argument("csv_path", help="Path to the CSV file")
+        parser.add_argument("--errors", help="Write the row-level error report to this CSV path")
+        parser.add_argument("--marked-by", help="Email of the user to record as marker")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options["organization_id"])
+        except Organization.DoesNotExist:
+            raise CommandError(f"❌ Organization {options['organization_id']} does not exist")
+
+        marked_by = None
+        if options["marked_by"]:
+            try:
+                marked_by = User.objects.get(email=options["marked_by"])
+            except User.DoesNotExist:
+                raise CommandError(f"❌ User {options['marked_by']} does not exist")
+
+        with open(options["csv_path"], newline="", encoding="utf-8-sig") as stream:
+            result = import_attendance_csv(
+                organization, stream, marked_by=marked_by, chunk_size=options["chunk_size"]
+            )
+
+        if options["errors"]:
+            with open(options["errors"], "w", newline="", encoding="utf-8") as report:
+                csv.writer(report).writerows(iter_error_report(result))
+
+        summary = (
+            f"{result.imported} of {result.rows} rows imported, "
+            f"{result.failed} failed, {result.sessions_created} sessions created"
+        )
+        if result.failed:
+            self.stdout.write(self.style.WARNING(f"⚠️ {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ {summary}"))
@@ -0,0 +1,140 @@
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from academics.models import ClassSessionAssignment, Term
+from attendance.models import AttendanceRecord
+from core.db_pool import pool_stats
+from students.models import StudentEnrollment
+from users.models import Organization, User
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+def _open_connections():
+    """Server connections to this database (PostgreSQL only)."""
+    if connection.vendor != "postgresql":
+        return None
+    with connections["default"].cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")
+        return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test: many teachers pushing attendance marks at once through "
+        "/api/attendance/sync/. Reports latency percentiles and peak database connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, required=True)
+        parser.add_argument("--user", required=True, help="Email of an admin/principal to mark as")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--date", type=date.fromisoformat, help="School day to mark (default: latest)")
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(pk=options["organization"]).first()
+        user = User.objects.filter(email=options["user"]).first()
+        if organization is None or user is None:
+            raise CommandError("Unknown organization or user.")
+
+        token = AccessToken.for_user(user)
+        token["organization_id"] = str(organization.id)
+        authorization = f"Bearer {token}"
+        host = next((host.lstrip(".") for host in settings.ALLOWED_HOSTS if host != "*"), "localhost")
+
+        payloads = self._payloads(organization, options["date"])
+        if not payloads:
+            raise CommandError("No class with enrolled students in a current term.")
+
+        peak = {"connections": _open_connections()}
+        done = threading.Event()
+
+        def watch_connections():
+            while not done.wait(0.05):
+                count = _open_connections()
+                if count is not None:
+                    peak["connections"] = max(peak["connections"] or 0, count)
+            connections.close_all()
+
+        def push(index):
+            body = dict(payloads[index % len(payloads)])
+            now = timezone.now().isoformat()
+            body["changes"] = [
+                {**change, "status": random.choice(AttendanceRecord.STATUS_CHOICES)[0], "marked_at": now}
+                for change in body["changes"]
+            ]
+            client = Client(HTTP_HOST=host)
+            start = time.perf_counter()
+            response = client.post(
+                "/api/attendance/sync/", body, content_type="application/json",
+                HTTP_AUTHORIZATION=authorization,
+            )
+            return time.perf_counter() - start, response.status_code
+
+        watcher = threading.Thread(target=watch_connections, daemon=True)
+        watcher.start()
+        start = time.perf_counter()
+        # Measures capacity, so the per-user write limit must not kick in.
+        with override_settings(RATELIMIT_ENABLED=False), \
+                ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(push, range(options["requests"])))
+        elapsed = time.perf_counter() - start
+        done.set()
+        watcher.join()
+
+        latencies = [latency * 1000 for latency, _ in results]
+        failures = sum(status >= 400 for _, status in results)
+        self.stdout.write(
+            f"requests={len(results)} failures={failures} concurrency={options['concurrency']} "
+            f"throughput={len(results) / elapsed:.1f}/s"
+        )
+        self.stdout.write(
+            f"latency_ms p50={statistics.median(latencies):.1f} p95={_percentile(latencies, 95):.1f} "
+            f"p99={_percentile(latencies, 99):.1f} max={max(latencies):.1f}"
+        )
+        self.stdout.write(f"peak_db_connections={peak['connections'] if peak['connections'] is not None else 'n/a'}")
+        for alias, stats in pool_stats().items():
+            self.stdout.write(f"pool[{alias}] " + " ".join(f"{key}={value}" for key, value in sorted(stats.items())))
+        self.stdout.write(self.style.SUCCESS("✅ Marking burst finished"))
+
+    def _payloads(self, organization, day=None):
+        """One sync body per class: every enrolled student, on `day` or the last school day."""
+        day = day or timezone.localdate()
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+
+        payloads = []
+        assignments = ClassSessionAssignment.all_objects.filter(organization=organization)
+        for assignment in assignments:
+            if not Term.all_objects.filter(
+                organization=organization, session_id=assignment.session_id,
+                start_date__lte=day, end_date__gte=day,
+            ).exists():
+                continue
+            students = list(StudentEnrollment.all_objects.filter(
+                organization=organization, class_assignment=assignment
+            ).values_list("student_id", flat=True))
+            if students:
+                payloads.append({
+                    "class_assignment": assignment.pk,
+                    "changes": [
+                        {"class_assignment": assignment.pk, "date": day.isoformat(), "period": "MORNING", "student": s}
+                        for s in students
+                    ],
+                })
+        return payloads
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from attendance.cube import rebuild_cube
+from users.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily attendance analytics cube from attendance records"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Only this organization id")
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.all()
+        if options["organization"]:
+            organizations = organizations.filter(pk=options["organization"])
+
+        for organization in organizations:
+            sessions = rebuild_cube(organization)
+            self.stdout.write(self.style.SUCCESS(f"✅ {organization}: cube rebuilt for {sessions} session(s)"))
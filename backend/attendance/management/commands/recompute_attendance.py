@@ -1,34 +1,32 @@
 from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
 from attendance.services import update_weekly_class_summary, update_term_class_summary
-from academics.models import Term, Class
-from attendance.models import AttendanceRecord
+from academics.models import Term, ClassSessionAssignment
+from attendance.models import AttendanceSession
 from datetime import timedelta
 
 class Command(BaseCommand):
     help = "Recompute all weekly and term attendance summaries"
 
     def handle(self, *args, **options):
-        for cls in Class.objects.all():
-            org = cls.organization
+        for class_assignment in ClassSessionAssignment.all_objects.all():
             # weekly summaries
-            first_record = AttendanceRecord.objects.filter(session__class_ref=cls).order_by("session__date").first()
-            last_record = AttendanceRecord.objects.filter(session__class_ref=cls).order_by("-session__date").first()
+            for term in Term.all_objects.filter(session=class_assignment.session):
+                bounds = AttendanceSession.all_objects.filter(
+                    class_assignment=class_assignment, term=term
+                ).aggregate(first=Min("date"), last=Max("date"))
 
-            if not first_record:
-                continue
+                if not bounds["first"]:
+                    continue
 
-            start_date = first_record.session.date
-            end_date = last_record.session.date
+                current = bounds["first"] - timedelta(days=bounds["first"].weekday())
+                while current <= bounds["last"]:
+                    week_start = current
+                    week_end = current + timedelta(days=4)
+                    update_weekly_class_summary(class_assignment, week_start, week_end, term)
+                    current += timedelta(weeks=1)
 
-            current = start_date - timedelta(days=start_date.weekday())
-            while current <= end_date:
-                week_start = current
-                week_end = current + timedelta(days=4)
-                update_weekly_class_summary(cls, week_start, week_end, org)
-                current += timedelta(weeks=1)
+                # term summaries
+                update_term_class_summary(class_assignment, term)
 
-            # term summaries
-            for term in Term.objects.filter(organization=org):
-                update_term_class_summary(cls, term, org)
-
-        self.stdout.write(self.style.SUCCESS("Attendance summaries recomputed successfully"))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS("Attendance summaries recomputed successfully"))
@@ -0,0 +1,145 @@
+# Generated by Django 5.2.4 on 2025-08-10 09:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SCOPED_MODELS = [
+    "AttendanceSession",
+    "WeeklyAttendanceSummary",
+    "TermAttendanceSummary",
+    "WeeklyClassAttendanceSummary",
+    "TermClassAttendanceSummary",
+]
+
+
+def link_class_assignments(apps, schema_editor):
+    """
+    Point existing rows at the ClassSessionAssignment for their
+    (organization, class_ref, term.session), creating it when missing.
+    """
+    ClassSessionAssignment = apps.get_model("academics", "ClassSessionAssignment")
+    cache = {}
+
+    def assignment_for(row, form_teacher_id=None):
+        key = (row.organization_id, row.class_ref_id, row.term.session_id)
+        if key not in cache:
+            cache[key], _ = ClassSessionAssignment.objects.get_or_create(
+                organization_id=row.organization_id,
+                class_ref_id=row.class_ref_id,
+                session_id=row.term.session_id,
+                defaults={"form_teacher_id": form_teacher_id},
+            )
+        return cache[key]
+
+    for model_name in SCOPED_MODELS:
+        model = apps.get_model("attendance", model_name)
+        for row in model.objects.select_related("term").iterator():
+            row.class_assignment = assignment_for(row, getattr(row, "form_teacher_id", None))
+            row.save(update_fields=["class_assignment"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesession',
+            name='class_assignment',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_sessions', to='academics.classsessionassignment'),
+        ),
+        migrations.AddField(
+            model_name='weeklyattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='weekly_attendance_summary', to='academics.classsessionassignment'),
+        ),
+        migrations.AddField(
+            model_name='termattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='term_attendance_summary', to='academics.classsessionassignment'),
+        ),
+        migrations.AddField(
+            model_name='weeklyclassattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='weekly_class_attendance_summary', to='academics.classsessionassignment'),
+        ),
+        migrations.AddField(
+            model_name='termclassattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='term_class_attendance_summary', to='academics.classsessionassignment'),
+        ),
+        migrations.RunPython(link_class_assignments, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='attendancesession',
+            unique_together={('organization', 'class_assignment', 'date', 'period')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='weeklyattendancesummary',
+            unique_together={('organization', 'class_assignment', 'student', 'week_start', 'week_end')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='termattendancesummary',
+            unique_together={('organization', 'class_assignment', 'student', 'term')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='weeklyclassattendancesummary',
+            unique_together={('organization', 'class_assignment', 'week_start', 'week_end')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='termclassattendancesummary',
+            unique_together={('organization', 'class_assignment', 'term')},
+        ),
+        migrations.RemoveField(
+            model_name='attendancesession',
+            name='class_ref',
+        ),
+        migrations.RemoveField(
+            model_name='attendancesession',
+            name='form_teacher',
+        ),
+        migrations.RemoveField(
+            model_name='weeklyattendancesummary',
+            name='class_ref',
+        ),
+        migrations.RemoveField(
+            model_name='termattendancesummary',
+            name='class_ref',
+        ),
+        migrations.RemoveField(
+            model_name='weeklyclassattendancesummary',
+            name='class_ref',
+        ),
+        migrations.RemoveField(
+            model_name='termclassattendancesummary',
+            name='class_ref',
+        ),
+        migrations.AlterField(
+            model_name='attendancesession',
+            name='class_assignment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_sessions', to='academics.classsessionassignment'),
+        ),
+        migrations.AlterField(
+            model_name='weeklyattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_attendance_summary', to='academics.classsessionassignment'),
+        ),
+        migrations.AlterField(
+            model_name='termattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_attendance_summary', to='academics.classsessionassignment'),
+        ),
+        migrations.AlterField(
+            model_name='weeklyclassattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_class_attendance_summary', to='academics.classsessionassignment'),
+        ),
+        migrations.AlterField(
+            model_name='termclassattendancesummary',
+            name='class_assignment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_class_attendance_summary', to='academics.classsessionassignment'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('attendance', '0003_attendanceexport'),
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('LOW_RATE', 'Low attendance rate'), ('CONSECUTIVE_ABSENCES', 'Consecutive absences')], max_length=20)),
+                ('detected_on', models.DateField()),
+                ('window_start', models.DateField()),
+                ('window_end', models.DateField()),
+                ('value', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('threshold', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('is_resolved', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('class_assignment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_alerts', to='academics.classsessionassignment')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_alerts', to='users.organization')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_alerts', to='users.studentprofile')),
+            ],
+            options={
+                'ordering': ['-detected_on', 'kind'],
+                'unique_together': {('organization', 'student', 'kind', 'detected_on')},
+            },
+        ),
+    ]
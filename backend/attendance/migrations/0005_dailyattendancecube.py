@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('attendance', '0004_attendancealert'),
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceCube',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('month', models.DateField()),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('period', models.CharField(choices=[('MORNING', 'Morning'), ('AFTERNOON', 'Afternoon')], max_length=10)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('academic_session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_cube', to='academics.academicsession')),
+                ('class_assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_cube', to='academics.classsessionassignment')),
+                ('class_ref', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_cube', to='academics.class')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_cube', to='users.organization')),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cube', to='attendance.attendancesession')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_cube', to='academics.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'date'], name='attendance__organiz_896e00_idx'), models.Index(fields=['organization', 'term'], name='attendance__organiz_17efb4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def stamp_existing_rows(apps, schema_editor):
+    """Give existing sessions/records version 1 so a first sync (cursor 0) sees them."""
+    AttendanceSession = apps.get_model("attendance", "AttendanceSession")
+    AttendanceRecord = apps.get_model("attendance", "AttendanceRecord")
+    SyncCounter = apps.get_model("attendance", "SyncCounter")
+
+    AttendanceSession.objects.update(sync_version=1)
+    AttendanceRecord.objects.update(sync_version=1)
+    organization_ids = set(AttendanceSession.objects.values_list("organization_id", flat=True))
+    SyncCounter.objects.bulk_create(
+        [SyncCounter(organization_id=organization_id, value=1) for organization_id in organization_ids]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('attendance', '0005_dailyattendancecube'),
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SESSION', 'Session'), ('RECORD', 'Record')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('class_assignment_id', models.BigIntegerField(blank=True, null=True)),
+                ('sync_version', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncCounter',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance_sync_counter', serialize=False, to='users.organization')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attendancerecord',
+            name='sync_version',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attendancesession',
+            name='sync_version',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['organization', 'sync_version'], name='attendance__organiz_719aad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['organization', 'sync_version'], name='attendance__organiz_b21324_idx'),
+        ),
+        migrations.AddField(
+            model_name='attendancetombstone',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_tombstones', to='users.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancetombstone',
+            index=models.Index(fields=['organization', 'sync_version'], name='attendance__organiz_fe08ac_idx'),
+        ),
+        migrations.RunPython(stamp_existing_rows, migrations.RunPython.noop),
+    ]
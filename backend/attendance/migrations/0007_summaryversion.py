@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_attendance_sync'),
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummaryVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('WEEKLY', 'Weekly summaries'), ('TERM', 'Term summaries')], max_length=10)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summary_versions', to='users.organization')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('organization', 'resource'), name='unique_summary_version')],
+            },
+        ),
+    ]
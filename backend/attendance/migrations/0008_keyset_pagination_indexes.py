@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('attendance', '0007_summaryversion'),
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['organization', 'id'], name='attendance__organiz_ef0eb4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['organization', 'date', 'id'], name='attendance__organiz_5dcf98_idx'),
+        ),
+    ]
@@ -1,10 +1,12 @@
 # attendance/models.py
 
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from core.managers import OrganizationManager
 from academics.models import Class, Term
+from students.models import StudentEnrollment
 from users.models import StudentProfile, TeacherProfile, Organization
 
 
@@ -57,6 +59,7 @@ class AttendanceSession(models.Model):
     # form_teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name="marked_sessions")
     is_locked = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    sync_version = models.BigIntegerField(default=0)  # see attendance.sync
 
     objects = OrganizationManager()
     all_objects = models.Manager()
@@ -69,9 +72,13 @@ class AttendanceSession(models.Model):
             "period"
         )
         ordering = ["-date", "period"]
+        indexes = [
+            models.Index(fields=["organization", "sync_version"]),
+            models.Index(fields=["organization", "date", "id"]),  # keyset pagination
+        ]
 
     def __str__(self):
-        return f"{self.class_ref} - {self.date} ({self.period})"
+        return f"{self.class_assignment} - {self.date} ({self.period})"
 
 
 class AttendanceRecord(models.Model):
@@ -91,6 +98,7 @@ class AttendanceRecord(models.Model):
     marked_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="attendance_marked"
     )
+    sync_version = models.BigIntegerField(default=0)  # see attendance.sync
 
     
     objects = OrganizationManager()
@@ -99,6 +107,16 @@ class AttendanceRecord(models.Model):
     class Meta:
         unique_together = ("organization", "session", "student")
         ordering = ["session", "student"]
+        indexes = [
+            models.Index(fields=["organization", "sync_version"]),
+            models.Index(fields=["organization", "id"]),  # keyset pagination
+        ]
+
+    def clean(self):
+        if self.session_id and self.student_id and not StudentEnrollment.all_objects.filter(
+            student_id=self.student_id, class_assignment_id=self.session.class_assignment_id
+        ).exists():
+            raise ValidationError({"student": "This student is not enrolled in the class for this session."})
 
     def __str__(self):
         return f"{self.student} - {self.session} ({self.status})"
@@ -215,4 +233,201 @@ class TermClassAttendanceSummary(models.Model):
         unique_together = ("organization", "class_assignment", "term")
 
     def __str__(self):
-        return f"{self.class_ref.name} - {self.term}"
\ No newline at end of file
+        return f"{self.class_ref.name} - {self.term}"
+
+class AttendanceExport(models.Model):
+    """A register/history/summary export generated in the background."""
+
+    class Kind(models.TextChoices):
+        REGISTER = "REGISTER", "Class register"
+        STUDENT_HISTORY = "STUDENT_HISTORY", "Student history"
+        TERM_SUMMARY = "TERM_SUMMARY", "Term summary"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        COMPLETED = "COMPLETED", "Completed"
+        FAILED = "FAILED", "Failed"
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="attendance_exports"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="attendance_exports",
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    file_format = models.CharField(max_length=4, default="csv")
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to="exports/attendance/", blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} export #{self.pk} ({self.status})"
+
+
+class AttendanceAlert(models.Model):
+    """A student flagged by the nightly chronic-absence pipeline."""
+
+    class Kind(models.TextChoices):
+        LOW_RATE = "LOW_RATE", "Low attendance rate"
+        CONSECUTIVE_ABSENCES = "CONSECUTIVE_ABSENCES", "Consecutive absences"
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="attendance_alerts"
+    )
+    student = models.ForeignKey(
+        StudentProfile, on_delete=models.CASCADE, related_name="attendance_alerts"
+    )
+    class_assignment = models.ForeignKey(
+        "academics.ClassSessionAssignment",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="attendance_alerts",
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    detected_on = models.DateField()
+    window_start = models.DateField()
+    window_end = models.DateField()
+    value = models.DecimalField(max_digits=5, decimal_places=2)  # rate (%) or streak length
+    threshold = models.DecimalField(max_digits=5, decimal_places=2)
+    is_resolved = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "student", "kind", "detected_on")
+        ordering = ["-detected_on", "kind"]
+
+    def __str__(self):
+        return f"{self.student} - {self.get_kind_display()} ({self.detected_on})"
+
+
+class DailyAttendanceCube(models.Model):
+    """
+    Daily rollup of attendance counts per session, for analytics.
+
+    One row per session with a count per status and the session's dimensions
+    copied in, so dashboards can slice and group without touching
+    AttendanceRecord. Rows are refreshed by `attendance.cube` whenever
+    records change.
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="attendance_cube")
+    session = models.OneToOneField(AttendanceSession, on_delete=models.CASCADE, related_name="cube")
+    class_assignment = models.ForeignKey(
+        "academics.ClassSessionAssignment",
+        on_delete=models.CASCADE,
+        related_name="attendance_cube",
+    )
+    class_ref = models.ForeignKey(Class, on_delete=models.CASCADE, related_name="attendance_cube")
+    academic_session = models.ForeignKey(
+        "academics.AcademicSession",
+        on_delete=models.CASCADE,
+        related_name="attendance_cube",
+    )
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="attendance_cube")
+    date = models.DateField()
+    month = models.DateField()  # first day of the month
+    weekday = models.PositiveSmallIntegerField()  # ISO: 1 = Monday
+    period = models.CharField(max_length=10, choices=AttendanceSession.PERIOD_CHOICES)
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "date"]),
+            models.Index(fields=["organization", "term"]),
+        ]
+
+    def __str__(self):
+        return f"{self.session} {self.present}/{self.total}"
+
+
+class SyncCounter(models.Model):
+    """Per-organization change counter behind the attendance sync cursor."""
+    organization = models.OneToOneField(
+        Organization, on_delete=models.CASCADE, primary_key=True, related_name="attendance_sync_counter"
+    )
+    value = models.BigIntegerField(default=0)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    def __str__(self):
+        return f"{self.organization} @ {self.value}"
+
+
+class AttendanceTombstone(models.Model):
+    """Marks a deleted session or record so sync clients can drop it."""
+
+    class Kind(models.TextChoices):
+        SESSION = "SESSION", "Session"
+        RECORD = "RECORD", "Record"
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="attendance_tombstones"
+    )
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    class_assignment_id = models.BigIntegerField(null=True, blank=True)  # plain id: the class may be gone too
+    sync_version = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["organization", "sync_version"])]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted @ {self.sync_version}"
+
+
+class SummaryVersion(models.Model):
+    """
+    Per-organization version of a family of summary tables, bumped whenever
+    those summaries are rewritten. Drives ETags and the summary response cache.
+    """
+
+    class Resource(models.TextChoices):
+        WEEKLY = "WEEKLY", "Weekly summaries"
+        TERM = "TERM", "Term summaries"
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="attendance_summary_versions"
+    )
+    resource = models.CharField(max_length=10, choices=Resource.choices)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["organization", "resource"], name="unique_summary_version")
+        ]
+
+    def __str__(self):
+        return f"{self.organization} {self.resource} v{self.version}"
@@ -1,6 +1,12 @@
 from rest_framework import permissions
 from users.models import Membership
 
+def _is_form_teacher(user, session):
+    """Whether `user` is the form teacher of the session's class assignment."""
+    form_teacher = session.class_assignment.form_teacher
+    return form_teacher is not None and form_teacher.membership.user_id == user.id
+
+
 class CanViewAttendance(permissions.BasePermission):
     """
     Students, parents, admins, principals can view attendance.
@@ -10,8 +16,9 @@ class CanViewAttendance(permissions.BasePermission):
         return request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        # Read-only allowed for everyone authenticated
-        return request.method in permissions.SAFE_METHODS
+        # Reads are scoped by each view's queryset; writes are left to
+        # CanManageAttendance, which views pair with this permission.
+        return True
     
 class CanManageAttendance(permissions.BasePermission):
     """
@@ -38,7 +45,7 @@ class CanManageAttendance(permissions.BasePermission):
                     session = AttendanceSession.objects.get(pk=view.kwargs["pk"])
                 except AttendanceSession.DoesNotExist:
                     return False
-                return session.form_teacher == request.user.memberships().teacher_profile
+                return _is_form_teacher(request.user, session)
             return True  # fallback for other cases
         return False
 
@@ -51,10 +58,10 @@ class CanManageAttendance(permissions.BasePermission):
         # Teacher must be the assigned form teacher for this class
         if role == Membership.RoleChoices.TEACHER:
             # For AttendanceSession
-            if hasattr(obj, "form_teacher"):
-                return obj.form_teacher == request.user.memberships.first().teacher_profile
+            if hasattr(obj, "class_assignment"):
+                return _is_form_teacher(request.user, obj)
             # For AttendanceRecord
             if hasattr(obj, "session"):
-                return obj.session.form_teacher == request.user.memberships().teacher_profile
+                return _is_form_teacher(request.user, obj.session)
 
         return False
\ No newline at end of file
@@ -1,4 +1,12 @@
+from django.utils import timezone
 from rest_framework import serializers
+from academics.models import ClassSessionAssignment, Term
+from core.exports import EXPORT_FORMATS
+from core.serializers import FlexFieldsMixin
+from .cube import DIMENSIONS
+from .sync import SYNC_MAX_CHANGES
+from students.models import StudentEnrollment
+from users.models import StudentProfile
 from .models import (
     AttendanceSession, 
     AttendanceRecord,
@@ -6,7 +14,9 @@ from .models import (
     WeeklyClassAttendanceSummary, 
     TermAttendanceSummary, 
     TermClassAttendanceSummary,
-    Holiday
+    Holiday,
+    AttendanceExport,
+    AttendanceAlert
 )
 
 
@@ -17,12 +27,15 @@ class HolidaySerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class AttendanceRecordSerializer(serializers.ModelSerializer):
+class AttendanceRecordSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(
-        source="student.user.get_full_name", 
+        source="student.membership.user.get_full_name", 
         read_only=True
     )
 
+    expandable_fields = {"student": "students.serializers.StudentProfileSerializer"}
+    field_relations = {"student_name": "student__membership__user"}
+
     class Meta:
         model = AttendanceRecord
         fields = [
@@ -36,24 +49,26 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "marked_at", "marked_by"]
 
     def validate(self, attrs):
-        request = self.context.get("request")
-        session = self.context.get("session")  # we can pass this in from the view if needed
+        session = self.context.get("session")  # passed in by the session's records action
         student = attrs.get("student")
 
         if not session and "session" in attrs:
             session = attrs["session"]
 
         if session and student:
-            # 1. Ensure student belongs to the same class
-            if student.school_class != session.class_ref:
+            # 1. Ensure student is enrolled in the session's class
+            if not StudentEnrollment.all_objects.filter(
+                student=student, class_assignment_id=session.class_assignment_id
+            ).exists():
                 raise serializers.ValidationError(
-                    {"student": "This student does not belong to the class for this session."}
+                    {"student": "This student is not enrolled in the class for this session."}
                 )
 
             # 2. Ensure no duplicate attendance for this student in this session
-            if AttendanceRecord.objects.filter(
-                organization=session.organization, session=session, student=student
-            ).exists():
+            duplicates = AttendanceRecord.all_objects.filter(session=session, student=student)
+            if self.instance is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            if duplicates.exists():
                 raise serializers.ValidationError(
                     {"student": "Attendance already marked for this student in this session."}
                 )
@@ -66,26 +81,50 @@ class AttendanceRecordSerializer(serializers.ModelSerializer):
         if request:
             validated_data["organization"] = request.user.memberships.first().organization
             validated_data["marked_by"] = request.user
+        validated_data["marked_at"] = timezone.now()
         return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        """Re-mark: the server's clock orders this edit against offline ones (see attendance.sync)."""
+        request = self.context.get("request")
+        if request:
+            validated_data["marked_by"] = request.user
+        validated_data["marked_at"] = timezone.now()
+        return super().update(instance, validated_data)
     
 
 class AttendanceSessionSerializer(serializers.ModelSerializer):
-    class_ref_name = serializers.CharField(source="class_ref.name", read_only=True)
-    records = AttendanceRecordSerializer(many=True, read_only=True)
+    class_ref = serializers.IntegerField(source="class_assignment.class_ref_id", read_only=True)
+    class_ref_name = serializers.CharField(source="class_assignment.class_ref.name", read_only=True)
+    form_teacher = serializers.IntegerField(source="class_assignment.form_teacher_id", read_only=True)
+    records = AttendanceRecordSerializer(many=True, required=False)
 
     class Meta:
         model = AttendanceSession
         fields = [
             "id", 
+            "class_assignment",
             "class_ref", 
             "class_ref_name", 
             "date", 
             "period",
+            "term",
             "form_teacher", 
+            "is_locked",
             "created_at", 
             "records"
         ]
-        read_only_fields = ["id","created_at", "records"]
+        read_only_fields = ["id", "is_locked", "created_at"]
+
+    def _create_records(self, session, records_data):
+        request = self.context.get("request")
+        for rec in records_data:
+            AttendanceRecord.objects.create(
+                session=session, 
+                organization=session.organization,
+                marked_by=request.user if request else None,
+                **rec
+            )
 
     def create(self, validated_data):
         request = self.context.get("request")
@@ -95,13 +134,7 @@ class AttendanceSessionSerializer(serializers.ModelSerializer):
             validated_data["organization"] = request.user.memberships.first().organization
 
         session = AttendanceSession.objects.create(**validated_data)
-        
-        for rec in records_data:
-            AttendanceRecord.objects.create(
-                session=session, 
-                organization=session.organization,
-                  **rec
-            )
+        self._create_records(session, records_data)
         return session
 
     def update(self, instance, validated_data):
@@ -116,58 +149,79 @@ class AttendanceSessionSerializer(serializers.ModelSerializer):
 
         if records_data is not None:
             instance.records.all().delete()
-            for rec in records_data:
-                AttendanceRecord.objects.create(session=instance, organization=instance.organization, **rec)
+            self._create_records(instance, records_data)
         return instance
     
     def validate(self, data):
-        """Block sessions on weekends or holidays."""
-        class_ref = data.get("class_ref")
-        date = data.get("date")
-        period = data.get("period")
-        form_teacher = data.get("form_teacher")
+        """Block sessions on weekends or holidays, and records of students outside the class."""
+        class_assignment = data.get("class_assignment", getattr(self.instance, "class_assignment", None))
+        date = data.get("date", getattr(self.instance, "date", None))
+        period = data.get("period", getattr(self.instance, "period", None))
 
         organization = (
             self.context["request"].user.memberships.first().organization
             if self.context.get("request") else None
         )
 
+        if organization and class_assignment and class_assignment.organization_id != organization.id:
+            raise serializers.ValidationError({"class_assignment": "Not found in this organization."})
+
         # Weekend check
         if date.weekday() >= 5:  # 5=Saturday, 6=Sunday
             raise serializers.ValidationError("Cannot create attendance on weekends.")
 
         # Holiday check
-        if organization and Holiday.objects.filter(date=date).exists():
+        if organization and Holiday.all_objects.filter(organization=organization, date=date).exists():
             raise serializers.ValidationError("Cannot create attendance on a holiday.")
 
         # Duplicate session check
-        if organization and AttendanceSession.objects.filter(
-            class_ref=class_ref, 
+        duplicates = AttendanceSession.all_objects.filter(
+            class_assignment=class_assignment, 
             date=date, 
             period=period
-        ).exists():
+        )
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
             raise serializers.ValidationError("Session already exists for this class, date, and period.")
-        
-        if class_ref and form_teacher and class_ref.form_teacher != form_teacher:
-            raise serializers.ValidationError("Form teacher mismatch for this class.")
+
+        # Every record must be for a student enrolled in the class
+        records = data.get("records") or []
+        if records:
+            enrolled = set(
+                StudentEnrollment.all_objects.filter(
+                    class_assignment=class_assignment,
+                    student__in=[rec["student"] for rec in records],
+                ).values_list("student_id", flat=True)
+            )
+            errors = [
+                {} if rec["student"].pk in enrolled
+                else {"student": ["This student is not enrolled in the class for this session."]}
+                for rec in records
+            ]
+            if any(errors):
+                raise serializers.ValidationError({"records": errors})
         
         return data
     
 
 class WeeklyAttendanceSummarySerializer(serializers.ModelSerializer):
+    class_ref = serializers.IntegerField(source="class_assignment.class_ref_id", read_only=True)
     student_name = serializers.CharField(
-        source="student.user.get_full_name", 
+        source="student.membership.user.get_full_name", 
         read_only=True
     )
     class_ref_name = serializers.CharField(
-        source="class_ref.name", 
+        source="class_assignment.class_ref.name", 
         read_only=True
     )
     class Meta:
         model = WeeklyAttendanceSummary
         fields = [
             "id", 
+            "class_assignment",
             "class_ref", 
+            "class_ref_name",
             "student", 
             "student_name",
             "week_start", 
@@ -179,12 +233,13 @@ class WeeklyAttendanceSummarySerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 class TermAttendanceSummarySerializer(serializers.ModelSerializer):
+    class_ref = serializers.IntegerField(source="class_assignment.class_ref_id", read_only=True)
     student_name = serializers.CharField(
-        source="student.user.get_full_name", 
+        source="student.membership.user.get_full_name", 
         read_only=True
     )
     class_ref_name = serializers.CharField(
-        source="class_ref.name", 
+        source="class_assignment.class_ref.name", 
         read_only=True
     )
 
@@ -192,7 +247,9 @@ class TermAttendanceSummarySerializer(serializers.ModelSerializer):
         model = TermAttendanceSummary
         fields = [
             "id", 
+            "class_assignment",
             "class_ref", 
+            "class_ref_name",
             "student", 
             "student_name",
             "term", 
@@ -203,8 +260,9 @@ class TermAttendanceSummarySerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 class WeeklyClassAttendanceSummarySerializer(serializers.ModelSerializer):
+    class_ref = serializers.IntegerField(source="class_assignment.class_ref_id", read_only=True)
     class_name = serializers.CharField(
-        source="class_ref.name", 
+        source="class_assignment.class_ref.name", 
         read_only=True
     )
 
@@ -212,6 +270,7 @@ class WeeklyClassAttendanceSummarySerializer(serializers.ModelSerializer):
         model = WeeklyClassAttendanceSummary
         fields = [
             "id",
+            "class_assignment",
             "class_ref",
             "class_name",
             "week_start",
@@ -224,8 +283,9 @@ class WeeklyClassAttendanceSummarySerializer(serializers.ModelSerializer):
 
 
 class TermClassAttendanceSummarySerializer(serializers.ModelSerializer):
+    class_ref = serializers.IntegerField(source="class_assignment.class_ref_id", read_only=True)
     class_ref_name = serializers.CharField(
-        source="class_ref.name", 
+        source="class_assignment.class_ref.name", 
         read_only=True
     )
 
@@ -234,6 +294,7 @@ class TermClassAttendanceSummarySerializer(serializers.ModelSerializer):
         fields = [
             "id", 
             "organization", 
+            "class_assignment",
             "class_ref", 
             "class_ref_name",
             "term",
@@ -243,4 +304,180 @@ class TermClassAttendanceSummarySerializer(serializers.ModelSerializer):
             "female_attendance",
             "average_percentage"
         ]
-        read_only_fields = fields
\ No newline at end of file
+        read_only_fields = fields
+
+
+class AttendanceExportSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AttendanceExport
+        fields = [
+            "id",
+            "kind",
+            "file_format",
+            "params",
+            "status",
+            "error",
+            "created_at",
+            "completed_at",
+            "download_url",
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != AttendanceExport.Status.COMPLETED:
+            return None
+        request = self.context.get("request")
+        url = f"/api/attendance/exports/{obj.id}/download/"
+        return request.build_absolute_uri(url) if request else url
+
+
+class AttendanceExportRequestSerializer(serializers.Serializer):
+    """Validates export query params and turns them into JSON-safe params."""
+
+    kind = serializers.ChoiceField(choices=AttendanceExport.Kind.choices)
+    file_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default="csv")
+    class_assignment = serializers.PrimaryKeyRelatedField(
+        queryset=ClassSessionAssignment.all_objects.all(), required=False
+    )
+    student = serializers.PrimaryKeyRelatedField(
+        queryset=StudentProfile.all_objects.all(), required=False
+    )
+    term = serializers.PrimaryKeyRelatedField(
+        queryset=Term.all_objects.all(), required=False
+    )
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    scope = serializers.ChoiceField(choices=["student", "class"], default="student")
+    background = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        organization = self.context["organization"]
+        kind = attrs["kind"]
+
+        for field in ("class_assignment", "term"):
+            obj = attrs.get(field)
+            if obj is not None and obj.organization_id != organization.id:
+                raise serializers.ValidationError({field: "Not found in this organization."})
+        student = attrs.get("student")
+        if student is not None and student.membership.organization_id != organization.id:
+            raise serializers.ValidationError({"student": "Not found in this organization."})
+
+        # Teachers may only export the classes they are form teacher of
+        class_assignments = self.context.get("class_assignments")
+        if class_assignments is not None:
+            class_assignment = attrs.get("class_assignment")
+            if class_assignment is not None and not class_assignments.filter(pk=class_assignment.pk).exists():
+                raise serializers.ValidationError({"class_assignment": "You are not the form teacher of this class."})
+            if student is not None and not StudentEnrollment.all_objects.filter(
+                student=student, class_assignment__in=class_assignments
+            ).exists():
+                raise serializers.ValidationError({"student": "This student is not in any of your classes."})
+            if kind == AttendanceExport.Kind.TERM_SUMMARY and class_assignment is None:
+                raise serializers.ValidationError({"class_assignment": "This field is required."})
+
+        has_range = attrs.get("start_date") and attrs.get("end_date")
+        if has_range and attrs["start_date"] > attrs["end_date"]:
+            raise serializers.ValidationError("start_date must be on or before end_date.")
+
+        if kind == AttendanceExport.Kind.REGISTER:
+            if not attrs.get("class_assignment"):
+                raise serializers.ValidationError({"class_assignment": "This field is required."})
+            if not has_range and not attrs.get("term"):
+                raise serializers.ValidationError("Provide a term or both start_date and end_date.")
+        elif kind == AttendanceExport.Kind.STUDENT_HISTORY:
+            if not student:
+                raise serializers.ValidationError({"student": "This field is required."})
+        elif not attrs.get("term"):
+            raise serializers.ValidationError({"term": "This field is required."})
+
+        return attrs
+
+    def to_params(self):
+        """JSON-safe params understood by `attendance.exports.export_rows`."""
+        data = self.validated_data
+        params = {"scope": data["scope"]}
+        for field in ("class_assignment", "student", "term"):
+            if data.get(field) is not None:
+                params[field] = data[field].pk
+        for field in ("start_date", "end_date"):
+            if data.get(field) is not None:
+                params[field] = data[field].isoformat()
+        return params
+
+
+class AttendanceAlertSerializer(serializers.ModelSerializer):
+    student_name = serializers.CharField(source="student.membership.user.get_full_name", read_only=True)
+    class_name = serializers.CharField(source="class_assignment.class_ref.name", read_only=True, default=None)
+
+    class Meta:
+        model = AttendanceAlert
+        fields = [
+            "id",
+            "student",
+            "student_name",
+            "class_assignment",
+            "class_name",
+            "kind",
+            "detected_on",
+            "window_start",
+            "window_end",
+            "value",
+            "threshold",
+            "is_resolved",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class AttendanceAnalyticsQuerySerializer(serializers.Serializer):
+    """Validates analytics query params: `group_by` dimensions plus filters."""
+
+    group_by = serializers.CharField(required=False, default="")
+    class_ref = serializers.IntegerField(required=False)
+    class_assignment = serializers.IntegerField(required=False)
+    academic_session = serializers.IntegerField(required=False)
+    term = serializers.IntegerField(required=False)
+    period = serializers.ChoiceField(choices=AttendanceSession.PERIOD_CHOICES, required=False)
+    weekday = serializers.IntegerField(required=False, min_value=1, max_value=7)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate_group_by(self, value):
+        dimensions = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in dimensions if name not in DIMENSIONS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown dimension(s): {', '.join(unknown)}. Choose from: {', '.join(DIMENSIONS)}."
+            )
+        return list(dict.fromkeys(dimensions))
+
+    def validate(self, attrs):
+        if attrs.get("start_date") and attrs.get("end_date") and attrs["start_date"] > attrs["end_date"]:
+            raise serializers.ValidationError("start_date must be on or before end_date.")
+        return attrs
+
+
+class SyncChangeSerializer(serializers.Serializer):
+    """One attendance mark queued on an offline client."""
+
+    class_assignment = serializers.IntegerField()
+    date = serializers.DateField()
+    period = serializers.ChoiceField(choices=AttendanceSession.PERIOD_CHOICES)
+    student = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=AttendanceRecord.STATUS_CHOICES)
+    marked_at = serializers.DateTimeField()
+
+
+class AttendanceSyncSerializer(serializers.Serializer):
+    """Sync request: the client's cursor plus any queued edits."""
+
+    cursor = serializers.IntegerField(min_value=0, default=0)
+    class_assignment = serializers.IntegerField(required=False)
+    changes = SyncChangeSerializer(many=True, required=False, default=list)
+
+    def validate_changes(self, value):
+        if len(value) > SYNC_MAX_CHANGES:
+            raise serializers.ValidationError(f"Send at most {SYNC_MAX_CHANGES} changes per request.")
+        return value
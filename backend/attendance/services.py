@@ -1,16 +1,25 @@
 from datetime import timedelta
+from decimal import Decimal
 from django.conf import settings
-from django.utils.timezone import localdate
-from django.db.models import Count, Sum
+from django.db import transaction
+from django.db.models import Count, Q
 
+from academics.models import ClassSessionAssignment, Term
+from core.locks import advisory_lock
+
+from .caching import bump_summary_version
 from .models import (
-    AttendanceRecord, 
-    WeeklyAttendanceSummary, 
+    AttendanceSession,
+    AttendanceRecord,
+    WeeklyAttendanceSummary,
     TermAttendanceSummary,
     WeeklyClassAttendanceSummary,
-    TermClassAttendanceSummary
+    TermClassAttendanceSummary,
+    SummaryVersion,
 )
-from academics.models import Term
+
+ATTENDED_STATUSES = ("PRESENT",)
+
 
 def get_week_bounds(date):
     """Return start (Monday) and end (Friday) of the week for a given date."""
@@ -18,206 +27,230 @@ def get_week_bounds(date):
     end = start + timedelta(days=4)  # Friday (ignoring weekends)
     return start, end
 
-def compute_weekly_summary_for_student(student, class_ref, week_start, week_end, organization):
-    """Compute/update weekly summary for a student."""
 
-    records = AttendanceRecord.objects.filter(
-        student=student,
-        session__class_ref=class_ref,
-        session__date__range=(week_start, week_end),
-        organization=organization,
-        session__date__range=[week_start, week_end],
+def _percentage(attended, total):
+    if not total:
+        return Decimal("0.00")
+    return (Decimal(attended) * 100 / Decimal(total)).quantize(Decimal("0.01"))
+
+
+def _student_counts(records, students=None):
+    """
+    {student_id: (total, attended)} for `records` in a single aggregate query.
+    """
+    if students is not None:
+        records = records.filter(student__in=students)
+    rows = (
+        records.order_by()
+        .values("student_id")
+        .annotate(
+            total=Count("id"),
+            attended=Count("id", filter=Q(status__in=ATTENDED_STATUSES)),
+        )
     )
+    return {row["student_id"]: (row["total"], row["attended"]) for row in rows}
+
 
-    total_sessions = records.count()
-    attended_sessions = records.filter(status="PRESENT").count()
-    percentage = (attended_sessions / total_sessions * 100) if total_sessions else 0
-
-    WeeklyAttendanceSummary.objects.update_or_create(
-        organization=organization,
-        class_ref=class_ref,
-        student=student,
-        week_start=week_start,
-        week_end=week_end,
-        total_sessions=total_sessions,
-        attended_sessions=attended_sessions,
-        percentage=percentage,
-        # defaults={
-        #     "total_sessions": total_sessions,
-        #     "attended_sessions": attended_sessions,
-        #     "percentage": percentage,
-        # }
+def _class_counts(records):
+    totals = records.order_by().aggregate(
+        total=Count("id"),
+        attended=Count("id", filter=Q(status__in=ATTENDED_STATUSES)),
     )
+    return totals["total"], totals["attended"]
 
 
-def compute_term_summary_for_student(student, class_ref, term, organization):
-    """Compute/update term summary for a student."""
-    records = AttendanceRecord.objects.filter(
-        organization=organization,
-        student=student,
-        session__class_ref=class_ref,
-        session__date__range=(term.start_date, term.end_date),
+# Records are selected through `session IN (subquery)` so the planner starts
+# from the handful of matching sessions and uses the record session index,
+# instead of scanning every record in the organization.
+
+def _weekly_records(class_assignment, week_start, week_end):
+    sessions = AttendanceSession.all_objects.filter(
+        organization_id=class_assignment.organization_id,
+        class_assignment=class_assignment,
+        date__range=(week_start, week_end),
     )
+    return AttendanceRecord.all_objects.filter(session__in=sessions.values("id"))
 
-    total_sessions = records.count()
-    attended_sessions = records.filter(status="PRESENT").count()
-    percentage = (attended_sessions / total_sessions * 100) if total_sessions else 0
 
-    TermAttendanceSummary.objects.update_or_create(
-        organization=organization,
-        class_ref=class_ref,
-        student=student,
+def _term_records(class_assignment, term):
+    sessions = AttendanceSession.all_objects.filter(
+        organization_id=class_assignment.organization_id,
+        class_assignment=class_assignment,
         term=term,
-        total_sessions=total_sessions,
-        attended_sessions=attended_sessions,
-        percentage=percentage
-        # defaults={
-        #     "total_sessions": total_sessions,
-        #     "attended_sessions": attended_sessions,
-        #     "percentage": percentage,
-        # }
     )
+    return AttendanceRecord.all_objects.filter(session__in=sessions.values("id"))
+
 
-def compute_weekly_summaries(class_ref, week_start, week_end, organization):
-    """Compute per-student and class-level attendance summaries for a given week."""
-
-    # --- Per Student Summaries (already had this logic) ---
-    students = class_ref.students.all()
-    for student in students:
-        records = AttendanceRecord.objects.filter(
-            organization=organization,
-            student=student,
-            session__class_ref=class_ref,
-            session__date__gte=week_start,
-            session__date__lte=week_end,
+def recompute_weekly_summaries(class_assignment, week_start, week_end, term, students=None):
+    """
+    Recompute student + class weekly summaries for one class and week.
+
+    Per-student counts come from one grouped query and are written with a
+    single bulk upsert. Pass `students` to limit the per-student part to a
+    subset (e.g. the student whose record just changed); the class total is
+    always recomputed.
+
+    Runs under a per (organization, class, week) advisory lock, so
+    concurrent workers count and write one after another and the last one
+    always sees every committed record.
+    """
+    organization_id = class_assignment.organization_id
+    with advisory_lock("attendance-weekly", organization_id, class_assignment.pk, week_start):
+        records = _weekly_records(class_assignment, week_start, week_end)
+        counts = _student_counts(records, students)
+
+        if students is not None:
+            # Students with no records left in this week drop to zero.
+            for student in students:
+                counts.setdefault(getattr(student, "pk", student), (0, 0))
+
+        WeeklyAttendanceSummary.all_objects.bulk_create(
+            [
+                WeeklyAttendanceSummary(
+                    organization_id=organization_id,
+                    class_assignment=class_assignment,
+                    student_id=student_id,
+                    week_start=week_start,
+                    week_end=week_end,
+                    term=term,
+                    total_sessions=total,
+                    attended_sessions=attended,
+                    percentage=_percentage(attended, total),
+                )
+                for student_id, (total, attended) in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["organization", "class_assignment", "student", "week_start", "week_end"],
+            update_fields=["term", "total_sessions", "attended_sessions", "percentage"],
         )
 
-        total_sessions = records.count()
-        attended_sessions = records.filter(status="PRESENT").count()
-
-        percentage = (attended_sessions / total_sessions) * 100 if total_sessions else 0
-
-        WeeklyAttendanceSummary.objects.update_or_create(
-            organization=organization,
-            class_ref=class_ref,
-            student=student,
-            week_start=week_start,
-            week_end=week_end,
-            total_sessions=total_sessions,
-            attended_sessions=attended_sessions,
-            percentage=percentage
-            # defaults={
-            #     "total_sessions": total_sessions,
-            #     "attended_sessions": attended_sessions,
-            #     "percentage": percentage,
-            # },
+        total_sessions, attended_sessions = _class_counts(records)
+        WeeklyClassAttendanceSummary.all_objects.bulk_create(
+            [
+                WeeklyClassAttendanceSummary(
+                    organization_id=organization_id,
+                    class_assignment=class_assignment,
+                    week_start=week_start,
+                    week_end=week_end,
+                    term=term,
+                    total_sessions=total_sessions,
+                    attended_sessions=attended_sessions,
+                    percentage=float(_percentage(attended_sessions, total_sessions)),
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["organization", "class_assignment", "week_start", "week_end"],
+            update_fields=["term", "total_sessions", "attended_sessions", "percentage"],
         )
+        bump_summary_version(organization_id, SummaryVersion.Resource.WEEKLY)
 
-    # --- Class-level Summary ---
-    class_records = AttendanceRecord.objects.filter(
-        organization=organization,
-        student__school_class=class_ref,
-        session__date__gte=week_start,
-        session__date__lte=week_end,
-    )
 
-    total_sessions = class_records.count()
-    attended_sessions = class_records.filter(status="PRESENT").count()
-    percentage = (attended_sessions / total_sessions) * 100 if total_sessions else 0
-
-    WeeklyClassAttendanceSummary.objects.update_or_create(
-        organization=organization,
-        class_ref=class_ref,
-        week_start=week_start,
-        week_end=week_end,
-        defaults={
-            "total_sessions": total_sessions,
-            "attended_sessions": attended_sessions,
-            "percentage": percentage,
-        },
-    )
+def recompute_term_summaries(class_assignment, term, students=None):
+    """
+    Recompute student + class term summaries for one class and term.
+    Same batching and locking rules as `recompute_weekly_summaries`.
+    """
+    organization_id = class_assignment.organization_id
+    with advisory_lock("attendance-term", organization_id, class_assignment.pk, term.pk):
+        records = _term_records(class_assignment, term)
+        counts = _student_counts(records, students)
+
+        if students is not None:
+            for student in students:
+                counts.setdefault(getattr(student, "pk", student), (0, 0))
+
+        TermAttendanceSummary.all_objects.bulk_create(
+            [
+                TermAttendanceSummary(
+                    organization_id=organization_id,
+                    class_assignment=class_assignment,
+                    student_id=student_id,
+                    term=term,
+                    total_sessions=total,
+                    attended_sessions=attended,
+                    percentage=_percentage(attended, total),
+                )
+                for student_id, (total, attended) in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["organization", "class_assignment", "student", "term"],
+            update_fields=["total_sessions", "attended_sessions", "percentage"],
+        )
 
-def update_weekly_class_summary(class_ref, week_start, week_end, organization):
-    """Compute/update class-level weekly summary."""
-    records = AttendanceRecord.objects.filter(
-        organization=organization,
-        session__class_ref=class_ref,
-        session__date__range=(week_start, week_end),
-    )
+        # StudentProfile has no gender yet, so male/female attendance is left as-is.
+        total_sessions, attended_sessions = _class_counts(records)
+        TermClassAttendanceSummary.all_objects.bulk_create(
+            [
+                TermClassAttendanceSummary(
+                    organization_id=organization_id,
+                    class_assignment=class_assignment,
+                    term=term,
+                    total_sessions=total_sessions,
+                    attended_sessions=attended_sessions,
+                    average_percentage=_percentage(attended_sessions, total_sessions),
+                )
+            ],
+            update_conflicts=True,
+            unique_fields=["organization", "class_assignment", "term"],
+            update_fields=["total_sessions", "attended_sessions", "average_percentage"],
+        )
+        bump_summary_version(organization_id, SummaryVersion.Resource.TERM)
 
-    total_sessions = records.count()
-    attended_sessions = records.filter(status=AttendanceRecord.Status.PRESENT).count()
-    percentage = (attended_sessions / total_sessions * 100) if total_sessions else 0
-
-    WeeklyClassAttendanceSummary.objects.update_or_create(
-        organization=organization,
-        class_ref=class_ref,
-        week_start=week_start,
-        week_end=week_end,
-        defaults={
-            "total_sessions": total_sessions,
-            "attended_sessions": attended_sessions,
-            "percentage": percentage,
-        }
-    )
 
+def compute_weekly_summary_for_student(student, class_assignment, week_start, week_end, term):
+    """Compute/update weekly summary for a student (and their class)."""
+    recompute_weekly_summaries(class_assignment, week_start, week_end, term, students=[student])
 
-def update_term_class_summary(class_ref, term, organization):
-    """Compute/update class-level term summary."""
-    records = AttendanceRecord.objects.filter(
-        organization=organization,
-        session__class_ref=class_ref,
-        session__date__range=(term.start_date, term.end_date),
-    ).select_related("student")
 
-    total_sessions = records.count()
-    attended_sessions = records.filter(status=AttendanceRecord.Status.PRESENT).count()
+def compute_term_summary_for_student(student, class_assignment, term):
+    """Compute/update term summary for a student (and their class)."""
+    recompute_term_summaries(class_assignment, term, students=[student])
 
-    male_attendance = records.filter(student__gender="MALE", status=AttendanceRecord.Status.PRESENT).count()
-    female_attendance = records.filter(student__gender="FEMALE", status=AttendanceRecord.Status.PRESENT).count()
 
-    avg_percentage = (attended_sessions / total_sessions * 100) if total_sessions else 0
+def update_weekly_class_summary(class_assignment, week_start, week_end, term):
+    """Compute/update every weekly summary of a class."""
+    recompute_weekly_summaries(class_assignment, week_start, week_end, term)
 
-    TermClassAttendanceSummary.objects.update_or_create(
-        organization=organization,
-        class_ref=class_ref,
-        term=term,
-        defaults={
-            "total_sessions": total_sessions,
-            "attended_sessions": attended_sessions,
-            "male_attendance": male_attendance,
-            "female_attendance": female_attendance,
-            "average_percentage": avg_percentage,
-        }
-    )
 
-def compute_term_summary_for_student(student, class_ref, term, organization):
-    """Compute/update term summary for a student."""
-    records = AttendanceRecord.objects.filter(
-        organization=organization,
-        student=student,
-        session__class_ref=class_ref,
-        session__date__range=(term.start_date, term.end_date),
-    )
+def update_term_class_summary(class_assignment, term):
+    """Compute/update every term summary of a class."""
+    recompute_term_summaries(class_assignment, term)
 
-    total_sessions = records.count()
-    attended_sessions = records.filter(status=AttendanceRecord.Status.PRESENT).count()
-    percentage = (attended_sessions / total_sessions * 100) if total_sessions else 0
 
-    TermAttendanceSummary.objects.update_or_create(
-        organization=organization,
-        class_ref=class_ref,
-        student=student,
-        term=term,
-        total_sessions=total_sessions,
-        attended_sessions=attended_sessions,
-        percentage=percentage
-        # defaults={
-        #     "total_sessions": total_sessions,
-        #     "attended_sessions": attended_sessions,
-        #     "percentage": percentage,
-        # }
-    )
+def recompute_summaries_for_keys(weekly_keys, term_keys):
+    """
+    Recompute summaries once per affected key after a bulk write.
+
+    `weekly_keys` is an iterable of (class_assignment, week_start, term)
+    and `term_keys` of (class_assignment, term); duplicates are ignored.
+    Keys are visited in a fixed order so that callers holding several
+    summary locks in one transaction always take them in the same order.
+    """
+    for class_assignment, week_start, term in sorted(
+        set(weekly_keys), key=lambda key: (key[0].pk, key[1], key[2].pk)
+    ):
+        week_start, week_end = get_week_bounds(week_start)
+        recompute_weekly_summaries(class_assignment, week_start, week_end, term)
+
+    for class_assignment, term in sorted(set(term_keys), key=lambda key: (key[0].pk, key[1].pk)):
+        recompute_term_summaries(class_assignment, term)
+
+
+def recompute_student_summaries(class_assignment, term, student, date):
+    """
+    Recompute the weekly (for the week of `date`) and term summaries of
+    one student and their class. Takes keys rather than a record so it
+    still works once the record is deleted; ids are accepted too.
+    """
+    if not isinstance(class_assignment, ClassSessionAssignment):
+        class_assignment = ClassSessionAssignment.all_objects.get(pk=class_assignment)
+    if not isinstance(term, Term):
+        term = Term.all_objects.get(pk=term)
+
+    week_start, week_end = get_week_bounds(date)
+    compute_weekly_summary_for_student(student, class_assignment, week_start, week_end, term)
+    compute_term_summary_for_student(student, class_assignment, term)
+
 
 def recompute_all_summaries(attendance_record):
     """
@@ -225,51 +258,31 @@ def recompute_all_summaries(attendance_record):
     based on a given AttendanceRecord.
     """
     session = attendance_record.session
-    org = session.organization
-    student = attendance_record.student
-    class_ref = session.class_ref
-    date = session.date
-
-    # --- Weekly range (Mon–Fri) ---
-    week_start = date - timedelta(days=date.weekday())
-    week_end = week_start + timedelta(days=4)
-
-    # Student weekly summary
-    compute_weekly_summary_for_student(student, class_ref, week_start, week_end, org)
-
-    # Class weekly summary
-    update_weekly_class_summary(class_ref, week_start, week_end, org)
-
-    # --- Term summaries ---
-    try:
-        term = Term.objects.get(
-            organization=org,
-            start_date__lte=date,
-            end_date__gte=date
-        )
-
-        # Student term summary
-        compute_term_summary_for_student(student, class_ref, term, org)
+    recompute_student_summaries(session.class_assignment, session.term, attendance_record.student_id, session.date)
 
-        # Class term summary
-        update_term_class_summary(class_ref, term, org)
 
-    except Term.DoesNotExist:
-        # No active term found for this record
-        pass
-
-def schedule_recompute_summaries(record_id):
+def schedule_recompute_summaries(attendance_record):
     """
-    Schedule recompute depending on settings:
+    Schedule the recompute for a record that was just saved or deleted:
     - Sync if ATTENDANCE_ASYNC_UPDATES = False
-    - Async via Celery if ATTENDANCE_ASYNC_UPDATES = True
+    - Async via Celery if ATTENDANCE_ASYNC_UPDATES = True, queued once the
+      transaction commits so the worker sees the change
     """
+    session = (
+        AttendanceSession.all_objects.filter(pk=attendance_record.session_id)
+        .values("class_assignment_id", "term_id", "date")
+        .first()
+    )
+    if session is None:
+        return
+    keys = (session["class_assignment_id"], session["term_id"], attendance_record.student_id, session["date"])
+
     if getattr(settings, "ATTENDANCE_ASYNC_UPDATES", False):
         from .tasks import recompute_summaries_task
-        recompute_summaries_task.delay(record_id)
+
+        class_assignment_id, term_id, student_id, date = keys
+        transaction.on_commit(
+            lambda: recompute_summaries_task.delay(class_assignment_id, term_id, student_id, date.isoformat())
+        )
     else:
-        try:
-            record = AttendanceRecord.objects.get(pk=record_id)
-        except AttendanceRecord.DoesNotExist:
-            return
-        recompute_all_summaries(record)
\ No newline at end of file
+        recompute_student_summaries(*keys)
@@ -1,16 +1,45 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import AttendanceRecord
+from .models import AttendanceSession, AttendanceRecord, AttendanceTombstone
 from .services import schedule_recompute_summaries
+from .cube import refresh_cube_for_sessions
+from .sync import stamp_on_commit, add_tombstone
 
 
 @receiver(post_save, sender=AttendanceRecord)
 def attendance_record_saved(sender, instance, **kwargs):
-    """When an AttendanceRecord is created/updated, recompute summaries."""
-    schedule_recompute_summaries(instance.id)
+    """When an AttendanceRecord is created/updated, refresh the cube and recompute summaries."""
+    stamp_on_commit(AttendanceRecord, instance.organization_id, instance.pk)
+    refresh_cube_for_sessions([instance.session_id])
+    schedule_recompute_summaries(instance)
 
 
 @receiver(post_delete, sender=AttendanceRecord)
 def attendance_record_deleted(sender, instance, **kwargs):
-    """When an AttendanceRecord is deleted, recompute summaries."""
-    schedule_recompute_summaries(instance.id)
\ No newline at end of file
+    """When an AttendanceRecord is deleted, refresh the cube and recompute summaries."""
+    add_tombstone(
+        AttendanceTombstone.Kind.RECORD,
+        instance.organization_id,
+        instance.pk,
+        AttendanceSession.all_objects.filter(pk=instance.session_id)
+        .values_list("class_assignment_id", flat=True)
+        .first(),
+    )
+    refresh_cube_for_sessions([instance.session_id])
+    schedule_recompute_summaries(instance)
+
+
+@receiver(post_save, sender=AttendanceSession)
+def attendance_session_saved(sender, instance, **kwargs):
+    """Bump the sync version so offline clients pick up session changes (e.g. locking)."""
+    stamp_on_commit(AttendanceSession, instance.organization_id, instance.pk)
+
+
+@receiver(post_delete, sender=AttendanceSession)
+def attendance_session_deleted(sender, instance, **kwargs):
+    add_tombstone(
+        AttendanceTombstone.Kind.SESSION,
+        instance.organization_id,
+        instance.pk,
+        instance.class_assignment_id,
+    )
@@ -0,0 +1,331 @@
+# attendance/sync.py
+"""
+Delta sync for offline attendance clients.
+
+Every session and record carries a `sync_version` taken from a
+per-organization counter (`SyncCounter`). The counter is bumped inside the
+transaction that writes the version, and the counter row stays locked until
+that transaction commits, so versions become visible in increasing order and
+a client that has seen cursor N has seen everything up to N. Deletions leave
+an `AttendanceTombstone` with its own version.
+
+Versions are allocated in bulk so the counter lock is held briefly: pushes
+and imports take one version per batch, and rows saved one by one through
+the ORM are stamped together once their transaction commits
+(`stamp_on_commit`), in a short transaction of their own, instead of
+locking the counter for the rest of the caller's transaction.
+
+Clients push queued edits and pull whatever changed after their cursor.
+Conflicting edits are resolved last-writer-wins on `marked_at`, which the
+server sets on every write it makes and clamps to its own clock on pushed
+edits, so a client with a fast clock cannot win every conflict. Every query
+is keyed by the edits in the batch or by `sync_version`, so the work grows
+with the amount of change, not with class size.
+"""
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from academics.models import ClassSessionAssignment, Term
+from students.models import StudentEnrollment
+from .cube import refresh_cube_for_sessions
+from .models import AttendanceSession, AttendanceRecord, AttendanceTombstone, Holiday, SyncCounter
+from .services import get_week_bounds, recompute_summaries_for_keys
+
+SYNC_PAGE_SIZE = 1000
+SYNC_MAX_CHANGES = 500
+
+SESSION_FIELDS = ("id", "class_assignment_id", "date", "period", "term_id", "is_locked", "sync_version")
+RECORD_FIELDS = ("id", "session_id", "student_id", "status", "marked_at", "marked_by_id", "sync_version")
+
+_pending = threading.local()  # {organization id: {model: {pk}}} awaiting stamp_on_commit
+
+
+def next_sync_version(organization_id):
+    """
+    Bump and return the organization's change counter. Call inside the
+    transaction that stores the version, so the counter row stays locked
+    until the write is visible.
+    """
+    counter, _ = SyncCounter.all_objects.select_for_update().get_or_create(
+        organization_id=organization_id
+    )
+    counter.value += 1
+    counter.save(update_fields=["value"])
+    return counter.value
+
+
+def stamp_on_commit(model, organization_id, pk):
+    """
+    Give row `pk` of `model` a fresh sync version once the current
+    transaction commits (at once outside a transaction). Rows saved in the
+    same transaction share one version.
+    """
+    pending = getattr(_pending, "stamps", None)
+    if pending is None:
+        pending = _pending.stamps = defaultdict(lambda: defaultdict(set))
+    pending[organization_id][model].add(pk)
+    transaction.on_commit(_flush_stamps)
+
+
+def _flush_stamps():
+    # The first callback of a commit stamps everything queued on this
+    # thread; the rest find nothing left. Rows queued by a transaction that
+    # rolled back are stamped with the next commit, which is harmless.
+    pending, _pending.stamps = getattr(_pending, "stamps", None), None
+    for organization_id, by_model in (pending or {}).items():
+        with transaction.atomic():
+            version = next_sync_version(organization_id)
+            for model, ids in by_model.items():
+                model.all_objects.filter(pk__in=ids).update(sync_version=version)
+
+
+def add_tombstone(kind, organization_id, object_id, class_assignment_id=None):
+    with transaction.atomic():
+        AttendanceTombstone.all_objects.create(
+            organization_id=organization_id,
+            kind=kind,
+            object_id=object_id,
+            class_assignment_id=class_assignment_id,
+            sync_version=next_sync_version(organization_id),
+        )
+
+
+def _record_payload(row):
+    return {field.removesuffix("_id"): row[field] for field in RECORD_FIELDS}
+
+
+def _session_payload(row):
+    return {field.removesuffix("_id"): row[field] for field in SESSION_FIELDS}
+
+
+def apply_changes(organization, changes, marked_by=None, class_assignments=None):
+    """
+    Apply a client's queued edits. Each change is a dict with
+    class_assignment (id), date, period, student (id), status and marked_at;
+    sessions missing on the server are created.
+
+    An edit loses to a server record marked at the same time or later; the
+    server copy is returned as a conflict so the client can adopt it. A
+    marked_at ahead of the server's clock is taken as now.
+    `class_assignments` optionally restricts writable classes. Returns a dict
+    of applied / conflicts / errors, keyed by the change's index.
+    """
+    result = {"applied": 0, "conflicts": [], "errors": []}
+    if not changes:
+        return result
+
+    def reject(index, message):
+        result["errors"].append({"index": index, "error": message})
+
+    ca_ids = {change["class_assignment"] for change in changes}
+    assignments = ClassSessionAssignment.all_objects.filter(organization=organization, pk__in=ca_ids)
+    if class_assignments is not None:
+        assignments = assignments.filter(pk__in=class_assignments.values("pk"))
+    academic_session_of = dict(assignments.values_list("id", "session_id"))
+
+    enrolled = set(
+        StudentEnrollment.all_objects.filter(
+            organization=organization,
+            class_assignment_id__in=academic_session_of,
+            student_id__in={change["student"] for change in changes},
+        ).values_list("student_id", "class_assignment_id")
+    )
+    dates = {change["date"] for change in changes}
+    holidays = set(
+        Holiday.all_objects.filter(organization=organization, date__in=dates).values_list("date", flat=True)
+    )
+    terms = list(
+        Term.all_objects.filter(
+            organization=organization,
+            session_id__in=set(academic_session_of.values()),
+            start_date__lte=max(dates),
+            end_date__gte=min(dates),
+        ).values_list("session_id", "start_date", "end_date", "id")
+    )
+
+    def term_for(academic_session_id, day):
+        for session_id, start, end, term_id in terms:
+            if session_id == academic_session_id and start <= day <= end:
+                return term_id
+        return None
+
+    # Validate, keeping only the latest edit per (class, date, period, student).
+    now = timezone.now()
+    latest = {}
+    for index, change in enumerate(changes):
+        if change["marked_at"] > now:
+            change = {**change, "marked_at": now}
+        ca_id, day = change["class_assignment"], change["date"]
+        if ca_id not in academic_session_of:
+            reject(index, "Unknown class assignment, or not yours to mark.")
+        elif (change["student"], ca_id) not in enrolled:
+            reject(index, "Student is not enrolled in this class.")
+        elif day.weekday() >= 5:
+            reject(index, "Cannot record attendance on weekends.")
+        elif day in holidays:
+            reject(index, "Cannot record attendance on a holiday.")
+        elif term_for(academic_session_of[ca_id], day) is None:
+            reject(index, "Date does not fall within any term.")
+        else:
+            key = (ca_id, day, change["period"], change["student"])
+            if key not in latest or latest[key][1]["marked_at"] <= change["marked_at"]:
+                latest[key] = (index, change)
+
+    if not latest:
+        return result
+
+    touched_sessions = set()
+    affected = set()
+    with transaction.atomic():
+        version = next_sync_version(organization.id)
+
+        session_keys = {key[:3] for key in latest}
+        sessions = _resolve_sessions(organization, session_keys, academic_session_of, term_for, version)
+
+        existing = {
+            (row["session_id"], row["student_id"]): row
+            for row in AttendanceRecord.all_objects.filter(
+                organization=organization,
+                session_id__in=[sessions[key]["id"] for key in session_keys],
+                student_id__in={key[3] for key in latest},
+            ).values(*RECORD_FIELDS)
+        }
+
+        to_write = []
+        for (ca_id, day, period, student_id), (index, change) in latest.items():
+            session = sessions[(ca_id, day, period)]
+            if session["is_locked"]:
+                reject(index, "This session is locked and cannot be modified.")
+                continue
+
+            current = existing.get((session["id"], student_id))
+            if current is not None and current["marked_at"] >= change["marked_at"]:
+                if current["marked_at"] == change["marked_at"] and current["status"] == change["status"]:
+                    result["applied"] += 1  # re-sent edit, already stored
+                else:
+                    result["conflicts"].append({"index": index, "record": _record_payload(current)})
+                continue
+
+            to_write.append(AttendanceRecord(
+                organization=organization,
+                session_id=session["id"],
+                student_id=student_id,
+                status=change["status"],
+                marked_at=change["marked_at"],
+                marked_by=marked_by,
+                sync_version=version,
+            ))
+            touched_sessions.add(session["id"])
+            affected.add((ca_id, get_week_bounds(day)[0], session["term_id"]))
+
+        AttendanceRecord.all_objects.bulk_create(
+            to_write,
+            update_conflicts=True,
+            unique_fields=["organization", "session", "student"],
+            update_fields=["status", "marked_at", "marked_by", "sync_version"],
+        )
+        refresh_cube_for_sessions(touched_sessions)
+        result["applied"] += len(to_write)
+
+    if affected:
+        assignments = ClassSessionAssignment.all_objects.in_bulk({key[0] for key in affected})
+        terms_by_id = Term.all_objects.in_bulk({key[2] for key in affected})
+        with transaction.atomic():
+            recompute_summaries_for_keys(
+                weekly_keys=[(assignments[ca], week, terms_by_id[term]) for ca, week, term in affected],
+                term_keys=[(assignments[ca], terms_by_id[term]) for ca, _, term in affected],
+            )
+
+    result["errors"].sort(key=lambda error: error["index"])
+    return result
+
+
+def _resolve_sessions(organization, keys, academic_session_of, term_for, version):
+    """{(class_assignment_id, date, period): session values}, creating missing sessions."""
+    def fetch():
+        rows = AttendanceSession.all_objects.filter(
+            organization=organization,
+            class_assignment_id__in={key[0] for key in keys},
+            date__in={key[1] for key in keys},
+        ).values(*SESSION_FIELDS)
+        return {(row["class_assignment_id"], row["date"], row["period"]): row for row in rows}
+
+    sessions = fetch()
+    missing = [key for key in keys if key not in sessions]
+    if missing:
+        AttendanceSession.all_objects.bulk_create(
+            [
+                AttendanceSession(
+                    organization=organization,
+                    class_assignment_id=ca_id,
+                    date=day,
+                    period=period,
+                    term_id=term_for(academic_session_of[ca_id], day),
+                    sync_version=version,
+                )
+                for ca_id, day, period in missing
+            ],
+            ignore_conflicts=True,
+        )
+        sessions = fetch()
+    return sessions
+
+
+def changes_since(organization, cursor=0, class_assignments=None, page_size=SYNC_PAGE_SIZE):
+    """
+    Sessions, records and deletions changed after `cursor` (0 = everything),
+    oldest first. Pages never split a version, so the returned cursor is
+    always safe to resume from; `has_more` says whether to pull again.
+    """
+    # Every version up to the committed counter value is visible, so that is
+    # the cursor to hand back once the client has caught up.
+    high = (
+        SyncCounter.all_objects.filter(organization=organization).values_list("value", flat=True).first()
+        or 0
+    )
+    window = {"organization": organization, "sync_version__gt": cursor, "sync_version__lte": high}
+    sessions = AttendanceSession.all_objects.filter(**window)
+    records = AttendanceRecord.all_objects.filter(**window)
+    tombstones = AttendanceTombstone.all_objects.filter(**window)
+    if class_assignments is not None:
+        sessions = sessions.filter(class_assignment__in=class_assignments)
+        records = records.filter(session__class_assignment__in=class_assignments)
+        tombstones = tombstones.filter(class_assignment_id__in=class_assignments.values("pk"))
+
+    next_cursor = max(high, cursor)
+    has_more = False
+    overflow = list(
+        records.order_by("sync_version").values_list("sync_version", flat=True)[page_size:page_size + 1]
+    )
+    if overflow:
+        # Cut just before the version that overflowed the page, unless the
+        # page would be empty (a single very large batch).
+        next_cursor = overflow[0]
+        if records.filter(sync_version__lt=next_cursor).exists():
+            next_cursor -= 1
+        has_more = next_cursor < high
+        sessions = sessions.filter(sync_version__lte=next_cursor)
+        records = records.filter(sync_version__lte=next_cursor)
+        tombstones = tombstones.filter(sync_version__lte=next_cursor)
+
+    return {
+        "cursor": next_cursor,
+        "has_more": has_more,
+        "sessions": [
+            _session_payload(row)
+            for row in sessions.order_by("sync_version", "id").values(*SESSION_FIELDS)
+        ],
+        "records": [
+            _record_payload(row)
+            for row in records.order_by("sync_version", "id").values(*RECORD_FIELDS)
+        ],
+        "deleted": [
+            {"kind": kind, "id": object_id, "sync_version": version}
+            for kind, object_id, version in tombstones.order_by("sync_version", "id").values_list(
+                "kind", "object_id", "sync_version"
+            )
+        ],
+    }
@@ -1,13 +1,38 @@
+from datetime import date
+
 from celery import shared_task
-from .models import AttendanceRecord
-from .services import recompute_all_summaries
+from users.models import Organization
+from .models import AttendanceExport
+from .services import recompute_student_summaries
+from .exports import write_export
+from .alerts import detect_chronic_absence
+
+@shared_task
+def recompute_summaries_task(class_assignment_id, term_id, student_id, session_date):
+    """
+    Celery task to recompute a student's weekly and term summaries after
+    one of their records changed or was deleted.
+    """
+    recompute_student_summaries(class_assignment_id, term_id, student_id, date.fromisoformat(session_date))
 
 @shared_task
-def recompute_summaries_task(record_id):
+def generate_attendance_export_task(export_id):
     """
-    Celery task to recompute summaries for an AttendanceRecord.
+    Celery task to build a background attendance export file.
     """
     try:
-        record = AttendanceRecord.objects.get(pk=record_id)
-    except AttendanceRecord.DoesNotExist:
-        return recompute_all_summaries(record)
\ No newline at end of file
+        export = AttendanceExport.all_objects.select_related("organization").get(pk=export_id)
+    except AttendanceExport.DoesNotExist:
+        return
+    write_export(export)
+
+
+@shared_task
+def detect_chronic_absence_task(organization_id=None):
+    """
+    Nightly Celery task: flag chronic absence for one organization, or all.
+    """
+    organizations = Organization.objects.all()
+    if organization_id is not None:
+        organizations = organizations.filter(pk=organization_id)
+    return {org.id: detect_chronic_absence(org) for org in organizations}
@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from attendance.alerts import absence_streaks, detect_chronic_absence
+from attendance.models import AttendanceSession, AttendanceRecord, AttendanceAlert
+
+
+def _school_days(start, count):
+    days, day = [], start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+@pytest.fixture
+def two_weeks(org, class_assignment, term, enrolled_students):
+    """
+    Ten school days of morning sessions:
+    - first student: always present
+    - second student: absent the last three days (70%, streak of 3)
+    - third student: absent every other day early on (70%, no streak)
+    """
+    days = _school_days(date(2025, 2, 3), 10)
+    sessions = AttendanceSession.all_objects.bulk_create([
+        AttendanceSession(
+            organization=org, class_assignment=class_assignment, term=term,
+            date=day, period="MORNING",
+        )
+        for day in days
+    ])
+    first, second, third = enrolled_students
+    records = []
+    for index, session in enumerate(sessions):
+        records.append(AttendanceRecord(organization=org, session=session, student=first, status="PRESENT"))
+        records.append(AttendanceRecord(
+            organization=org, session=session, student=second,
+            status="ABSENT" if index >= 7 else "PRESENT",
+        ))
+        records.append(AttendanceRecord(
+            organization=org, session=session, student=third,
+            status="ABSENT" if index in (0, 2, 4) else "PRESENT",
+        ))
+    AttendanceRecord.all_objects.bulk_create(records)
+    return days
+
+
+def test_absence_streaks_skip_unmarked_days():
+    absent = np.array([[True, False, True, True, False, True]])
+    marked = np.array([[True, False, True, True, True, True]])
+    # Day 1 is unmarked, so the streak carries over it; day 4 breaks it.
+    assert absence_streaks(absent, marked).tolist() == [[1, 1, 2, 3, 0, 1]]
+
+
+@pytest.mark.django_db
+def test_detect_chronic_absence_flags_rate_and_streak(org, class_assignment, enrolled_students, two_weeks):
+    created = detect_chronic_absence(org, as_of=two_weeks[-1])
+    assert created == 3
+
+    first, second, third = enrolled_students
+    alerts = {(a.student_id, a.kind): a for a in AttendanceAlert.all_objects.filter(organization=org)}
+    assert set(alerts) == {
+        (second.id, AttendanceAlert.Kind.LOW_RATE),
+        (second.id, AttendanceAlert.Kind.CONSECUTIVE_ABSENCES),
+        (third.id, AttendanceAlert.Kind.LOW_RATE),
+    }
+    low_rate = alerts[(third.id, AttendanceAlert.Kind.LOW_RATE)]
+    assert float(low_rate.value) == 70.0
+    assert low_rate.class_assignment == class_assignment
+    assert (low_rate.window_start, low_rate.window_end) == (two_weeks[0], two_weeks[-1])
+    assert float(alerts[(second.id, AttendanceAlert.Kind.CONSECUTIVE_ABSENCES)].value) == 3
+
+    # Re-running the same night does not duplicate alerts.
+    assert detect_chronic_absence(org, as_of=two_weeks[-1]) == 0
+    assert AttendanceAlert.all_objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_detect_chronic_absence_ignores_excused(org, enrolled_students, two_weeks):
+    AttendanceRecord.all_objects.filter(student=enrolled_students[1], status="ABSENT").update(status="EXCUSED")
+    detect_chronic_absence(org, as_of=two_weeks[-1])
+    assert not AttendanceAlert.all_objects.filter(student=enrolled_students[1]).exists()
+
+
+@pytest.mark.django_db
+def test_alert_api_filters_and_resolves(admin_client, org, enrolled_students, two_weeks):
+    detect_chronic_absence(org, as_of=two_weeks[-1])
+
+    resp = admin_client.get("/api/attendance/alerts/", {"kind": "CONSECUTIVE_ABSENCES"})
+    assert resp.status_code == 200
+    results = resp.data["results"] if isinstance(resp.data, dict) else resp.data
+    assert [row["student"] for row in results] == [enrolled_students[1].id]
+
+    resolved = admin_client.post(f"/api/attendance/alerts/{results[0]['id']}/resolve/")
+    assert resolved.status_code == 200
+    assert resolved.data["is_resolved"] is True
+
+    open_alerts = admin_client.get("/api/attendance/alerts/", {"is_resolved": "false"})
+    open_results = open_alerts.data["results"] if isinstance(open_alerts.data, dict) else open_alerts.data
+    assert len(open_results) == 2
+
+
+@pytest.mark.django_db
+def test_only_a_streak_still_running_is_flagged(org, enrolled_students, two_weeks):
+    # The second student came back on the last day: the three-day run is over.
+    AttendanceRecord.all_objects.filter(
+        student=enrolled_students[1], session__date=two_weeks[-1]
+    ).update(status="PRESENT")
+
+    detect_chronic_absence(org, as_of=two_weeks[-1])
+
+    assert not AttendanceAlert.all_objects.filter(kind=AttendanceAlert.Kind.CONSECUTIVE_ABSENCES).exists()
+
+
+@pytest.mark.django_db
+def test_open_alerts_are_not_raised_again(org, enrolled_students, two_weeks):
+    # Day nine: both are below the rate (7/9 present), the streak is only two days.
+    assert detect_chronic_absence(org, as_of=two_weeks[-2]) == 2
+    AttendanceAlert.all_objects.filter(student=enrolled_students[2]).update(is_resolved=True)
+
+    # Day ten: the second student's open low-rate alert stands and only the
+    # new streak is raised; the third's resolved alert is raised anew.
+    assert detect_chronic_absence(org, as_of=two_weeks[-1]) == 2
+    low_rate = AttendanceAlert.all_objects.filter(kind=AttendanceAlert.Kind.LOW_RATE)
+    assert low_rate.filter(student=enrolled_students[1]).count() == 1
+    assert low_rate.filter(student=enrolled_students[2], is_resolved=False).count() == 1
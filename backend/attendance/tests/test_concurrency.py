@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from django.db import connection
+
+from attendance.models import (
+    AttendanceSession,
+    AttendanceRecord,
+    WeeklyClassAttendanceSummary,
+    WeeklyAttendanceSummary,
+    TermClassAttendanceSummary,
+)
+from attendance.services import recompute_all_summaries, recompute_weekly_summaries, get_week_bounds
+from core.locks import lock_key
+from users.models import Membership, StudentProfile
+from tests.utils import create_user_with_role
+
+WORKERS = 8
+
+
+def test_lock_key_is_stable_and_signed_64_bit():
+    key = lock_key("attendance-weekly", 1, 2, date(2025, 2, 3))
+    assert key == lock_key("attendance-weekly", 1, 2, date(2025, 2, 3))
+    assert key != lock_key("attendance-weekly", 1, 2, date(2025, 2, 10))
+    assert -(2 ** 63) <= key < 2 ** 63
+
+
+@pytest.mark.django_db
+def test_recompute_overwrites_row_inserted_by_another_worker(org, class_assignment, term, enrolled_students):
+    """
+    Without advisory locks (SQLite) a concurrent worker can insert the class
+    row between our count and our write; the upsert must absorb it rather
+    than raise IntegrityError.
+    """
+    session = AttendanceSession.objects.create(
+        organization=org, class_assignment=class_assignment, term=term,
+        date=date(2025, 2, 3), period="MORNING",
+    )
+    AttendanceRecord.all_objects.bulk_create([
+        AttendanceRecord(organization=org, session=session, student=student, status="PRESENT")
+        for student in enrolled_students
+    ])
+    week_start, week_end = get_week_bounds(session.date)
+    WeeklyClassAttendanceSummary.all_objects.create(
+        organization=org, class_assignment=class_assignment, term=term,
+        week_start=week_start, week_end=week_end, total_sessions=1, attended_sessions=0,
+    )
+
+    recompute_weekly_summaries(class_assignment, week_start, week_end, term)
+
+    weekly = WeeklyClassAttendanceSummary.all_objects.get(class_assignment=class_assignment)
+    assert (weekly.total_sessions, weekly.attended_sessions) == (3, 3)
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="needs real concurrent writers; SQLite's in-memory test database allows one",
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_recomputes_leave_correct_counts(org, class_assignment, term):
+    """
+    N workers each mark a different student in the same class and week and
+    immediately recompute, all at once. Whatever the interleaving, the final
+    summaries must count every record.
+    """
+    sessions = [
+        AttendanceSession.objects.create(
+            organization=org, class_assignment=class_assignment, term=term,
+            date=day, period="MORNING",
+        )
+        for day in (date(2025, 2, 3), date(2025, 2, 4))
+    ]
+    students = []
+    for index in range(WORKERS):
+        user = create_user_with_role(f"stress{index}@test.com", role=Membership.RoleChoices.STUDENT, org=org)
+        students.append(StudentProfile.objects.create(membership=user.memberships.get(), grade="JSS1"))
+
+    barrier = threading.Barrier(WORKERS)
+
+    def worker(index):
+        try:
+            barrier.wait()
+            record = AttendanceRecord.all_objects.create(
+                organization=org,
+                session=sessions[index % 2],
+                student=students[index],
+                status="PRESENT" if index % 4 else "ABSENT",
+            )
+            recompute_all_summaries(record)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        list(pool.map(worker, range(WORKERS)))
+
+    weekly = WeeklyClassAttendanceSummary.all_objects.get(class_assignment=class_assignment)
+    assert (weekly.total_sessions, weekly.attended_sessions) == (WORKERS, WORKERS - WORKERS // 4)
+    term_summary = TermClassAttendanceSummary.all_objects.get(class_assignment=class_assignment, term=term)
+    assert (term_summary.total_sessions, term_summary.attended_sessions) == (WORKERS, WORKERS - WORKERS // 4)
+    assert WeeklyAttendanceSummary.all_objects.filter(class_assignment=class_assignment).count() == WORKERS
@@ -0,0 +1,104 @@
+from datetime import date
+
+import pytest
+from rest_framework.test import APIClient
+
+from attendance.cube import aggregate_cube, rebuild_cube
+from attendance.models import AttendanceSession, AttendanceRecord, DailyAttendanceCube
+from tests.utils import login
+
+
+def _counts(session):
+    row = DailyAttendanceCube.all_objects.filter(session=session).values(
+        "present", "absent", "total"
+    ).first()
+    return row and (row["present"], row["absent"], row["total"])
+
+
+@pytest.fixture
+def week_sessions(org, class_assignment, term):
+    """Monday morning/afternoon and Tuesday morning."""
+    return [
+        AttendanceSession.objects.create(
+            organization=org, class_assignment=class_assignment, term=term,
+            date=day, period=period,
+        )
+        for day, period in [
+            (date(2025, 2, 3), "MORNING"),
+            (date(2025, 2, 3), "AFTERNOON"),
+            (date(2025, 2, 4), "MORNING"),
+        ]
+    ]
+
+
+@pytest.mark.django_db
+def test_cube_follows_record_changes(org, week_sessions, enrolled_students):
+    monday = week_sessions[0]
+    first, second, _ = enrolled_students
+    record = AttendanceRecord.objects.create(organization=org, session=monday, student=first, status="PRESENT")
+    AttendanceRecord.objects.create(organization=org, session=monday, student=second, status="PRESENT")
+    assert _counts(monday) == (2, 0, 2)
+
+    record.status = "ABSENT"
+    record.save()
+    assert _counts(monday) == (1, 1, 2)
+
+    record.delete()
+    assert _counts(monday) == (1, 0, 1)
+
+    AttendanceRecord.objects.filter(session=monday).delete()
+    assert _counts(monday) is None
+
+
+@pytest.mark.django_db
+def test_aggregate_cube_groups_by_dimensions(org, class_assignment, week_sessions, enrolled_students):
+    AttendanceRecord.all_objects.bulk_create([
+        AttendanceRecord(organization=org, session=session, student=student, status=status)
+        for session, statuses in zip(week_sessions, [
+            ("PRESENT", "PRESENT", "ABSENT"),
+            ("PRESENT", "LATE", "ABSENT"),
+            ("PRESENT", "PRESENT", "PRESENT"),
+        ])
+        for student, status in zip(enrolled_students, statuses)
+    ])
+    assert rebuild_cube(org) == 3
+
+    by_weekday = aggregate_cube(org, ["weekday"])
+    assert [(row["weekday"], row["present"], row["total"]) for row in by_weekday] == [(1, 3, 6), (2, 3, 3)]
+    assert by_weekday[0]["attendance_rate"] == 50.0
+
+    by_period = aggregate_cube(org, ["class_ref", "period"], {"weekday": 1})
+    assert [(row["class_name"], row["period"], row["late"], row["absent"]) for row in by_period] == [
+        ("JSS1", "AFTERNOON", 1, 1),
+        ("JSS1", "MORNING", 0, 1),
+    ]
+
+    (overall,) = aggregate_cube(org, [], {"class_assignment": class_assignment.id})
+    assert overall["total"] == 9 and overall["present"] == 6
+
+
+@pytest.mark.django_db
+def test_analytics_api(admin_client, org, term, week_sessions, enrolled_students):
+    AttendanceRecord.objects.create(
+        organization=org, session=week_sessions[0], student=enrolled_students[0], status="PRESENT"
+    )
+
+    resp = admin_client.get("/api/attendance/analytics/", {"group_by": "term,period", "term": term.id})
+    assert resp.status_code == 200
+    assert resp.data["group_by"] == ["term", "period"]
+    assert resp.data["results"] == [{
+        "term": term.id, "term_name": term.name, "period": "MORNING",
+        "present": 1, "absent": 0, "late": 0, "excused": 0,
+        "total": 1, "attendance_rate": 100.0,
+    }]
+
+    bad = admin_client.get("/api/attendance/analytics/", {"group_by": "gender"})
+    assert bad.status_code == 400
+    assert "group_by" in bad.data
+
+
+@pytest.mark.django_db
+def test_analytics_api_is_admin_only(org, teacher):
+    client = APIClient()
+    login(client, teacher.membership.user.email, "testpass123", org.id)
+    assert client.get("/api/attendance/analytics/").status_code == 403
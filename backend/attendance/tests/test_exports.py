@@ -0,0 +1,191 @@
+import csv
+import io
+import zipfile
+from datetime import date
+
+import pytest
+from rest_framework.test import APIClient
+
+from attendance.models import AttendanceSession, AttendanceRecord, AttendanceExport
+from attendance.exports import write_export
+from core.exports import iter_xlsx
+from tests.utils import create_school_class, create_teacher_with_profile, create_user_with_role, login
+from academics.models import ClassSessionAssignment
+from students.models import StudentEnrollment
+from users.models import Membership, StudentProfile
+
+
+def _read_csv(response):
+    body = b"".join(response.streaming_content).decode("utf-8")
+    return list(csv.reader(io.StringIO(body)))
+
+
+@pytest.fixture
+def marked_sessions(org, class_assignment, term, enrolled_students):
+    """Two sessions; the first two students are marked, the third is not."""
+    monday = AttendanceSession.objects.create(
+        organization=org, class_assignment=class_assignment, term=term,
+        date=date(2025, 2, 3), period="MORNING",
+    )
+    tuesday = AttendanceSession.objects.create(
+        organization=org, class_assignment=class_assignment, term=term,
+        date=date(2025, 2, 4), period="MORNING",
+    )
+    first, second, _ = enrolled_students
+    # bulk_create: exports read marks, they do not depend on summary signals
+    AttendanceRecord.all_objects.bulk_create([
+        AttendanceRecord(organization=org, session=monday, student=first, status="PRESENT"),
+        AttendanceRecord(organization=org, session=tuesday, student=first, status="ABSENT"),
+        AttendanceRecord(organization=org, session=monday, student=second, status="LATE"),
+    ])
+    return monday, tuesday
+
+
+def test_iter_xlsx_writes_readable_workbook():
+    payload = b"".join(iter_xlsx([["Name", "Score"], ["Ada & co", 3]], flush_every=1))
+    archive = zipfile.ZipFile(io.BytesIO(payload))
+    assert archive.testzip() is None
+    sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert "Ada &amp; co" in sheet
+    assert '<c r="B2"><v>3</v></c>' in sheet
+
+
+@pytest.mark.django_db
+def test_register_export_pivots_sessions_into_columns(admin_client, class_assignment, marked_sessions, enrolled_students):
+    resp = admin_client.get("/api/attendance/exports/register/", {
+        "class_assignment": class_assignment.id,
+        "start_date": "2025-02-03",
+        "end_date": "2025-02-07",
+    })
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "text/csv"
+
+    header, *rows = _read_csv(resp)
+    assert header[2:4] == ["2025-02-03 MO", "2025-02-04 MO"]
+    assert len(rows) == len(enrolled_students)
+
+    by_name = {row[1]: row for row in rows}
+    first, second, third = (s.membership.user.get_full_name() for s in enrolled_students)
+    assert by_name[first][2:] == ["P", "A", "1", "2", "50.0"]
+    assert by_name[second][2:] == ["L", "", "0", "1", "0.0"]
+    assert by_name[third][2:] == ["", "", "0", "0", "0.0"]
+
+
+@pytest.mark.django_db
+def test_student_history_export_as_xlsx(admin_client, marked_sessions, enrolled_students):
+    resp = admin_client.get("/api/attendance/exports/student-history/", {
+        "student": enrolled_students[0].id,
+        "file_format": "xlsx",
+    })
+    assert resp.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content)))
+    sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row ") == 3  # header + two marks
+
+
+@pytest.mark.django_db
+def test_background_export_can_be_downloaded(admin_client, class_assignment, term, marked_sessions, settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    monkeypatch.setattr(
+        "attendance.views.generate_attendance_export_task.delay",
+        lambda export_id: write_export(AttendanceExport.all_objects.get(pk=export_id)),
+    )
+
+    resp = admin_client.get("/api/attendance/exports/register/", {
+        "class_assignment": class_assignment.id,
+        "term": term.id,
+        "background": "true",
+    })
+    assert resp.status_code == 202
+    export = AttendanceExport.all_objects.get(pk=resp.data["id"])
+    assert export.status == AttendanceExport.Status.COMPLETED
+
+    listing = admin_client.get(f"/api/attendance/exports/{export.id}/")
+    assert listing.data["download_url"].endswith(f"/exports/{export.id}/download/")
+
+    download = admin_client.get(f"/api/attendance/exports/{export.id}/download/")
+    assert download.status_code == 200
+    body = b"".join(download.streaming_content).decode("utf-8")
+    assert body.startswith("Admission No.,Student,2025-02-03 MO")
+
+
+@pytest.mark.django_db
+def test_register_export_rejects_other_organization(admin_client, teacher, term):
+    from users.models import Organization
+    other = Organization.objects.create(name="Other School")
+    other_assignment = ClassSessionAssignment.objects.create(
+        organization=other,
+        class_ref=create_school_class(name="JSS3", organization=other),
+        session=term.session,
+    )
+    resp = admin_client.get("/api/attendance/exports/register/", {
+        "class_assignment": other_assignment.id,
+        "term": term.id,
+    })
+    assert resp.status_code == 400
+    assert "class_assignment" in resp.data
+
+
+@pytest.mark.django_db
+def test_student_cannot_export(org, student, class_assignment, term):
+    client = APIClient()
+    login(client, student.membership.user.email, "pass", org.id)
+    resp = client.get("/api/attendance/exports/register/", {
+        "class_assignment": class_assignment.id,
+        "term": term.id,
+    })
+    assert resp.status_code == 403
+
+
+@pytest.fixture
+def teacher_client(org, teacher):
+    client = APIClient()
+    login(client, teacher.membership.user.email, "testpass123", org.id)
+    return client
+
+
+@pytest.fixture
+def other_class(org, term):
+    """A class of the same session with its own form teacher and one student."""
+    assignment = ClassSessionAssignment.objects.create(
+        organization=org,
+        class_ref=create_school_class(name="JSS3", organization=org),
+        form_teacher=create_teacher_with_profile("other-teacher@test.com", organization=org, employee_id="EMP999"),
+        session=term.session,
+    )
+    user = create_user_with_role("other-kid@test.com", role=Membership.RoleChoices.STUDENT, org=org)
+    student = StudentProfile.objects.create(membership=user.memberships.get())
+    StudentEnrollment.objects.create(organization=org, student=student, class_assignment=assignment)
+    return assignment, student
+
+
+@pytest.mark.django_db
+def test_teacher_exports_only_their_classes(teacher_client, class_assignment, term, marked_sessions, enrolled_students, other_class):
+    other_assignment, other_student = other_class
+
+    own = teacher_client.get("/api/attendance/exports/register/", {"class_assignment": class_assignment.id, "term": term.id})
+    assert own.status_code == 200
+
+    resp = teacher_client.get("/api/attendance/exports/register/", {"class_assignment": other_assignment.id, "term": term.id})
+    assert resp.status_code == 400 and "class_assignment" in resp.data
+
+    assert teacher_client.get(
+        "/api/attendance/exports/student-history/", {"student": enrolled_students[0].id}
+    ).status_code == 200
+    resp = teacher_client.get("/api/attendance/exports/student-history/", {"student": other_student.id})
+    assert resp.status_code == 400 and "student" in resp.data
+
+    resp = teacher_client.get("/api/attendance/exports/term-summaries/", {"term": term.id})
+    assert resp.status_code == 400 and "class_assignment" in resp.data
+
+
+@pytest.mark.django_db
+def test_teacher_lists_only_their_own_exports(org, teacher_client, admin_client, teacher):
+    own = AttendanceExport.objects.create(
+        organization=org, requested_by=teacher.membership.user, kind=AttendanceExport.Kind.REGISTER
+    )
+    AttendanceExport.objects.create(organization=org, kind=AttendanceExport.Kind.REGISTER)
+
+    listed = teacher_client.get("/api/attendance/exports/").json()
+    assert [export["id"] for export in listed] == [own.id]
+    assert len(admin_client.get("/api/attendance/exports/").json()) == 2
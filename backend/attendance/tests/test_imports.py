@@ -0,0 +1,118 @@
+import io
+from datetime import date
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from attendance.imports import import_attendance_csv
+from attendance.models import (
+    AttendanceSession,
+    AttendanceRecord,
+    Holiday,
+    TermAttendanceSummary,
+    WeeklyClassAttendanceSummary,
+)
+
+
+@pytest.fixture
+def admitted_students(enrolled_students):
+    for number, student in enumerate(enrolled_students, start=1):
+        student.admission_number = f"ADM{number:03}"
+        student.save(update_fields=["admission_number"])
+    return enrolled_students
+
+
+def _csv(*lines):
+    return io.StringIO("\n".join(["admission_number,date,period,status", *lines]) + "\n")
+
+
+@pytest.mark.django_db
+def test_import_creates_sessions_records_and_summaries(org, class_assignment, term, admitted_students):
+    Holiday.objects.create(organization=org, date=date(2025, 2, 5), description="Founders' Day")
+
+    result = import_attendance_csv(org, _csv(
+        "ADM001,2025-02-03,MORNING,PRESENT",
+        "ADM002,2025-02-03,morning,a",
+        "ADM003,2025-02-04,AFTERNOON,LATE",
+        "ADM999,2025-02-03,MORNING,PRESENT",
+        "ADM001,2025-02-08,MORNING,PRESENT",
+        "ADM001,2025-02-05,MORNING,PRESENT",
+        "ADM001,2025-06-02,MORNING,PRESENT",
+        "ADM001,2025-02-03,EVENING,PRESENT",
+        "ADM001,03/02/2025,MORNING,PRESENT",
+    ))
+
+    assert result.rows == 9
+    assert result.imported == 3
+    assert result.sessions_created == 2
+    assert [error["line"] for error in result.errors] == [5, 6, 7, 8, 9, 10]
+    assert "Unknown admission number" in result.errors[0]["error"]
+
+    first, second, _ = admitted_students
+    assert AttendanceRecord.all_objects.get(student=second).status == "ABSENT"
+    assert AttendanceSession.all_objects.filter(class_assignment=class_assignment).count() == 2
+
+    summary = TermAttendanceSummary.all_objects.get(student=first, term=term)
+    assert (summary.total_sessions, summary.attended_sessions) == (1, 1)
+    weekly = WeeklyClassAttendanceSummary.all_objects.get(
+        class_assignment=class_assignment, week_start=date(2025, 2, 3)
+    )
+    assert (weekly.total_sessions, weekly.attended_sessions) == (3, 1)
+
+
+@pytest.mark.django_db
+def test_reimport_upserts_instead_of_duplicating(org, class_assignment, term, admitted_students):
+    import_attendance_csv(org, _csv("ADM001,2025-02-03,MORNING,ABSENT"))
+    result = import_attendance_csv(org, _csv(
+        "ADM001,2025-02-03,MORNING,ABSENT",
+        "ADM001,2025-02-03,MORNING,PRESENT",  # later row wins
+    ), chunk_size=1)
+
+    assert result.failed == 0
+    record = AttendanceRecord.all_objects.get(student=admitted_students[0])
+    assert record.status == "PRESENT"
+    summary = TermAttendanceSummary.all_objects.get(student=admitted_students[0], term=term)
+    assert (summary.total_sessions, summary.attended_sessions) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_import_skips_locked_sessions(org, class_assignment, term, admitted_students):
+    AttendanceSession.objects.create(
+        organization=org, class_assignment=class_assignment, term=term,
+        date=date(2025, 2, 3), period="MORNING", is_locked=True,
+    )
+    result = import_attendance_csv(org, _csv("ADM001,2025-02-03,MORNING,PRESENT"))
+    assert result.imported == 0
+    assert result.errors[0]["error"] == "This session is locked and cannot be modified."
+
+
+@pytest.mark.django_db
+def test_import_endpoint_returns_error_report(admin_client, admitted_students):
+    upload = SimpleUploadedFile(
+        "register.csv",
+        b"admission_number,date,period,status\nADM001,2025-02-03,MORNING,PRESENT\nADM404,2025-02-03,MORNING,PRESENT\n",
+        content_type="text/csv",
+    )
+    resp = admin_client.post("/api/attendance/imports/", {"file": upload}, format="multipart")
+    assert resp.status_code == 200
+    assert (resp.data["imported"], resp.data["failed"]) == (1, 1)
+
+    upload.seek(0)
+    resp = admin_client.post("/api/attendance/imports/?report=csv", {"file": upload}, format="multipart")
+    body = b"".join(resp.streaming_content).decode("utf-8").splitlines()
+    assert body[0] == "line,admission_number,date,period,status,error"
+    assert body[1].startswith("3,ADM404,")
+
+
+@pytest.mark.django_db
+def test_import_command_writes_error_report(org, admitted_students, tmp_path):
+    source = tmp_path / "register.csv"
+    source.write_text("admission_number,date,period,status\nADM001,2025-02-03,MORNING,PRESENT\nADM001,2025-02-09,MORNING,PRESENT\n")
+    report = tmp_path / "errors.csv"
+
+    out = io.StringIO()
+    call_command("import_attendance", org.id, str(source), errors=str(report), stdout=out)
+
+    assert "1 of 2 rows imported" in out.getvalue()
+    assert "Cannot record attendance on weekends." in report.read_text()
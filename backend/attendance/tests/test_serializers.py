@@ -4,15 +4,15 @@ from attendance.models import AttendanceSession, AttendanceRecord
 
 
 @pytest.mark.django_db
-def test_session_serializer_rejects_student_outside_class(api_rf, org, school_class, teacher, term, student_other_class):
+def test_session_serializer_rejects_student_outside_class(api_rf, org, class_assignment, teacher, term, student_other_class):
     request = api_rf.post("/")
-    request.user = teacher.user
+    request.user = teacher.membership.user
     serializer = AttendanceSessionSerializer(
         data={
-            "class_ref": school_class.id,
+            "class_assignment": class_assignment.id,
             "date": "2025-05-05",
             "period": "MORNING",
-            "form_teacher": teacher.id,
+            "term": term.id,
             "records": [
                 {"student": student_other_class.id, "status": "PRESENT"}
             ]
@@ -23,15 +23,36 @@ def test_session_serializer_rejects_student_outside_class(api_rf, org, school_cl
     assert "student" in serializer.errors["records"][0]
 
 
+@pytest.mark.django_db
+def test_session_serializer_creates_records_of_enrolled_students(api_rf, org, class_assignment, teacher, term, student):
+    request = api_rf.post("/")
+    request.user = teacher.membership.user
+    serializer = AttendanceSessionSerializer(
+        data={
+            "class_assignment": class_assignment.id,
+            "date": "2025-02-04",
+            "period": "MORNING",
+            "term": term.id,
+            "records": [{"student": student.id, "status": "LATE"}],
+        },
+        context={"request": request}
+    )
+    assert serializer.is_valid(), serializer.errors
+    session = serializer.save()
+    assert session.organization == org
+    assert list(session.records.values_list("student_id", "status")) == [(student.id, "LATE")]
+    assert serializer.data["form_teacher"] == teacher.id
+
+
 @pytest.mark.django_db
 def test_record_serializer_autofills_org_and_user(api_rf, org, session, student, teacher):
     request = api_rf.post("/")
-    request.user = teacher.user
+    request.user = teacher.membership.user
     serializer = AttendanceRecordSerializer(
         data={"student": student.id, "status": "ABSENT"},
-        context={"request": request}
+        context={"request": request, "session": session}
     )
     assert serializer.is_valid(), serializer.errors
     record = serializer.save(session=session)
     assert record.organization == org
-    assert record.marked_by == teacher.user
+    assert record.marked_by == teacher.membership.user
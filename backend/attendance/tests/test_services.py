@@ -5,18 +5,42 @@ from attendance.models import WeeklyAttendanceSummary, TermAttendanceSummary
 
 
 @pytest.mark.django_db
-def test_compute_weekly_summary(student, school_class, org, session_present):
-    week_start = date.today() - timedelta(days=date.today().weekday())
+def test_compute_weekly_summary(student, class_assignment, term, session_present):
+    week_start = session_present.session.date - timedelta(days=session_present.session.date.weekday())
     week_end = week_start + timedelta(days=4)
 
-    compute_weekly_summary_for_student(student, school_class, week_start, week_end, org)
+    compute_weekly_summary_for_student(student, class_assignment, week_start, week_end, term)
     summary = WeeklyAttendanceSummary.objects.get(student=student)
-    assert summary.total_sessions >= 1
-    assert summary.attended_sessions <= summary.total_sessions
+    assert (summary.total_sessions, summary.attended_sessions) == (1, 1)
+    assert summary.class_assignment == class_assignment
 
 
 @pytest.mark.django_db
-def test_compute_term_summary(student, school_class, org, term, session_present):
-    compute_term_summary_for_student(student, school_class, term, org)
+def test_compute_term_summary(student, class_assignment, term, session_present):
+    compute_term_summary_for_student(student, class_assignment, term)
     summary = TermAttendanceSummary.objects.get(student=student, term=term)
-    assert summary.total_sessions >= 1
+    assert (summary.total_sessions, summary.attended_sessions) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_recompute_weekly_summaries_aggregates_whole_class(org, class_assignment, term, enrolled_students):
+    from attendance.models import AttendanceSession, AttendanceRecord, WeeklyClassAttendanceSummary
+    from attendance.services import recompute_weekly_summaries, get_week_bounds
+
+    day = date(2025, 2, 3)
+    session = AttendanceSession.objects.create(
+        organization=org, class_assignment=class_assignment, term=term, date=day, period="MORNING"
+    )
+    AttendanceRecord.all_objects.bulk_create([
+        AttendanceRecord(organization=org, session=session, student=student, status=status)
+        for student, status in zip(enrolled_students, ["PRESENT", "PRESENT", "ABSENT"])
+    ])
+
+    week_start, week_end = get_week_bounds(day)
+    recompute_weekly_summaries(class_assignment, week_start, week_end, term)
+
+    rows = WeeklyAttendanceSummary.all_objects.filter(class_assignment=class_assignment)
+    assert sorted(rows.values_list("attended_sessions", flat=True)) == [0, 1, 1]
+    class_summary = WeeklyClassAttendanceSummary.all_objects.get(class_assignment=class_assignment)
+    assert (class_summary.total_sessions, class_summary.attended_sessions) == (3, 2)
+    assert round(class_summary.percentage, 2) == 66.67
@@ -14,3 +14,42 @@ def test_signal_recomputes_summary_on_record_save(session, student, org):
     # After save → summaries should exist
     assert WeeklyAttendanceSummary.objects.filter(
         student=student).exists()
+
+
+@pytest.mark.django_db
+def test_deleting_a_record_recomputes_summaries(session, student, org, django_capture_on_commit_callbacks):
+    from attendance.models import AttendanceRecord, SummaryVersion, TermAttendanceSummary
+    with django_capture_on_commit_callbacks(execute=True):
+        record = AttendanceRecord.objects.create(organization=org, session=session, student=student, status="PRESENT")
+    version = SummaryVersion.all_objects.get(organization=org, resource="WEEKLY").version
+
+    with django_capture_on_commit_callbacks(execute=True):
+        record.delete()
+
+    weekly = WeeklyAttendanceSummary.objects.get(student=student)
+    assert (weekly.total_sessions, weekly.attended_sessions) == (0, 0)
+    assert TermAttendanceSummary.objects.get(student=student).total_sessions == 0
+    assert SummaryVersion.all_objects.get(organization=org, resource="WEEKLY").version > version
+
+
+@pytest.mark.django_db
+def test_async_recompute_is_queued_after_commit(session, student, org, settings, monkeypatch,
+                                               django_capture_on_commit_callbacks):
+    from attendance import tasks
+    from attendance.models import AttendanceRecord
+    settings.ATTENDANCE_ASYNC_UPDATES = True
+    queued = []
+    monkeypatch.setattr(tasks.recompute_summaries_task, "delay", lambda *args: queued.append(args))
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        record = AttendanceRecord.objects.create(organization=org, session=session, student=student, status="ABSENT")
+        record.delete()
+    assert queued == []
+
+    for callback in callbacks:
+        callback()
+    args = (session.class_assignment_id, session.term_id, student.pk, "2025-02-03")
+    assert queued == [args, args]
+
+    tasks.recompute_summaries_task(*args)
+    assert WeeklyAttendanceSummary.objects.get(student=student).total_sessions == 0
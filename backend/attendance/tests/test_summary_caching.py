@@ -0,0 +1,112 @@
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+from attendance.models import AttendanceSession, AttendanceRecord, SummaryVersion
+from tests.utils import login
+
+URL = "/api/attendance/weekly-class-summaries/"
+
+
+def _rows(response):
+    rows = response.json()
+    return rows["results"] if isinstance(rows, dict) else rows
+
+
+def _summary_queries(queries):
+    return [q["sql"] for q in queries if "weeklyclassattendancesummary" in q["sql"].lower()]
+
+
+@pytest.fixture
+def marked(org, class_assignment, term, enrolled_students, django_capture_on_commit_callbacks):
+    session = AttendanceSession.objects.create(
+        organization=org, class_assignment=class_assignment, term=term,
+        date=date(2025, 2, 3), period="MORNING",
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        AttendanceRecord.objects.create(
+            organization=org, session=session, student=enrolled_students[0], status="PRESENT"
+        )
+    return session
+
+
+@pytest.mark.django_db
+def test_summary_writes_bump_the_version(org, marked, enrolled_students, django_capture_on_commit_callbacks):
+    version = SummaryVersion.all_objects.get(organization=org, resource=SummaryVersion.Resource.WEEKLY)
+    assert version.version >= 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        AttendanceRecord.objects.create(
+            organization=org, session=marked, student=enrolled_students[1], status="ABSENT"
+        )
+    version_after = SummaryVersion.all_objects.get(pk=version.pk)
+    assert version_after.version > version.version
+    assert version_after.updated_at >= version.updated_at
+
+
+@pytest.mark.django_db
+def test_matching_etag_is_answered_without_the_queryset(admin_client, marked):
+    first = admin_client.get(URL)
+    assert first.status_code == 200
+    etag = first["ETag"]
+    assert first["Last-Modified"]
+
+    with CaptureQueriesContext(connection) as queries:
+        not_modified = admin_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified["ETag"] == etag
+    assert _summary_queries(queries.captured_queries) == []
+
+    with CaptureQueriesContext(connection) as queries:
+        cached = admin_client.get(URL)
+    assert cached.status_code == 200 and cached.json() == first.json()
+    assert _summary_queries(queries.captured_queries) == []
+
+    assert admin_client.get(URL, {"class_assignment": 1})["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_new_marks_change_the_etag(admin_client, marked, enrolled_students, org, django_capture_on_commit_callbacks):
+    first = admin_client.get(URL)
+    assert first.status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        AttendanceRecord.objects.create(
+            organization=org, session=marked, student=enrolled_students[1], status="PRESENT"
+        )
+    second = admin_client.get(URL, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert second.status_code == 200
+    assert second["ETag"] != first["ETag"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/attendance/weekly-summaries/", "/api/attendance/term-summaries/"])
+def test_student_summaries_carry_the_student_name(admin_client, marked, enrolled_students, url):
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    assert [row["student_name"] for row in _rows(response)] == [enrolled_students[0].membership.user.get_full_name()]
+
+
+@pytest.mark.django_db
+def test_students_and_admins_get_their_own_slice(admin_client, marked, enrolled_students, org,
+                                                 django_capture_on_commit_callbacks):
+    url = "/api/attendance/weekly-summaries/"
+    with django_capture_on_commit_callbacks(execute=True):
+        AttendanceRecord.objects.create(
+            organization=org, session=marked, student=enrolled_students[1], status="ABSENT"
+        )
+    student_client = APIClient()
+    login(student_client, enrolled_students[1].membership.user.email, "pass", org.id)
+
+    admin = admin_client.get(url)
+    student = student_client.get(url)
+
+    assert admin.status_code == student.status_code == 200
+    assert admin["ETag"] != student["ETag"]
+    assert len(_rows(admin)) == 2
+    assert [row["student"] for row in _rows(student)] == [enrolled_students[1].pk]
+    assert student_client.get(url, HTTP_IF_NONE_MATCH=admin["ETag"]).status_code == 200
@@ -0,0 +1,188 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from rest_framework.test import APIClient
+
+from academics.models import ClassSessionAssignment
+from django.db import transaction
+from django.utils import timezone
+
+from attendance.models import AttendanceSession, AttendanceRecord, SyncCounter
+from attendance.sync import changes_since
+from tests.utils import create_school_class, create_teacher_with_profile, login
+
+MONDAY = "2025-02-03"
+
+
+def _at(hour):
+    return datetime(2025, 2, 3, hour, tzinfo=dt_timezone.utc).isoformat()
+
+
+def _change(class_assignment, student, status="PRESENT", marked_at=_at(8), period="MORNING"):
+    return {
+        "class_assignment": class_assignment.id,
+        "date": MONDAY,
+        "period": period,
+        "student": student.id,
+        "status": status,
+        "marked_at": marked_at,
+    }
+
+
+@pytest.mark.django_db
+def test_push_then_pull_only_returns_changes(admin_client, class_assignment, term, enrolled_students,
+                                            django_capture_on_commit_callbacks):
+    first, second, _ = enrolled_students
+    pushed = admin_client.post("/api/attendance/sync/", {
+        "cursor": 0,
+        "changes": [_change(class_assignment, first), _change(class_assignment, second, "ABSENT")],
+    }, format="json")
+    assert pushed.status_code == 200
+    assert pushed.data["applied"] == 2
+    assert len(pushed.data["sessions"]) == 1
+    assert {(r["student"], r["status"]) for r in pushed.data["records"]} == {
+        (first.id, "PRESENT"), (second.id, "ABSENT"),
+    }
+    cursor = pushed.data["cursor"]
+
+    assert AttendanceSession.all_objects.get().term == term
+
+    idle = admin_client.get("/api/attendance/sync/", {"cursor": cursor})
+    assert idle.data["records"] == [] and idle.data["sessions"] == []
+    assert idle.data["cursor"] == cursor
+
+    record = AttendanceRecord.objects.get(student=second)
+    record.status = "LATE"
+    with django_capture_on_commit_callbacks(execute=True):
+        record.save()
+    delta = admin_client.get("/api/attendance/sync/", {"cursor": cursor})
+    assert [(r["id"], r["status"]) for r in delta.data["records"]] == [(record.id, "LATE")]
+    assert delta.data["cursor"] > cursor
+
+    record_id = record.id
+    record.delete()
+    deleted = admin_client.get("/api/attendance/sync/", {"cursor": delta.data["cursor"]})
+    assert deleted.data["deleted"] == [
+        {"kind": "RECORD", "id": record_id, "sync_version": deleted.data["cursor"]}
+    ]
+
+
+@pytest.mark.django_db
+def test_last_writer_wins_on_marked_at(admin_client, class_assignment, enrolled_students):
+    student = enrolled_students[0]
+    admin_client.post("/api/attendance/sync/", {
+        "changes": [_change(class_assignment, student, "PRESENT", _at(10))],
+    }, format="json")
+
+    stale = admin_client.post("/api/attendance/sync/", {
+        "changes": [_change(class_assignment, student, "ABSENT", _at(9))],
+    }, format="json")
+    assert stale.data["applied"] == 0
+    (conflict,) = stale.data["conflicts"]
+    assert conflict["index"] == 0 and conflict["record"]["status"] == "PRESENT"
+
+    newer = admin_client.post("/api/attendance/sync/", {
+        "changes": [
+            _change(class_assignment, student, "LATE", _at(11)),
+            _change(class_assignment, student, "ABSENT", _at(12)),  # later edit in the same batch wins
+        ],
+    }, format="json")
+    assert newer.data["applied"] == 1 and newer.data["conflicts"] == []
+    assert AttendanceRecord.objects.get(student=student).status == "ABSENT"
+
+
+@pytest.mark.django_db
+def test_push_rejects_bad_edits(org, class_assignment, term, enrolled_students, students):
+    # The form teacher of `class_assignment` may not mark another teacher's class.
+    other = ClassSessionAssignment.objects.create(
+        organization=org,
+        class_ref=create_school_class(name="JSS2", organization=org),
+        form_teacher=create_teacher_with_profile("other320@test.com", organization=org, employee_id="EMP2"),
+        session=term.session,
+    )
+    client = APIClient()
+    login(client, class_assignment.form_teacher.membership.user.email, "testpass123", org.id)
+
+    resp = client.post("/api/attendance/sync/", {
+        "changes": [
+            _change(other, enrolled_students[0]),
+            dict(_change(class_assignment, enrolled_students[0]), date="2025-02-08"),
+            _change(class_assignment, enrolled_students[1]),
+        ],
+    }, format="json")
+    assert resp.status_code == 200
+    assert resp.data["applied"] == 1
+    assert [error["index"] for error in resp.data["errors"]] == [0, 1]
+
+
+@pytest.mark.django_db
+def test_changes_since_pages_without_splitting_versions(org, admin_client, class_assignment, enrolled_students):
+    for index, student in enumerate(enrolled_students):
+        admin_client.post("/api/attendance/sync/", {
+            "changes": [_change(class_assignment, student, marked_at=_at(8 + index))],
+        }, format="json")
+
+    page = changes_since(org, 0, page_size=2)
+    assert page["has_more"] is True
+    assert len(page["records"]) == 2
+
+    rest = changes_since(org, page["cursor"], page_size=2)
+    assert rest["has_more"] is False
+    assert [r["student"] for r in rest["records"]] == [enrolled_students[2].id]
+
+
+@pytest.mark.django_db
+def test_future_marked_at_is_clamped_to_server_time(admin_client, class_assignment, enrolled_students):
+    student = enrolled_students[0]
+    future = (timezone.now() + timedelta(days=365)).isoformat()
+    admin_client.post("/api/attendance/sync/", {
+        "changes": [_change(class_assignment, student, "ABSENT", future)],
+    }, format="json")
+    assert AttendanceRecord.objects.get(student=student).marked_at <= timezone.now()
+
+    # An edit made after the push still wins over the far-future clock.
+    later = admin_client.post("/api/attendance/sync/", {
+        "changes": [_change(class_assignment, student, "PRESENT", timezone.now().isoformat())],
+    }, format="json")
+    assert later.data["applied"] == 1
+    assert AttendanceRecord.objects.get(student=student).status == "PRESENT"
+
+
+@pytest.mark.django_db
+def test_server_edits_move_marked_at(admin_client, class_assignment, enrolled_students):
+    student = enrolled_students[0]
+    admin_client.post("/api/attendance/sync/", {
+        "changes": [_change(class_assignment, student, "PRESENT", _at(10))],
+    }, format="json")
+    record = AttendanceRecord.objects.get(student=student)
+
+    teacher = APIClient()
+    login(teacher, class_assignment.form_teacher.membership.user.email, "testpass123", class_assignment.organization_id)
+    resp = teacher.patch(
+        f"/api/attendance/sessions/{record.session_id}/records/",
+        [{"student": student.id, "status": "LATE"}],
+        format="json",
+    )
+    assert resp.status_code == 200
+    record.refresh_from_db()
+    assert record.status == "LATE" and record.marked_at > datetime(2025, 2, 3, 10, tzinfo=dt_timezone.utc)
+
+    # The offline edit queued before the server edit now loses.
+    stale = admin_client.post("/api/attendance/sync/", {
+        "changes": [_change(class_assignment, student, "ABSENT", _at(11))],
+    }, format="json")
+    assert stale.data["applied"] == 0 and stale.data["conflicts"][0]["record"]["status"] == "LATE"
+
+
+@pytest.mark.django_db
+def test_records_saved_in_one_transaction_share_one_version(org, session, enrolled_students,
+                                                             django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        with transaction.atomic():
+            for student in enrolled_students:
+                AttendanceRecord.objects.create(organization=org, session=session, student=student)
+            # Nothing is stamped, and the counter is not locked, until commit.
+            assert set(AttendanceRecord.objects.values_list("sync_version", flat=True)) == {0}
+
+    versions = set(AttendanceRecord.objects.values_list("sync_version", flat=True))
+    assert versions == {SyncCounter.all_objects.get(organization=org).value}
@@ -1,40 +1,47 @@
 import pytest
 from rest_framework.test import APIClient
 from django.urls import reverse
-from datetime import date
 
 
 @pytest.mark.django_db
-def test_teacher_can_create_session(org, school_class, teacher, term):
+def test_teacher_can_create_session(org, class_assignment, teacher, term):
     client = APIClient()
     client.force_authenticate(user=teacher.membership.user)
     url = reverse("attendance-session-list")
     resp = client.post(url, {
-        "class_ref": school_class.id,
-        "date": str(date.today()),
+        "class_assignment": class_assignment.id,
+        "date": "2025-02-04",
         "period": "MORNING",
-        "form_teacher": teacher.id,
         "term": term.id
     }, format="json")
-    assert resp.status_code == 201
+    assert resp.status_code == 201, resp.data
+    assert resp.data["form_teacher"] == teacher.id
 
 
 @pytest.mark.django_db
-def test_student_cannot_create_session(api_client_student, school_class, session):
+def test_student_cannot_create_session(api_client_student, class_assignment, term, session):
     url = reverse("attendance-session-list")
     resp = api_client_student.post(url, {
-        "class_ref": school_class.id,
-        "date": str(date.today()),
+        "class_assignment": class_assignment.id,
+        "date": "2025-02-04",
         "period": "MORNING",
-        "form_teacher": session.form_teacher.id
+        "term": term.id
     }, format="json")
     assert resp.status_code == 403
 
 
 @pytest.mark.django_db
-def test_bulk_record_creation(api_client_teacher, session, students):
+def test_bulk_record_creation(api_client_teacher, session, enrolled_students):
     url = reverse("attendance-session-records", args=[session.id])
-    data = [{"student": s.id, "status": "PRESENT"} for s in students]
+    data = [{"student": s.id, "status": "PRESENT"} for s in enrolled_students]
     resp = api_client_teacher.post(url, data, format="json")
     assert resp.status_code == 201
-    assert len(resp.json()) == len(students)
+    assert len(resp.json()) == len(enrolled_students)
+
+
+@pytest.mark.django_db
+def test_bulk_record_creation_rejects_student_outside_class(api_client_teacher, session, student_other_class):
+    url = reverse("attendance-session-records", args=[session.id])
+    resp = api_client_teacher.post(url, [{"student": student_other_class.id, "status": "PRESENT"}], format="json")
+    assert resp.status_code == 400
+    assert "student" in resp.data
@@ -8,6 +8,11 @@ from .views import (
     WeeklyClassAttendanceSummaryViewSet,
     TermAttendanceSummaryViewSet,
     TermClassAttendanceSummaryViewSet,
+    AttendanceExportViewSet,
+    AttendanceImportViewSet,
+    AttendanceAlertViewSet,
+    AttendanceAnalyticsViewSet,
+    AttendanceSyncViewSet,
 )
 
 router = DefaultRouter()
@@ -23,6 +28,21 @@ router.register(r'weekly-class-summaries', WeeklyClassAttendanceSummaryViewSet,
 router.register(r'term-summaries', TermAttendanceSummaryViewSet, basename="term-summary")
 router.register(r'term-class-summaries', TermClassAttendanceSummaryViewSet, basename="term-class-summary")
 
+# CSV/XLSX exports (streamed, or built in the background)
+router.register(r'exports', AttendanceExportViewSet, basename="attendance-export")
+
+# Bulk CSV import
+router.register(r'imports', AttendanceImportViewSet, basename="attendance-import")
+
+# Chronic-absence alerts
+router.register(r'alerts', AttendanceAlertViewSet, basename="attendance-alert")
+
+# Dashboards over the daily attendance cube
+router.register(r'analytics', AttendanceAnalyticsViewSet, basename="attendance-analytics")
+
+# Delta sync for offline marking clients
+router.register(r'sync', AttendanceSyncViewSet, basename="attendance-sync")
+
 urlpatterns = [
     path("", include(router.urls)),
 ]
\ No newline at end of file
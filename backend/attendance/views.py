@@ -1,12 +1,26 @@
+import io
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from django.http import FileResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from academics.models import Term
-from users.models import StudentProfile
-
-from .services import compute_term_summary_for_student
+from academics.models import Term, ClassSessionAssignment
+from core.exports import streaming_export_response
+from core.pagination import DateKeysetPagination, KeysetPagination
+from core.permissions import IsAdminOrPrincipal, IsTeacher, any_of
+from core.serializers import FlexFieldsViewMixin, requested_fields
+from core.throttling import WRITE_THROTTLES
+from users.models import Membership
+
+from .caching import ConditionalSummaryMixin, scope_summaries
+from .services import update_term_class_summary
+from .exports import export_rows, export_filename
+from .imports import import_attendance_csv, iter_error_report
+from .cube import aggregate_cube
+from .sync import apply_changes, changes_since
+from .tasks import generate_attendance_export_task
 from .models import (
     AttendanceSession, 
     AttendanceRecord,
@@ -14,7 +28,10 @@ from .models import (
     WeeklyClassAttendanceSummary,
     TermAttendanceSummary,
     TermClassAttendanceSummary,
-    Holiday
+    Holiday,
+    AttendanceExport,
+    AttendanceAlert,
+    SummaryVersion,
 )
 from .serializers import (
     AttendanceSessionSerializer, 
@@ -23,7 +40,12 @@ from .serializers import (
     WeeklyClassAttendanceSummarySerializer, 
     TermAttendanceSummarySerializer,
     TermClassAttendanceSummarySerializer,
-    HolidaySerializer
+    HolidaySerializer,
+    AttendanceExportSerializer,
+    AttendanceExportRequestSerializer,
+    AttendanceAlertSerializer,
+    AttendanceAnalyticsQuerySerializer,
+    AttendanceSyncSerializer
 )
 from .permissions import (
     CanViewAttendance,
@@ -34,6 +56,7 @@ from .permissions import (
 class HolidayViewSet(viewsets.ModelViewSet):
     serializer_class = HolidaySerializer
     permission_classes = [CanViewAttendance, CanManageAttendance]  # only admins can manage holidays
+    throttle_classes = WRITE_THROTTLES
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["date"]
 
@@ -43,9 +66,11 @@ class HolidayViewSet(viewsets.ModelViewSet):
 
 class AttendanceSessionViewSet(viewsets.ModelViewSet):
     serializer_class = AttendanceSessionSerializer
+    pagination_class = DateKeysetPagination
     permission_classes = [CanViewAttendance, CanManageAttendance]
+    throttle_classes = WRITE_THROTTLES
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["class_ref", "date", "period", "form_teacher"]
+    filterset_fields = ["class_assignment", "date", "period", "term"]
 
     # def get_permissions(self):
     #     if self.action in ["create", "update", "partial_update", "destroy"]:
@@ -53,17 +78,20 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
     #     return [permissions.IsAuthenticated(), CanViewAttendance()]
 
     def get_queryset(self):
-        qs = AttendanceSession.objects.all()
+        qs = AttendanceSession.objects.select_related("class_assignment__class_ref")
+        role = getattr(self.request.user.memberships.first(), "role", None)
+
+        # Teachers → see only the sessions of classes they are form teacher of
+        if role == Membership.RoleChoices.TEACHER:
+            qs = qs.filter(class_assignment__form_teacher__membership__user=self.request.user)
 
-        # Teachers → see only their sessions
-        if hasattr(self.request.user, "teacher_profile"):
-            qs = qs.filter(form_teacher=self.request.user.teacher_profile)
+        # Students → see only the sessions of classes they are enrolled in
+        elif role == Membership.RoleChoices.STUDENT:
+            qs = qs.filter(class_assignment__enrollments__student__membership__user=self.request.user)
 
-        # Students/Parents → see only their class
-        elif hasattr(self.request.user, "student_profile"):
-            qs = qs.filter(class_ref=self.request.user.student_profile.class_ref)
-        elif hasattr(self.request.user, "parent_profile"):
-            qs = qs.filter(student__in=self.request.user.parent_profile.children.all())
+        # Parents → not linked to their children yet
+        elif role == Membership.RoleChoices.PARENT:
+            qs = qs.none()
         return qs
     
     @action(detail=True, methods=["post"], url_path="lock")
@@ -121,8 +149,9 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
             )
         
         if request.method == "GET":
-            records = session.records.all()
-            serializer = AttendanceRecordSerializer(records, many=True)
+            fields, expand = requested_fields(request)
+            records = AttendanceRecordSerializer.optimize_queryset(session.records.all(), fields, expand)
+            serializer = AttendanceRecordSerializer(records, many=True, context=self.get_serializer_context())
             return Response(serializer.data)
 
         # --- CREATE (RESET + REPLACE) ---
@@ -130,12 +159,11 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
             records_data = request.data if isinstance(request.data, list) else []
             session.records.all().delete()  # reset before adding
             created_records = []
+            context = {**self.get_serializer_context(), "session": session}
             for record in records_data:
-                record["session"] = session.id
-                record["organization"] = session.organization.id
-                serializer = AttendanceRecordSerializer(data=record)
+                serializer = AttendanceRecordSerializer(data=record, context=context)
                 serializer.is_valid(raise_exception=True)
-                serializer.save(marked_by=request.user)
+                serializer.save(session=session, organization=session.organization, marked_by=request.user)
                 created_records.append(serializer.data)
             return Response(created_records, status=status.HTTP_201_CREATED)
 
@@ -152,7 +180,7 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
                 serializer = AttendanceRecordSerializer(
-                    rec_obj, data=record, partial=True
+                    rec_obj, data=record, partial=True, context={**self.get_serializer_context(), "session": session}
                 )
                 serializer.is_valid(raise_exception=True)
                 serializer.save(marked_by=request.user)
@@ -160,11 +188,13 @@ class AttendanceSessionViewSet(viewsets.ModelViewSet):
             return Response(updated_records, status=status.HTTP_200_OK)
     
     def perform_create(self, serializer):
-        serializer.save(organization=self.request.user.membership.organization)
+        serializer.save(organization=self.request.user.memberships.first().organization)
 
-class AttendanceRecordViewSet(viewsets.ModelViewSet):
+class AttendanceRecordViewSet(FlexFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = AttendanceRecordSerializer
+    pagination_class = KeysetPagination
     permission_classes = [CanViewAttendance, CanManageAttendance]
+    throttle_classes = WRITE_THROTTLES
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["session", "student", "status"]
 
@@ -176,54 +206,48 @@ class AttendanceRecordViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # org = self.request.user.organization
         qs = AttendanceRecord.objects.all()
+        role = getattr(self.request.user.memberships.first(), "role", None)
 
-        if hasattr(self.request.user, "teacher_profile"):
+        if role == Membership.RoleChoices.TEACHER:
             qs = qs.filter(
-                session__form_teacher=self.request.user.teacher_profile
+                session__class_assignment__form_teacher__membership__user=self.request.user
             )
 
-        elif hasattr(self.request.user, "student_profile"):
+        elif role == Membership.RoleChoices.STUDENT:
             qs = qs.filter(
-                student=self.request.user.student_profile
+                student__membership__user=self.request.user
             )
 
+        elif role == Membership.RoleChoices.PARENT:
+            qs = qs.none()
+
         return qs
 
 
-class WeeklyAttendanceSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+class WeeklyAttendanceSummaryViewSet(ConditionalSummaryMixin, viewsets.ReadOnlyModelViewSet):
+    summary_resource = SummaryVersion.Resource.WEEKLY
     serializer_class = WeeklyAttendanceSummarySerializer
     permission_classes = [permissions.IsAuthenticated, CanViewAttendance]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["student", "class_ref", "week_start", "week_end"]
+    filterset_fields = ["student", "class_assignment", "week_start", "week_end"]
 
     def get_queryset(self):
-        qs = WeeklyAttendanceSummary.objects.all()
-
-        if hasattr(self.request.user, "student_profile"):
-            qs = qs.filter(student=self.request.user.student_profile)
+        qs = WeeklyAttendanceSummary.objects.select_related("class_assignment__class_ref", "student__membership__user")
 
-        elif hasattr(self.request.user, "teacher_profile"):
-            qs = qs.filter(class_ref__attendance_sessions__form_teacher=self.request.user.teacher_profile)
+        return scope_summaries(qs, self.request)
 
-        return qs.distinct()
 
-
-class TermAttendanceSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+class TermAttendanceSummaryViewSet(ConditionalSummaryMixin, viewsets.ReadOnlyModelViewSet):
+    summary_resource = SummaryVersion.Resource.TERM
     serializer_class = TermAttendanceSummarySerializer
     permission_classes = [permissions.IsAuthenticated, CanViewAttendance]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["student", "class_ref", "term"]
+    filterset_fields = ["student", "class_assignment", "term"]
 
     def get_queryset(self):
-        qs = TermAttendanceSummary.objects.all()
-
-        if hasattr(self.request.user, "student_profile"):
-            qs = qs.filter(student=self.request.user.student_profile)
+        qs = TermAttendanceSummary.objects.select_related("class_assignment__class_ref", "student__membership__user")
 
-        elif hasattr(self.request.user, "teacher_profile"):
-            qs = qs.filter(class_ref__attendance_sessions__form_teacher=self.request.user.teacher_profile)
-
-        return qs.distinct()
+        return scope_summaries(qs, self.request)
 
 class TermSummaryViewSet(viewsets.ViewSet):
     permission_classes = [IsAdminUser, CanViewAttendance]
@@ -232,32 +256,274 @@ class TermSummaryViewSet(viewsets.ViewSet):
     def compute(self, request, pk=None):
         """Trigger computation for a specific term."""
         try:
-            term = Term.objects.get(pk=pk, organization=request.user.membership.organization)
+            term = Term.objects.get(pk=pk, organization=request.organization)
         except Term.DoesNotExist:
             return Response({"detail": "Term not found."}, status=404)
 
-        for student in StudentProfile.objects.filter(organization=term.organization):
-            compute_term_summary_for_student(student, student.school_class, term, term.organization)
+        assignments = ClassSessionAssignment.objects.filter(
+            organization=term.organization, session=term.session
+        )
+        for class_assignment in assignments:
+            update_term_class_summary(class_assignment, term)
 
         return Response({"detail": f"Summaries computed for term {term.id}."})
     
-class WeeklyClassAttendanceSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+class WeeklyClassAttendanceSummaryViewSet(ConditionalSummaryMixin, viewsets.ReadOnlyModelViewSet):
     """Allow authorized users to view precomputed weekly class summaries."""
 
+    summary_resource = SummaryVersion.Resource.WEEKLY
     serializer_class = WeeklyClassAttendanceSummarySerializer
     permission_classes = [permissions.IsAuthenticated, CanViewAttendance]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["class_ref", "week_start", "week_end"]
+    filterset_fields = ["class_assignment", "week_start", "week_end"]
 
     def get_queryset(self):
-        return WeeklyClassAttendanceSummary.objects.all()
+        return WeeklyClassAttendanceSummary.objects.select_related("class_assignment__class_ref")
 
-class TermClassAttendanceSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+class TermClassAttendanceSummaryViewSet(ConditionalSummaryMixin, viewsets.ReadOnlyModelViewSet):
     """View term class attendance summaries (read-only)."""
+    summary_resource = SummaryVersion.Resource.TERM
     serializer_class = TermClassAttendanceSummarySerializer
     permission_classes = [permissions.IsAuthenticated, CanViewAttendance]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["class_ref", "term"]
+    filterset_fields = ["class_assignment", "term"]
 
     def get_queryset(self):
-        return TermClassAttendanceSummary.objects.all()
\ No newline at end of file
+        return TermClassAttendanceSummary.objects.select_related("class_assignment__class_ref")
+
+class AttendanceExportViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Registers, student histories and term summaries as CSV/XLSX.
+
+    Exports stream straight from the database by default; pass
+    `background=true` to build the file in Celery and fetch it later
+    from `/exports/{id}/download/`. Teachers may only export classes they
+    are form teacher of (and their students), and only see their own
+    exports.
+    """
+    serializer_class = AttendanceExportSerializer
+    permission_classes = [any_of(IsAdminOrPrincipal, IsTeacher)]
+    throttle_classes = WRITE_THROTTLES
+
+    def get_queryset(self):
+        org = getattr(self.request, "organization", None)
+        if not org:
+            return AttendanceExport.objects.none()
+        qs = AttendanceExport.all_objects.filter(organization=org)
+        if not IsAdminOrPrincipal().has_permission(self.request, self):
+            qs = qs.filter(requested_by=self.request.user)
+        return qs
+
+    def _export(self, request, kind):
+        params = request.query_params.dict()
+        params["kind"] = kind
+
+        class_assignments = None
+        if not IsAdminOrPrincipal().has_permission(request, self):
+            class_assignments = ClassSessionAssignment.all_objects.filter(
+                organization=request.organization,
+                form_teacher__membership__user=request.user,
+            )
+
+        serializer = AttendanceExportRequestSerializer(
+            data=params,
+            context={"organization": request.organization, "class_assignments": class_assignments},
+        )
+        serializer.is_valid(raise_exception=True)
+        export_params = serializer.to_params()
+        file_format = serializer.validated_data["file_format"]
+
+        if serializer.validated_data["background"]:
+            export = AttendanceExport.objects.create(
+                organization=request.organization,
+                requested_by=request.user,
+                kind=kind,
+                file_format=file_format,
+                params=export_params,
+            )
+            generate_attendance_export_task.delay(export.id)
+            return Response(
+                AttendanceExportSerializer(export, context={"request": request}).data,
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        rows = export_rows(request.organization, kind, export_params)
+        return streaming_export_response(
+            rows,
+            export_filename(kind, export_params),
+            fmt=file_format,
+            sheet_name=AttendanceExport.Kind(kind).label,
+        )
+
+    @action(detail=False, methods=["get"], url_path="register")
+    def register(self, request):
+        """Class × date register for a class assignment and date range/term."""
+        return self._export(request, AttendanceExport.Kind.REGISTER)
+
+    @action(detail=False, methods=["get"], url_path="student-history")
+    def student_history(self, request):
+        """Full attendance history for one student."""
+        return self._export(request, AttendanceExport.Kind.STUDENT_HISTORY)
+
+    @action(detail=False, methods=["get"], url_path="term-summaries")
+    def term_summaries(self, request):
+        """Per-student or per-class term summary table."""
+        return self._export(request, AttendanceExport.Kind.TERM_SUMMARY)
+
+    @action(detail=True, methods=["get"], url_path="download")
+    def download(self, request, pk=None):
+        """Download a finished background export."""
+        export = self.get_object()
+        if export.status != AttendanceExport.Status.COMPLETED or not export.file:
+            return Response(
+                {"detail": f"Export is {export.status.lower()}, not ready for download."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return FileResponse(
+            export.file.open("rb"),
+            as_attachment=True,
+            filename=export.file.name.rsplit("/", 1)[-1],
+        )
+
+
+class AttendanceImportViewSet(viewsets.ViewSet):
+    """
+    Bulk-import attendance from a CSV upload (multipart field `file`) with
+    the columns admission_number, date, period, status.
+
+    Responds with counts and a row-level error report; pass `report=csv`
+    to get the error report back as a CSV file instead. Teachers may only
+    import into classes they are form teacher of.
+    """
+    permission_classes = [any_of(IsAdminOrPrincipal, IsTeacher)]
+    throttle_classes = WRITE_THROTTLES
+    parser_classes = [MultiPartParser]
+
+    def create(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        class_assignments = None
+        if not IsAdminOrPrincipal().has_permission(request, self):
+            class_assignments = ClassSessionAssignment.all_objects.filter(
+                organization=request.organization,
+                form_teacher__membership__user=request.user,
+            )
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        result = import_attendance_csv(
+            request.organization,
+            stream,
+            marked_by=request.user,
+            class_assignments=class_assignments,
+        )
+
+        if request.query_params.get("report") == "csv":
+            return streaming_export_response(iter_error_report(result), "attendance-import-errors")
+
+        response_status = status.HTTP_200_OK if result.rows else status.HTTP_400_BAD_REQUEST
+        return Response(result.as_dict(), status=response_status)
+
+
+class AttendanceAlertViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Chronic-absence alerts raised by the nightly detection task.
+    Teachers only see alerts for classes they are form teacher of.
+    """
+    serializer_class = AttendanceAlertSerializer
+    permission_classes = [any_of(IsAdminOrPrincipal, IsTeacher)]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["student", "class_assignment", "kind", "is_resolved", "detected_on"]
+
+    def get_queryset(self):
+        org = getattr(self.request, "organization", None)
+        if not org:
+            return AttendanceAlert.objects.none()
+        qs = AttendanceAlert.all_objects.filter(organization=org).select_related(
+            "student__membership__user", "class_assignment__class_ref"
+        )
+        if not IsAdminOrPrincipal().has_permission(self.request, self):
+            qs = qs.filter(class_assignment__form_teacher__membership__user=self.request.user)
+        return qs
+
+    @action(detail=True, methods=["post"])
+    def resolve(self, request, pk=None):
+        """Mark an alert as followed up."""
+        alert = self.get_object()
+        alert.is_resolved = True
+        alert.save(update_fields=["is_resolved"])
+        return Response(self.get_serializer(alert).data)
+
+
+class AttendanceAnalyticsViewSet(viewsets.ViewSet):
+    """
+    Attendance dashboards backed by the daily attendance cube.
+
+    `group_by` takes a comma-separated list of dimensions (class_ref,
+    class_assignment, academic_session, term, date, month, weekday, period);
+    the remaining query params filter the cube. Each result row carries
+    per-status counts, the total and the attendance rate.
+    """
+    permission_classes = [IsAdminOrPrincipal]
+
+    def list(self, request):
+        serializer = AttendanceAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        group_by = filters.pop("group_by")
+
+        return Response({
+            "group_by": group_by,
+            "results": aggregate_cube(request.organization, group_by, filters),
+        })
+
+
+class AttendanceSyncViewSet(viewsets.ViewSet):
+    """
+    Delta sync for offline marking clients.
+
+    GET  ?cursor=N            → sessions, records and deletions changed after N
+    POST {cursor, changes}    → apply queued edits (last writer wins on
+                                marked_at), then return changes after cursor
+
+    Responses carry the next `cursor` and `has_more`. Teachers only sync
+    classes they are form teacher of.
+    """
+    permission_classes = [any_of(IsAdminOrPrincipal, IsTeacher)]
+    throttle_classes = WRITE_THROTTLES
+
+    def _class_assignments(self, request, data):
+        """Classes this request may sync, or None for the whole organization."""
+        class_assignments = ClassSessionAssignment.all_objects.filter(organization=request.organization)
+        restricted = False
+        if not IsAdminOrPrincipal().has_permission(request, self):
+            class_assignments = class_assignments.filter(form_teacher__membership__user=request.user)
+            restricted = True
+        if data.get("class_assignment"):
+            class_assignments = class_assignments.filter(pk=data["class_assignment"])
+            restricted = True
+        return class_assignments if restricted else None
+
+    def list(self, request):
+        serializer = AttendanceSyncSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return Response(changes_since(
+            request.organization, data["cursor"], self._class_assignments(request, data)
+        ))
+
+    def create(self, request):
+        serializer = AttendanceSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        class_assignments = self._class_assignments(request, data)
+
+        result = apply_changes(
+            request.organization,
+            data["changes"],
+            marked_by=request.user,
+            class_assignments=class_assignments,
+        )
+        result.update(changes_since(request.organization, data["cursor"], class_assignments))
+        return Response(result)
@@ -0,0 +1,18 @@
+import pytest
+from django.core.cache import cache
+
+from core.ratelimit import get_limiter
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Every test starts with full rate-limit buckets."""
+    get_limiter().reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Primary keys are reused between tests, so cached lookups (tenants, summaries) must not be."""
+    cache.clear()
+    yield
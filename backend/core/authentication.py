@@ -1,6 +1,4 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from users.models import Membership, Organization
-from core.utils import set_current_organization
 
 # class OrganizationJWTAuthentication(JWTAuthentication):
 #     """
@@ -50,8 +48,8 @@ from core.utils import set_current_organization
 #         return user, token
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from users.models import Membership, Organization
-from core.utils import set_current_organization
+from core.logs import bind_log_context
+from core.tenancy import activate, resolve_organization
 
 class OrganizationJWTAuthentication(JWTAuthentication):
     """
@@ -67,20 +65,8 @@ class OrganizationJWTAuthentication(JWTAuthentication):
 
         user, token = result
 
-        # Clear first
-        request.organization = None
-        set_current_organization(None)
-
-        org_id = token.get("organization_id")
-
-        if org_id:
-            try:
-                org = Organization.objects.get(id=org_id)
-                if Membership.objects.filter(user=user, organization=org, is_active=True).exists():
-                    request.organization = org
-                    set_current_organization(org)
-            except Organization.DoesNotExist:
-                pass
+        # One (cached) query; None unless the user is still an active member
+        activate(request, resolve_organization(user, token.get("organization_id")))
 
+        bind_log_context(user_id=user.pk)
         return user, token
-
@@ -0,0 +1,180 @@
+# core/batch.py
+"""
+POST /api/batch/ runs several API calls in one round trip.
+
+    {"requests": [
+        {"id": "classes", "method": "GET", "path": "/api/academics/classes/"},
+        {"id": "weekly", "method": "GET", "path": "/api/attendance/weekly-summaries/?week_start=2025-01-06"},
+        {"method": "POST", "path": "/api/attendance/holidays/", "body": {...}}
+    ]}
+
+    -> {"responses": [{"id": "classes", "status": 200, "body": [...]}, ...]}
+
+The batch request is authenticated and its organization resolved once; each
+sub-request is dispatched straight to the view its path resolves to, as
+that user and organization, so the views' own permission checks, filters
+and serializers still apply. Responses come back in request order with
+their own status; one failing item does not fail the batch.
+
+Consecutive GET sub-requests are independent and run concurrently on a
+small thread pool (BATCH_MAX_WORKERS). Any other method is a barrier: it
+runs alone, after everything before it and before everything after it.
+
+The pool is shared by every batch in the process, so however many batches
+arrive at once, at most BATCH_MAX_WORKERS sub-requests hold a database
+connection on top of the request threads' own; core.db_pool sizes the web
+pool for exactly that.
+"""
+import contextvars
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from core.utils import set_current_organization
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = "/api/batch/"
+ALLOWED_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "BATCH_MAX_WORKERS", 4), thread_name_prefix="batch"
+        )
+    return _executor
+
+
+def _validate(items):
+    """Error message for a malformed `requests` list, or None."""
+    if not isinstance(items, list) or not items:
+        return "`requests` must be a non-empty list."
+    limit = getattr(settings, "BATCH_MAX_REQUESTS", 20)
+    if len(items) > limit:
+        return f"At most {limit} sub-requests per batch."
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            return f"requests[{index}] needs a `path`."
+        if str(item.get("method", "GET")).upper() not in ALLOWED_METHODS:
+            return f"requests[{index}] has an unsupported method."
+        path = urlsplit(item["path"]).path
+        if not path.startswith("/api/") or path.startswith(BATCH_PATH):
+            return f"requests[{index}] must target an /api/ endpoint other than the batch endpoint."
+    return None
+
+
+def _subrequest(parent, method, path, body):
+    """A WSGIRequest for `method path` carrying the batch request's headers."""
+    url = urlsplit(path)
+    payload = json.dumps(body).encode() if body is not None else b""
+    environ = {
+        key: value for key, value in parent.META.items()
+        if key.startswith("HTTP_") or key in ("SERVER_NAME", "SERVER_PORT", "REMOTE_ADDR", "wsgi.url_scheme")
+    }
+    environ.update({
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "SCRIPT_NAME": "",
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(payload)),
+        "wsgi.input": io.BytesIO(payload),
+    })
+    environ.setdefault("wsgi.url_scheme", parent.scheme)
+    return WSGIRequest(environ)
+
+
+def _body(response):
+    if isinstance(response, Response):
+        return response.data
+    if getattr(response, "streaming", False):
+        return None  # downloads are not inlined; call them directly
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(response.content or b"null")
+    return response.content.decode(response.charset or "utf-8", errors="replace")
+
+
+def _dispatch(parent, item):
+    method = str(item.get("method", "GET")).upper()
+    result = {"status": status.HTTP_404_NOT_FOUND, "body": {"detail": "Not found."}}
+    if "id" in item:
+        result["id"] = item["id"]
+
+    request = _subrequest(parent, method, item["path"], item.get("body"))
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return result
+
+    # Authenticated once for the whole batch.
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    request.organization = getattr(parent, "organization", None)
+    request.resolver_match = match
+
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", method, item["path"])
+        result.update(status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={"detail": "Server error."})
+        return result
+    result["status"] = response.status_code
+    result["body"] = _body(response)
+    return result
+
+
+def _dispatch_in_worker(parent, item, organization):
+    set_current_organization(organization)
+    close_old_connections()
+    try:
+        return _dispatch(parent, item)
+    finally:
+        close_old_connections()
+        set_current_organization(None)
+
+
+def _run_reads(parent, items):
+    """Run GET sub-requests concurrently (inline when there is only one)."""
+    if len(items) == 1 or getattr(settings, "BATCH_MAX_WORKERS", 4) <= 1:
+        return [_dispatch(parent, item) for item in items]
+    organization = getattr(parent, "organization", None)
+    futures = [
+        # Each task gets a copy of this request's context (log fields, DB routing).
+        _get_executor().submit(contextvars.copy_context().run, _dispatch_in_worker, parent, item, organization)
+        for item in items
+    ]
+    return [future.result() for future in futures]
+
+
+@api_view(["POST"])
+def batch(request):
+    items = request.data.get("requests") if isinstance(request.data, dict) else None
+    error = _validate(items)
+    if error:
+        return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    responses, reads = [], []
+    for item in items:
+        if str(item.get("method", "GET")).upper() == "GET":
+            reads.append(item)
+            continue
+        responses += _run_reads(request, reads) if reads else []
+        reads = []
+        responses.append(_dispatch(request, item))
+    if reads:
+        responses += _run_reads(request, reads)
+    return Response({"responses": responses})
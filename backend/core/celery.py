@@ -12,4 +12,15 @@ app = Celery('core')  # Make sure this line exists
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django apps.
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+# Sampled profiling of attendance tasks (no-op unless PROFILING_ENABLED).
+from core.profiling import connect_celery_signals  # noqa: E402
+
+connect_celery_signals()
+
+# Prefork children must not share the parent's database pools.
+from celery.signals import worker_process_init  # noqa: E402
+from core.db_pool import reset_pools_after_fork  # noqa: E402
+
+worker_process_init.connect(lambda **kwargs: reset_pools_after_fork(), weak=False)
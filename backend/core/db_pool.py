@@ -0,0 +1,113 @@
+# core/db_pool.py
+"""
+PostgreSQL connection settings for deployed processes.
+
+`postgres_database()` builds DATABASES["default"] for one process type
+(gunicorn "web", Celery "worker", Celery "beat") in one of three modes,
+chosen with DB_POOL_MODE:
+
+- "pool" (default): Django's psycopg 3 connection pool, sized per process
+  type. Connections are health-checked before they are handed out.
+- "pgbouncer": persistent connections to a pgbouncer running in transaction
+  mode, health-checked per request; server-side cursors are disabled since
+  they do not survive transaction pooling.
+- "persistent": plain persistent, health-checked connections.
+
+Pools belong to one process. Workers forked from a parent that already
+opened a pool call `reset_pools_after_fork()` (gunicorn post_fork,
+Celery worker_process_init) so they open their own.
+"""
+import os
+
+from django.db import connections
+
+POOL_MODES = ("pool", "pgbouncer", "persistent")
+
+
+def pool_sizes():
+    """
+    (min_size, max_size) per process type. A gunicorn worker needs one
+    connection per request thread plus one per /api/batch/ thread: batch
+    GETs run on one executor per process, at most BATCH_MAX_WORKERS at a
+    time, while their request thread keeps its own connection (core.batch).
+    A Celery prefork child runs one task at a time.
+    """
+    threads = int(os.getenv("GUNICORN_THREADS", 4))
+    batch_workers = int(os.getenv("BATCH_MAX_WORKERS", 4))
+    return {
+        "web": (2, threads + (batch_workers if batch_workers > 1 else 0)),
+        "worker": (1, 2),
+        "beat": (1, 1),
+    }
+
+
+def postgres_database(process_type="web", mode="pool"):
+    if mode not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, not {mode!r}")
+    sizes = pool_sizes()
+    min_size, max_size = sizes.get(process_type, sizes["web"])
+    database = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv("POSTGRES_DB"),
+        "USER": os.getenv("POSTGRES_USER"),
+        "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
+        "HOST": os.getenv("POSTGRES_HOST", "db"),
+        "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"application_name": f"school-{process_type}"},
+    }
+
+    if mode == "pool":
+        database["CONN_MAX_AGE"] = 0  # the pool owns connection lifetime
+        database["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", min_size)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", max_size)),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),  # wait for a free connection
+            "max_idle": 300,
+            "max_lifetime": 1800,
+        }
+    else:
+        database["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+        if mode == "pgbouncer":
+            database["HOST"] = os.getenv("PGBOUNCER_HOST", "pgbouncer")
+            database["PORT"] = os.getenv("PGBOUNCER_PORT", "6432")
+            database["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return database
+
+
+def _pools():
+    for connection in connections.all():
+        if connection.vendor == "postgresql" and connection.alias in connection._connection_pools:
+            yield connection.alias, connection._connection_pools[connection.alias]
+
+
+def reset_pools_after_fork():
+    """
+    Forget pools inherited from the parent process. They are not closed:
+    their sockets are shared with the parent, and closing them here would
+    end the parent's sessions. The child opens its own pool on first use.
+    """
+    for alias, _ in list(_pools()):
+        connections[alias]._connection_pools.pop(alias, None)
+
+
+def pool_stats():
+    """{alias: psycopg_pool statistics} for every pool this process has open."""
+    return {alias: pool.get_stats() for alias, pool in _pools()}
+
+
+def render_pool_metrics():
+    """Prometheus gauges for this process's pools (empty without pools)."""
+    stats = pool_stats()
+    if not stats:
+        return ""
+    lines = []
+    names = sorted({key for values in stats.values() for key in values})
+    for key in names:
+        metric = f"db_pool_{key}"
+        lines.append(f"# HELP {metric} psycopg connection pool statistic {key}.")
+        lines.append(f"# TYPE {metric} gauge")
+        for alias, values in sorted(stats.items()):
+            if key in values:
+                lines.append(f'{metric}{{alias="{alias}",pid="{os.getpid()}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,152 @@
+# core/db_routers.py
+"""
+Read-replica routing.
+
+`ReplicaRoutingMiddleware` lets safe-method requests (GET, HEAD, OPTIONS)
+read from one of DATABASE_REPLICAS; every write, and every read in an
+unsafe request, goes to the primary ("default"). Once a request writes, the
+rest of it reads from the primary too.
+
+Replicas lag, so a user who just wrote (a teacher marking attendance) is
+pinned to the primary for REPLICA_STICKY_SECONDS, per user and
+organization. Pins live in the Django cache (REPLICA_PIN_CACHE), which must
+be shared between workers in production. Outside requests (Celery, shell)
+everything uses the primary unless wrapped in `use_replica()`.
+"""
+import contextvars
+import hashlib
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import StreamingHttpResponse
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_state = contextvars.ContextVar("db_routing", default=None)
+
+
+class RoutingState:
+    def __init__(self, replica=None):
+        self.replica = replica  # alias reads go to, or None for the primary
+        self.wrote = False
+
+
+def replicas():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def _choose_replica():
+    aliases = replicas()
+    return random.choice(aliases) if aliases else None
+
+
+@contextmanager
+def use_replica():
+    """Send reads in the block to a replica (if any are configured)."""
+    token = _state.set(RoutingState(_choose_replica()))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Send every query in the block to the primary."""
+    token = _state.set(RoutingState())
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS  # reads inside a write transaction see its writes
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replicas hold the same data as the primary
+
+
+def sticky_key(request):
+    """
+    Cache key pinning this request's user/organization to the primary, or
+    None for anonymous requests. Read from the JWT (signature checked, no
+    database query) or, for session users, from the session cookie.
+    """
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+    from rest_framework_simplejwt.settings import api_settings
+
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if raw_token is not None:
+        try:
+            token = auth.get_validated_token(raw_token)
+        except InvalidToken:
+            return None
+        return f"replica-pin:{token.get('organization_id')}:{token.get(api_settings.USER_ID_CLAIM)}"
+
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return f"replica-pin:session:{hashlib.sha256(session_key.encode()).hexdigest()[:32]}"
+    return None
+
+
+def _pin_cache():
+    return caches[getattr(settings, "REPLICA_PIN_CACHE", "default")]
+
+
+def _stream_with_state(state, chunks):
+    """Re-enter the request's routing state for every streamed chunk."""
+    iterator = iter(chunks)
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = next(iterator, None)
+        finally:
+            _state.reset(token)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replicas():
+            return self.get_response(request)
+
+        key = sticky_key(request)
+        pinned = key is not None and _pin_cache().get(key) is not None
+        safe = request.method in SAFE_METHODS
+        state = RoutingState(_choose_replica() if safe and not pinned else None)
+
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if key is not None and (state.wrote or (not safe and response.status_code < 400)):
+            _pin_cache().set(key, 1, getattr(settings, "REPLICA_STICKY_SECONDS", 10))
+        if isinstance(response, StreamingHttpResponse):
+            response.streaming_content = _stream_with_state(state, response.streaming_content)
+        return response
@@ -0,0 +1,34 @@
+# core/locks.py
+"""
+Cross-process locks for short critical sections.
+
+On PostgreSQL `advisory_lock` takes a transaction-level advisory lock, so
+concurrent Celery workers touching the same key queue up instead of racing.
+Other backends have no advisory locks; there the block only runs in a
+transaction, and callers must keep their writes safe on their own (atomic
+upserts). SQLite serializes writers anyway.
+"""
+import hashlib
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+def lock_key(*parts):
+    """Stable signed 64-bit key for `parts`, as pg_advisory_xact_lock expects."""
+    digest = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@contextmanager
+def advisory_lock(*parts, using=DEFAULT_DB_ALIAS):
+    """
+    Run the block in a transaction holding the advisory lock for `parts`.
+    The lock is released when the outermost transaction commits or rolls back.
+    """
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [lock_key(*parts)])
+        yield
@@ -0,0 +1,170 @@
+# core/logs.py
+"""
+Structured, non-blocking logging.
+
+Every record is written as one JSON object per line. Records are handed to a
+`QueueLogHandler`, which only puts them on an in-memory queue; a
+`QueueListener` thread formats and writes them, so request threads never
+wait on stdout. Records carry the request id, organization id and user id of
+the request that logged them (see `RequestLogContextMiddleware`).
+
+DEBUG records are sampled: with LOG_DEBUG_SAMPLE_RATE = N only 1 request in
+N keeps its debug output, chosen by request id so a kept request logs all of
+its debug lines.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_context = contextvars.ContextVar("log_context", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields.
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "org_id", "user_id"}
+
+
+def bind_log_context(**values):
+    """Add values (request_id, org_id, user_id) to the current request's log context."""
+    context = _context.get()
+    if context is not None:
+        context.update(values)
+
+
+def get_log_context():
+    return _context.get() or {}
+
+
+class RequestLogContextFilter(logging.Filter):
+    """Stamps request_id / org_id / user_id on the record, on the logging thread."""
+
+    def filter(self, record):
+        context = get_log_context()
+        for key in ("request_id", "org_id", "user_id"):
+            if not hasattr(record, key):
+                setattr(record, key, context.get(key))
+        return True
+
+
+class DebugSampleFilter(logging.Filter):
+    """Keeps DEBUG records for 1 request in `rate` (1 = keep all)."""
+
+    def __init__(self, rate=1):
+        super().__init__()
+        self.rate = max(int(rate), 1)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate == 1:
+            return True
+        request_id = get_log_context().get("request_id")
+        if request_id is None:
+            return random.randrange(self.rate) == 0
+        return int(uuid.uuid5(uuid.NAMESPACE_OID, request_id).hex[:8], 16) % self.rate == 0
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "org_id": getattr(record, "org_id", None),
+            "user_id": getattr(record, "user_id", None),
+        }
+        payload.update(
+            (key, value) for key, value in vars(record).items() if key not in _RESERVED
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class QueueLogHandler(logging.handlers.QueueHandler):
+    """
+    Queues records for a listener thread that writes them to `stream`
+    (stdout by default) with this handler's formatter.
+
+    The listener is started lazily in each process, so workers forked from a
+    preloading master get their own thread.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.listener = None
+        self._pid = None
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve the message and traceback now (args may be mutated later)
+        # but leave the formatting to the listener thread.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass  # drop rather than block the request
+
+    def start(self):
+        self._pid = os.getpid()
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self._pid = None
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        if self.listener is not None and self._pid == os.getpid():
+            self.stop()
+            self.start()
+        self.target.flush()
+
+
+class RequestLogContextMiddleware:
+    """
+    Opens a log context per request with a request id (taken from the
+    X-Request-ID header or generated) and echoes the id on the response.
+    Authentication binds org_id and user_id once they are known.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        token = _context.set({"request_id": request_id, "org_id": None, "user_id": None})
+        try:
+            response = self.get_response(request)
+        finally:
+            _context.reset(token)
+        response[REQUEST_ID_HEADER] = request_id
+        return response
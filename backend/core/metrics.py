@@ -0,0 +1,257 @@
+# core/metrics.py
+"""
+Per-route request metrics in Prometheus text format.
+
+`RequestMetricsMiddleware` times every request and counts its database
+queries; the numbers land in cumulative histograms keyed by route pattern
+(never the raw path, so label cardinality stays bounded). By default each
+process keeps its own histograms in memory. With METRICS_BACKEND = "redis"
+all gunicorn workers add into one Redis hash, and any worker can render the
+combined view. Workers buffer their increments and send them in one
+pipeline every METRICS_FLUSH_SECONDS rather than once per request; if Redis
+cannot be reached the buffer is kept and the next attempt waits
+METRICS_REDIS_RETRY_SECONDS, so an outage delays metrics instead of failing
+requests.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Total request latency.", LATENCY_BUCKETS),
+    "http_request_db_seconds": ("Time spent in database queries per request.", LATENCY_BUCKETS),
+    "http_request_serialize_seconds": ("Time spent rendering the response body.", LATENCY_BUCKETS),
+    "http_request_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+}
+
+COUNTERS = {
+    "ratelimit_decisions_total": "Rate limiter decisions by scope, outcome and bucket store.",
+}
+
+REDIS_KEY = "metrics:http"
+
+logger = logging.getLogger(__name__)
+
+_REGEX_GROUP = re.compile(r"\(\?P<(\w+)>[^)]*\)")
+
+
+def route_label(resolver_match):
+    """
+    Route pattern of a resolved request, e.g. "api/attendance/alerts/<pk>/".
+    DRF router regexes are folded into the same `<name>` form.
+    """
+    if resolver_match is None or not resolver_match.route:
+        return "unmatched"
+    route = _REGEX_GROUP.sub(r"<\1>", resolver_match.route)
+    return route.replace("^", "").replace("$", "").replace("\\", "")
+
+
+def _bucket_for(value, buckets):
+    """Index of the first bucket `value` fits in (len(buckets) = +Inf)."""
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            return index
+    return len(buckets)
+
+
+class LocalMetricsStore:
+    """Histograms for this process only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(float)
+
+    def add(self, increments):
+        with self._lock:
+            for key, amount in increments.items():
+                self._counts[key] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+class RedisMetricsStore:
+    """Histograms shared by every worker through one Redis hash."""
+
+    def __init__(self, client=None):
+        self._client = client
+        self._lock = threading.Lock()
+        self._pending = defaultdict(float)  # increments not yet sent to Redis
+        self._last_flush = time.monotonic()
+        self._redis_down_until = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.StrictRedis(
+                host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0,
+                socket_timeout=0.5, socket_connect_timeout=0.5,
+            )
+        return self._client
+
+    def add(self, increments):
+        now = time.monotonic()
+        with self._lock:
+            for key, amount in increments.items():
+                self._pending[key] += amount
+            due = (
+                now - self._last_flush >= getattr(settings, "METRICS_FLUSH_SECONDS", 1)
+                and now >= self._redis_down_until
+            )
+        if due:
+            try:
+                self.flush()
+            except Exception as exc:
+                retry = getattr(settings, "METRICS_REDIS_RETRY_SECONDS", 5)
+                logger.warning("Metrics store unavailable (%s); buffering locally for %ss", exc, retry)
+                self._redis_down_until = time.monotonic() + retry
+
+    def flush(self):
+        """Send buffered increments in one pipeline; they are kept if Redis fails."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, amount in pending.items():
+                pipe.hincrbyfloat(REDIS_KEY, "|".join(key), amount)
+            pipe.execute()
+        except Exception:
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+            raise
+
+    def snapshot(self):
+        self.flush()
+        return {
+            tuple(field.decode().split("|")): float(value)
+            for field, value in self.client.hgetall(REDIS_KEY).items()
+        }
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._redis_down_until = 0.0
+        self.client.delete(REDIS_KEY)
+
+
+class MetricsRegistry:
+    def __init__(self, store):
+        self.store = store
+
+    def observe(self, route, method, status, values):
+        """
+        Record one request. `values` maps histogram name -> observed value.
+        Keys are (metric, route, method, status, series) tuples where series
+        is a bucket index, "sum" or "count".
+        """
+        increments = {}
+        labels = (route, method, str(status))
+        for name, value in values.items():
+            buckets = HISTOGRAMS[name][1]
+            increments[(name, *labels, str(_bucket_for(value, buckets)))] = 1
+            increments[(name, *labels, "sum")] = value
+            increments[(name, *labels, "count")] = 1
+        self.store.add(increments)
+
+    def increment(self, name, labels, amount=1):
+        """Add to counter `name` (one of COUNTERS) for `labels` ({name: value})."""
+        rendered = ",".join(f'{key}="{_escape(str(value))}"' for key, value in sorted(labels.items()))
+        self.store.add({(name, rendered): amount})
+
+    def render(self):
+        """Prometheus text exposition (version 0.0.4) of every histogram and counter."""
+        series = defaultdict(dict)
+        counters = defaultdict(dict)
+        for key, amount in self.store.snapshot().items():
+            if len(key) == 2:
+                counters[key[0]][key[1]] = amount
+                continue
+            name, route, method, status, part = key
+            series[(name, route, method, status)][part] = amount
+
+        lines = []
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, route, method, status), parts in sorted(series.items()):
+                if metric != name:
+                    continue
+                labels = f'route="{_escape(route)}",method="{method}",status="{status}"'
+                cumulative = 0
+                for index, bound in enumerate((*buckets, math.inf)):
+                    cumulative += parts.get(str(index), 0)
+                    le = "+Inf" if bound == math.inf else repr(float(bound))
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {_number(cumulative)}')
+                lines.append(f"{name}_sum{{{labels}}} {_number(parts.get('sum', 0))}")
+                lines.append(f"{name}_count{{{labels}}} {_number(parts.get('count', 0))}")
+        for name, help_text in COUNTERS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, amount in sorted(counters.get(name, {}).items()):
+                lines.append(f"{name}{{{labels}}} {_number(amount)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The process-wide registry, built from METRICS_BACKEND on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                backend = getattr(settings, "METRICS_BACKEND", "local")
+                store = RedisMetricsStore() if backend == "redis" else LocalMetricsStore()
+                _registry = MetricsRegistry(store)
+    return _registry
+
+
+def query_budget(route):
+    """Max queries a request to `route` should need before it is logged."""
+    budgets = getattr(settings, "METRICS_QUERY_BUDGETS", {})
+    return budgets.get(route, getattr(settings, "METRICS_QUERY_BUDGET", 50))
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that reports its render time to the metrics middleware."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            request = (renderer_context or {}).get("request")
+            if request is not None:
+                django_request = getattr(request, "_request", request)
+                django_request.serialize_time = (
+                    getattr(django_request, "serialize_time", 0.0) + time.perf_counter() - start
+                )
@@ -1,52 +1,79 @@
-from core.utils import (
-    set_current_organization, 
-    get_current_organization
-)
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core.metrics import get_registry, query_budget, route_label
+from core.tenancy import defer as defer_tenant
+
+logger = logging.getLogger(__name__)
 
 
 class OrganizationMiddleware:
+    """
+    Gives every request a lazily resolved tenant (see `core.tenancy`).
+    API requests get theirs again from OrganizationJWTAuthentication.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        defer_tenant(request)
+        return self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, DB query count, DB time and render time per request
+    into the route histograms of `core.metrics`, and logs requests that run
+    more queries than their route's budget. Goes first in MIDDLEWARE so the
+    latency covers the whole stack.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        print("\n=== [OrganizationMiddleware] Running ===")
-        set_current_organization(None)
-        request.organization = None
-
-        user = request.user
-        print(f"User in middleware: {user} (authenticated={getattr(user, 'is_authenticated', False)})")
-
-        if user and user.is_authenticated:
-            from users.models import Membership
-            membership = Membership.all_objects.filter(
-                user=user, 
-                is_active=True
-            ).first()
-            print(f"First active membership: {membership}")
-            if membership:
-                org = membership.organization
-                print(f"✅ Default org set to {org}")
-                set_current_organization(org)
-                request.organization = org
-
-        # Allow override via request header
-        org_id = request.headers.get("X-Organization-ID")
-        print(f"Header X-Organization-ID: {org_id}")
-        if org_id and user and user.is_authenticated:
+        if not getattr(settings, "METRICS_ENABLED", True):
+            return self.get_response(request)
+
+        db = {"queries": 0, "time": 0.0}
+
+        def count_query(execute, sql, params, many, context):
+            start = time.perf_counter()
             try:
-                from users.models import Organization, Membership
-                org = Organization.objects.get(id=org_id)
-                if Membership.all_objects.filter(user=user, organization=org).exists():
-                    print(f"✅ Overriding org to {org}")
-                    set_current_organization(org)
-                    request.organization = org
-                else:
-                    print(f"❌ User is not a member of {org}")
-            except Organization.DoesNotExist:
-                print(f"❌ Org with id={org_id} does not exist")
-
-        print(f"Final resolved org for request: {get_current_organization()} / {getattr(request, 'organization', None)}")
-        print("========================================\n")
-
-        response = self.get_response(request)
+                return execute(sql, params, many, context)
+            finally:
+                db["queries"] += 1
+                db["time"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            # Wrappers attach to this thread's connection handles, opened or not.
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        route = route_label(getattr(request, "resolver_match", None))
+        try:
+            get_registry().observe(route, request.method, response.status_code, {
+                "http_request_duration_seconds": duration,
+                "http_request_db_seconds": db["time"],
+                "http_request_serialize_seconds": getattr(request, "serialize_time", 0.0),
+                "http_request_db_queries": db["queries"],
+            })
+        except Exception:
+            # Metrics must never fail the request they measure.
+            logger.exception("Could not record metrics for %s %s", request.method, route)
+
+        budget = query_budget(route)
+        if db["queries"] > budget:
+            logger.warning(
+                "Query budget exceeded: %s %s ran %d queries (budget %d) in %.1f ms",
+                request.method, request.path, db["queries"], budget, duration * 1000,
+            )
         return response
@@ -0,0 +1,109 @@
+# core/pdf.py
+"""
+Minimal PDF writer.
+
+Just enough of PDF 1.4 for generated documents such as report cards:
+pages of text in the standard Helvetica fonts, lines and shaded boxes.
+Nothing is embedded and content streams are deflated, so a one-page
+document is a few kilobytes. Output carries no timestamps, so the same
+drawing calls always give the same bytes. Imports nothing from Django, so
+spawned worker processes can render without setting it up.
+"""
+import zlib
+
+A4 = (595.28, 841.89)  # points
+FONTS = (b"Helvetica", b"Helvetica-Bold")
+
+# Helvetica advance widths (1/1000 em) for printable ASCII; other characters use 556.
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+
+def text_width(text, size):
+    """Approximate width in points of `text` set in Helvetica at `size` (bold runs ~5% wider)."""
+    units = sum(
+        _HELVETICA_WIDTHS[ord(char) - 32] if 32 <= ord(char) < 127 else 556 for char in str(text)
+    )
+    return units * size / 1000
+
+
+def _string(text):
+    data = str(text).encode("cp1252", "replace")  # WinAnsiEncoding
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class PDFDocument:
+    """Drawing calls go to the current page; coordinates are points from the bottom left."""
+
+    def __init__(self, page_size=A4):
+        self.width, self.height = page_size
+        self._pages = []
+
+    def add_page(self):
+        self._pages.append([])
+
+    def _draw(self, operation):
+        if not self._pages:
+            self.add_page()
+        self._pages[-1].append(operation)
+
+    def text(self, x, y, text, size=10, bold=False, align="left"):
+        if align != "left":
+            width = text_width(text, size) * (1.05 if bold else 1)
+            x -= width if align == "right" else width / 2
+        self._draw(b"BT /F%d %g Tf %.2f %.2f Td %s Tj ET" % (2 if bold else 1, size, x, y, _string(text)))
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self._draw(b"%g w %.2f %.2f m %.2f %.2f l S" % (width, x1, y1, x2, y2))
+
+    def rect(self, x, y, width, height, fill=None, stroke=True):
+        """A box; `fill` is a grey level from 0 (black) to 1 (white)."""
+        operation = b"%.2f %.2f %.2f %.2f re" % (x, y, width, height)
+        if fill is not None:
+            self._draw(b"q %.2f g %s f Q" % (fill, operation))
+        if stroke:
+            self._draw(b"0.5 w %s S" % operation)
+
+    def render(self):
+        """The finished document as bytes."""
+        if not self._pages:
+            self.add_page()
+        page_count = len(self._pages)
+        # 1 catalog, 2 page tree, 3-4 fonts, then a page object and its content per page.
+        page_ids = [5 + 2 * index for index in range(page_count)]
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [%s] /Count %d >>"
+            % (b" ".join(b"%d 0 R" % page_id for page_id in page_ids), page_count),
+        ]
+        for font in FONTS:
+            objects.append(
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % font
+            )
+        for page_id, operations in zip(page_ids, self._pages):
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (self.width, self.height, page_id + 1)
+            )
+            stream = zlib.compress(b"\n".join(operations))
+            objects.append(
+                b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream)
+            )
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
@@ -0,0 +1,285 @@
+# core/profiling.py
+"""
+Opt-in sampling profiler for production requests and Celery tasks.
+
+A profiled unit of work gets a background thread that snapshots the worker
+thread's stack every PROFILING_INTERVAL seconds and counts identical stacks
+(the "collapsed" format flamegraph.pl and speedscope read). SQL executed
+meanwhile is captured too. Finished profiles are stored and can be listed
+and downloaded by staff through /api/profiles/. With PROFILING_BACKEND =
+"redis" every web and Celery worker writes to Redis (one key per profile,
+expiring after PROFILING_TTL_SECONDS, plus an index of the latest
+PROFILING_BUFFER_SIZE), so any worker can serve any profile; the "local"
+backend keeps a ring buffer per process.
+
+Requests are profiled 1 in PROFILING_SAMPLE_RATE, or on demand when they
+carry `X-Profile: <PROFILING_TOKEN>`. Nothing runs unless PROFILING_ENABLED.
+"""
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+PROFILE_HEADER = "X-Profile"
+MAX_STACK_DEPTH = 128
+REDIS_KEY_PREFIX = "profiling:profile:"
+REDIS_INDEX_KEY = "profiling:index"
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class ProfileBuffer:
+    """Last N profiles of this process, newest last."""
+
+    def __init__(self, size):
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=size)
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def all(self):
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((p for p in self._profiles if p["id"] == profile_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+class RedisProfileStore:
+    """Latest N profiles of every worker, one expiring Redis key each."""
+
+    def __init__(self, size, ttl, client=None):
+        self.size = size
+        self.ttl = ttl
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.StrictRedis(
+                host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0,
+                socket_timeout=0.5, socket_connect_timeout=0.5,
+            )
+        return self._client
+
+    def add(self, profile):
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(REDIS_KEY_PREFIX + profile["id"], json.dumps(profile), ex=self.ttl)
+        pipe.zadd(REDIS_INDEX_KEY, {profile["id"]: now})
+        pipe.zremrangebyscore(REDIS_INDEX_KEY, "-inf", now - self.ttl)
+        pipe.zremrangebyrank(REDIS_INDEX_KEY, 0, -self.size - 1)
+        pipe.execute()
+
+    def all(self):
+        ids = [item.decode() for item in self.client.zrange(REDIS_INDEX_KEY, 0, -1)]
+        if not ids:
+            return []
+        found = self.client.mget([REDIS_KEY_PREFIX + profile_id for profile_id in ids])
+        return [json.loads(item) for item in found if item is not None]
+
+    def get(self, profile_id):
+        found = self.client.get(REDIS_KEY_PREFIX + profile_id)
+        return None if found is None else json.loads(found)
+
+    def clear(self):
+        ids = [item.decode() for item in self.client.zrange(REDIS_INDEX_KEY, 0, -1)]
+        self.client.delete(REDIS_INDEX_KEY, *(REDIS_KEY_PREFIX + profile_id for profile_id in ids))
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """The profile store, built from PROFILING_BACKEND on first use."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                size = _setting("PROFILING_BUFFER_SIZE", 50)
+                if _setting("PROFILING_BACKEND", "local") == "redis":
+                    _buffer = RedisProfileStore(size, _setting("PROFILING_TTL_SECONDS", 86400))
+                else:
+                    _buffer = ProfileBuffer(size)
+    return _buffer
+
+
+def _save(profile_data):
+    try:
+        get_buffer().add(profile_data)
+    except Exception:
+        # Losing a profile must never fail the request or task it measured.
+        logger.exception("Could not store profile %s", profile_data["id"])
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_stack(frame):
+    """Root-first `a;b;c` form of the stack ending at `frame`."""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples one thread's stack on an interval from a daemon thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+@contextmanager
+def profile(kind, name):
+    """
+    Profile the enclosed block (run on the current thread) and store the
+    result (see `get_buffer`). Yields the profile dict, filled in on exit.
+    """
+    interval = _setting("PROFILING_INTERVAL", 0.005)
+    max_queries = _setting("PROFILING_MAX_QUERIES", 500)
+    result = {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "name": name,
+        "started_at": timezone.now().isoformat(),
+        "interval_ms": interval * 1000,
+    }
+    queries = []
+
+    def capture_sql(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(queries) < max_queries:
+                queries.append({"sql": sql, "duration_ms": round((time.perf_counter() - start) * 1000, 3)})
+
+    sampler = StackSampler(threading.get_ident(), interval)
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(capture_sql))
+            sampler.start()
+            try:
+                yield result
+            finally:
+                stacks = sampler.stop()
+                result.update(
+                    duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                    samples=sum(stacks.values()),
+                    stacks=dict(stacks),
+                    queries=queries,
+                )
+    finally:
+        _save(result)
+
+
+def collapsed(profile_data):
+    """Collapsed-stack text ("frame;frame;frame count" per line)."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(profile_data["stacks"].items()))
+
+
+def should_sample():
+    rate = _setting("PROFILING_SAMPLE_RATE", 0)
+    return bool(rate) and random.randrange(rate) == 0
+
+
+def requested_by_header(request):
+    token = _setting("PROFILING_TOKEN", "")
+    return bool(token) and request.headers.get(PROFILE_HEADER) == token
+
+
+class SamplingProfilerMiddleware:
+    """Profiles sampled or explicitly requested requests; see module docs."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _setting("PROFILING_ENABLED", False):
+            return self.get_response(request)
+        if not (requested_by_header(request) or should_sample()):
+            return self.get_response(request)
+
+        with profile("request", f"{request.method} {request.path}") as result:
+            response = self.get_response(request)
+            result["status"] = response.status_code
+        response["X-Profile-Id"] = result["id"]
+        return response
+
+
+# --- Celery -----------------------------------------------------------------
+
+_active_tasks = {}
+
+
+def _task_prerun(task_id=None, task=None, **kwargs):
+    prefixes = _setting("PROFILING_TASK_PREFIXES", ("attendance.",))
+    if not _setting("PROFILING_ENABLED", False) or not task.name.startswith(tuple(prefixes)):
+        return
+    if not should_sample():
+        return
+    context = profile("task", task.name)
+    context.__enter__()
+    _active_tasks[task_id] = context
+
+
+def _task_postrun(task_id=None, **kwargs):
+    context = _active_tasks.pop(task_id, None)
+    if context is not None:
+        context.__exit__(None, None, None)
+
+
+def connect_celery_signals():
+    """Profile sampled Celery tasks whose name starts with PROFILING_TASK_PREFIXES."""
+    from celery.signals import task_prerun, task_postrun
+
+    task_prerun.connect(_task_prerun, weak=False)
+    task_postrun.connect(_task_postrun, weak=False)
@@ -0,0 +1,186 @@
+# core/ratelimit.py
+"""
+Token-bucket rate limiting.
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per
+second; every request takes one and is refused while the bucket is empty,
+with the time until the next token as its Retry-After. Rules are written
+like DRF rates, "20/min" meaning a burst of 20 refilling at 20 per minute,
+and looked up per scope in RATELIMITS.
+
+With RATELIMIT_BACKEND = "redis" buckets are shared by every worker: one
+Lua script reads, refills, takes and writes a bucket atomically, using the
+Redis clock so workers with skewed clocks agree. If Redis cannot be reached
+the limiter falls back to per-process buckets for
+RATELIMIT_REDIS_RETRY_SECONDS before trying Redis again, so an outage
+loosens limits instead of failing requests.
+
+Decisions are counted per scope in `core.metrics` (ratelimit_decisions_total);
+a metrics failure is logged and never changes the decision.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from core.metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "sec": 1, "second": 1, "m": 60, "min": 60, "minute": 60,
+           "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+REDIS_KEY_PREFIX = "ratelimit:"
+
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+
+def parse_rule(rule):
+    """"20/min" -> (capacity 20, refill 20/60 tokens per second); None stays None."""
+    if not rule:
+        return None
+    count, _, period = rule.partition("/")
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period.strip().lower()]
+
+
+def get_rule(scope):
+    if not getattr(settings, "RATELIMIT_ENABLED", True):
+        return None
+    return parse_rule(getattr(settings, "RATELIMITS", {}).get(scope))
+
+
+def _refill(tokens, elapsed, capacity, rate):
+    return min(capacity, tokens + max(0.0, elapsed) * rate)
+
+
+class LocalBucketStore:
+    """Buckets for this process only, least recently used evicted first."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, monotonic timestamp)
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.pop(key, (capacity, now))
+            tokens = _refill(tokens, now - ts, capacity, rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBucketStore:
+    """Buckets shared by every worker, updated by one Lua script call each."""
+
+    def __init__(self, client=None):
+        self._client = client
+        self._script = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.StrictRedis(
+                host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0,
+                socket_timeout=0.1, socket_connect_timeout=0.1,
+            )
+        return self._client
+
+    def take(self, key, capacity, rate):
+        if self._script is None:
+            self._script = self.client.register_script(TOKEN_BUCKET_LUA)
+        allowed, wait = self._script(keys=[REDIS_KEY_PREFIX + key], args=[capacity, rate])
+        return bool(allowed), float(wait)
+
+
+class RateLimiter:
+    def __init__(self, store, fallback=None):
+        self.store = store
+        self.fallback = fallback or store
+        self._redis_down_until = 0.0
+
+    def reset(self):
+        """Forget this process's buckets (Redis buckets expire on their own)."""
+        self._redis_down_until = 0.0
+        for store in {self.store, self.fallback}:
+            if isinstance(store, LocalBucketStore):
+                store.reset()
+
+    def _store(self):
+        return self.fallback if time.monotonic() < self._redis_down_until else self.store
+
+    def take(self, scope, ident, capacity, rate):
+        """(allowed, seconds until a token is available) for bucket scope:ident."""
+        key = f"{scope}:{ident}"
+        store = self._store()
+        try:
+            allowed, wait = store.take(key, capacity, rate)
+        except Exception as exc:
+            if store is self.fallback:
+                raise
+            retry = getattr(settings, "RATELIMIT_REDIS_RETRY_SECONDS", 5)
+            logger.warning("Rate limit store unavailable (%s); using local buckets for %ss", exc, retry)
+            self._redis_down_until = time.monotonic() + retry
+            store = self.fallback
+            allowed, wait = store.take(key, capacity, rate)
+
+        try:
+            get_registry().increment("ratelimit_decisions_total", {
+                "scope": scope,
+                "decision": "allowed" if allowed else "throttled",
+                "store": "local" if isinstance(store, LocalBucketStore) else "redis",
+            })
+        except Exception:
+            logger.exception("Could not count rate limit decision for %s", scope)
+        return allowed, math.ceil(wait * 1000) / 1000
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """The process-wide limiter, built from RATELIMIT_BACKEND on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                local = LocalBucketStore(getattr(settings, "RATELIMIT_LOCAL_MAX_KEYS", 10000))
+                if getattr(settings, "RATELIMIT_BACKEND", "local") == "redis":
+                    _limiter = RateLimiter(RedisBucketStore(), fallback=local)
+                else:
+                    _limiter = RateLimiter(local)
+    return _limiter
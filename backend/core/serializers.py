@@ -0,0 +1,162 @@
+# core/serializers.py
+"""
+Sparse fieldsets and field expansion for read requests.
+
+    ?fields=id,student,status        only these fields
+    ?expand=student                  inline the related object instead of its pk
+    ?expand=class_subject.teacher    expansions nest with dots
+    ?fields=id,student.admission_number&expand=student
+
+A serializer opts in with `FlexFieldsMixin` and declares
+
+    expandable_fields  {field: serializer class or "app.serializers.Name"}
+    field_relations    {field: "relation__path" that field reads}
+
+and its viewset adds `FlexFieldsViewMixin`, which turns the same query
+params into `select_related` / `prefetch_related` on the queryset: a
+relation is only joined when a requested field reads it, and requested
+expansions are fetched up front instead of once per row.
+
+Only safe (GET/HEAD/OPTIONS) requests are reshaped; writes always see the
+full serializer.
+"""
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+_UNSET = object()
+
+
+def parse_list_param(value):
+    """'a, b,a.c' -> ['a', 'b', 'a.c'] (empty input -> None: no restriction)."""
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()] or None
+
+
+def requested_fields(request):
+    """(fields, expand) asked for by `request`; (None, []) for writes."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, []
+    params = request.query_params
+    return parse_list_param(params.get("fields")), parse_list_param(params.get("expand")) or []
+
+
+def _split(paths):
+    """['a', 'b.c', 'b.d'] -> ({'a', 'b'}, {'b': ['c', 'd']})."""
+    top, nested = set(), {}
+    for path in paths or ():
+        head, _, rest = path.partition(".")
+        top.add(head)
+        if rest:
+            nested.setdefault(head, []).append(rest)
+    return top, nested
+
+
+def _is_many(model, path):
+    """Whether following `path` from `model` can yield several rows."""
+    for name in path.split("__"):
+        field = model._meta.get_field(name)
+        if field.many_to_many or field.one_to_many:
+            return True
+        model = field.related_model
+    return False
+
+
+class FlexFieldsMixin:
+    """Serializer side: drop unrequested fields and build expansions."""
+
+    expandable_fields = {}
+    field_relations = {}
+
+    def __init__(self, *args, fields=_UNSET, expand=_UNSET, **kwargs):
+        self._requested = (fields, expand)
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def get_expandable(cls, name):
+        serializer_class = cls.expandable_fields[name]
+        if isinstance(serializer_class, str):
+            serializer_class = import_string(serializer_class)
+        return serializer_class
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_requested(self):
+        fields, expand = self._requested
+        if fields is _UNSET and expand is _UNSET:
+            if not self._is_top_level():
+                return None, []
+            return requested_fields(self.context.get("request"))
+        return (None if fields is _UNSET else fields), ([] if expand is _UNSET else expand or [])
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested, expand = self.get_requested()
+        keep, nested_fields = _split(requested)
+        expand_top, nested_expand = _split(expand)
+
+        if requested is not None:
+            for name in set(fields) - keep:
+                fields.pop(name)
+
+        model = getattr(getattr(self, "Meta", None), "model", None)
+        for name in expand_top & set(self.expandable_fields):
+            if requested is not None and name not in keep:
+                continue
+            serializer_class = self.get_expandable(name)
+            fields[name] = serializer_class(
+                many=model is not None and _is_many(model, name),
+                read_only=True,
+                fields=nested_fields.get(name),
+                expand=nested_expand.get(name, []),
+            )
+        return fields
+
+    @classmethod
+    def related_paths(cls, fields=None, expand=()):
+        """Relation paths the output for (fields, expand) will read."""
+        keep, nested_fields = _split(fields)
+        expand_top, nested_expand = _split(expand)
+
+        paths = [
+            path for name, path in cls.field_relations.items()
+            if fields is None or name in keep
+        ]
+        for name in expand_top & set(cls.expandable_fields):
+            if fields is not None and name not in keep:
+                continue
+            paths.append(name)
+            serializer_class = cls.get_expandable(name)
+            if issubclass(serializer_class, FlexFieldsMixin):
+                paths.extend(
+                    f"{name}__{path}"
+                    for path in serializer_class.related_paths(nested_fields.get(name), nested_expand.get(name))
+                )
+        return paths
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=()):
+        """Join or prefetch exactly the relations (fields, expand) need."""
+        select, prefetch = [], []
+        for path in dict.fromkeys(cls.related_paths(fields, expand)):
+            (prefetch if _is_many(queryset.model, path) else select).append(path)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class FlexFieldsViewMixin:
+    """Viewset side: shape the queryset for the fields the request asked for."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, FlexFieldsMixin):
+            fields, expand = requested_fields(self.request)
+            queryset = serializer_class.optimize_queryset(queryset, fields, expand)
+        return queryset
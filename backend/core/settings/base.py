@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +49,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.logs.RequestLogContextMiddleware",
+    "core.middleware.RequestMetricsMiddleware",
+    "core.profiling.SamplingProfilerMiddleware",
+    "core.db_routers.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -56,8 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "users.middleware.TenantMiddleware",
-    # "core.middleware.OrganizationMiddleware",
+    "core.middleware.OrganizationMiddleware",
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -90,6 +95,38 @@ DATABASES = {
     }
 }
 
+# Read replicas (core.db_routers). Set DB_REPLICA_NAME (and DB_REPLICA_HOST
+# for PostgreSQL) to add one; locally a second SQLite file works.
+DATABASE_REPLICAS = []
+if os.getenv("DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("DB_REPLICA_NAME"),
+        "HOST": os.getenv("DB_REPLICA_HOST", DATABASES["default"].get("HOST", "")),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS = ["replica"]
+
+DATABASE_ROUTERS = ["core.db_routers.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = 10  # keep a user on the primary this long after a write
+REPLICA_PIN_CACHE = "default"
+
+
+# Password hashing. PASSWORD_HASHER picks the hasher new hashes use; every
+# other entry still verifies, and a user's hash is upgraded to the preferred
+# one on their next login. argon2 and bcrypt need argon2-cffi / bcrypt.
+_PASSWORD_HASHERS = {
+    "pbkdf2": "users.hashers.TunablePBKDF2PasswordHasher",
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "bcrypt": "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "pbkdf2_sha1": "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+}
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", 0)) or None  # None: Django's default
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -171,4 +208,136 @@ CELERY_RESULT_BACKEND = "redis://redis:6379/0"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
-CELERY_TIMEZONE = "Africa/Lagos"
\ No newline at end of file
+CELERY_TIMEZONE = "Africa/Lagos"
+
+CELERY_BEAT_SCHEDULE = {
+    "detect-chronic-absence": {
+        "task": "attendance.tasks.detect_chronic_absence_task",
+        "schedule": crontab(hour=1, minute=0),
+    },
+    "snapshot-fee-balances": {
+        "task": "payments.tasks.snapshot_balances_task",
+        "schedule": crontab(hour=2, minute=0),
+    },
+}
+
+# Chronic-absence alerts: under MIN_RATE % over the last WINDOW_DAYS school
+# days, or CONSECUTIVE_ABSENCES school days absent in a row.
+ATTENDANCE_ALERT_WINDOW_DAYS = 10
+ATTENDANCE_ALERT_MIN_RATE = 80
+ATTENDANCE_ALERT_CONSECUTIVE_ABSENCES = 3
+
+# Request metrics (/metrics). "redis" shares histograms across gunicorn workers;
+# each worker flushes its buffered counts every METRICS_FLUSH_SECONDS and keeps
+# buffering for METRICS_REDIS_RETRY_SECONDS after Redis fails. Scrapers send
+# METRICS_TOKEN as a bearer token; without one only staff users can read /metrics.
+METRICS_ENABLED = True
+METRICS_BACKEND = os.getenv("METRICS_BACKEND", "local")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_FLUSH_SECONDS = 1
+METRICS_REDIS_RETRY_SECONDS = 5
+METRICS_QUERY_BUDGET = 50
+METRICS_QUERY_BUDGETS = {}  # route pattern -> budget, e.g. {"api/attendance/sync/": 30}
+
+# Token-bucket rate limits (core.ratelimit / core.throttling): scope ->
+# "burst/period", refilling at that rate. "redis" shares buckets between
+# workers and falls back to per-process buckets while Redis is down.
+RATELIMIT_ENABLED = True
+RATELIMIT_BACKEND = os.getenv("RATELIMIT_BACKEND", "local")
+RATELIMIT_REDIS_RETRY_SECONDS = 5
+RATELIMITS = {
+    "login_ip": "30/min",
+    "login_identifier": "10/min",
+    "register_ip": "20/hour",
+    "write_user": "120/min",
+    "write_org": "3000/min",
+}
+
+# Sampling profiler (/api/profiles/, staff only). Profiles 1 in SAMPLE_RATE
+# requests and attendance tasks (0 = never), plus requests sending
+# `X-Profile: <PROFILING_TOKEN>`. "redis" stores profiles where every web and
+# Celery worker can read them, each kept for PROFILING_TTL_SECONDS.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "") == "1"
+PROFILING_BACKEND = os.getenv("PROFILING_BACKEND", "local")
+PROFILING_TTL_SECONDS = 86400
+PROFILING_SAMPLE_RATE = int(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL = 0.005  # seconds between stack samples
+PROFILING_BUFFER_SIZE = 50
+PROFILING_MAX_QUERIES = 500
+PROFILING_TASK_PREFIXES = ("attendance.",)
+
+# Logging: JSON lines on stdout, written by a background thread (core.logs).
+# DEBUG output is kept for 1 request in LOG_DEBUG_SAMPLE_RATE.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_DEBUG_SAMPLE_RATE = int(os.getenv("LOG_DEBUG_SAMPLE_RATE", 100))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "request_context": {"()": "core.logs.RequestLogContextFilter"},
+        "debug_sample": {"()": "core.logs.DebugSampleFilter", "rate": LOG_DEBUG_SAMPLE_RATE},
+    },
+    "formatters": {
+        "json": {"()": "core.logs.JSONFormatter"},
+    },
+    "handlers": {
+        "queue": {
+            "class": "core.logs.QueueLogHandler",
+            "formatter": "json",
+            "filters": ["request_context", "debug_sample"],
+        },
+    },
+    "root": {"handlers": ["queue"], "level": LOG_LEVEL},
+    "loggers": {
+        "django": {"handlers": ["queue"], "level": "INFO", "propagate": False},
+        "django.db.backends": {"level": "INFO"},
+    },
+}
+
+# Keep Celery from replacing the handlers above in workers.
+CELERY_WORKER_HIJACK_ROOT_LOGGER = False
+
+# Health probes (health.views). Readiness results are cached per process;
+# every probe finishes within HEALTH_TIME_BUDGET seconds.
+HEALTH_CACHE_SECONDS = 5
+HEALTH_TIME_BUDGET = 2.0
+HEALTH_CELERY_QUEUES = ("celery",)
+HEALTH_QUEUE_WARN_DEPTH = 1000  # deep mode reports "degraded" above this
+
+# Attendance summary endpoints: server-side response cache lifetime. Entries
+# are keyed by the summary version, so this only bounds memory, not staleness.
+SUMMARY_CACHE_SECONDS = 300
+
+# /api/batch/ (core.batch): sub-requests per call, and threads that run a
+# batch's GET sub-requests concurrently (1 runs them in the request thread).
+# The threads are shared by the whole process and each holds a database
+# connection, so the web pool is sized GUNICORN_THREADS + BATCH_MAX_WORKERS.
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", 4))
+
+# Term results (grades.engine): grade bands as (grade, lowest total).
+GRADE_SCALE = (("A", 70), ("B", 60), ("C", 50), ("D", 45), ("E", 40), ("F", 0))
+
+# Report card batches (grades.report_cards): processes rendering PDFs
+# (None = one per CPU). Celery prefork children cannot start processes, so
+# batches built by the worker render in the task's own process.
+REPORT_CARD_WORKERS = None
+
+# Broadsheets (grades.caching): response cache lifetime. Entries are keyed by
+# the gradebook version, so this only bounds memory, not staleness.
+BROADSHEET_CACHE_SECONDS = 300
+
+# Bulk invoicing (payments.invoicing): Celery tasks a run is split over
+# (students are sharded by id), and students per transaction within a shard.
+INVOICE_SHARDS = 4
+INVOICE_CHUNK_SIZE = 500
+
+# Bulk onboarding (users.onboarding): processes hashing new passwords
+# (None = one per CPU).
+ONBOARDING_HASH_WORKERS = None
+# Rows accepted by one upload to the onboarding endpoint, which hashes them
+# inside the request; keeps an import well inside GUNICORN_TIMEOUT. Larger
+# files go through `manage.py onboard_users`.
+ONBOARDING_MAX_ROWS = 250
@@ -1,3 +1,7 @@
+from copy import deepcopy
+
+from core.db_pool import postgres_database
+
 from .base import *
 
 # REST_FRAMEWORK = {
@@ -16,7 +20,32 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.metrics.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
+# Share rate-limit buckets between workers.
+RATELIMIT_BACKEND = os.getenv("RATELIMIT_BACKEND", "redis")
+
+# Store profiles where every web and Celery worker can read them.
+PROFILING_BACKEND = os.getenv("PROFILING_BACKEND", "redis")
+
 # Attendance recomputation mode
-ATTENDANCE_ASYNC_UPDATES = True
\ No newline at end of file
+ATTENDANCE_ASYNC_UPDATES = True
+
+# PostgreSQL with pooled, health-checked connections (see core.db_pool).
+# PROCESS_TYPE (web / worker / beat) picks the pool size, DB_POOL_MODE
+# picks pool / pgbouncer / persistent.
+PROCESS_TYPE = os.getenv("PROCESS_TYPE", "web")
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "pool")
+
+if os.getenv("POSTGRES_DB"):
+    DATABASES["default"] = postgres_database(PROCESS_TYPE, DB_POOL_MODE)
+    if "replica" in DATABASES:
+        DATABASES["replica"] = {
+            **deepcopy(DATABASES["default"]),
+            "HOST": os.getenv("DB_REPLICA_HOST", DATABASES["default"]["HOST"]),
+            "TEST": {"MIRROR": "default"},
+        }
@@ -0,0 +1,105 @@
+# core/tenancy.py
+"""
+Tenant resolution: which organization a request acts for.
+
+Every entry point asks `resolve_organization`. OrganizationJWTAuthentication
+passes the token's organization_id. OrganizationMiddleware handles
+session-authenticated requests (the admin) and passes the
+X-Organization-ID header, falling back to the user's first active
+membership. Either way it is one indexed query, an active Membership joined
+to its Organization. The answer is an authorization decision, so it is not
+cached: a membership deactivated by any process, or by a bulk update that
+sends no signals, stops working on the very next request.
+
+`activate` publishes the result as `request.organization`,
+`request.tenant`, the thread's current organization and the log context.
+The middleware defers the work until something reads one of those, so
+anonymous requests, health probes and API requests, whose tenant comes
+from the token, never run it.
+"""
+import functools
+import logging
+
+from django.utils.functional import SimpleLazyObject
+
+from core.logs import bind_log_context
+from core.utils import defer_current_organization, set_current_organization
+
+logger = logging.getLogger(__name__)
+
+ORGANIZATION_HEADER = "X-Organization-ID"
+
+
+def _organization_id(value):
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return False
+
+
+def resolve_organization(user, organization_id=None):
+    """
+    The organization `user` acts for: `organization_id` if they are an
+    active member of it, else (with no id given) their first active
+    membership's organization. None if neither applies.
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    organization_id = _organization_id(organization_id)
+    if organization_id is False:
+        return None
+
+    from users.models import Membership
+    memberships = Membership.all_objects.select_related("organization").filter(user_id=user.pk, is_active=True)
+    if organization_id is not None:
+        memberships = memberships.filter(organization_id=organization_id)
+    membership = memberships.order_by("pk").first()
+    return membership.organization if membership else None
+
+
+def activate(request, organization):
+    """Make `organization` the tenant of `request` and of the current thread."""
+    targets = [request]
+    inner = getattr(request, "_request", None)  # a DRF Request wraps the HttpRequest
+    if inner is not None:
+        targets.append(inner)
+    for target in targets:
+        target.organization = organization
+        target.tenant = organization
+    set_current_organization(organization)
+    bind_log_context(org_id=getattr(organization, "id", None))
+    return organization
+
+
+def _resolve_from_header(request):
+    user = request.user
+    requested = request.headers.get(ORGANIZATION_HEADER)
+    if requested:
+        organization = resolve_organization(user, requested)
+        if organization is not None:
+            return organization
+        logger.warning("User %s is not an active member of organization %s", user.pk, requested)
+    return resolve_organization(user)
+
+
+def defer(request):
+    """
+    Install a lazy tenant on `request`: nothing is queried until
+    `request.organization`, `request.tenant` or the current organization
+    is first read. Requests without an authenticated user get None outright.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return activate(request, None)
+
+    @functools.cache
+    def resolve():
+        organization = _resolve_from_header(request)
+        bind_log_context(org_id=getattr(organization, "id", None))
+        return organization
+
+    request.organization = request.tenant = SimpleLazyObject(resolve)
+    defer_current_organization(resolve)
+    bind_log_context(user_id=user.pk)
@@ -0,0 +1,109 @@
+# core/throttling.py
+"""
+DRF throttles backed by the token buckets in `core.ratelimit`.
+
+Each class limits one scope (a key of RATELIMITS) per IP address, user,
+organization or submitted login identifier. A refused request gets DRF's
+429 with a Retry-After header. Scopes missing from RATELIMITS are not
+limited.
+
+The IP address is REMOTE_ADDR. X-Forwarded-For is only read when
+REST_FRAMEWORK["NUM_PROXIES"] says how many trusted proxies append to it;
+otherwise any client could pick its own bucket by sending the header.
+"""
+import hashlib
+from collections.abc import Mapping
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from core.ratelimit import get_limiter, get_rule
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    writes_only = False  # leave GET/HEAD/OPTIONS alone
+
+    def get_ident_key(self, request, view):
+        """What the bucket is per; None skips the throttle for this request."""
+        raise NotImplementedError
+
+    def get_ident(self, request):
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get("REMOTE_ADDR")
+        return super().get_ident(request)
+
+    def allow_request(self, request, view):
+        self._wait = None
+        if self.writes_only and request.method in SAFE_METHODS:
+            return True
+        rule = get_rule(self.scope)
+        if rule is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        allowed, wait = get_limiter().take(self.scope, ident, *rule)
+        self._wait = None if allowed else wait
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request, view):
+        return f"ip:{self.get_ident(request)}"
+
+
+class UserThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request, view):
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return f"ip:{self.get_ident(request)}"
+        return f"user:{user.pk}"
+
+
+class OrganizationThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request, view):
+        organization = getattr(request, "organization", None)
+        return f"org:{organization.pk}" if organization is not None else None
+
+
+class LoginIdentifierThrottle(TokenBucketThrottle):
+    """Per account being logged into, whichever IPs the attempts come from."""
+
+    def get_ident_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None  # not a login form; the serializer rejects it
+        identifier = str(request.data.get("username") or "").strip().lower()
+        if not identifier:
+            return None
+        return "login:" + hashlib.sha256(identifier.encode()).hexdigest()[:32]
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = "login_ip"
+
+
+class LoginAccountThrottle(LoginIdentifierThrottle):
+    scope = "login_identifier"
+
+
+class RegistrationIPThrottle(IPThrottle):
+    scope = "register_ip"
+
+
+class WriteUserThrottle(UserThrottle):
+    scope = "write_user"
+    writes_only = True
+
+
+class WriteOrganizationThrottle(OrganizationThrottle):
+    scope = "write_org"
+    writes_only = True
+
+
+AUTH_THROTTLES = [LoginIPThrottle, LoginAccountThrottle]
+WRITE_THROTTLES = [WriteUserThrottle, WriteOrganizationThrottle]
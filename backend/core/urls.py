@@ -2,7 +2,9 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from health.views import health_check
+from health.views import liveness, readiness
+from core.batch import batch
+from core.views import metrics, profile_list, profile_detail
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,7 +14,13 @@ urlpatterns = [
     path("api/", include("students.urls")),
     path("api/academics/", include("academics.urls")),
     path("api/attendance/", include("attendance.urls")),
-    path("health/", health_check),
+    path("api/grades/", include("grades.urls")),
+    path("health/", liveness),
+    path("health/ready/", readiness),
+    path("metrics", metrics),
+    path("api/batch/", batch),
+    path("api/profiles/", profile_list),
+    path("api/profiles/<str:profile_id>/", profile_detail),
 ]
 
 if settings.DEBUG:
@@ -5,6 +5,16 @@ _user_context = local()
 
 def set_current_organization(org):
     _user_context.organization = org
+    _user_context.resolver = None
+
+def defer_current_organization(resolver):
+    """Let `resolver()` decide the current organization the first time it is asked for."""
+    _user_context.organization = None
+    _user_context.resolver = resolver
 
 def get_current_organization():
+    resolver = getattr(_user_context, "resolver", None)
+    if resolver is not None:
+        _user_context.resolver = None
+        _user_context.organization = resolver()
     return getattr(_user_context, "organization", None)
@@ -0,0 +1,61 @@
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from core.db_pool import render_pool_metrics
+from core.metrics import get_registry
+from core.profiling import collapsed, get_buffer
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint. Scrapers send METRICS_TOKEN as
+    `Authorization: Bearer <token>`; without a token configured only
+    logged-in staff can read it.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            return HttpResponseForbidden("Invalid metrics token.")
+    elif not request.user.is_staff:
+        return HttpResponseForbidden("Set METRICS_TOKEN to scrape metrics.")
+    try:
+        body = get_registry().render()
+    except Exception:
+        logger.exception("Could not read request metrics")
+        return HttpResponse("Metrics store unavailable.", status=503, content_type=PROMETHEUS_CONTENT_TYPE)
+    return HttpResponse(body + render_pool_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Stored profiles of requests and tasks, newest first (without stacks)."""
+    summaries = [
+        {key: value for key, value in item.items() if key not in ("stacks", "queries")}
+        | {"query_count": len(item["queries"])}
+        for item in reversed(get_buffer().all())
+    ]
+    return Response(summaries)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_detail(request, profile_id):
+    """One profile with its stacks and SQL; `?output=collapsed` for flamegraph input."""
+    found = get_buffer().get(profile_id)
+    if found is None:
+        return Response({"detail": "Profile not found."}, status=404)
+    if request.query_params.get("output") == "collapsed":
+        response = HttpResponse(collapsed(found), content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="profile-{profile_id}.collapsed"'
+        return response
+    return Response(found)
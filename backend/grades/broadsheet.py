@@ -0,0 +1,134 @@
+# grades/broadsheet.py
+"""
+Class broadsheets.
+
+A broadsheet lays every student of a class against every subject and
+assessment component for a term. It is returned columnar rather than as
+nested objects: parallel arrays describe the students, subjects and
+components, and the marks are one flat row-major array of shape
+(students, subjects, components), so
+
+    scores[(s * len(subjects) + j) * len(components) + c]
+
+is student s's mark for component c of subject j (null when blank). The
+computed subject results are flat (students, subjects) arrays indexed the
+same way, and term results are one entry per student. Everything is read
+with `values_list` in six queries, whatever the size of the class.
+"""
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from academics.models import ClassSubject
+from users.models import StudentProfile
+from .models import AssessmentComponent, Score, SubjectResult, TermResult
+
+
+def _float(value):
+    return None if value is None else float(value)
+
+
+def build_broadsheet(school_class, term):
+    """The columnar broadsheet of `school_class` for `term` (JSON-safe)."""
+    scope = {"organization_id": school_class.organization_id, "term": term}
+
+    subjects = list(
+        ClassSubject.all_objects.filter(school_class=school_class)
+        .order_by("subject__name", "id")
+        .values_list("id", "subject__name", "subject__code")
+    )
+    subject_index = {pk: index for index, (pk, _, _) in enumerate(subjects)}
+    components = list(
+        AssessmentComponent.all_objects.filter(**scope).values_list("id", "name", "weight", "max_score")
+    )
+    component_index = {pk: index for index, (pk, _, _, _) in enumerate(components)}
+
+    scores = list(
+        Score.all_objects.filter(class_subject_id__in=list(subject_index), **scope)
+        .annotate(mark=Cast("value", FloatField()))
+        .values_list("student_id", "class_subject_id", "component_id", "mark")
+    )
+    subject_results = list(
+        SubjectResult.all_objects.filter(class_subject_id__in=list(subject_index), **scope)
+        .values_list("student_id", "class_subject_id", "total", "grade", "position")
+    )
+    term_results = {
+        student_id: (average, grade, position)
+        for student_id, average, grade, position in TermResult.all_objects.filter(
+            school_class=school_class, **scope
+        ).values_list("student_id", "average", "grade", "position")
+    }
+
+    student_ids = {row[0] for row in scores} | {row[0] for row in subject_results} | set(term_results)
+    students = list(
+        StudentProfile.all_objects.filter(pk__in=student_ids)
+        .order_by("membership__user__last_name", "membership__user__first_name", "id")
+        .values_list(
+            "id", "admission_number", "membership__user__first_name", "membership__user__last_name"
+        )
+    )
+    student_index = {pk: index for index, (pk, _, _, _) in enumerate(students)}
+
+    width = len(subjects) * len(components)
+    marks = [None] * (len(students) * width)
+    for student_id, class_subject_id, component_id, mark in scores:
+        if component_id in component_index:
+            offset = student_index[student_id] * width + subject_index[class_subject_id] * len(components)
+            marks[offset + component_index[component_id]] = mark
+
+    cells = len(students) * len(subjects)
+    totals, grades, positions = [None] * cells, [None] * cells, [None] * cells
+    for student_id, class_subject_id, total, grade, position in subject_results:
+        cell = student_index[student_id] * len(subjects) + subject_index[class_subject_id]
+        totals[cell], grades[cell], positions[cell] = float(total), grade, position
+
+    results = [term_results.get(pk, (None, None, None)) for pk, _, _, _ in students]
+    return {
+        "school_class": school_class.pk,
+        "term": term.pk,
+        "shape": [len(students), len(subjects), len(components)],
+        "students": {
+            "id": [pk for pk, _, _, _ in students],
+            "admission_number": [number for _, number, _, _ in students],
+            "name": [f"{first} {last}".strip() for _, _, first, last in students],
+        },
+        "subjects": {
+            "id": [pk for pk, _, _ in subjects],
+            "name": [name for _, name, _ in subjects],
+            "code": [code for _, _, code in subjects],
+        },
+        "components": {
+            "id": [pk for pk, _, _, _ in components],
+            "name": [name for _, name, _, _ in components],
+            "weight": [float(weight) for _, _, weight, _ in components],
+            "max_score": [float(max_score) for _, _, _, max_score in components],
+        },
+        "scores": marks,
+        "subject_results": {"total": totals, "grade": grades, "position": positions},
+        "term_results": {
+            "average": [_float(average) for average, _, _ in results],
+            "grade": [grade for _, grade, _ in results],
+            "position": [position for _, _, position in results],
+        },
+    }
+
+
+def broadsheet_rows(sheet):
+    """Header then one row per student: every mark, subject total, grade and position, then the term result."""
+    subjects, components = sheet["subjects"]["name"], sheet["components"]["name"]
+    header = ["Admission No.", "Student"]
+    for subject in subjects:
+        header += [f"{subject} {component}" for component in components]
+        header += [f"{subject} Total", f"{subject} Grade", f"{subject} Position"]
+    yield header + ["Average", "Grade", "Position"]
+
+    students = sheet["students"]
+    results, term_results = sheet["subject_results"], sheet["term_results"]
+    width = len(components)
+    for s, name in enumerate(students["name"]):
+        row = [students["admission_number"][s] or "", name]
+        for j in range(len(subjects)):
+            cell = s * len(subjects) + j
+            row += sheet["scores"][cell * width:(cell + 1) * width]
+            row += [results["total"][cell], results["grade"][cell], results["position"][cell]]
+        row += [term_results["average"][s], term_results["grade"][s], term_results["position"][s]]
+        yield ["" if value is None else value for value in row]
@@ -0,0 +1,62 @@
+# grades/caching.py
+"""
+Gradebook versions.
+
+A class's broadsheet for a term is fully described by its GradebookVersion:
+the version moves on (once the transaction commits) whenever one of its
+scores is saved or deleted, when the term's assessment components change
+and when grades.engine rewrites its results. The broadsheet endpoint keys
+its ETag and response cache on (organization, class, term, version), so a
+matching If-None-Match is answered 304 with one query and a cache hit
+skips building the payload. Old entries are never read again once the
+version moves on and simply expire.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import GradebookVersion
+
+
+def bump_gradebook_version(organization_id, term_id, school_class_ids):
+    """Move the gradebooks of `school_class_ids` for a term to a new version once the transaction commits."""
+    school_class_ids = list(school_class_ids)
+    if not school_class_ids:
+        return
+
+    def bump():
+        GradebookVersion.all_objects.bulk_create(
+            [
+                GradebookVersion(organization_id=organization_id, school_class_id=pk, term_id=term_id)
+                for pk in school_class_ids
+            ],
+            ignore_conflicts=True,
+        )
+        GradebookVersion.all_objects.filter(
+            organization_id=organization_id, term_id=term_id, school_class_id__in=school_class_ids
+        ).update(version=F("version") + 1, updated_at=timezone.now())
+
+    transaction.on_commit(bump)
+
+
+def gradebook_version(school_class, term):
+    """(version, updated_at) of a class's gradebook; (0, None) before its first change."""
+    return (
+        GradebookVersion.all_objects.filter(
+            organization_id=school_class.organization_id, school_class=school_class, term=term
+        )
+        .values_list("version", "updated_at")
+        .first()
+    ) or (0, None)
+
+
+def cached_broadsheet(school_class, term, version, build):
+    """The broadsheet payload for `version`, from the cache or `build()`."""
+    key = f"grades-broadsheet:{school_class.organization_id}:{school_class.pk}:{term.pk}:{version}"
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, getattr(settings, "BROADSHEET_CACHE_SECONDS", 300))
+    return data
@@ -0,0 +1,112 @@
+# grades/cards.py
+"""
+Report card layout.
+
+A card is a plain dict built by `grades.report_cards.class_cards`: strings
+and numbers only, so it pickles cheaply to worker processes and hashes
+stably. `render_report_card` turns one into PDF bytes. This module imports
+nothing from Django, so spawned workers can load it directly.
+
+`card_digest` covers the card data and LAYOUT_VERSION. Bump
+LAYOUT_VERSION whenever the drawing below changes, so cached cards are
+rendered again.
+"""
+import hashlib
+import json
+
+from core.pdf import PDFDocument
+
+LAYOUT_VERSION = 1
+
+MARGIN = 40
+ROW_HEIGHT = 18
+COLUMNS = (  # (heading, card key, x offset from the margin, alignment)
+    ("Subject", "name", 6, "left"),
+    ("Total", "total", 240, "right"),
+    ("Grade", "grade", 272, "center"),
+    ("Position", "position", 340, "right"),
+    ("Class avg", "average", 405, "right"),
+    ("Highest", "highest", 460, "right"),
+    ("Lowest", "lowest", 510, "right"),
+)
+
+
+def card_digest(card):
+    payload = json.dumps([LAYOUT_VERSION, card], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def ordinal(number):
+    if not number:
+        return "-"
+    suffix = "th" if 10 <= number % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+def _table_header(pdf, y, width):
+    pdf.rect(MARGIN, y - 5, width, ROW_HEIGHT, fill=0.85)
+    for heading, _, offset, align in COLUMNS:
+        pdf.text(MARGIN + offset, y, heading, size=9, bold=True, align=align)
+    return y - ROW_HEIGHT
+
+
+def render_report_card(card):
+    """PDF bytes for one student's card."""
+    pdf = PDFDocument()
+    pdf.add_page()
+    width = pdf.width - 2 * MARGIN
+    y = pdf.height - MARGIN - 16
+
+    pdf.text(pdf.width / 2, y, card["school"], size=16, bold=True, align="center")
+    if card.get("address"):
+        y -= 14
+        pdf.text(pdf.width / 2, y, card["address"], size=9, align="center")
+    y -= 22
+    pdf.text(pdf.width / 2, y, f"Report Card - {card['term']}", size=12, bold=True, align="center")
+    y -= 10
+    pdf.line(MARGIN, y, pdf.width - MARGIN, y, width=1)
+
+    summary = card["summary"]
+    details = (
+        ("Student", card["student"]),
+        ("Admission No.", card["admission_number"] or "-"),
+        ("Class", card["class"]),
+        ("Position", f"{ordinal(summary['position'])} of {summary['class_size']}"),
+    )
+    for label, value in details:
+        y -= 16
+        pdf.text(MARGIN, y, f"{label}:", size=10, bold=True)
+        pdf.text(MARGIN + 95, y, value, size=10)
+
+    y = _table_header(pdf, y - 28, width)
+    for subject in card["subjects"]:
+        if y < MARGIN + 120:  # leave room for the summary
+            pdf.add_page()
+            y = _table_header(pdf, pdf.height - MARGIN - 16, width)
+        for _, key, offset, align in COLUMNS:
+            value = ordinal(subject[key]) if key == "position" else subject[key]
+            pdf.text(MARGIN + offset, y, value, size=9, align=align)
+        pdf.line(MARGIN, y - 5, pdf.width - MARGIN, y - 5, width=0.25)
+        y -= ROW_HEIGHT
+
+    y -= 16
+    lines = [
+        f"Subjects taken: {summary['subjects_taken']}    Total: {summary['total']}    "
+        f"Average: {summary['average']}    Grade: {summary['grade']}",
+        f"Class average: {summary['class_average']}",
+    ]
+    attendance = card.get("attendance")
+    if attendance:
+        lines.append(
+            f"Attendance: {attendance['attended']} of {attendance['total']} sessions ({attendance['percentage']}%)"
+        )
+    for line in lines:
+        pdf.text(MARGIN, y, line, size=10)
+        y -= 16
+
+    y -= 30
+    for index, label in enumerate(("Form teacher", "Principal")):
+        x = MARGIN + index * (width / 2 + 20)
+        pdf.line(x, y, x + width / 2 - 20, y)
+        pdf.text(x, y - 12, label, size=9)
+    return pdf.render()
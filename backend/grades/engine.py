@@ -0,0 +1,269 @@
+# grades/engine.py
+"""
+Term results processing.
+
+All scores of one class and term are fetched in one query and packed into
+a student × subject × component array. Weighted subject totals, grades,
+subject and class positions and the per-subject and per-class statistics
+are then computed for the whole class at once with NumPy and written back
+with bulk upserts. Results left over from an earlier run (a deleted score,
+a student who moved class) are removed in the same transaction, and the
+class's gradebook version is bumped so cached broadsheets are rebuilt.
+
+A subject total is the sum over the term's components of
+score / max_score × weight. A blank component counts as zero once the
+student has any score in the subject; a subject with no scores at all is
+not taken. Positions use competition ranking: equal totals share a
+position and the next one is skipped ("1, 2, 2, 4").
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from academics.models import Class, ClassSubject
+from core.locks import advisory_lock
+from .caching import bump_gradebook_version
+from .models import (
+    AssessmentComponent, ClassResultSummary, Score, SubjectResult, SubjectResultSummary, TermResult,
+)
+
+DEFAULT_GRADE_SCALE = (("A", 70), ("B", 60), ("C", 50), ("D", 45), ("E", 40), ("F", 0))
+
+
+def grade_scale():
+    """(grade, lowest total) pairs, overridable with settings.GRADE_SCALE."""
+    return getattr(settings, "GRADE_SCALE", DEFAULT_GRADE_SCALE)
+
+
+def assign_grades(totals, scale=None):
+    """The grade of every total at once; NaN (not taken) gets ""."""
+    bands = sorted(scale or grade_scale(), key=lambda band: band[1])
+    floors = np.array([floor for _, floor in bands], dtype=float)
+    letters = np.array([""] + [letter for letter, _ in bands])
+    totals = np.asarray(totals, dtype=float)
+    return letters[np.searchsorted(floors, np.nan_to_num(totals, nan=-np.inf), side="right")]
+
+
+def competition_rank(values):
+    """
+    Rank every column of `values` highest first, ties sharing the best
+    position ("1, 2, 2, 4"). NaN entries are left unranked (0).
+    """
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    keys = np.where(missing, -np.inf, values)
+    order = np.argsort(-keys, axis=0, kind="stable")
+    ranked = np.take_along_axis(keys, order, axis=0)
+
+    rows = np.arange(values.shape[0]).reshape((-1,) + (1,) * (values.ndim - 1))
+    starts = np.ones(ranked.shape, dtype=bool)
+    starts[1:] = ranked[1:] != ranked[:-1]
+    positions = np.maximum.accumulate(np.where(starts, rows, 0), axis=0) + 1
+
+    ranks = np.empty_like(positions)
+    np.put_along_axis(ranks, order, positions, axis=0)
+    return np.where(missing, 0, ranks)
+
+
+def column_statistics(values):
+    """Count, mean, population standard deviation, highest and lowest of each column, ignoring NaN."""
+    taken = ~np.isnan(values)
+    count = taken.sum(axis=0)
+    mean = np.where(taken, values, 0.0).sum(axis=0) / np.maximum(count, 1)
+    variance = (np.where(taken, values - mean, 0.0) ** 2).sum(axis=0) / np.maximum(count, 1)
+    highest = np.where(taken, values, -np.inf).max(axis=0)
+    lowest = np.where(taken, values, np.inf).min(axis=0)
+    return count, mean, np.sqrt(variance), highest, lowest
+
+
+def weighted_totals(grid, weights, max_scores):
+    """
+    Subject totals from a student × subject × component score grid
+    (NaN = blank), rounded to 2 places; NaN where no component was scored.
+    """
+    taken = ~np.isnan(grid).all(axis=2)
+    totals = (np.nan_to_num(grid) / max_scores) @ weights
+    return np.where(taken, np.round(totals, 2), np.nan)
+
+
+def _decimal(value):
+    return Decimal(f"{value:.2f}")
+
+
+def _load_scores(organization_id, term, class_subject_ids, component_ids):
+    # Read values as floats: building a Decimal per score costs more than the maths.
+    return list(
+        Score.all_objects.filter(
+            organization_id=organization_id,
+            term=term,
+            class_subject_id__in=class_subject_ids,
+            component_id__in=component_ids,
+        )
+        .annotate(score=Cast("value", FloatField()))
+        .values_list("student_id", "class_subject_id", "component_id", "score")
+    )
+
+
+def _write_results(school_class, term, students, subjects, totals, now):
+    organization_id = school_class.organization_id
+    taken = ~np.isnan(totals)
+    grades = assign_grades(totals)
+    positions = competition_rank(totals)
+
+    subjects_taken = taken.sum(axis=1)
+    overall = np.where(taken, totals, 0.0).sum(axis=1)
+    averages = np.round(overall / subjects_taken, 2)
+    class_positions = competition_rank(averages)
+    class_grades = assign_grades(averages)
+
+    SubjectResult.all_objects.bulk_create(
+        [
+            SubjectResult(
+                organization_id=organization_id,
+                student_id=int(students[row]),
+                class_subject_id=int(subjects[column]),
+                term=term,
+                total=_decimal(totals[row, column]),
+                grade=grades[row, column],
+                position=int(positions[row, column]),
+                computed_at=now,
+            )
+            for row, column in zip(*np.nonzero(taken))
+        ],
+        update_conflicts=True,
+        unique_fields=["organization", "student", "class_subject", "term"],
+        update_fields=["total", "grade", "position", "computed_at"],
+        batch_size=1000,
+    )
+    TermResult.all_objects.bulk_create(
+        [
+            TermResult(
+                organization_id=organization_id,
+                student_id=int(students[row]),
+                school_class=school_class,
+                term=term,
+                subjects_taken=int(subjects_taken[row]),
+                total=_decimal(overall[row]),
+                average=_decimal(averages[row]),
+                grade=class_grades[row],
+                position=int(class_positions[row]),
+                computed_at=now,
+            )
+            for row in range(len(students))
+        ],
+        update_conflicts=True,
+        unique_fields=["organization", "school_class", "student", "term"],
+        update_fields=["subjects_taken", "total", "average", "grade", "position", "computed_at"],
+        batch_size=1000,
+    )
+
+    count, mean, std_dev, highest, lowest = column_statistics(totals)
+    SubjectResultSummary.all_objects.bulk_create(
+        [
+            SubjectResultSummary(
+                organization_id=organization_id,
+                class_subject_id=int(subjects[column]),
+                term=term,
+                students=int(count[column]),
+                average=_decimal(mean[column]),
+                std_dev=_decimal(std_dev[column]),
+                highest=_decimal(highest[column]),
+                lowest=_decimal(lowest[column]),
+                computed_at=now,
+            )
+            for column in range(len(subjects))
+        ],
+        update_conflicts=True,
+        unique_fields=["organization", "class_subject", "term"],
+        update_fields=["students", "average", "std_dev", "highest", "lowest", "computed_at"],
+    )
+
+    count, mean, std_dev, highest, lowest = column_statistics(averages[:, None])
+    ClassResultSummary.all_objects.bulk_create(
+        [
+            ClassResultSummary(
+                organization_id=organization_id,
+                school_class=school_class,
+                term=term,
+                students=int(count[0]),
+                average=_decimal(mean[0]),
+                std_dev=_decimal(std_dev[0]),
+                highest=_decimal(highest[0]),
+                lowest=_decimal(lowest[0]),
+                computed_at=now,
+            )
+        ],
+        update_conflicts=True,
+        unique_fields=["organization", "school_class", "term"],
+        update_fields=["students", "average", "std_dev", "highest", "lowest", "computed_at"],
+    )
+
+
+def _delete_stale(school_class, term, class_subject_ids, now):
+    scope = {"organization_id": school_class.organization_id, "term": term, "computed_at__lt": now}
+    SubjectResult.all_objects.filter(class_subject_id__in=class_subject_ids, **scope).delete()
+    SubjectResultSummary.all_objects.filter(class_subject_id__in=class_subject_ids, **scope).delete()
+    TermResult.all_objects.filter(school_class=school_class, **scope).delete()
+    ClassResultSummary.all_objects.filter(school_class=school_class, **scope).delete()
+
+
+def compute_class_results(school_class, term):
+    """
+    Recompute every result of `school_class` for `term` from its scores.
+    Returns the number of students with results.
+    """
+    components = list(
+        AssessmentComponent.all_objects.filter(organization_id=school_class.organization_id, term=term)
+        .values_list("id", "weight", "max_score")
+    )
+    component_index = {pk: index for index, (pk, _, _) in enumerate(components)}
+    weights = np.array([float(weight) for _, weight, _ in components])
+    max_scores = np.array([float(max_score) for _, _, max_score in components])
+
+    # Filtering on the ids (not a join) lets the score index narrow to this class.
+    class_subject_ids = list(
+        ClassSubject.all_objects.filter(school_class=school_class).values_list("id", flat=True)
+    )
+
+    with advisory_lock("grades", school_class.organization_id, school_class.pk, term.pk):
+        now = timezone.now()
+        rows = _load_scores(school_class.organization_id, term, class_subject_ids, list(component_index))
+        students = []
+        if rows:
+            students, student_of = np.unique(
+                np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)), return_inverse=True
+            )
+            subjects, subject_of = np.unique(
+                np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)), return_inverse=True
+            )
+            component_of = np.fromiter((component_index[row[2]] for row in rows), dtype=np.int64, count=len(rows))
+
+            grid = np.full((len(students), len(subjects), len(components)), np.nan)
+            grid[student_of, subject_of, component_of] = np.fromiter(
+                (row[3] for row in rows), dtype=float, count=len(rows)
+            )
+            totals = weighted_totals(grid, weights, max_scores)
+            _write_results(school_class, term, students, subjects, totals, now)
+        _delete_stale(school_class, term, class_subject_ids, now)
+        bump_gradebook_version(school_class.organization_id, term.pk, [school_class.pk])
+    return len(students)
+
+
+def compute_term_results(term, classes=None):
+    """
+    Recompute results for every class with subjects in `term`'s
+    organization (or just `classes`). Returns (classes, students) processed.
+    """
+    if classes is None:
+        classes = Class.all_objects.filter(
+            organization_id=term.organization_id, class_subjects__isnull=False
+        ).distinct()
+    class_count = student_count = 0
+    for school_class in classes:
+        student_count += compute_class_results(school_class, term)
+        class_count += 1
+    return class_count, student_count
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from academics.models import Class, Term
+from grades.engine import compute_term_results
+
+
+class Command(BaseCommand):
+    help = "Compute subject and term results (totals, grades, positions, statistics) for a term"
+
+    def add_arguments(self, parser):
+        parser.add_argument("term_id", type=int, help="ID of the term")
+        parser.add_argument("--class", dest="classes", type=int, action="append", help="Only this class id (repeatable)")
+
+    def handle(self, *args, **options):
+        try:
+            term = Term.all_objects.get(id=options["term_id"])
+        except Term.DoesNotExist:
+            raise CommandError(f"❌ Term {options['term_id']} does not exist")
+
+        classes = None
+        if options["classes"]:
+            classes = Class.all_objects.filter(organization_id=term.organization_id, pk__in=options["classes"])
+
+        start = time.perf_counter()
+        class_count, student_count = compute_term_results(term, classes)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Results computed for {student_count} student(s) in {class_count} class(es) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,60 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from academics.models import Class, Term
+from grades.models import ReportCardBatch
+from grades.report_cards import default_workers, generate_report_cards
+
+
+def _cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Render report cards for a term into a zip. Reports cards per second "
+        "(total and per core); --force re-renders unchanged cards too."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("term_id", type=int, help="ID of the term")
+        parser.add_argument("--class", dest="school_class", type=int, help="Only this class id")
+        parser.add_argument("--workers", type=int, default=default_workers())
+        parser.add_argument("--force", action="store_true", help="Ignore cached cards")
+
+    def handle(self, *args, **options):
+        try:
+            term = Term.all_objects.get(id=options["term_id"])
+        except Term.DoesNotExist:
+            raise CommandError(f"❌ Term {options['term_id']} does not exist")
+
+        school_class = None
+        if options["school_class"]:
+            school_class = Class.all_objects.select_related("organization").filter(
+                organization_id=term.organization_id, pk=options["school_class"]
+            ).first()
+            if school_class is None:
+                raise CommandError(f"❌ Class {options['school_class']} does not exist in this term's organization")
+
+        batch = ReportCardBatch.all_objects.create(
+            organization_id=term.organization_id, term=term, school_class=school_class
+        )
+        start = time.perf_counter()
+        generate_report_cards(batch, workers=options["workers"], force=options["force"])
+        elapsed = time.perf_counter() - start
+
+        cores = min(_cores(), options["workers"])
+        rate = batch.total_cards / elapsed if elapsed else 0.0
+        render_rate = batch.rendered_cards / elapsed if elapsed else 0.0
+        self.stdout.write(
+            f"cards={batch.total_cards} rendered={batch.rendered_cards} reused={batch.reused_cards} "
+            f"workers={options['workers']} cores={cores} elapsed={elapsed:.2f}s"
+        )
+        self.stdout.write(
+            f"cards_per_second={rate:.1f} rendered_per_second={render_rate:.1f} per_core={render_rate / cores:.1f}"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Report cards written to {batch.file.name}"))
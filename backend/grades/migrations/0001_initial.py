@@ -0,0 +1,124 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('users', '0006_user_phone_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('weight', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('max_score', models.DecimalField(decimal_places=2, default=100, max_digits=6)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessment_components', to='users.organization')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessment_components', to='academics.term')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+                'unique_together': {('organization', 'term', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassResultSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('students', models.PositiveIntegerField()),
+                ('average', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('std_dev', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('highest', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('lowest', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('computed_at', models.DateTimeField()),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_result_summaries', to='users.organization')),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_summaries', to='academics.class')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_result_summaries', to='academics.term')),
+            ],
+            options={
+                'unique_together': {('organization', 'school_class', 'term')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Score',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='academics.classsubject')),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='grades.assessmentcomponent')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='users.organization')),
+                ('recorded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recorded_scores', to='users.teacherprofile')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='users.studentprofile')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='academics.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'term', 'class_subject'], name='grades_scor_organiz_371794_idx')],
+                'unique_together': {('student', 'class_subject', 'term', 'component')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SubjectResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('grade', models.CharField(max_length=2)),
+                ('position', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('class_subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='academics.classsubject')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_results', to='users.organization')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_results', to='users.studentprofile')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_results', to='academics.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'term', 'class_subject'], name='grades_subj_organiz_9b9f9a_idx')],
+                'unique_together': {('organization', 'student', 'class_subject', 'term')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SubjectResultSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('students', models.PositiveIntegerField()),
+                ('average', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('std_dev', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('highest', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('lowest', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('computed_at', models.DateTimeField()),
+                ('class_subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_summaries', to='academics.classsubject')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_result_summaries', to='users.organization')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_result_summaries', to='academics.term')),
+            ],
+            options={
+                'unique_together': {('organization', 'class_subject', 'term')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TermResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subjects_taken', models.PositiveSmallIntegerField()),
+                ('total', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('average', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('grade', models.CharField(max_length=2)),
+                ('position', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='users.organization')),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='academics.class')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='users.studentprofile')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='academics.term')),
+            ],
+            options={
+                'unique_together': {('organization', 'school_class', 'student', 'term')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('grades', '0002_report_cards'),
+        ('users', '0006_user_phone_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradebookVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_versions', to='users.organization')),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_versions', to='academics.class')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_versions', to='academics.term')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('organization', 'school_class', 'term'), name='unique_gradebook_version')],
+            },
+        ),
+    ]
@@ -1,3 +1,209 @@
+# grades/models.py
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from core.managers import OrganizationManager
+from users.models import Organization, StudentProfile, TeacherProfile
+
+
+class AssessmentComponent(models.Model):
+    """One part of a term's assessment scheme, e.g. "CA1" worth 20% or "Exam" worth 60%."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="assessment_components")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="assessment_components")
+    name = models.CharField(max_length=50)
+    weight = models.DecimalField(max_digits=5, decimal_places=2)  # % of the subject total
+    max_score = models.DecimalField(max_digits=6, decimal_places=2, default=100)
+    position = models.PositiveSmallIntegerField(default=0)  # order on score sheets
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "term", "name")
+        ordering = ["position", "id"]
+
+    def __str__(self):
+        return f"{self.term} - {self.name} ({self.weight}%)"
+
+
+class Score(models.Model):
+    """A student's raw mark for one component of one class subject in a term."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="scores")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="scores")
+    class_subject = models.ForeignKey("academics.ClassSubject", on_delete=models.CASCADE, related_name="scores")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="scores")
+    component = models.ForeignKey(AssessmentComponent, on_delete=models.CASCADE, related_name="scores")
+    value = models.DecimalField(max_digits=6, decimal_places=2)
+    recorded_by = models.ForeignKey(
+        TeacherProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name="recorded_scores"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("student", "class_subject", "term", "component")
+        indexes = [models.Index(fields=["organization", "term", "class_subject"])]
+
+    def __str__(self):
+        return f"{self.student} - {self.class_subject} {self.component.name}: {self.value}"
+
+
+# Computed by grades.engine; never edited by hand.
+class SubjectResult(models.Model):
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="subject_results")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="subject_results")
+    class_subject = models.ForeignKey("academics.ClassSubject", on_delete=models.CASCADE, related_name="results")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="subject_results")
+    total = models.DecimalField(max_digits=6, decimal_places=2)
+    grade = models.CharField(max_length=2)
+    position = models.PositiveIntegerField()  # in the class, for this subject
+    computed_at = models.DateTimeField()
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "student", "class_subject", "term")
+        indexes = [models.Index(fields=["organization", "term", "class_subject"])]
+
+
+class TermResult(models.Model):
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="term_results")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="term_results")
+    school_class = models.ForeignKey("academics.Class", on_delete=models.CASCADE, related_name="term_results")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="term_results")
+    subjects_taken = models.PositiveSmallIntegerField()
+    total = models.DecimalField(max_digits=8, decimal_places=2)
+    average = models.DecimalField(max_digits=6, decimal_places=2)
+    grade = models.CharField(max_length=2)
+    position = models.PositiveIntegerField()  # in the class, by average
+    computed_at = models.DateTimeField()
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "school_class", "student", "term")
+
+
+class SubjectResultSummary(models.Model):
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="subject_result_summaries")
+    class_subject = models.ForeignKey("academics.ClassSubject", on_delete=models.CASCADE, related_name="result_summaries")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="subject_result_summaries")
+    students = models.PositiveIntegerField()
+    average = models.DecimalField(max_digits=6, decimal_places=2)
+    std_dev = models.DecimalField(max_digits=6, decimal_places=2)
+    highest = models.DecimalField(max_digits=6, decimal_places=2)
+    lowest = models.DecimalField(max_digits=6, decimal_places=2)
+    computed_at = models.DateTimeField()
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "class_subject", "term")
+
+
+class ClassResultSummary(models.Model):
+    """Statistics of the students' averages in a class."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="class_result_summaries")
+    school_class = models.ForeignKey("academics.Class", on_delete=models.CASCADE, related_name="result_summaries")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="class_result_summaries")
+    students = models.PositiveIntegerField()
+    average = models.DecimalField(max_digits=6, decimal_places=2)
+    std_dev = models.DecimalField(max_digits=6, decimal_places=2)
+    highest = models.DecimalField(max_digits=6, decimal_places=2)
+    lowest = models.DecimalField(max_digits=6, decimal_places=2)
+    computed_at = models.DateTimeField()
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "school_class", "term")
+
+
+class GradebookVersion(models.Model):
+    """
+    Version of a class's gradebook for a term, bumped whenever its scores,
+    the term's components or its computed results change. Drives the
+    broadsheet ETag and response cache (see grades.caching).
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="gradebook_versions")
+    school_class = models.ForeignKey("academics.Class", on_delete=models.CASCADE, related_name="gradebook_versions")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="gradebook_versions")
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["organization", "school_class", "term"], name="unique_gradebook_version")
+        ]
+
+    def __str__(self):
+        return f"{self.school_class} - {self.term} v{self.version}"
+
+
+class ReportCard(models.Model):
+    """The last rendered card of a student for a term, reused while its digest still matches."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="report_cards")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="report_cards")
+    school_class = models.ForeignKey("academics.Class", on_delete=models.CASCADE, related_name="report_cards")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="report_cards")
+    digest = models.CharField(max_length=64)  # grades.cards.card_digest of the rendered data
+    file = models.FileField(upload_to="report_cards/cards/")
+    rendered_at = models.DateTimeField()
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "school_class", "student", "term")
+
+
+class ReportCardBatch(models.Model):
+    """A zip of report cards for a term (one class, or every class), built in the background."""
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        COMPLETED = "COMPLETED", "Completed"
+        FAILED = "FAILED", "Failed"
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="report_card_batches")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="report_card_batches")
+    school_class = models.ForeignKey(
+        "academics.Class", on_delete=models.CASCADE, null=True, blank=True, related_name="report_card_batches"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="report_card_batches"
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    total_cards = models.PositiveIntegerField(default=0)
+    rendered_cards = models.PositiveIntegerField(default=0)
+    reused_cards = models.PositiveIntegerField(default=0)  # unchanged since their last render
+    file = models.FileField(upload_to="report_cards/batches/", blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    @property
+    def progress(self):
+        """Percentage of cards done."""
+        done = self.rendered_cards + self.reused_cards
+        return round(done / self.total_cards * 100, 1) if self.total_cards else 0.0
 
-# Create your models here.
+    def __str__(self):
+        return f"Report cards #{self.pk} - {self.term} ({self.status})"
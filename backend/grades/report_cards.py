@@ -0,0 +1,275 @@
+# grades/report_cards.py
+"""
+Report card batches.
+
+Cards are built class by class from the computed results (see
+grades.engine). `class_cards` gathers everything a class needs in five
+queries: term results with student names, subject results, subject and
+class statistics, and term attendance. Each card's digest is compared with
+the ReportCard kept from the last run, and only new or changed cards are
+rendered. Rendering is CPU-bound, so `ReportCardRenderer` spreads it over
+worker processes, spawned like users.passwords.PasswordHasherPool, except
+inside a daemonic process such as a Celery prefork child, which may not
+start children and renders in-process instead. Every
+card, rendered or reused, is appended to a zip spooled to a temporary file
+on disk. Progress is saved on the ReportCardBatch after each class.
+"""
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from academics.models import Class, Term
+from attendance.models import TermAttendanceSummary
+from .cards import card_digest, render_report_card
+from .models import ClassResultSummary, ReportCard, SubjectResult, SubjectResultSummary, TermResult
+
+
+def default_workers():
+    return getattr(settings, "REPORT_CARD_WORKERS", None) or os.cpu_count() or 1
+
+
+def _is_daemonic():
+    """Daemonic processes (Celery prefork pool children) cannot start worker processes."""
+    if multiprocessing.current_process().daemon:
+        return True
+    from billiard.process import current_process
+
+    return bool(current_process().daemon)
+
+
+class ReportCardRenderer:
+    """
+    Context manager rendering batches of cards in `workers` processes
+    (in this process when workers is 1, or when this process is daemonic).
+    """
+
+    def __init__(self, workers=None, chunksize=4):
+        self.workers = 1 if _is_daemonic() else workers or default_workers()
+        self.chunksize = chunksize
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def render(self, cards):
+        """PDF bytes for `cards`, in order."""
+        cards = list(cards)
+        if self._executor is None or len(cards) < 2:
+            return [render_report_card(card) for card in cards]
+        return list(self._executor.map(render_report_card, cards, chunksize=self.chunksize))
+
+
+def _text(value):
+    return "-" if value is None else str(value)
+
+
+def class_cards(school_class, term, term_label=None):
+    """
+    [(student_id, zip entry name, card)] for every student with a term
+    result in `school_class`, best position first.
+    """
+    organization = school_class.organization
+    scope = {"organization_id": organization.pk, "term": term}
+    term_label = term_label or str(term)
+    class_label = str(school_class)
+
+    students = list(
+        TermResult.all_objects.filter(school_class=school_class, **scope)
+        .order_by("position", "student__membership__user__last_name", "student_id")
+        .values_list(
+            "student_id",
+            "student__admission_number",
+            "student__membership__user__first_name",
+            "student__membership__user__last_name",
+            "subjects_taken",
+            "total",
+            "average",
+            "grade",
+            "position",
+        )
+    )
+    if not students:
+        return []
+
+    subjects = {
+        class_subject_id: {"name": name, "average": _text(average), "highest": _text(highest), "lowest": _text(lowest)}
+        for class_subject_id, name, average, highest, lowest in SubjectResultSummary.all_objects.filter(
+            class_subject__school_class=school_class, **scope
+        )
+        .order_by("class_subject__subject__name")
+        .values_list(
+            "class_subject_id", "class_subject__subject__name", "average", "highest", "lowest"
+        )
+    }
+    results = {}
+    for student_id, class_subject_id, total, grade, position in SubjectResult.all_objects.filter(
+        class_subject_id__in=list(subjects), **scope
+    ).values_list("student_id", "class_subject_id", "total", "grade", "position"):
+        results.setdefault(student_id, {})[class_subject_id] = (total, grade, position)
+
+    class_summary = (
+        ClassResultSummary.all_objects.filter(school_class=school_class, **scope)
+        .values_list("students", "average")
+        .first()
+    ) or (len(students), None)
+
+    attendance = {
+        student_id: {"attended": attended, "total": total, "percentage": _text(percentage)}
+        for student_id, total, attended, percentage in TermAttendanceSummary.all_objects.filter(
+            class_assignment__class_ref=school_class,
+            student_id__in=[row[0] for row in students],
+            **scope,
+        ).values_list("student_id", "total_sessions", "attended_sessions", "percentage")
+    }
+
+    cards = []
+    for student_id, admission_number, first_name, last_name, taken, total, average, grade, position in students:
+        name = f"{first_name} {last_name}".strip()
+        student_results = results.get(student_id, {})
+        card = {
+            "school": organization.name,
+            "address": organization.address or "",
+            "term": term_label,
+            "class": class_label,
+            "student": name,
+            "admission_number": admission_number or "",
+            "subjects": [
+                {"total": _text(result[0]), "grade": result[1], "position": result[2], **subject}
+                for class_subject_id, subject in subjects.items()
+                if (result := student_results.get(class_subject_id))
+            ],
+            "summary": {
+                "subjects_taken": taken,
+                "total": _text(total),
+                "average": _text(average),
+                "grade": grade,
+                "position": position,
+                "class_size": class_summary[0],
+                "class_average": _text(class_summary[1]),
+            },
+            "attendance": attendance.get(student_id),
+        }
+        filename = get_valid_filename(f"{admission_number or student_id} {name}") + ".pdf"
+        cards.append((student_id, f"{get_valid_filename(class_label)}/{filename}", card))
+    return cards
+
+
+def _add_class(archive, renderer, school_class, term, term_label, force):
+    """Write one class's cards into `archive`; returns (rendered, reused)."""
+    cards = class_cards(school_class, term, term_label)
+    kept = {
+        card.student_id: card
+        for card in ReportCard.all_objects.filter(
+            organization_id=school_class.organization_id, school_class=school_class, term=term
+        )
+    }
+    digests = [card_digest(card) for _, _, card in cards]
+
+    reused = {}
+    if not force:
+        for index, (student_id, _, _) in enumerate(cards):
+            record = kept.get(student_id)
+            if record is None or record.digest != digests[index]:
+                continue
+            try:
+                with record.file.open("rb") as handle:
+                    reused[index] = handle.read()
+            except FileNotFoundError:
+                pass  # render it again below
+
+    stale = [index for index in range(len(cards)) if index not in reused]
+    rendered = dict(zip(stale, renderer.render(cards[index][2] for index in stale)))
+
+    now = timezone.now()
+    created, updated = [], []
+    for index, (student_id, name, card) in enumerate(cards):
+        if index in reused:
+            archive.writestr(name, reused[index])
+            continue
+        data = rendered[index]
+        archive.writestr(name, data)
+
+        record = kept.get(student_id)
+        if record is None:
+            record = ReportCard(
+                organization_id=school_class.organization_id, student_id=student_id,
+                school_class=school_class, term=term,
+            )
+            created.append(record)
+        else:
+            if record.file:
+                record.file.storage.delete(record.file.name)
+            updated.append(record)
+        record.digest = digests[index]
+        record.rendered_at = now
+        record.file.save(f"{digests[index]}.pdf", ContentFile(data), save=False)
+
+    ReportCard.all_objects.bulk_create(created)
+    ReportCard.all_objects.bulk_update(updated, ["digest", "file", "rendered_at"])
+    return len(rendered), len(reused)
+
+
+def generate_report_cards(batch, workers=None, force=False):
+    """
+    Build `batch`'s zip into its `file` field. Cards whose data has not
+    changed since their last render are reused unless `force` is set.
+    """
+    batch.status = batch.Status.RUNNING
+    batch.save(update_fields=["status"])
+
+    try:
+        term = Term.all_objects.select_related("session").get(pk=batch.term_id)
+        if batch.school_class_id:
+            classes = [batch.school_class]
+        else:
+            classes = list(
+                Class.all_objects.filter(organization_id=batch.organization_id, term_results__term=term)
+                .select_related("organization")
+                .distinct()
+                .order_by("name", "section", "id")
+            )
+        batch.total_cards = TermResult.all_objects.filter(
+            organization_id=batch.organization_id, term=term, school_class__in=classes
+        ).count()
+        batch.rendered_cards = batch.reused_cards = 0
+        batch.save(update_fields=["total_cards", "rendered_cards", "reused_cards"])
+
+        term_label = str(term)
+        with tempfile.TemporaryFile() as spool:
+            with zipfile.ZipFile(spool, "w", zipfile.ZIP_STORED) as archive, ReportCardRenderer(workers) as renderer:
+                for school_class in classes:
+                    rendered, reused = _add_class(archive, renderer, school_class, term, term_label, force)
+                    batch.rendered_cards += rendered
+                    batch.reused_cards += reused
+                    batch.save(update_fields=["rendered_cards", "reused_cards"])
+            spool.seek(0)
+            scope = f"class-{batch.school_class_id}" if batch.school_class_id else "all"
+            batch.file.save(f"report-cards-term-{term.pk}-{scope}.zip", File(spool), save=False)
+    except Exception as exc:
+        batch.status = batch.Status.FAILED
+        batch.error = str(exc)
+        batch.completed_at = timezone.now()
+        batch.save(update_fields=["status", "error", "completed_at"])
+        raise
+
+    batch.status = batch.Status.COMPLETED
+    batch.completed_at = timezone.now()
+    batch.save(update_fields=["status", "file", "completed_at"])
+    return batch
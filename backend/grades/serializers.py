@@ -0,0 +1,62 @@
+from rest_framework import serializers
+
+from academics.models import Class, Term
+from core.exports import EXPORT_FORMATS
+from .models import ReportCardBatch
+
+
+class BroadsheetQuerySerializer(serializers.Serializer):
+    """Validates broadsheet query params: the class and term, both in the caller's organization."""
+
+    school_class = serializers.PrimaryKeyRelatedField(queryset=Class.all_objects.all())
+    term = serializers.PrimaryKeyRelatedField(queryset=Term.all_objects.all())
+    file_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default="csv")
+
+    def validate(self, attrs):
+        organization = self.context["organization"]
+        for field in ("school_class", "term"):
+            if attrs[field].organization_id != organization.id:
+                raise serializers.ValidationError({field: "Not found in this organization."})
+        return attrs
+
+
+class ReportCardBatchSerializer(serializers.ModelSerializer):
+    """A report card batch: requested with a term (and optionally one class), then polled for progress."""
+
+    term = serializers.PrimaryKeyRelatedField(queryset=Term.all_objects.all())
+    school_class = serializers.PrimaryKeyRelatedField(
+        queryset=Class.all_objects.all(), required=False, allow_null=True
+    )
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportCardBatch
+        fields = [
+            "id",
+            "term",
+            "school_class",
+            "status",
+            "total_cards",
+            "rendered_cards",
+            "reused_cards",
+            "progress",
+            "error",
+            "created_at",
+            "completed_at",
+            "download_url",
+        ]
+        read_only_fields = [field for field in fields if field not in ("term", "school_class")]
+
+    def validate(self, attrs):
+        organization = self.context["organization"]
+        for field in ("school_class", "term"):
+            if attrs.get(field) is not None and attrs[field].organization_id != organization.id:
+                raise serializers.ValidationError({field: "Not found in this organization."})
+        return attrs
+
+    def get_download_url(self, obj):
+        if obj.status != ReportCardBatch.Status.COMPLETED:
+            return None
+        request = self.context.get("request")
+        url = f"/api/grades/report-cards/{obj.id}/download/"
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import ClassSubject
+from .caching import bump_gradebook_version
+from .models import AssessmentComponent, Score
+
+
+@receiver([post_save, post_delete], sender=Score)
+def bump_class_gradebook(sender, instance, **kwargs):
+    """A saved or deleted mark changes its class's broadsheet."""
+    school_class_ids = ClassSubject.all_objects.filter(pk=instance.class_subject_id).values_list(
+        "school_class_id", flat=True
+    )
+    bump_gradebook_version(instance.organization_id, instance.term_id, school_class_ids)
+
+
+@receiver([post_save, post_delete], sender=AssessmentComponent)
+def bump_term_gradebooks(sender, instance, **kwargs):
+    """Components are shared by every class in the term, so all their broadsheets change."""
+    school_class_ids = (
+        ClassSubject.all_objects.filter(organization_id=instance.organization_id)
+        .values_list("school_class_id", flat=True)
+        .distinct()
+    )
+    bump_gradebook_version(instance.organization_id, instance.term_id, school_class_ids)
@@ -0,0 +1,30 @@
+from celery import shared_task
+from academics.models import Term
+from .engine import compute_term_results
+
+
+@shared_task
+def compute_term_results_task(term_id):
+    """
+    Celery task to recompute every class's results for a term.
+    """
+    try:
+        term = Term.all_objects.get(pk=term_id)
+    except Term.DoesNotExist:
+        return
+    return compute_term_results(term)
+
+
+@shared_task
+def generate_report_cards_task(batch_id):
+    """
+    Celery task to build a ReportCardBatch zip in the background.
+    """
+    from .models import ReportCardBatch
+    from .report_cards import generate_report_cards
+
+    try:
+        batch = ReportCardBatch.all_objects.select_related("school_class__organization").get(pk=batch_id)
+    except ReportCardBatch.DoesNotExist:
+        return
+    generate_report_cards(batch)
@@ -0,0 +1,15 @@
+from rest_framework.routers import DefaultRouter
+from django.urls import path, include
+from .views import BroadsheetViewSet, ReportCardBatchViewSet
+
+router = DefaultRouter()
+
+# Class × subject × component marks, columnar or streamed as CSV/XLSX
+router.register(r'broadsheet', BroadsheetViewSet, basename="broadsheet")
+
+# Report card zips, built in the background
+router.register(r'report-cards', ReportCardBatchViewSet, basename="report-cards")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
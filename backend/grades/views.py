@@ -1,3 +1,143 @@
-from django.shortcuts import render
+import hashlib
 
-# Create your views here.
+from django.db import transaction
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+
+from academics.models import ClassSessionAssignment, ClassSubject
+from core.exports import streaming_export_response
+from core.permissions import IsAdminOrPrincipal, IsTeacher, any_of
+from core.throttling import WRITE_THROTTLES
+from .broadsheet import broadsheet_rows, build_broadsheet
+from .caching import cached_broadsheet, gradebook_version
+from .models import ReportCardBatch
+from .serializers import BroadsheetQuerySerializer, ReportCardBatchSerializer
+from .tasks import generate_report_cards_task
+
+
+class BroadsheetViewSet(viewsets.ViewSet):
+    """
+    A class's marks and results for a term, for review before approval.
+
+    GET ?school_class=&term=                   → columnar JSON (see grades.broadsheet)
+    GET export/?school_class=&term=&file_format= → the same sheet streamed as CSV/XLSX
+
+    Both carry an ETag and Last-Modified from the class's gradebook version
+    and honour If-None-Match / If-Modified-Since with a 304.
+
+    Teachers only see classes they teach a subject in or are form teacher
+    of for the term's session; admins and principals see every class.
+    """
+    permission_classes = [any_of(IsAdminOrPrincipal, IsTeacher)]
+
+    def _check_class_access(self, request, school_class, term):
+        if IsAdminOrPrincipal().has_permission(request, self):
+            return
+        teaches = ClassSubject.all_objects.filter(
+            school_class=school_class, teacher__membership__user=request.user
+        ).exists() or ClassSessionAssignment.all_objects.filter(
+            class_ref=school_class, session_id=term.session_id, form_teacher__membership__user=request.user
+        ).exists()
+        if not teaches:
+            raise PermissionDenied("You do not teach this class.")
+
+    def _conditional(self, request):
+        """(validated params, gradebook version, headers, 304 response or None)."""
+        serializer = BroadsheetQuerySerializer(
+            data=request.query_params, context={"organization": request.organization}
+        )
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        school_class, term = params["school_class"], params["term"]
+        self._check_class_access(request, school_class, term)
+
+        version, updated_at = gradebook_version(school_class, term)
+        fingerprint = hashlib.sha256(
+            f"{school_class.organization_id}|{school_class.pk}|{term.pk}|{version}|{request.path}".encode()
+        ).hexdigest()
+        headers = {"ETag": f'"{fingerprint[:32]}"', "Cache-Control": "private, no-cache"}
+        last_modified = None
+        if updated_at is not None:
+            last_modified = int(updated_at.timestamp())
+            headers["Last-Modified"] = http_date(last_modified)
+
+        not_modified = get_conditional_response(request, etag=headers["ETag"], last_modified=last_modified)
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+        return params, version, headers, not_modified
+
+    def _sheet(self, params, version):
+        school_class, term = params["school_class"], params["term"]
+        data = cached_broadsheet(school_class, term, version, lambda: build_broadsheet(school_class, term))
+        return {**data, "version": version}
+
+    def list(self, request):
+        params, version, headers, not_modified = self._conditional(request)
+        if not_modified is not None:
+            return not_modified
+        return Response(self._sheet(params, version), headers=headers)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        params, version, headers, not_modified = self._conditional(request)
+        if not_modified is not None:
+            return not_modified
+        response = streaming_export_response(
+            broadsheet_rows(self._sheet(params, version)),
+            f"broadsheet-{params['school_class'].pk}-term-{params['term'].pk}",
+            fmt=params["file_format"],
+            sheet_name="Broadsheet",
+        )
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+
+class ReportCardBatchViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Report card zips, built in Celery (see grades.report_cards).
+
+    POST {term, school_class?}   → 202 with the PENDING batch
+    GET {id}/                    → status and progress
+    GET {id}/download/           → the zip once COMPLETED
+    """
+    serializer_class = ReportCardBatchSerializer
+    permission_classes = [IsAdminOrPrincipal]
+    throttle_classes = WRITE_THROTTLES
+
+    def get_queryset(self):
+        org = getattr(self.request, "organization", None)
+        if not org:
+            return ReportCardBatch.objects.none()
+        return ReportCardBatch.all_objects.filter(organization=org)
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "organization": getattr(self.request, "organization", None)}
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        batch = serializer.save(organization=request.organization, requested_by=request.user)
+        transaction.on_commit(lambda: generate_report_cards_task.delay(batch.pk))
+        return Response(self.get_serializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"], url_path="download")
+    def download(self, request, pk=None):
+        """Download a finished batch."""
+        batch = self.get_object()
+        if batch.status != ReportCardBatch.Status.COMPLETED or not batch.file:
+            return Response(
+                {"detail": f"Batch is {batch.status.lower()}, not ready for download."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return FileResponse(
+            batch.file.open("rb"),
+            as_attachment=True,
+            filename=batch.file.name.rsplit("/", 1)[-1],
+        )
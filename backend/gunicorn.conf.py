@@ -0,0 +1,19 @@
+# gunicorn.conf.py
+# Read by gunicorn from the working directory. Threads share the worker's
+# database pool, sized from GUNICORN_THREADS and BATCH_MAX_WORKERS (see
+# core.db_pool).
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 3))
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+preload_app = os.getenv("GUNICORN_PRELOAD", "") == "1"
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from core.db_pool import reset_pools_after_fork
+
+        reset_pools_after_fork()
@@ -1,32 +1,139 @@
-from django.http import JsonResponse
-from django.db import connection
+"""
+Health endpoints for Docker, load balancers and uptime monitors.
+
+/health/               liveness: the process is serving requests; touches
+                       no backend
+/health/ready/         readiness: database and Redis answer
+/health/ready/?deep=1  readiness plus Celery queue depth and DB pool stats
+
+Readiness results are cached per process for HEALTH_CACHE_SECONDS, so
+frequent probes cost one backend round trip per window. Backend checks run
+concurrently and the whole probe is bounded by HEALTH_TIME_BUDGET; a check
+that has not answered by then is reported as a timeout.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import redis
 from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+
+from core.db_pool import pool_stats
 
-def health_check(request):
-    status = {"status": "ok"}
-    
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="health")
+
+_redis_clients = {}
+_redis_lock = threading.Lock()
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_redis(url=None):
+    """
+    Module-level client for `url` (default: REDIS_HOST/REDIS_PORT) backed by
+    one connection pool per process, with short timeouts for probing.
+    """
+    url = url or f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0"
+    client = _redis_clients.get(url)
+    if client is None:
+        with _redis_lock:
+            client = _redis_clients.get(url)
+            if client is None:
+                timeout = getattr(settings, "HEALTH_TIME_BUDGET", 2.0)
+                pool = redis.ConnectionPool.from_url(
+                    url, max_connections=4, socket_connect_timeout=timeout, socket_timeout=timeout
+                )
+                client = _redis_clients[url] = redis.StrictRedis(connection_pool=pool)
+    return client
+
+
+def check_database():
     try:
         with connection.cursor() as cursor:
-            cursor.execute("SELECT 1;")
+            cursor.execute("SELECT 1")
             cursor.fetchone()
-        status["database"] = "ok"
-    except Exception as e:
-        status["database"] = f"error: {str(e)}"
-        status["status"] = "unhealthy"
+    finally:
+        connection.close()  # runs on a probe thread; give the connection back
+    return {"status": "ok"}
+
+
+def check_redis():
+    get_redis().ping()
+    return {"status": "ok"}
 
-    # --- Check Redis ---
+
+def check_celery_queues():
+    broker = get_redis(settings.CELERY_BROKER_URL)
+    queues = getattr(settings, "HEALTH_CELERY_QUEUES", ("celery",))
+    pipe = broker.pipeline(transaction=False)
+    for queue in queues:
+        pipe.llen(queue)
+    depths = dict(zip(queues, pipe.execute()))
+    limit = getattr(settings, "HEALTH_QUEUE_WARN_DEPTH", 1000)
+    return {"status": "degraded" if any(depth > limit for depth in depths.values()) else "ok", "depth": depths}
+
+
+def check_db_pool():
+    stats = pool_stats()
+    waiting = sum(values.get("requests_waiting", 0) for values in stats.values())
+    return {"status": "degraded" if waiting else "ok", "pools": stats}
+
+
+def _run_checks(checks, budget):
+    """Run `checks` ({name: callable}) within `budget` seconds in total."""
+    results = {}
+    futures = {_executor.submit(check): name for name, check in checks.items()}
+    done, not_done = wait(futures, timeout=budget)
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as exc:
+            results[futures[future]] = {"status": "error", "error": str(exc)}
+    for future in not_done:
+        future.cancel()
+        results[futures[future]] = {"status": "error", "error": f"timed out after {budget}s"}
+    return results
+
+
+def _probe(deep):
+    checks = {"database": check_database, "redis": check_redis}
+    if deep:
+        checks.update(celery=check_celery_queues, db_pool=check_db_pool)
+
+    results = _run_checks(checks, getattr(settings, "HEALTH_TIME_BUDGET", 2.0))
+    statuses = {result["status"] for result in results.values()}
+    overall = "unhealthy" if "error" in statuses else "degraded" if "degraded" in statuses else "ok"
+    return {"status": overall, "checks": results, "checked_at": time.time()}
+
+
+def _cached_probe(deep):
+    """Latest probe result, re-probing at most once per HEALTH_CACHE_SECONDS."""
+    ttl = getattr(settings, "HEALTH_CACHE_SECONDS", 5)
+    key = "deep" if deep else "ready"
+    cached = _cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    # One thread probes; concurrent callers reuse the previous result if any.
+    if not _cache_lock.acquire(blocking=cached is None):
+        return cached[1]
     try:
-        r = redis.StrictRedis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=0,
-            socket_connect_timeout=2,
-        )
-        r.ping()
-        status["redis"] = "ok"
-    except Exception as e:
-        status["redis"] = f"error: {str(e)}"
-        status["status"] = "unhealthy"
-
-    return JsonResponse(status, status=200 if status["status"] == "ok" else 500)
\ No newline at end of file
+        cached = _cache.get(key)
+        if cached is None or time.monotonic() - cached[0] >= ttl:
+            cached = _cache[key] = (time.monotonic(), _probe(deep))
+        return cached[1]
+    finally:
+        _cache_lock.release()
+
+
+def liveness(request):
+    return JsonResponse({"status": "ok"})
+
+
+def readiness(request):
+    deep = request.GET.get("deep") in ("1", "true")
+    result = _cached_probe(deep)
+    return JsonResponse(result, status=503 if result["status"] == "unhealthy" else 200)
@@ -0,0 +1,206 @@
+# payments/invoicing.py
+"""
+Bulk termly invoicing.
+
+An InvoiceRun bills every student enrolled in the term's session from one
+version of a FeeSchedule. Students are split over shards by id (each shard
+a Celery task) so several workers share a large school. A shard resolves
+its students and their classes from StudentEnrollment in one query, works
+out every class's invoice lines in memory, then processes its students in
+chunks: one query for the invoices they already have, then the new
+Invoices and their ledger entries (payments.ledger.post_entries) are
+inserted with bulk_create in the chunk's transaction. Progress is counted
+on the run after each chunk.
+
+Runs are idempotent per (schedule, version): a student invoiced for this
+version is skipped, so a failed run can simply be started again, and a
+run left RUNNING by a worker that died can be forced to start again. When a
+later version is run, students already billed from an earlier one get an
+ADJUSTMENT for the difference instead of a second full invoice.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from students.models import StudentEnrollment
+from .ledger import ZERO, post_entries
+from .models import FeeItem, FeeSchedule, Invoice, InvoiceRun, LedgerEntry
+
+
+def default_shards():
+    return getattr(settings, "INVOICE_SHARDS", 4)
+
+
+def default_chunk_size():
+    return getattr(settings, "INVOICE_CHUNK_SIZE", 500)
+
+
+def bump_schedule_version(schedule_id):
+    FeeSchedule.all_objects.filter(pk=schedule_id).update(version=F("version") + 1)
+
+
+def _enrolled(schedule, shard=0, shards=1):
+    """The enrollments of the schedule's session, restricted to one shard of students."""
+    enrollments = StudentEnrollment.all_objects.filter(
+        organization_id=schedule.organization_id, class_assignment__session_id=schedule.term.session_id
+    )
+    if shards > 1:
+        enrollments = enrollments.alias(shard=F("student_id") % shards).filter(shard=shard)
+    return enrollments
+
+
+def class_lines(schedule):
+    """
+    A function giving (lines, total) for a class id: the schedule's items
+    for every class, then those for that class, in position order.
+    """
+    shared, by_class = [], defaultdict(list)
+    for name, amount, school_class_id in FeeItem.all_objects.filter(schedule=schedule).values_list(
+        "name", "amount", "school_class_id"
+    ):
+        (shared if school_class_id is None else by_class[school_class_id]).append((name, amount))
+
+    cache = {}
+
+    def lines_for(school_class_id):
+        if school_class_id not in cache:
+            items = shared + by_class.get(school_class_id, [])
+            cache[school_class_id] = (
+                [{"name": name, "amount": str(amount)} for name, amount in items],
+                sum((amount for _, amount in items), ZERO),
+            )
+        return cache[school_class_id]
+
+    return lines_for
+
+
+def _invoice_chunk(run, schedule, lines_for, chunk, now):
+    """Invoice one chunk of (student id, class id); returns how many invoices were created."""
+    student_ids = [student_id for student_id, _ in chunk]
+    with transaction.atomic():
+        billed = {}  # student id -> (version, total) of their latest invoice from this schedule
+        for student_id, version, total in (
+            Invoice.all_objects.filter(schedule=schedule, student_id__in=student_ids)
+            .order_by("schedule_version")
+            .values_list("student_id", "schedule_version", "total")
+        ):
+            billed[student_id] = (version, total)
+
+        invoices, entries = [], []
+        for student_id, school_class_id in chunk:
+            previous = billed.get(student_id)
+            if previous is not None and previous[0] == run.schedule_version:
+                continue  # already billed by this version
+            lines, total = lines_for(school_class_id)
+            if previous is None and not lines:
+                continue  # no fee applies to this class
+            number = f"INV-{schedule.term_id}-{schedule.pk}-{run.schedule_version}-{student_id}"
+            invoices.append(Invoice(
+                organization_id=run.organization_id, student_id=student_id, term_id=schedule.term_id,
+                schedule=schedule, schedule_version=run.schedule_version, school_class_id=school_class_id,
+                number=number, lines=lines, total=total, created_at=now,
+            ))
+
+            entry = {"kind": LedgerEntry.Kind.INVOICE, "amount": total, "description": schedule.name}
+            if previous is not None:
+                entry = {
+                    "kind": LedgerEntry.Kind.ADJUSTMENT,
+                    "amount": total - previous[1],
+                    "description": f"{schedule.name} (revised, v{run.schedule_version})",
+                }
+            if entry["amount"]:
+                entries.append(LedgerEntry(
+                    organization_id=run.organization_id, student_id=student_id, term_id=schedule.term_id,
+                    reference=number, recorded_by_id=run.requested_by_id, created_at=now, **entry,
+                ))
+
+        Invoice.all_objects.bulk_create(invoices, batch_size=default_chunk_size())
+        post_entries(entries)
+    return len(invoices)
+
+
+def invoice_shard(run, shard=0, shards=1, chunk_size=None):
+    """
+    Bill this shard's students for `run`, then count the shard done; the
+    last shard to finish completes the run. Returns invoices created.
+    """
+    runs = InvoiceRun.all_objects.filter(pk=run.pk)
+    try:
+        schedule = FeeSchedule.all_objects.select_related("term").get(pk=run.schedule_id)
+        if schedule.version != run.schedule_version:
+            raise ValueError(
+                f"Fee schedule changed (v{run.schedule_version} -> v{schedule.version}) since the run started; "
+                "start a new run."
+            )
+        lines_for = class_lines(schedule)
+
+        students = {}  # student id -> class id of their latest enrollment in the session
+        for student_id, school_class_id in (
+            _enrolled(schedule, shard, shards)
+            .order_by("student_id", "-date_enrolled", "-id")
+            .values_list("student_id", "class_assignment__class_ref_id")
+        ):
+            students.setdefault(student_id, school_class_id)
+
+        created = 0
+        now = timezone.now()
+        students = list(students.items())
+        chunk_size = chunk_size or default_chunk_size()
+        for start in range(0, len(students), chunk_size):
+            chunk = students[start:start + chunk_size]
+            invoiced = _invoice_chunk(run, schedule, lines_for, chunk, now)
+            runs.update(
+                processed_students=F("processed_students") + len(chunk),
+                invoiced_students=F("invoiced_students") + invoiced,
+            )
+            created += invoiced
+    except Exception as exc:
+        runs.update(status=InvoiceRun.Status.FAILED, error=str(exc), completed_at=timezone.now())
+        raise
+
+    runs.update(completed_shards=F("completed_shards") + 1)
+    runs.filter(status=InvoiceRun.Status.RUNNING, completed_shards__gte=F("total_shards")).update(
+        status=InvoiceRun.Status.COMPLETED, completed_at=timezone.now()
+    )
+    return created
+
+
+def start_invoice_run(schedule, requested_by=None, shards=None, inline=False, force=False):
+    """
+    The InvoiceRun for the schedule's current version, started unless it
+    is already running or complete. Shards go to Celery once the
+    transaction commits, or run here one after another when `inline`.
+
+    `force` restarts a run stuck in RUNNING because its workers died; only
+    use it once none of its shards can still be working.
+    """
+    run, _ = InvoiceRun.all_objects.get_or_create(
+        schedule=schedule,
+        schedule_version=schedule.version,
+        defaults={"organization_id": schedule.organization_id, "requested_by": requested_by},
+    )
+    if run.status == InvoiceRun.Status.COMPLETED or (run.status == InvoiceRun.Status.RUNNING and not force):
+        return run
+
+    run.status = InvoiceRun.Status.RUNNING
+    run.total_shards = shards or default_shards()
+    run.total_students = _enrolled(schedule).values("student_id").distinct().count()
+    run.completed_shards = run.processed_students = run.invoiced_students = 0
+    run.error = ""
+    run.completed_at = None
+    run.save()
+
+    if inline:
+        for shard in range(run.total_shards):
+            invoice_shard(run, shard, run.total_shards)
+        run.refresh_from_db()
+    else:
+        from .tasks import invoice_shard_task
+
+        transaction.on_commit(lambda: [
+            invoice_shard_task.delay(run.pk, shard, run.total_shards) for shard in range(run.total_shards)
+        ])
+    return run
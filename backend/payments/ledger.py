@@ -0,0 +1,197 @@
+# payments/ledger.py
+"""
+Fee ledger.
+
+Every change to what a student owes is a LedgerEntry appended through
+`post_entries`, which numbers it, works out the running balance and moves
+the student's StudentBalance in the same transaction. Reading a balance is
+then one row, and a class's outstanding fees one row per student, however
+long the ledger grows; nothing ever sums the entries on the request path.
+
+`take_snapshots` records each changed balance against the sequence of the
+entry it covers, and `reconcile` replays the raw entries to check every
+running balance, snapshot and StudentBalance.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BalanceSnapshot, LedgerEntry, StudentBalance
+
+ZERO = Decimal("0.00")
+BATCH_SIZE = 500
+_SIGNS = {LedgerEntry.Kind.INVOICE: 1, LedgerEntry.Kind.PAYMENT: -1}
+
+
+def signed_amount(kind, amount):
+    """
+    Invoices and payments are given as positive sums and stored with the
+    sign of their effect on the balance; adjustments are stored as given.
+    """
+    amount = Decimal(amount)
+    if kind == LedgerEntry.Kind.ADJUSTMENT:
+        return amount
+    if kind not in _SIGNS:
+        raise ValueError(f"Unknown ledger entry kind {kind!r}.")
+    if amount <= 0:
+        raise ValueError(f"{LedgerEntry.Kind(kind).label} amounts must be positive.")
+    return amount * _SIGNS[kind]
+
+
+def post_entries(entries):
+    """
+    Append unsaved LedgerEntry objects and return them, saved. Entries of
+    the same student are applied in the order given. The students' balance
+    rows are locked for the transaction, so concurrent postings queue up.
+    """
+    entries = list(entries)
+    for entry in entries:
+        entry.amount = signed_amount(entry.kind, entry.amount)
+    if not entries:
+        return entries
+
+    organizations = {entry.student_id: entry.organization_id for entry in entries}
+    now = timezone.now()
+    with transaction.atomic():
+        StudentBalance.all_objects.bulk_create(
+            [StudentBalance(organization_id=org_id, student_id=pk) for pk, org_id in organizations.items()],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        balances = {
+            balance.student_id: balance
+            for balance in StudentBalance.all_objects.select_for_update()
+            .filter(student_id__in=list(organizations))
+            .order_by("student_id")
+        }
+        for entry in entries:
+            balance = balances[entry.student_id]
+            balance.sequence += 1
+            balance.balance += entry.amount
+            balance.updated_at = now
+            entry.sequence = balance.sequence
+            entry.balance_after = balance.balance
+
+        LedgerEntry.all_objects.bulk_create(entries, batch_size=BATCH_SIZE)
+        StudentBalance.all_objects.bulk_update(
+            balances.values(), ["balance", "sequence", "updated_at"], batch_size=BATCH_SIZE
+        )
+    return entries
+
+
+def post_entry(student, term, kind, amount, **fields):
+    """Append one entry (see `post_entries`); `fields` are reference, description, recorded_by..."""
+    entry = LedgerEntry(
+        organization_id=term.organization_id, student=student, term=term, kind=kind, amount=amount, **fields
+    )
+    return post_entries([entry])[0]
+
+
+def current_balance(student):
+    """What `student` owes now (negative when in credit)."""
+    return (
+        StudentBalance.all_objects.filter(student=student).values_list("balance", flat=True).first()
+    ) or ZERO
+
+
+def outstanding_fees(class_assignment):
+    """
+    [(student_id, admission_number, first_name, last_name, balance)] of the
+    students enrolled in `class_assignment` who owe anything, largest first.
+    """
+    return list(
+        StudentBalance.all_objects.filter(
+            organization_id=class_assignment.organization_id,
+            student__enrollments__class_assignment=class_assignment,
+            balance__gt=0,
+        )
+        .order_by("-balance", "student_id")
+        .values_list(
+            "student_id",
+            "student__admission_number",
+            "student__membership__user__first_name",
+            "student__membership__user__last_name",
+            "balance",
+        )
+    )
+
+
+def _scope(queryset, organization_id):
+    return queryset if organization_id is None else queryset.filter(organization_id=organization_id)
+
+
+def take_snapshots(organization_id=None):
+    """Snapshot every balance that moved since its last snapshot. Returns how many were taken."""
+    latest = BalanceSnapshot.all_objects.filter(student=OuterRef("student")).order_by("-sequence").values("sequence")[:1]
+    changed = (
+        _scope(StudentBalance.all_objects, organization_id)
+        .annotate(snapshot_sequence=Coalesce(Subquery(latest), Value(0)))
+        .filter(sequence__gt=F("snapshot_sequence"))
+        .values_list("organization_id", "student_id", "balance", "sequence")
+    )
+    now = timezone.now()
+    snapshots = BalanceSnapshot.all_objects.bulk_create(
+        [
+            BalanceSnapshot(organization_id=org_id, student_id=pk, balance=balance, sequence=sequence, taken_at=now)
+            for org_id, pk, balance, sequence in changed.iterator(chunk_size=2000)
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    return len(snapshots)
+
+
+def reconcile(organization_id=None):
+    """
+    Replay the raw entries student by student and check every entry's
+    sequence and running balance, every snapshot and every StudentBalance.
+    Returns (entries checked, problems); no problems means all agree.
+    """
+    balances = {
+        pk: (balance, sequence)
+        for pk, balance, sequence in _scope(StudentBalance.all_objects, organization_id).values_list(
+            "student_id", "balance", "sequence"
+        )
+    }
+    snapshots = defaultdict(dict)
+    for pk, sequence, balance in _scope(BalanceSnapshot.all_objects, organization_id).values_list(
+        "student_id", "sequence", "balance"
+    ):
+        snapshots[pk][sequence] = balance
+
+    problems = []
+    replayed = {}  # student id -> (running balance, last sequence)
+    checked = 0
+    entries = (
+        _scope(LedgerEntry.all_objects, organization_id)
+        .order_by("student_id", "sequence")
+        .values_list("student_id", "sequence", "amount", "balance_after")
+    )
+    for pk, sequence, amount, balance_after in entries.iterator(chunk_size=2000):
+        checked += 1
+        total, last = replayed.get(pk, (ZERO, 0))
+        if sequence != last + 1:
+            problems.append(f"student {pk}: entry #{sequence} follows #{last}")
+        total += amount
+        if balance_after != total:
+            problems.append(f"student {pk}: entry #{sequence} balance_after {balance_after}, entries sum to {total}")
+        snapshot = snapshots[pk].pop(sequence, None)
+        if snapshot is not None and snapshot != total:
+            problems.append(f"student {pk}: snapshot at #{sequence} is {snapshot}, entries sum to {total}")
+        replayed[pk] = (total, sequence)
+
+    for pk, leftover in snapshots.items():
+        for sequence in sorted(leftover):
+            problems.append(f"student {pk}: snapshot at #{sequence} has no matching entry")
+    for pk in sorted(balances.keys() | replayed.keys()):
+        expected = replayed.get(pk, (ZERO, 0))
+        if balances.get(pk) != expected:
+            balance, sequence = balances.get(pk, (None, None))
+            problems.append(
+                f"student {pk}: balance {balance} at #{sequence}, entries sum to {expected[0]} at #{expected[1]}"
+            )
+    return checked, problems
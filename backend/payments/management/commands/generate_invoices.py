@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from payments.invoicing import start_invoice_run
+from payments.models import FeeSchedule
+
+
+class Command(BaseCommand):
+    help = "Invoice every enrolled student from the current version of a fee schedule"
+
+    def add_arguments(self, parser):
+        parser.add_argument("schedule_id", type=int, help="ID of the fee schedule")
+        parser.add_argument("--shards", type=int, help="Split the run over this many tasks (default: INVOICE_SHARDS)")
+        parser.add_argument("--background", action="store_true", help="Queue the shards on Celery instead of running them here")
+        parser.add_argument(
+            "--force", action="store_true", help="Restart a run left running by workers that died"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            schedule = FeeSchedule.all_objects.select_related("term").get(id=options["schedule_id"])
+        except FeeSchedule.DoesNotExist:
+            raise CommandError(f"❌ Fee schedule {options['schedule_id']} does not exist")
+
+        try:
+            run = start_invoice_run(
+                schedule, shards=options["shards"], inline=not options["background"], force=options["force"]
+            )
+        except Exception as exc:
+            raise CommandError(f"❌ Invoice run failed: {exc}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Invoice run #{run.pk} ({schedule} v{run.schedule_version}) {run.status.lower()}: "
+            f"{run.invoiced_students} invoiced, {run.processed_students}/{run.total_students} processed"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from payments.ledger import reconcile
+
+
+class Command(BaseCommand):
+    help = "Check running balances, snapshots and current balances against the raw ledger entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Only this organization id")
+
+    def handle(self, *args, **options):
+        checked, problems = reconcile(options["organization"])
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems:
+            raise CommandError(f"❌ {len(problems)} ledger problem(s) found in {checked} entries")
+        self.stdout.write(self.style.SUCCESS(f"✅ Ledger reconciled: {checked} entries checked"))
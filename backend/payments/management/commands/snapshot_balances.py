@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from payments.ledger import take_snapshots
+
+
+class Command(BaseCommand):
+    help = "Snapshot every fee balance that changed since its last snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Only this organization id")
+
+    def handle(self, *args, **options):
+        taken = take_snapshots(options["organization"])
+        self.stdout.write(self.style.SUCCESS(f"✅ {taken} balance snapshot(s) taken"))
@@ -1,3 +1,213 @@
+# payments/models.py
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from core.managers import OrganizationManager
+from users.models import Organization, StudentProfile
+
+
+class LedgerEntry(models.Model):
+    """
+    One line of a student's fee ledger. Entries are append-only: a mistake
+    is corrected with an ADJUSTMENT, never by editing or deleting a line.
+
+    `amount` is signed from the school's side: positive adds to what the
+    student owes (invoices), negative reduces it (payments). `sequence`
+    numbers a student's entries from 1 and `balance_after` is the running
+    balance once this entry is applied; both are set by payments.ledger.
+    """
+
+    class Kind(models.TextChoices):
+        INVOICE = "INVOICE", "Invoice"
+        PAYMENT = "PAYMENT", "Payment"
+        ADJUSTMENT = "ADJUSTMENT", "Adjustment"
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="ledger_entries")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="ledger_entries")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="ledger_entries")
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    sequence = models.PositiveIntegerField()
+    balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    reference = models.CharField(max_length=64, blank=True)  # invoice or receipt number
+    description = models.CharField(max_length=255, blank=True)
+    recorded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["student", "sequence"]
+        constraints = [
+            models.UniqueConstraint(fields=["student", "sequence"], name="unique_ledger_sequence")
+        ]
+        indexes = [models.Index(fields=["organization", "term", "kind"])]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Ledger entries are append-only; post an adjustment instead.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ledger entries are append-only; post an adjustment instead.")
+
+    def __str__(self):
+        return f"{self.student} #{self.sequence} {self.kind} {self.amount}"
+
+
+class StudentBalance(models.Model):
+    """
+    A student's current balance: the `balance_after` of their latest entry,
+    kept up to date as entries are posted so reading it is one row.
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="student_balances")
+    student = models.OneToOneField(StudentProfile, on_delete=models.CASCADE, related_name="fee_balance")
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    sequence = models.PositiveIntegerField(default=0)  # of the latest entry applied
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    def __str__(self):
+        return f"{self.student}: {self.balance}"
+
+
+class BalanceSnapshot(models.Model):
+    """
+    A student's balance as of their entry `sequence`, taken periodically.
+    Reconciliation checks each one against the sum of the raw entries.
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="balance_snapshots")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="balance_snapshots")
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    sequence = models.PositiveIntegerField()
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["student", "-sequence"]
+        constraints = [
+            models.UniqueConstraint(fields=["student", "sequence"], name="unique_balance_snapshot")
+        ]
+
+    def __str__(self):
+        return f"{self.student} @{self.sequence}: {self.balance}"
+
+
+class FeeSchedule(models.Model):
+    """
+    A term's fees, e.g. "2025/2026 First Term fees". `version` moves on
+    whenever its items change; invoicing is idempotent per version.
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="fee_schedules")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="fee_schedules")
+    name = models.CharField(max_length=100)
+    version = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        unique_together = ("organization", "term", "name")
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class FeeItem(models.Model):
+    """One fee of a schedule, charged to every class or only to `school_class`."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="fee_items")
+    schedule = models.ForeignKey(FeeSchedule, on_delete=models.CASCADE, related_name="items")
+    name = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    school_class = models.ForeignKey(
+        "academics.Class", on_delete=models.CASCADE, null=True, blank=True, related_name="fee_items"
+    )  # None = every class
+    position = models.PositiveSmallIntegerField(default=0)  # order on invoices
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["position", "id"]
+
+    def __str__(self):
+        return f"{self.name}: {self.amount}"
+
+
+class Invoice(models.Model):
+    """A student's bill from one version of a fee schedule; its ledger entry carries `number` as reference."""
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="invoices")
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="invoices")
+    term = models.ForeignKey("academics.Term", on_delete=models.CASCADE, related_name="invoices")
+    schedule = models.ForeignKey(FeeSchedule, on_delete=models.CASCADE, related_name="invoices")
+    schedule_version = models.PositiveIntegerField()
+    school_class = models.ForeignKey("academics.Class", on_delete=models.CASCADE, related_name="invoices")
+    number = models.CharField(max_length=64, unique=True)
+    lines = models.JSONField(default=list)  # [{"name": ..., "amount": "15000.00"}]
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["schedule", "schedule_version", "student"], name="unique_invoice_per_version")
+        ]
+
+    def __str__(self):
+        return f"{self.number}: {self.total}"
+
+
+class InvoiceRun(models.Model):
+    """Bulk invoicing of every enrolled student for one version of a fee schedule, split over shards."""
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        COMPLETED = "COMPLETED", "Completed"
+        FAILED = "FAILED", "Failed"
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="invoice_runs")
+    schedule = models.ForeignKey(FeeSchedule, on_delete=models.CASCADE, related_name="runs")
+    schedule_version = models.PositiveIntegerField()
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="invoice_runs"
+    )
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    total_shards = models.PositiveSmallIntegerField(default=1)
+    completed_shards = models.PositiveSmallIntegerField(default=0)
+    total_students = models.PositiveIntegerField(default=0)
+    processed_students = models.PositiveIntegerField(default=0)
+    invoiced_students = models.PositiveIntegerField(default=0)  # new invoices; the rest were already billed
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OrganizationManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["schedule", "schedule_version"], name="unique_invoice_run_per_version")
+        ]
+
+    @property
+    def progress(self):
+        """Percentage of enrolled students processed."""
+        if not self.total_students:
+            return 100.0 if self.status == self.Status.COMPLETED else 0.0
+        return round(self.processed_students / self.total_students * 100, 1)
 
-# Create your models here.
+    def __str__(self):
+        return f"Invoice run #{self.pk} - {self.schedule} ({self.status})"
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .invoicing import bump_schedule_version
+from .models import FeeItem
+
+
+@receiver([post_save, post_delete], sender=FeeItem)
+def bump_fee_schedule(sender, instance, **kwargs):
+    """Changed items make a new schedule version, so the next run bills (or credits) the difference."""
+    bump_schedule_version(instance.schedule_id)
@@ -0,0 +1,25 @@
+from celery import shared_task
+from .ledger import take_snapshots
+
+
+@shared_task
+def snapshot_balances_task():
+    """
+    Celery beat task to snapshot every fee balance that changed since its last snapshot.
+    """
+    return take_snapshots()
+
+
+@shared_task
+def invoice_shard_task(run_id, shard, shards):
+    """
+    Celery task to bill one shard of students for an InvoiceRun.
+    """
+    from .invoicing import invoice_shard
+    from .models import InvoiceRun
+
+    try:
+        run = InvoiceRun.all_objects.get(pk=run_id)
+    except InvoiceRun.DoesNotExist:
+        return
+    return invoice_shard(run, shard, shards)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2025-08-10 09:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('academics', '0007_classsessionassignment'),
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentEnrollment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_enrolled', models.DateField(default=django.utils.timezone.localdate)),
+                ('class_assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='academics.classsessionassignment')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_enrollments', to='users.organization')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='users.studentprofile')),
+            ],
+            options={
+                'unique_together': {('organization', 'student', 'class_assignment')},
+            },
+        ),
+    ]
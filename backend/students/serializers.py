@@ -1,14 +1,20 @@
 from rest_framework import serializers
+from core.serializers import FlexFieldsMixin
 from users.models import Membership, StudentProfile
 
 
-class StudentProfileSerializer(serializers.ModelSerializer):
+class StudentProfileSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     membership_id = serializers.PrimaryKeyRelatedField(
         queryset=Membership.objects.all(), source="membership", write_only=True
     )
     student_email = serializers.EmailField(source="membership.user.email", read_only=True)
     student_name = serializers.SerializerMethodField()
 
+    field_relations = {
+        "student_email": "membership__user",
+        "student_name": "membership__user",
+    }
+
     class Meta:
         model = StudentProfile
         fields = [
@@ -9,13 +9,16 @@ from core.permissions import (
     IsStudentSelfOnly,
     any_of
 )
+from core.pagination import KeysetPagination
+from core.serializers import FlexFieldsViewMixin
 from users.models import StudentProfile, Membership
 from .serializers import StudentProfileSerializer
 
 
-class StudentProfileViewSet(viewsets.ModelViewSet):
+class StudentProfileViewSet(FlexFieldsViewMixin, viewsets.ModelViewSet):
     queryset = StudentProfile.objects.all()
     serializer_class = StudentProfileSerializer
+    pagination_class = KeysetPagination
     permission_classes = [
         any_of(
             IsAdminOrPrincipal, 
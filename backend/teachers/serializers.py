@@ -1,13 +1,19 @@
 from rest_framework import serializers
+from core.serializers import FlexFieldsMixin
 from users.models import TeacherProfile, Membership
 
 
-class TeacherProfileSerializer(serializers.ModelSerializer):
+class TeacherProfileSerializer(FlexFieldsMixin, serializers.ModelSerializer):
     # Show teacher’s name and email from Membership → User
     email = serializers.EmailField(source="membership.user.email", read_only=True)
     first_name = serializers.CharField(source="membership.user.first_name", read_only=True)
     last_name = serializers.CharField(source="membership.user.last_name", read_only=True)
 
+    field_relations = {
+        "email": "membership__user",
+        "first_name": "membership__user",
+        "last_name": "membership__user",
+    }
 
     membership_id = serializers.PrimaryKeyRelatedField(
         source="membership",
@@ -6,10 +6,11 @@ from .serializers import (
     TeacherProfileCreateSerializer
 )
 from core.permissions import IsAdminOrPrincipal,any_of
+from core.serializers import FlexFieldsViewMixin
 from .permissions import IsTeacherSelfOnly
 
 
-class TeacherProfileViewSet(viewsets.ModelViewSet):
+class TeacherProfileViewSet(FlexFieldsViewMixin, viewsets.ModelViewSet):
     """
     CRUD API for Teacher Profiles
     """
@@ -1,6 +1,21 @@
+from datetime import date
+
 import pytest
 from rest_framework.test import APIClient
-from users.models import Organization
+
+from academics.models import AcademicSession, Term
+from core.utils import set_current_organization
+from grades.models import AssessmentComponent, Score
+from tests.utils import create_class_subject, create_school_class, create_subject, create_user_with_role
+from users.models import Membership, Organization, StudentProfile
+
+
+@pytest.fixture(autouse=True)
+def clear_current_organization():
+    """Don't let one test's tenant leak into the next through the thread-local."""
+    set_current_organization(None)
+    yield
+    set_current_organization(None)
 
 
 @pytest.fixture
@@ -13,3 +28,48 @@ def api_client():
 def organization(db):
     """Creates a test organization for use in tests."""
     return Organization.objects.create(name="Test School")
+
+
+@pytest.fixture
+def term(organization):
+    """First term of the 2025/2026 session."""
+    session = AcademicSession.objects.create(
+        organization=organization, name="2025/2026", start_date=date(2025, 9, 1), end_date=date(2026, 7, 31)
+    )
+    return Term.objects.create(
+        organization=organization, session=session, name="FIRST",
+        start_date=date(2025, 9, 1), end_date=date(2025, 12, 15),
+    )
+
+
+@pytest.fixture
+def gradebook(organization, term):
+    """
+    JSS1A taking Maths and English with CA (40%, out of 20) and Exam (60%)
+    marks for ada, ben and cal. Returns (class, maths, english, students).
+    """
+    school_class = create_school_class(organization=organization)
+    maths = create_class_subject(school_class, create_subject("Maths", "MTH", organization), organization=organization)
+    english = create_class_subject(school_class, create_subject("English", "ENG", organization), organization=organization)
+    ca = AssessmentComponent.objects.create(organization=organization, term=term, name="CA", weight=40, max_score=20)
+    exam = AssessmentComponent.objects.create(organization=organization, term=term, name="Exam", weight=60)
+
+    students = []
+    for name in ("ada", "ben", "cal"):
+        user = create_user_with_role(f"{name}@school.com", Membership.RoleChoices.STUDENT, organization)
+        students.append(StudentProfile.objects.create(membership=user.memberships.get()))
+
+    marks = {  # student: {subject: (CA out of 20, exam out of 100)}
+        students[0]: {maths: (20, 80), english: (10, 50)},  # 88, 50
+        students[1]: {maths: (15, 70), english: (18, 90)},  # 72, 90
+        students[2]: {maths: (20, None)},                   # 40 (blank exam), no English
+    }
+    for student, subjects in marks.items():
+        for class_subject, (ca_mark, exam_mark) in subjects.items():
+            for component, mark in ((ca, ca_mark), (exam, exam_mark)):
+                if mark is not None:
+                    Score.objects.create(
+                        organization=organization, student=student, class_subject=class_subject,
+                        term=term, component=component, value=mark,
+                    )
+    return school_class, maths, english, students
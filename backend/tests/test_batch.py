@@ -0,0 +1,78 @@
+import pytest
+from rest_framework.test import APIClient
+
+from academics.models import Class
+from core.authentication import OrganizationJWTAuthentication
+from tests.utils import create_user_with_role, login
+from users.models import Membership, Organization
+
+
+@pytest.fixture
+def admin_client(db):
+    organization = Organization.objects.create(name="Batch School")
+    create_user_with_role("admin@batch.com", Membership.RoleChoices.ADMIN, organization)
+    Class.objects.create(organization=organization, name="Grade 5", section="A")
+    client = APIClient()
+    login(client, "admin@batch.com", "testpass123", organization.id)
+    return client
+
+
+def _batch(client, requests):
+    return client.post("/api/batch/", {"requests": requests}, format="json")
+
+
+def test_sub_requests_run_in_order_with_one_authentication(admin_client, settings, monkeypatch):
+    settings.BATCH_MAX_WORKERS = 1
+    calls = []
+    authenticate = OrganizationJWTAuthentication.authenticate
+    monkeypatch.setattr(
+        OrganizationJWTAuthentication, "authenticate",
+        lambda self, request: calls.append(request.path) or authenticate(self, request),
+    )
+
+    response = _batch(admin_client, [
+        {"id": "classes", "path": "/api/academics/classes/"},
+        {"id": "new", "method": "POST", "path": "/api/academics/subjects/", "body": {"name": "Maths", "code": "MTH"}},
+        {"id": "subjects", "path": "/api/academics/subjects/?fields=name"},
+        {"id": "missing", "path": "/api/academics/nothing-here/"},
+    ])
+
+    assert response.status_code == 200
+    items = {item["id"]: item for item in response.data["responses"]}
+    assert [item["id"] for item in response.data["responses"]] == ["classes", "new", "subjects", "missing"]
+    assert items["classes"]["status"] == 200 and items["classes"]["body"][0]["name"] == "Grade 5"
+    assert items["new"]["status"] == 201
+    assert items["subjects"]["body"] == [{"name": "Maths"}]
+    assert items["missing"]["status"] == 404
+    assert calls == ["/api/batch/"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_run_concurrently(settings):
+    settings.BATCH_MAX_WORKERS = 4
+    organization = Organization.objects.create(name="Parallel School")
+    create_user_with_role("admin@parallel.com", Membership.RoleChoices.ADMIN, organization)
+    Class.objects.create(organization=organization, name="Grade 6")
+    client = APIClient()
+    login(client, "admin@parallel.com", "testpass123", organization.id)
+
+    response = _batch(client, [{"path": "/api/academics/classes/"}] * 3)
+
+    assert [item["status"] for item in response.data["responses"]] == [200, 200, 200]
+    assert all(item["body"][0]["name"] == "Grade 6" for item in response.data["responses"])
+
+
+@pytest.mark.parametrize("requests", [
+    [],
+    [{"path": "/admin/"}],
+    [{"path": "/api/batch/"}],
+    [{"path": "/api/academics/classes/", "method": "TRACE"}],
+    [{"path": "/api/academics/classes/"}] * 21,
+])
+def test_malformed_batches_are_rejected(admin_client, requests):
+    assert _batch(admin_client, requests).status_code == 400
+
+
+@pytest.mark.django_db
+def test_batch_requires_authentication():
+    assert _batch(APIClient(), [{"path": "/api/academics/classes/"}]).status_code == 401
@@ -0,0 +1,120 @@
+import csv
+import io
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.models import ClassSessionAssignment
+from grades.broadsheet import build_broadsheet
+from grades.engine import compute_class_results
+from grades.models import GradebookVersion, Score
+from tests.utils import create_school_class, create_teacher_with_profile, create_user_with_role, login
+from users.models import Membership, Organization
+
+
+@pytest.fixture
+def principal_client(api_client, organization):
+    create_user_with_role("head@school.com", Membership.RoleChoices.PRINCIPAL, organization)
+    login(api_client, "head@school.com", "testpass123", organization.id)
+    return api_client
+
+
+@pytest.mark.django_db
+def test_broadsheet_is_columnar_and_built_in_six_queries(gradebook, term):
+    school_class, maths, english, (ada, ben, cal) = gradebook
+    compute_class_results(school_class, term)
+
+    with CaptureQueriesContext(connection) as queries:
+        sheet = build_broadsheet(school_class, term)
+
+    assert len(queries) == 6
+    assert sheet["shape"] == [3, 2, 2]
+    assert sheet["students"]["id"] == [ada.pk, ben.pk, cal.pk]
+    assert sheet["subjects"]["name"] == ["English", "Maths"] and sheet["components"]["name"] == ["CA", "Exam"]
+    assert sheet["scores"] == [
+        10.0, 50.0, 20.0, 80.0,  # ada: English CA, Exam, Maths CA, Exam
+        18.0, 90.0, 15.0, 70.0,  # ben
+        None, None, 20.0, None,  # cal: no English, blank Maths exam
+    ]
+    assert sheet["subject_results"]["total"] == [50.0, 88.0, 90.0, 72.0, None, 40.0]
+    assert sheet["subject_results"]["position"] == [2, 1, 1, 2, None, 3]
+    assert sheet["term_results"]["position"] == [2, 1, 3]
+
+
+@pytest.mark.django_db
+def test_broadsheet_is_cached_until_the_gradebook_changes(
+    principal_client, gradebook, term, django_capture_on_commit_callbacks
+):
+    school_class, maths, _, (ada, _, _) = gradebook
+    url = f"/api/grades/broadsheet/?school_class={school_class.pk}&term={term.pk}"
+
+    first = principal_client.get(url)
+    assert first.status_code == 200 and first.data["version"] == 0
+    with CaptureQueriesContext(connection) as queries:
+        cached = principal_client.get(url)
+    assert cached.data == first.data
+    assert not any("grades_score" in query["sql"] for query in queries.captured_queries)
+
+    assert principal_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Score.objects.filter(student=ada, class_subject=maths, component__name="CA").update(value=5)
+        Score.objects.get(student=ada, class_subject=maths, component__name="CA").save()
+
+    changed = principal_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert changed.status_code == 200 and changed.data["version"] == 1
+    assert changed.data["scores"][2] == 5.0
+    assert changed["ETag"] != first["ETag"]
+
+
+@pytest.mark.django_db
+def test_broadsheet_streams_csv(principal_client, gradebook, term):
+    school_class = gradebook[0]
+    compute_class_results(school_class, term)
+
+    response = principal_client.get(
+        f"/api/grades/broadsheet/export/?school_class={school_class.pk}&term={term.pk}"
+    )
+
+    assert response.status_code == 200 and response["ETag"]
+    rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode("utf-8-sig"))))
+    assert rows[0][:8] == [
+        "Admission No.", "Student", "English CA", "English Exam", "English Total", "English Grade",
+        "English Position", "Maths CA",
+    ]
+    assert rows[3][2:7] == ["", "", "", "", ""]  # cal took no English
+    assert rows[3][-3:] == ["40.0", "E", "3"]
+
+
+@pytest.mark.django_db
+def test_broadsheet_rejects_another_organizations_class(principal_client, term):
+    other = Organization.objects.create(name="Other School")
+    school_class = create_school_class(organization=other)
+
+    response = principal_client.get(f"/api/grades/broadsheet/?school_class={school_class.pk}&term={term.pk}")
+
+    assert response.status_code == 400 and "school_class" in response.data
+    assert not GradebookVersion.all_objects.exists()
+
+
+@pytest.mark.django_db
+def test_teachers_only_see_classes_they_teach(api_client, organization, gradebook, term):
+    school_class, maths, _, _ = gradebook
+    url = f"/api/grades/broadsheet/?school_class={school_class.pk}&term={term.pk}"
+    subject_teacher = create_teacher_with_profile("maths@school.com", organization, employee_id="T1")
+    form_teacher = create_teacher_with_profile("form@school.com", organization, employee_id="T2")
+    create_teacher_with_profile("other@school.com", organization, employee_id="T3")
+    maths.teacher = subject_teacher
+    maths.save()
+    ClassSessionAssignment.objects.create(
+        organization=organization, class_ref=school_class, session=term.session, form_teacher=form_teacher
+    )
+
+    for email in ("maths@school.com", "form@school.com"):
+        login(api_client, email, "testpass123", organization.id)
+        assert api_client.get(url).status_code == 200
+
+    login(api_client, "other@school.com", "testpass123", organization.id)
+    assert api_client.get(url).status_code == 403
+    assert api_client.get(url.replace("/?", "/export/?")).status_code == 403
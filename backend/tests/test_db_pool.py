@@ -0,0 +1,53 @@
+import pytest
+
+from core import db_pool
+
+
+class FakePool:
+    def get_stats(self):
+        return {"pool_size": 4, "pool_available": 1, "requests_waiting": 2, "requests_wait_ms": 350}
+
+
+def test_pool_mode_is_sized_per_process_type(monkeypatch):
+    monkeypatch.setenv("POSTGRES_DB", "school")
+    web = db_pool.postgres_database("web", "pool")
+    worker = db_pool.postgres_database("worker", "pool")
+
+    assert web["CONN_MAX_AGE"] == 0 and web["CONN_HEALTH_CHECKS"] is True
+    assert web["OPTIONS"]["pool"]["max_size"] == db_pool.pool_sizes()["web"][1]
+    assert worker["OPTIONS"]["pool"]["max_size"] == db_pool.pool_sizes()["worker"][1]
+    assert worker["OPTIONS"]["application_name"] == "school-worker"
+
+
+@pytest.mark.parametrize("batch_workers, max_size", [("4", 12), ("1", 8)])
+def test_web_pool_covers_request_and_batch_threads(monkeypatch, batch_workers, max_size):
+    monkeypatch.setenv("GUNICORN_THREADS", "8")
+    monkeypatch.setenv("BATCH_MAX_WORKERS", batch_workers)
+    monkeypatch.delenv("DB_POOL_MAX_SIZE", raising=False)
+
+    web = db_pool.postgres_database("web", "pool")
+
+    # One connection per request thread, plus one per shared batch thread
+    # (none when batches run inline in the request thread).
+    assert web["OPTIONS"]["pool"]["max_size"] == max_size
+
+
+def test_pgbouncer_mode_uses_persistent_connections_without_server_cursors(monkeypatch):
+    monkeypatch.setenv("PGBOUNCER_HOST", "bouncer")
+    database = db_pool.postgres_database("web", "pgbouncer")
+
+    assert "pool" not in database["OPTIONS"]
+    assert database["HOST"] == "bouncer" and database["DISABLE_SERVER_SIDE_CURSORS"] is True
+    assert database["CONN_MAX_AGE"] > 0 and database["CONN_HEALTH_CHECKS"] is True
+
+    with pytest.raises(ValueError):
+        db_pool.postgres_database("web", "bogus")
+
+
+def test_pool_metrics_render_as_gauges(monkeypatch):
+    assert db_pool.render_pool_metrics() == ""  # SQLite: no pools
+
+    monkeypatch.setattr(db_pool, "_pools", lambda: iter([("default", FakePool())]))
+    text = db_pool.render_pool_metrics()
+    assert "# TYPE db_pool_requests_wait_ms gauge" in text
+    assert 'db_pool_requests_waiting{alias="default",pid="' in text
@@ -0,0 +1,70 @@
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.db_routers import ReplicaRouter, ReplicaRoutingMiddleware, use_primary, use_replica
+from users.models import User
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    settings.REPLICA_STICKY_SECONDS = 30
+    cache.clear()
+    yield "replica"
+    cache.clear()
+
+
+def _bearer(user_id, organization_id):
+    token = AccessToken()
+    token["user_id"] = user_id
+    token["organization_id"] = organization_id
+    return f"Bearer {token}"
+
+
+def test_router_reads_from_replica_until_a_write(replica):
+    router = ReplicaRouter()
+    assert router.db_for_read(User) == "default"  # outside any request
+
+    with use_replica():
+        assert router.db_for_read(User) == "replica"
+        assert router.db_for_write(User) == "default"
+        assert router.db_for_read(User) == "default"
+
+    with use_primary():
+        assert router.db_for_read(User) == "default"
+
+
+def test_writer_sticks_to_primary_per_user_and_org(replica):
+    router = ReplicaRouter()
+    seen = []
+
+    def view(request):
+        seen.append(router.db_for_read(User))
+        if request.method == "POST":
+            router.db_for_write(User)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    factory = RequestFactory()
+    teacher = _bearer(1, 10)
+
+    middleware(factory.get("/api/attendance/weekly-summaries/", HTTP_AUTHORIZATION=teacher))
+    middleware(factory.post("/api/attendance/records/", HTTP_AUTHORIZATION=teacher))
+    middleware(factory.get("/api/attendance/weekly-summaries/", HTTP_AUTHORIZATION=teacher))
+    middleware(factory.get("/api/attendance/weekly-summaries/", HTTP_AUTHORIZATION=_bearer(1, 11)))
+    middleware(factory.get("/api/attendance/weekly-summaries/", HTTP_AUTHORIZATION=_bearer(2, 10)))
+
+    assert seen == ["replica", "default", "default", "replica", "replica"]
+
+
+def test_streamed_responses_keep_request_routing(replica):
+    router = ReplicaRouter()
+
+    def view(request):
+        return StreamingHttpResponse(router.db_for_read(User).encode() for _ in range(2))
+
+    response = ReplicaRoutingMiddleware(view)(RequestFactory().get("/api/attendance/exports/register/"))
+    assert b"".join(response.streaming_content) == b"replicareplica"
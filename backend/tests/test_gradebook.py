@@ -0,0 +1,84 @@
+import io
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from grades.engine import assign_grades, column_statistics, competition_rank, compute_class_results
+from grades.models import ClassResultSummary, Score, SubjectResult, SubjectResultSummary, TermResult
+
+
+def test_competition_rank_shares_positions_and_skips():
+    values = np.array([[70, 50], [90, np.nan], [80, 50], [80, 60], [60, 40]], dtype=float)
+    assert competition_rank(values).tolist() == [[4, 2], [1, 0], [2, 2], [2, 1], [5, 4]]
+    assert competition_rank(np.array([55.5, 55.5, 55.5])).tolist() == [1, 1, 1]
+
+
+def test_assign_grades_uses_the_lowest_total_of_each_band():
+    totals = np.array([70, 69.99, 45, 39.5, 0, np.nan])
+    scale = (("A", 70), ("B", 60), ("D", 45), ("E", 40), ("F", 0))
+    assert assign_grades(totals, scale).tolist() == ["A", "B", "D", "F", "F", ""]
+
+
+def test_column_statistics_ignore_subjects_not_taken():
+    values = np.array([[10, np.nan], [20, 5], [60, np.nan]])
+    count, mean, std_dev, highest, lowest = column_statistics(values)
+    assert count.tolist() == [3, 1]
+    assert mean == pytest.approx([30, 5])
+    assert std_dev == pytest.approx([np.nanstd(values[:, 0]), 0])
+    assert highest.tolist() == [60, 5] and lowest.tolist() == [10, 5]
+
+
+@pytest.mark.django_db
+def test_class_results(gradebook, term):
+    school_class, maths, english, (ada, ben, cal) = gradebook
+
+    assert compute_class_results(school_class, term) == 3
+
+    results = {
+        (r.student_id, r.class_subject_id): (r.total, r.grade, r.position)
+        for r in SubjectResult.all_objects.all()
+    }
+    assert results == {
+        (ada.pk, maths.pk): (Decimal("88.00"), "A", 1),
+        (ben.pk, maths.pk): (Decimal("72.00"), "A", 2),
+        (cal.pk, maths.pk): (Decimal("40.00"), "E", 3),
+        (ada.pk, english.pk): (Decimal("50.00"), "C", 2),
+        (ben.pk, english.pk): (Decimal("90.00"), "A", 1),
+    }
+
+    term_results = {r.student_id: r for r in TermResult.all_objects.all()}
+    assert term_results[ben.pk].average == Decimal("81.00") and term_results[ben.pk].position == 1
+    assert term_results[ada.pk].average == Decimal("69.00") and term_results[ada.pk].grade == "B"
+    assert term_results[cal.pk].subjects_taken == 1 and term_results[cal.pk].position == 3
+
+    maths_summary = SubjectResultSummary.all_objects.get(class_subject=maths)
+    assert (maths_summary.students, maths_summary.average, maths_summary.highest, maths_summary.lowest) == (
+        3, Decimal("66.67"), Decimal("88.00"), Decimal("40.00")
+    )
+    assert maths_summary.std_dev == Decimal(f"{np.std([88, 72, 40]):.2f}")
+    assert ClassResultSummary.all_objects.get(school_class=school_class).average == Decimal("63.33")
+
+
+@pytest.mark.django_db
+def test_recompute_removes_stale_results(gradebook, term):
+    school_class, maths, english, (ada, ben, cal) = gradebook
+    compute_class_results(school_class, term)
+
+    Score.all_objects.filter(student=cal).delete()
+    Score.all_objects.filter(student=ada, class_subject=english).delete()
+    compute_class_results(school_class, term)
+
+    assert not TermResult.all_objects.filter(student=cal).exists()
+    assert not SubjectResult.all_objects.filter(student=ada, class_subject=english).exists()
+    assert SubjectResultSummary.all_objects.get(class_subject=english).students == 1
+    assert TermResult.all_objects.get(student=ada).position == 1  # 88 beats ben's 81
+
+
+@pytest.mark.django_db
+def test_compute_results_command(gradebook, term):
+    out = io.StringIO()
+    call_command("compute_results", term.id, stdout=out)
+    assert "3 student(s) in 1 class(es)" in out.getvalue()
+    assert TermResult.all_objects.count() == 3
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from django.test import Client
+
+from health import views
+
+
+class FakeRedis:
+    def __init__(self, fail=False, delay=0, depth=0):
+        self.fail, self.delay, self.depth = fail, delay, depth
+        self.pings = 0
+
+    def ping(self):
+        self.pings += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("Connection refused")
+        return True
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def llen(self, queue):
+        pass
+
+    def execute(self):
+        return [self.depth]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch, settings):
+    settings.HEALTH_CACHE_SECONDS = 60
+    settings.HEALTH_TIME_BUDGET = 0.5
+    views._cache.clear()
+    client = FakeRedis()
+    monkeypatch.setattr(views, "get_redis", lambda url=None: client)
+    yield client
+    views._cache.clear()
+
+
+def test_liveness_touches_no_backend(fake_redis):
+    # No django_db mark: any query would raise.
+    fake_redis.fail = True
+    response = Client().get("/health/")
+    assert response.status_code == 200 and response.json() == {"status": "ok"}
+    assert fake_redis.pings == 0
+
+
+@pytest.mark.django_db
+def test_readiness_is_cached_between_probes(fake_redis):
+    client = Client()
+    first = client.get("/health/ready/")
+    second = client.get("/health/ready/")
+
+    assert first.status_code == 200
+    assert first.json()["checks"] == {"database": {"status": "ok"}, "redis": {"status": "ok"}}
+    assert second.json() == first.json()
+    assert fake_redis.pings == 1
+
+
+@pytest.mark.django_db
+def test_readiness_fails_when_redis_is_down(fake_redis):
+    fake_redis.fail = True
+    response = Client().get("/health/ready/")
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["redis"] == {"status": "error", "error": "Connection refused"}
+
+
+@pytest.mark.django_db
+def test_deep_probe_reports_queue_depth_within_budget(fake_redis, settings):
+    settings.HEALTH_QUEUE_WARN_DEPTH = 10
+    fake_redis.depth = 25
+    deep = Client().get("/health/ready/", {"deep": "1"}).json()
+    assert deep["status"] == "degraded"
+    assert deep["checks"]["celery"] == {"status": "degraded", "depth": {"celery": 25}}
+    assert deep["checks"]["db_pool"] == {"status": "ok", "pools": {}}
+
+    views._cache.clear()
+    fake_redis.delay = 2
+    start = time.monotonic()
+    slow = Client().get("/health/ready/", {"deep": "1"})
+    assert time.monotonic() - start < 1.5
+    assert slow.status_code == 503
+    assert slow.json()["checks"]["redis"]["error"] == "timed out after 0.5s"
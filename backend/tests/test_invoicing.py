@@ -0,0 +1,159 @@
+import io
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.models import ClassSessionAssignment
+from payments import tasks
+from payments.invoicing import invoice_shard, start_invoice_run
+from payments.ledger import current_balance, reconcile
+from payments.models import FeeItem, FeeSchedule, Invoice, InvoiceRun, LedgerEntry
+from students.models import StudentEnrollment
+from tests.utils import create_school_class, create_user_with_role
+from users.models import Membership, StudentProfile
+
+
+@pytest.fixture
+def school(organization, term, settings):
+    """Two classes of the term's session: JSS1A with 3 students, JSS2A with 2."""
+    settings.INVOICE_CHUNK_SIZE = 2
+    classes, students = [], []
+    for name, size in (("JSS1A", 3), ("JSS2A", 2)):
+        school_class = create_school_class(name=name, organization=organization)
+        class_assignment = ClassSessionAssignment.objects.create(
+            organization=organization, class_ref=school_class, session=term.session
+        )
+        for index in range(size):
+            user = create_user_with_role(f"{name.lower()}-{index}@school.com", Membership.RoleChoices.STUDENT, organization)
+            student = StudentProfile.objects.create(membership=user.memberships.get())
+            StudentEnrollment.objects.create(organization=organization, student=student, class_assignment=class_assignment)
+            students.append(student)
+        classes.append(school_class)
+    return classes, students
+
+
+@pytest.fixture
+def schedule(organization, term, school):
+    schedule = FeeSchedule.objects.create(organization=organization, term=term, name="First Term fees")
+    FeeItem.objects.create(organization=organization, schedule=schedule, name="Tuition", amount=50000)
+    FeeItem.objects.create(
+        organization=organization, schedule=schedule, name="Lab fee", amount=5000, school_class=school[0][1], position=1
+    )
+    schedule.refresh_from_db()
+    return schedule
+
+
+@pytest.mark.django_db
+def test_run_invoices_every_enrolled_student_once(schedule, school):
+    jss1, jss2 = school[0]
+    students = school[1]
+
+    run = start_invoice_run(schedule, shards=3, inline=True)
+
+    assert (run.status, run.total_students, run.processed_students, run.invoiced_students) == ("COMPLETED", 5, 5, 5)
+    assert (run.completed_shards, run.progress) == (3, 100.0)
+    totals = dict(Invoice.objects.values_list("student_id", "total"))
+    assert totals == {
+        **{student.pk: Decimal("50000.00") for student in students[:3]},
+        **{student.pk: Decimal("55000.00") for student in students[3:]},
+    }
+    invoice = Invoice.objects.get(student=students[3])
+    assert invoice.school_class == jss2 and invoice.lines == [
+        {"name": "Tuition", "amount": "50000.00"}, {"name": "Lab fee", "amount": "5000.00"},
+    ]
+    entry = LedgerEntry.objects.get(student=students[3])
+    assert (entry.kind, entry.amount, entry.reference) == ("INVOICE", Decimal("55000.00"), invoice.number)
+    assert current_balance(students[3]) == Decimal("55000.00")
+
+    assert start_invoice_run(schedule, shards=3, inline=True) == run
+    assert Invoice.objects.count() == 5 and LedgerEntry.objects.count() == 5
+    assert reconcile() == (5, [])
+
+
+@pytest.mark.django_db
+def test_shard_queries_do_not_grow_per_student(schedule, settings):
+    settings.INVOICE_CHUNK_SIZE = 500
+    run = InvoiceRun.objects.create(
+        organization=schedule.organization, schedule=schedule, schedule_version=schedule.version, status="RUNNING"
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        assert invoice_shard(run) == 5
+
+    enrollment_queries = [q for q in queries.captured_queries if "students_studentenrollment" in q["sql"]]
+    assert len(enrollment_queries) == 1
+    assert len(queries) == 16  # 3 to load, 10 for the chunk (with savepoints), 3 for progress and completion
+
+
+@pytest.mark.django_db
+def test_failed_run_restarts_and_skips_students_already_billed(schedule, school):
+    run = start_invoice_run(schedule, shards=1, inline=True)
+    Invoice.objects.filter(student=school[1][0]).delete()
+    run.status = InvoiceRun.Status.FAILED
+    run.save()
+
+    rerun = start_invoice_run(schedule, shards=2, inline=True)
+
+    assert rerun.pk == run.pk and rerun.status == "COMPLETED"
+    assert (rerun.processed_students, rerun.invoiced_students) == (5, 1)
+    assert Invoice.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_stalled_run_restarts_only_when_forced(schedule, school):
+    run = start_invoice_run(schedule, shards=1, inline=True)
+    Invoice.objects.filter(student=school[1][0]).delete()
+    InvoiceRun.objects.filter(pk=run.pk).update(status=InvoiceRun.Status.RUNNING, completed_at=None)
+
+    assert start_invoice_run(schedule, shards=2, inline=True).status == "RUNNING"
+    assert Invoice.objects.count() == 4
+
+    out = io.StringIO()
+    call_command("generate_invoices", schedule.pk, shards=2, force=True, stdout=out)
+    assert "completed: 1 invoiced, 5/5 processed" in out.getvalue()
+    assert Invoice.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_revised_schedule_adjusts_the_difference(schedule, school):
+    students = school[1]
+    start_invoice_run(schedule, shards=2, inline=True)
+
+    tuition = FeeItem.objects.get(schedule=schedule, name="Tuition")
+    tuition.amount = 45000
+    tuition.save()
+    schedule.refresh_from_db()
+    run = start_invoice_run(schedule, shards=2, inline=True)
+
+    assert run.schedule_version == schedule.version and run.invoiced_students == 5
+    assert Invoice.objects.filter(student=students[0]).count() == 2
+    adjustment = LedgerEntry.objects.get(student=students[0], kind="ADJUSTMENT")
+    assert adjustment.amount == Decimal("-5000.00")
+    assert current_balance(students[0]) == Decimal("45000.00")
+    assert current_balance(students[3]) == Decimal("50000.00")
+
+
+@pytest.mark.django_db
+def test_background_run_queues_one_task_per_shard(schedule, monkeypatch, django_capture_on_commit_callbacks):
+    queued = []
+    monkeypatch.setattr(tasks.invoice_shard_task, "delay", lambda *args: queued.append(args))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        run = start_invoice_run(schedule, shards=2)
+    assert run.status == "RUNNING" and queued == [(run.pk, 0, 2), (run.pk, 1, 2)]
+
+    FeeItem.objects.create(organization=schedule.organization, schedule=schedule, name="PTA levy", amount=2000)
+    with pytest.raises(ValueError, match="Fee schedule changed"):
+        tasks.invoice_shard_task(*queued[0])
+    run.refresh_from_db()
+    assert run.status == "FAILED" and "start a new run" in run.error
+
+
+@pytest.mark.django_db
+def test_command_runs_the_schedule(schedule):
+    out = io.StringIO()
+    call_command("generate_invoices", schedule.pk, shards=2, stdout=out)
+    assert "completed: 5 invoiced, 5/5 processed" in out.getvalue()
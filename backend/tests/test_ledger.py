@@ -0,0 +1,133 @@
+import io
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.models import ClassSessionAssignment
+from payments.ledger import (
+    current_balance, outstanding_fees, post_entries, post_entry, reconcile, take_snapshots,
+)
+from payments.models import BalanceSnapshot, LedgerEntry, StudentBalance
+from students.models import StudentEnrollment
+from tests.utils import create_school_class, create_user_with_role
+from users.models import Membership, StudentProfile
+
+INVOICE, PAYMENT, ADJUSTMENT = LedgerEntry.Kind.values
+
+
+@pytest.fixture
+def students(organization):
+    profiles = []
+    for name in ("ada", "ben", "cal"):
+        user = create_user_with_role(f"{name}@school.com", Membership.RoleChoices.STUDENT, organization)
+        profiles.append(StudentProfile.objects.create(membership=user.memberships.get(), admission_number=name.upper()))
+    return profiles
+
+
+@pytest.mark.django_db
+def test_entries_carry_a_running_balance(students, term):
+    ada = students[0]
+
+    post_entry(ada, term, INVOICE, "50000.00", reference="INV-1")
+    post_entry(ada, term, PAYMENT, "30000")
+    entry = post_entry(ada, term, ADJUSTMENT, "-2500.50", description="Sibling discount")
+
+    assert (entry.sequence, entry.balance_after) == (3, Decimal("17499.50"))
+    assert list(LedgerEntry.objects.filter(student=ada).values_list("amount", "balance_after")) == [
+        (Decimal("50000.00"), Decimal("50000.00")),
+        (Decimal("-30000.00"), Decimal("20000.00")),
+        (Decimal("-2500.50"), Decimal("17499.50")),
+    ]
+    with CaptureQueriesContext(connection) as queries:
+        assert current_balance(ada) == Decimal("17499.50")
+    assert len(queries) == 1
+    assert current_balance(students[1]) == 0
+
+
+@pytest.mark.django_db
+def test_entries_are_append_only(students, term):
+    entry = post_entry(students[0], term, INVOICE, 100)
+
+    with pytest.raises(ValueError):
+        entry.save()
+    with pytest.raises(ValueError):
+        entry.delete()
+    with pytest.raises(ValueError):
+        post_entry(students[0], term, PAYMENT, -100)
+    assert current_balance(students[0]) == 100
+
+
+@pytest.mark.django_db
+def test_bulk_posting_applies_entries_in_order(students, term):
+    ada, ben, _ = students
+    entries = [
+        LedgerEntry(organization_id=term.organization_id, student=student, term=term, kind=kind, amount=amount)
+        for student, kind, amount in ((ada, INVOICE, 100), (ben, INVOICE, 80), (ada, PAYMENT, 60), (ben, INVOICE, 5))
+    ]
+
+    with CaptureQueriesContext(connection) as queries:
+        post_entries(entries)
+
+    assert len(queries) <= 6  # savepoint, balance rows, lock, entries, balances, release
+    assert [(entry.sequence, entry.balance_after) for entry in entries] == [(1, 100), (1, 80), (2, 40), (2, 85)]
+    assert dict(StudentBalance.objects.values_list("student_id", "balance")) == {ada.pk: 40, ben.pk: 85}
+
+
+@pytest.mark.django_db
+def test_outstanding_fees_for_a_class(organization, students, term):
+    ada, ben, cal = students
+    class_assignment = ClassSessionAssignment.objects.create(
+        organization=organization, class_ref=create_school_class(organization=organization), session=term.session
+    )
+    for student in students:
+        StudentEnrollment.objects.create(organization=organization, student=student, class_assignment=class_assignment)
+    post_entry(ada, term, INVOICE, 100)
+    post_entry(ben, term, INVOICE, 300)
+    post_entry(cal, term, INVOICE, 50)
+    post_entry(cal, term, PAYMENT, 50)
+
+    rows = outstanding_fees(class_assignment)
+
+    assert [(row[0], row[1], row[4]) for row in rows] == [(ben.pk, "BEN", 300), (ada.pk, "ADA", 100)]
+
+
+@pytest.mark.django_db
+def test_snapshots_only_changed_balances_and_reconcile(students, term):
+    ada, ben, _ = students
+    post_entry(ada, term, INVOICE, 100)
+    post_entry(ben, term, INVOICE, 70)
+
+    assert take_snapshots() == 2
+    assert take_snapshots() == 0
+    post_entry(ada, term, PAYMENT, 40)
+    assert take_snapshots(term.organization_id) == 1
+    assert list(BalanceSnapshot.objects.filter(student=ada).values_list("sequence", "balance")) == [(2, 60), (1, 100)]
+
+    assert reconcile() == (3, [])
+    out = io.StringIO()
+    call_command("reconcile_ledger", stdout=out)
+    assert "3 entries checked" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_reconcile_reports_drift(students, term):
+    ada, ben, _ = students
+    post_entry(ada, term, INVOICE, 100)
+    post_entry(ben, term, INVOICE, 70)
+    call_command("snapshot_balances", stdout=io.StringIO())
+
+    StudentBalance.objects.filter(student=ada).update(balance=90)
+    BalanceSnapshot.objects.filter(student=ben).update(balance=75)
+
+    checked, problems = reconcile()
+    assert checked == 2
+    assert problems == [
+        f"student {ben.pk}: snapshot at #1 is 75.00, entries sum to 70.00",
+        f"student {ada.pk}: balance 90.00 at #1, entries sum to 100.00 at #1",
+    ]
+    with pytest.raises(CommandError, match="2 ledger problem"):
+        call_command("reconcile_ledger", stdout=io.StringIO(), stderr=io.StringIO())
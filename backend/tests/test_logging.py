@@ -0,0 +1,97 @@
+import ast
+import io
+import json
+import logging
+from pathlib import Path
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.logs import (
+    DebugSampleFilter,
+    JSONFormatter,
+    QueueLogHandler,
+    RequestLogContextFilter,
+    RequestLogContextMiddleware,
+    bind_log_context,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _capture(rate=1):
+    stream = io.StringIO()
+    handler = QueueLogHandler(stream=stream)
+    handler.setFormatter(JSONFormatter())
+    handler.addFilter(RequestLogContextFilter())
+    handler.addFilter(DebugSampleFilter(rate))
+    logger = logging.getLogger("tests.logging")
+    logger.handlers, logger.propagate = [handler], False
+    logger.setLevel(logging.DEBUG)
+    return logger, handler, stream
+
+
+def _lines(handler, stream):
+    handler.flush()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def _in_request(logic, request_id):
+    def view(request):
+        logic()
+        return HttpResponse()
+
+    request = RequestFactory().get("/", HTTP_X_REQUEST_ID=request_id)
+    return RequestLogContextMiddleware(view)(request)
+
+
+def test_records_are_json_with_request_context():
+    logger, handler, stream = _capture()
+
+    def view():
+        bind_log_context(org_id=7, user_id=42)
+        logger.info("Marked %d students", 30, extra={"session_id": 5})
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("Recompute failed")
+
+    response = _in_request(view, "req-1")
+    logger.info("Outside a request")
+    marked, failed, outside = _lines(handler, stream)
+    handler.stop()
+
+    assert response["X-Request-ID"] == "req-1"
+    assert marked["message"] == "Marked 30 students"
+    assert (marked["request_id"], marked["org_id"], marked["user_id"]) == ("req-1", 7, 42)
+    assert marked["session_id"] == 5 and marked["level"] == "INFO"
+    assert "ZeroDivisionError" in failed["exception"]
+    assert outside["request_id"] is None
+
+
+def test_debug_records_are_sampled_per_request():
+    logger, handler, stream = _capture(rate=4)
+    for index in range(200):
+        _in_request(lambda: (logger.debug("one"), logger.debug("two"), logger.warning("kept")), f"req-{index}")
+    lines = _lines(handler, stream)
+    handler.stop()
+
+    debug_by_request = {}
+    for line in lines:
+        if line["level"] == "DEBUG":
+            debug_by_request.setdefault(line["request_id"], []).append(line["message"])
+    assert sum(line["level"] == "WARNING" for line in lines) == 200
+    assert 20 < len(debug_by_request) < 80
+    assert all(messages == ["one", "two"] for messages in debug_by_request.values())
+
+
+def test_no_print_calls_in_app_code():
+    offenders = []
+    for path in BACKEND_DIR.rglob("*.py"):
+        parts = path.relative_to(BACKEND_DIR).parts
+        if parts[0] == "tests" or "tests" in parts or "migrations" in parts or path.name.startswith("test_"):
+            continue
+        for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "print":
+                offenders.append(f"{path.relative_to(BACKEND_DIR)}:{node.lineno}")
+    assert offenders == [], "use logging instead of print: " + ", ".join(offenders)
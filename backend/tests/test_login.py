@@ -0,0 +1,100 @@
+import io
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.managers import UserManager
+from users.models import Membership, Organization, StudentProfile, User
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(settings):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+
+
+@pytest.fixture
+def student(organization):
+    user = User.objects.create_user(
+        "ada@school.com", "Ada", "Lovelace", password="testpass123", phone="+234 (803) 123-4567"
+    )
+    membership = Membership.objects.create(user=user, organization=organization, role=Membership.RoleChoices.STUDENT)
+    StudentProfile.objects.create(membership=membership, admission_number="ADM-0042")
+    return user
+
+
+def _login(client, identifier, password="testpass123", **extra):
+    return client.post("/api/auth/login/", {"username": identifier, "password": password, **extra}, format="json")
+
+
+@pytest.mark.parametrize("raw, normalized", [
+    ("+234 (803) 123-4567", "+2348031234567"),
+    ("0803-123-4567", "08031234567"),
+    ("  ", None),
+    (None, None),
+])
+def test_phone_normalization(raw, normalized):
+    assert UserManager.normalize_phone(raw) == normalized
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("identifier", ["ada@school.com", "+2348031234567", "+234 803 123 4567", "ADM-0042"])
+def test_login_by_any_identifier_in_one_query(api_client, student, identifier):
+    assert student.phone == "+2348031234567"
+
+    with CaptureQueriesContext(connection) as queries:
+        response = _login(api_client, identifier)
+
+    assert response.status_code == 200, response.content
+    assert response.data["user_id"] == student.id
+    assert len(queries) == 1
+
+
+@pytest.mark.django_db
+def test_token_carries_the_requested_organization(api_client, student):
+    other = Organization.objects.create(name="Evening School")
+    Membership.all_objects.create(user=student, organization=other, role=Membership.RoleChoices.TEACHER)
+
+    response = _login(api_client, "ada@school.com", organization=other.id)
+
+    assert response.status_code == 200
+    assert AccessToken(response.data["access"])["organization_id"] == str(other.id)
+
+
+@pytest.mark.django_db
+def test_hashes_are_upgraded_on_login(api_client, student, settings):
+    User.objects.filter(pk=student.pk).update(password=make_password("testpass123", hasher="pbkdf2_sha1"))
+    assert _login(api_client, "ada@school.com").status_code == 200
+    student.refresh_from_db()
+    assert student.password.startswith("pbkdf2_sha256$1000$")
+
+    settings.PASSWORD_PBKDF2_ITERATIONS = 2000
+    assert _login(api_client, "ada@school.com").status_code == 200
+    student.refresh_from_db()
+    assert student.password.startswith("pbkdf2_sha256$2000$")
+
+
+@pytest.mark.django_db
+def test_shared_phone_is_not_a_login(api_client, student):
+    User.objects.create_user("twin@school.com", "Twin", "Lovelace", password="testpass123", phone="08031234567")
+    User.objects.create_user("twin2@school.com", "Twin", "Two", password="testpass123", phone="0803 123 4567")
+    assert _login(api_client, "08031234567").status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_login_burst_reports_throughput_per_core():
+    organization = Organization.objects.create(name="Burst School")
+    user = User.objects.create_user("burst@school.com", "B", "U", password="testpass123")
+    Membership.objects.create(user=user, organization=organization, role=Membership.RoleChoices.TEACHER)
+
+    out = io.StringIO()
+    call_command(
+        "login_burst", identifier="burst@school.com", password="testpass123",
+        requests=4, concurrency=2, stdout=out,
+    )
+
+    assert "queries_per_login=1" in out.getvalue()
+    assert "per_core=" in out.getvalue()
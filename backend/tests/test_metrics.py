@@ -0,0 +1,167 @@
+import logging
+
+import pytest
+from rest_framework.test import APIClient
+
+from core.metrics import REDIS_KEY, LocalMetricsStore, MetricsRegistry, RedisMetricsStore, get_registry
+from users.models import Membership, Organization
+from tests.utils import create_user_with_role, login
+
+
+@pytest.fixture
+def registry():
+    registry = get_registry()
+    registry.store.reset()
+    yield registry
+    registry.store.reset()
+
+
+def test_render_is_cumulative_prometheus_histogram():
+    registry = MetricsRegistry(LocalMetricsStore())
+    registry.observe("api/things/", "GET", 200, {"http_request_db_queries": 3})
+    registry.observe("api/things/", "GET", 200, {"http_request_db_queries": 30})
+
+    text = registry.render()
+    labels = 'route="api/things/",method="GET",status="200"'
+    assert "# TYPE http_request_db_queries histogram" in text
+    assert f'http_request_db_queries_bucket{{{labels},le="2.0"}} 0' in text
+    assert f'http_request_db_queries_bucket{{{labels},le="5.0"}} 1' in text
+    assert f'http_request_db_queries_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"http_request_db_queries_sum{{{labels}}} 33" in text
+    assert f"http_request_db_queries_count{{{labels}}} 2" in text
+
+
+@pytest.mark.django_db
+def test_requests_are_recorded_per_route(registry, settings):
+    organization = Organization.objects.create(name="Metrics School")
+    create_user_with_role("admin@metrics.com", Membership.RoleChoices.ADMIN, organization)
+    client = APIClient()
+    login(client, "admin@metrics.com", "testpass123", organization.id)
+
+    client.get("/api/attendance/alerts/")
+    status = client.get("/api/attendance/alerts/").status_code
+
+    settings.METRICS_TOKEN = "s3cret"
+    text = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").content.decode()
+    labels = f'route="api/attendance/alerts/",method="GET",status="{status}"'
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+    assert f"http_request_serialize_seconds_count{{{labels}}} 2" in text
+    assert f"http_request_db_queries_count{{{labels}}} 2" in text
+
+
+@pytest.mark.django_db
+def test_query_budget_offenders_are_logged(registry, settings, caplog):
+    settings.METRICS_QUERY_BUDGETS = {"api/auth/login/": 0}
+    organization = Organization.objects.create(name="Budget School")
+    create_user_with_role("admin@budget.com", Membership.RoleChoices.ADMIN, organization)
+
+    with caplog.at_level(logging.WARNING, logger="core.middleware"):
+        login(APIClient(), "admin@budget.com", "testpass123", organization.id)
+
+    assert any("Query budget exceeded" in message for message in caplog.messages)
+
+
+def test_metrics_token_is_enforced(settings):
+    settings.METRICS_TOKEN = "s3cret"
+    client = APIClient()
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code == 200
+
+
+@pytest.mark.django_db
+def test_metrics_are_private_without_a_token(settings):
+    settings.METRICS_TOKEN = ""
+    user = create_user_with_role("ops@metrics.com", Membership.RoleChoices.ADMIN,
+                                 Organization.objects.create(name="Ops School"))
+    client = APIClient()
+    assert client.get("/metrics").status_code == 403
+
+    client.force_login(user)
+    assert client.get("/metrics").status_code == 403
+
+    user.is_staff = True
+    user.save(update_fields=["is_staff"])
+    assert client.get("/metrics").status_code == 200
+
+
+class FakeRedis:
+    """Just enough of redis-py for RedisMetricsStore: pipelined HINCRBYFLOAT and HGETALL."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.down = False
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hgetall(self, key):
+        self._call()
+        return {field.encode(): str(value).encode() for field, value in self.hashes.get(key, {}).items()}
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def _call(self):
+        self.round_trips += 1
+        if self.down:
+            raise ConnectionError("Redis is down")
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.commands = redis, []
+
+    def hincrbyfloat(self, key, field, amount):
+        self.commands.append((key, field, amount))
+
+    def execute(self):
+        self.redis._call()
+        for key, field, amount in self.commands:
+            bucket = self.redis.hashes.setdefault(key, {})
+            bucket[field] = bucket.get(field, 0) + amount
+
+
+def test_redis_store_batches_round_trips(settings):
+    settings.METRICS_FLUSH_SECONDS = 60
+    redis = FakeRedis()
+    registry = MetricsRegistry(RedisMetricsStore(redis))
+
+    for _ in range(5):
+        registry.observe("api/things/", "GET", 200, {"http_request_db_queries": 3})
+    assert redis.round_trips == 0
+
+    assert 'http_request_db_queries_count{route="api/things/",method="GET",status="200"} 5' in registry.render()
+    assert redis.round_trips == 2  # one flush, one read
+
+
+def test_redis_outage_buffers_instead_of_failing(settings, caplog):
+    settings.METRICS_FLUSH_SECONDS = 0
+    settings.METRICS_REDIS_RETRY_SECONDS = 60
+    redis = FakeRedis()
+    redis.down = True
+    store = RedisMetricsStore(redis)
+    registry = MetricsRegistry(store)
+
+    with caplog.at_level(logging.WARNING, logger="core.metrics"):
+        for _ in range(3):
+            registry.observe("api/things/", "GET", 200, {"http_request_db_queries": 3})
+    assert redis.round_trips == 1  # then it waits out the retry window
+    assert any("Metrics store unavailable" in message for message in caplog.messages)
+
+    redis.down = False
+    store.flush()
+    counts = redis.hashes[REDIS_KEY]
+    assert counts["http_request_db_queries|api/things/|GET|200|count"] == 3
+
+
+@pytest.mark.django_db
+def test_a_failing_metrics_store_does_not_fail_requests(registry, monkeypatch, caplog):
+    def broken(increments):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(registry.store, "add", broken)
+    with caplog.at_level(logging.ERROR, logger="core.middleware"):
+        response = APIClient().get("/health/")
+    assert response.status_code == 200
+    assert any("Could not record metrics" in message for message in caplog.messages)
@@ -0,0 +1,132 @@
+import io
+import json
+
+import pytest
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from tests.utils import create_user_with_role, login
+from users.models import Membership, Organization, ParentProfile, StudentProfile, TeacherProfile, User
+from users.onboarding import onboard_users, rows_from_csv, rows_from_json
+from users.passwords import PasswordHasherPool
+
+
+@pytest.fixture
+def school(db):
+    return Organization.objects.create(name="Onboarding School")
+
+
+def _row(email, role, **extra):
+    return {"email": email, "first_name": "New", "last_name": "Person", "role": role, **extra}
+
+
+@pytest.mark.django_db
+def test_rows_are_created_with_profiles_and_a_line_each(school):
+    create_user_with_role("taken@school.com", Membership.RoleChoices.STUDENT, school)
+    rows = rows_from_json([
+        _row("kid@school.com", "student", password="s3cret-pass", admission_number="A-1", date_of_admission="2025-01-06"),
+        _row("teach@school.com", "TEACHER", employee_id="T-1", hire_date="2024-09-01"),
+        _row("mum@school.com", "PARENT", occupation="Nurse"),
+        _row("kid@school.com", "STUDENT"),
+        _row("taken@school.com", "STUDENT"),
+        _row("twin@school.com", "STUDENT", admission_number="A-1"),
+        _row("late@school.com", "STUDENT", date_of_admission="06/01/2025"),
+        _row("boss@school.com", "JANITOR"),
+        {"email": "nameless@school.com", "role": "STUDENT"},
+    ])
+
+    result = onboard_users(school, rows, workers=1, chunk_size=2)
+
+    assert (result.rows, result.created, result.failed) == (9, 3, 6)
+    assert [line["status"] for line in result.lines] == ["created"] * 3 + ["error"] * 6
+    assert "more than once" in result.lines[3]["error"]
+    assert "already exists" in result.lines[4]["error"]
+    assert "admission_number" in result.lines[5]["error"]
+    assert "date_of_admission" in result.lines[6]["error"]
+
+    kid = User.objects.get(email="kid@school.com")
+    assert kid.check_password("s3cret-pass")
+    assert StudentProfile.all_objects.get(membership__user=kid, membership__organization=school).admission_number == "A-1"
+    assert TeacherProfile.all_objects.get(employee_id="T-1").membership.role == Membership.RoleChoices.TEACHER
+    assert ParentProfile.all_objects.get(membership__user__email="mum@school.com").occupation == "Nurse"
+    assert not User.objects.get(email="teach@school.com").has_usable_password()
+
+
+def test_password_pool_hashes_in_worker_processes():
+    with PasswordHasherPool(workers=2) as pool:
+        assert all(value.startswith("!") for value in pool.hash(["", None, ""]))
+        assert pool._executor is None  # nothing to hash, no processes started
+        hashes = pool.hash(["one-password", "two-password", ""])
+    assert check_password("one-password", hashes[0])
+    assert check_password("two-password", hashes[1])
+    assert hashes[2].startswith("!")
+
+
+def test_csv_header_is_checked():
+    with pytest.raises(ValueError, match="role"):
+        rows_from_csv(io.StringIO("email,first_name,last_name\n"))
+
+
+@pytest.mark.django_db
+def test_onboarding_endpoint(school, settings):
+    settings.ONBOARDING_HASH_WORKERS = 1
+    create_user_with_role("admin@onboard.com", Membership.RoleChoices.ADMIN, school)
+    client = APIClient()
+    login(client, "admin@onboard.com", "testpass123", school.id)
+
+    response = client.post(
+        "/api/auth/onboard/", [_row("a@onboard.com", "STUDENT"), _row("b@onboard", "STUDENT")], format="json"
+    )
+    assert response.status_code == 200
+    assert (response.data["created"], response.data["failed"]) == (1, 1)
+    assert Membership.all_objects.filter(user__email="a@onboard.com", organization=school).exists()
+
+    upload = io.BytesIO(b"email,first_name,last_name,role\nc@onboard.com,C,D,teacher\n")
+    upload.name = "staff.csv"
+    report = client.post("/api/auth/onboard/?report=csv", {"file": upload}, format="multipart")
+    lines = b"".join(report.streaming_content).decode().splitlines()
+    assert lines[0] == "line,email,role,status,user_id,error"
+    assert lines[1].startswith("2,c@onboard.com,TEACHER,created,")
+
+
+@pytest.mark.django_db
+def test_onboarding_endpoint_caps_the_upload(school, settings):
+    settings.ONBOARDING_MAX_ROWS = 2
+    create_user_with_role("admin@onboard.com", Membership.RoleChoices.ADMIN, school)
+    client = APIClient()
+    login(client, "admin@onboard.com", "testpass123", school.id)
+
+    rows = [_row(f"{name}@onboard.com", "STUDENT") for name in ("a", "b", "c")]
+    response = client.post("/api/auth/onboard/", rows, format="json")
+
+    assert response.status_code == 400 and "At most 2 rows" in response.data["detail"]
+    assert not Membership.all_objects.filter(user__email="a@onboard.com").exists()
+
+    upload = io.BytesIO(b"email,first_name,last_name,role\n" + b"".join(
+        b"%s@onboard.com,A,B,student\n" % name for name in (b"d", b"e", b"f")
+    ))
+    upload.name = "students.csv"
+    assert client.post("/api/auth/onboard/", {"file": upload}, format="multipart").status_code == 400
+    assert client.post("/api/auth/onboard/", rows[:2], format="json").status_code == 200
+
+
+@pytest.mark.django_db
+def test_teachers_cannot_onboard(school):
+    create_user_with_role("t@onboard.com", Membership.RoleChoices.TEACHER, school)
+    client = APIClient()
+    login(client, "t@onboard.com", "testpass123", school.id)
+    assert client.post("/api/auth/onboard/", [], format="json").status_code == 403
+
+
+@pytest.mark.django_db
+def test_command_writes_result_report(school, tmp_path):
+    source = tmp_path / "users.json"
+    source.write_text(json.dumps([_row("cmd@school.com", "STUDENT"), _row("cmd@school.com", "STUDENT")]))
+    report = tmp_path / "report.csv"
+
+    out = io.StringIO()
+    call_command("onboard_users", str(school.id), str(source), report=str(report), workers=1, stdout=out)
+
+    assert "1 of 2 users created, 1 failed" in out.getvalue()
+    assert len(report.read_text().splitlines()) == 3
@@ -0,0 +1,125 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from academics.models import ClassSessionAssignment
+from attendance.models import AttendanceRecord, AttendanceSession
+from tests.utils import create_school_class, create_user_with_role, login
+from users.models import Membership, Organization, StudentProfile
+
+
+@pytest.fixture
+def organization(db):
+    return Organization.objects.create(name="Keyset School")
+
+
+@pytest.fixture
+def client(organization):
+    create_user_with_role("admin@keyset.com", Membership.RoleChoices.ADMIN, organization)
+    client = APIClient()
+    login(client, "admin@keyset.com", "testpass123", organization.id)
+    return client
+
+
+@pytest.fixture
+def students(organization):
+    profiles = []
+    for index in range(7):
+        user = create_user_with_role(f"kid{index}@keyset.com", Membership.RoleChoices.STUDENT, organization)
+        profiles.append(StudentProfile.objects.create(membership=user.memberships.first()))
+    return profiles
+
+
+@pytest.fixture
+def class_assignment(organization, term):
+    return ClassSessionAssignment.objects.create(
+        organization=organization, class_ref=create_school_class(organization=organization), session=term.session
+    )
+
+
+def _walk(client, url, page_size=3, link="next"):
+    seen, pages, url = [], [], f"{url}?page_size={page_size}" if "?" not in url else url
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.data
+        assert len(response.data["results"]) <= page_size
+        seen += response.data["results"]
+        pages.append(response.data)
+        url = response.data[link]
+    return seen if link == "next" else pages
+
+
+@pytest.mark.django_db
+def test_students_are_cursor_paginated_with_client_page_size(client, students):
+    seen = _walk(client, "/api/students/")
+
+    assert [item["id"] for item in seen] == sorted((profile.id for profile in students), reverse=True)
+
+    capped = client.get("/api/students/?page_size=100000")
+    assert capped.status_code == 200 and len(capped.data["results"]) == 7
+
+
+@pytest.mark.django_db
+def test_sessions_are_paginated_newest_date_first(client, organization, class_assignment, term):
+    monday = date(2025, 9, 8)
+    sessions = [
+        AttendanceSession.objects.create(
+            organization=organization, class_assignment=class_assignment, term=term,
+            date=monday + timedelta(days=day), period=period,
+        )
+        for day in range(4) for period in ("MORNING", "AFTERNOON")
+    ]
+
+    seen = _walk(client, "/api/attendance/sessions/")
+
+    expected = sorted(sessions, key=lambda session: (session.date, session.id), reverse=True)
+    assert [item["id"] for item in seen] == [session.id for session in expected]
+
+
+@pytest.mark.django_db
+def test_records_are_paginated_newest_first(client, organization, class_assignment, term, students):
+    session = AttendanceSession.objects.create(
+        organization=organization, class_assignment=class_assignment, term=term, date=date(2025, 9, 8), period="MORNING"
+    )
+    records = AttendanceRecord.objects.bulk_create(
+        AttendanceRecord(organization=organization, session=session, student=student) for student in students
+    )
+
+    seen = _walk(client, "/api/attendance/records/")
+
+    assert [item["id"] for item in seen] == sorted((record.id for record in records), reverse=True)
+
+
+@pytest.mark.django_db
+def test_session_cursor_carries_date_and_id(client, organization, term):
+    day = date(2025, 9, 8)
+    sessions = [
+        AttendanceSession.objects.create(
+            organization=organization, term=term, date=day, period=period,
+            class_assignment=ClassSessionAssignment.objects.create(
+                organization=organization, session=term.session,
+                class_ref=create_school_class(name=f"JSS{index}", organization=organization),
+            ),
+        )
+        for index in range(4) for period in ("MORNING", "AFTERNOON")
+    ]
+
+    with CaptureQueriesContext(connection) as queries:
+        seen = _walk(client, "/api/attendance/sessions/")
+    assert [item["id"] for item in seen] == sorted((session.id for session in sessions), reverse=True)
+    page_queries = [q["sql"] for q in queries.captured_queries if 'FROM "attendance_attendancesession"' in q["sql"]]
+    assert page_queries and not any("OFFSET" in sql for sql in page_queries)
+
+    last = client.get("/api/attendance/sessions/?page_size=3")
+    while last.data["next"]:
+        last = client.get(last.data["next"])
+    back = _walk(client, last.data["previous"], link="previous")
+    assert [item["id"] for page in reversed(back) for item in page["results"]] == [item["id"] for item in seen[:6]]
+
+
+@pytest.mark.django_db
+def test_malformed_cursor_is_a_404(client):
+    assert client.get("/api/attendance/sessions/?cursor=cD1ub3QtYS1kYXRlJTdDMQ%3D%3D").status_code == 404
@@ -0,0 +1,176 @@
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+from core import profiling as profiling_module
+from core.profiling import RedisProfileStore, _task_postrun, _task_prerun, collapsed, get_buffer, profile
+from users.models import Membership, Organization, User
+from tests.utils import create_user_with_role
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_TOKEN = "let-me-profile"
+    settings.PROFILING_INTERVAL = 0.001
+    get_buffer().clear()
+    yield get_buffer()
+    get_buffer().clear()
+
+
+def _busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_collects_collapsed_stacks(profiling):
+    with profile("manual", "busy") as result:
+        _busy_wait(0.05)
+
+    assert result["samples"] > 0
+    text = collapsed(result)
+    assert "test_profiling:_busy_wait" in text
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in text.splitlines())
+    assert profiling.get(result["id"]) is result
+
+
+@pytest.mark.django_db
+def test_header_triggers_request_profile(profiling):
+    organization = Organization.objects.create(name="Profiled School")
+    create_user_with_role("admin@profiled.com", Membership.RoleChoices.ADMIN, organization)
+
+    client = APIClient()
+    client.post("/api/auth/login/", {"username": "admin@profiled.com", "password": "nope"}, format="json")
+    assert profiling.all() == []  # no header, sampling off
+
+    resp = client.post(
+        "/api/auth/login/",
+        {"username": "admin@profiled.com", "password": "testpass123", "organization_id": organization.id},
+        format="json",
+        HTTP_X_PROFILE="let-me-profile",
+    )
+    (captured,) = profiling.all()
+    assert resp["X-Profile-Id"] == captured["id"]
+    assert captured["name"] == "POST /api/auth/login/"
+    assert any("users_user" in query["sql"] for query in captured["queries"])
+
+
+@pytest.mark.django_db
+def test_profile_endpoints_are_staff_only(profiling):
+    with profile("manual", "busy") as result:
+        _busy_wait(0.02)
+
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user("dev@test.com", "Dev", "User", password="x"))
+    assert client.get("/api/profiles/").status_code == 403
+
+    client.force_authenticate(User.objects.create_user("ops@test.com", "Ops", "User", password="x", is_staff=True))
+    listing = client.get("/api/profiles/")
+    assert [item["id"] for item in listing.data] == [result["id"]]
+    assert "stacks" not in listing.data[0]
+
+    download = client.get(f"/api/profiles/{result['id']}/", {"output": "collapsed"})
+    assert download.status_code == 200
+    assert download.content.decode() == collapsed(result)
+
+
+def test_attendance_tasks_are_sampled(profiling, settings):
+    settings.PROFILING_SAMPLE_RATE = 1  # every task
+
+    class FakeTask:
+        name = "attendance.tasks.recompute_summaries_task"
+
+    _task_prerun(task_id="t1", task=FakeTask())
+    _busy_wait(0.02)
+    _task_postrun(task_id="t1")
+
+    (captured,) = profiling.all()
+    assert captured["kind"] == "task" and captured["name"] == FakeTask.name
+
+
+class FakeRedis:
+    """Just enough of redis-py for RedisProfileStore (TTLs are not simulated)."""
+
+    def __init__(self):
+        self.values, self.index = {}, {}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def zadd(self, key, mapping):
+        self.index.update(mapping)
+
+    def zrange(self, key, start, end):
+        return [member.encode() for member in sorted(self.index, key=self.index.get)]
+
+    def zremrangebyscore(self, key, low, high):
+        self.index = {member: score for member, score in self.index.items() if score > high}
+
+    def zremrangebyrank(self, key, start, end):
+        for member in sorted(self.index, key=self.index.get)[start:end + 1 or None]:
+            del self.index[member]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+        if "profiling:index" in keys:
+            self.index = {}
+
+
+@pytest.fixture
+def shared_store(profiling, monkeypatch):
+    """A Redis-backed store; a second instance on the same Redis stands in for another worker."""
+    redis = FakeRedis()
+    monkeypatch.setattr(profiling_module, "_buffer", RedisProfileStore(2, 3600, client=redis))
+    return RedisProfileStore(2, 3600, client=redis)
+
+
+@pytest.mark.django_db
+def test_task_profiles_are_visible_to_every_worker(shared_store, settings):
+    settings.PROFILING_SAMPLE_RATE = 1
+
+    class FakeTask:
+        name = "attendance.tasks.recompute_summaries_task"
+
+    for task_id in ("t1", "t2", "t3"):
+        _task_prerun(task_id=task_id, task=FakeTask())
+        _busy_wait(0.01)
+        _task_postrun(task_id=task_id)
+
+    stored = shared_store.all()
+    assert len(stored) == 2  # only the latest PROFILING_BUFFER_SIZE are kept
+    assert shared_store.get(stored[-1]["id"])["name"] == FakeTask.name
+
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user("ops@test.com", "Ops", "User", password="x", is_staff=True))
+    listing = client.get("/api/profiles/")
+    assert [item["id"] for item in listing.data] == [item["id"] for item in reversed(stored)]
+
+
+def test_a_failing_store_does_not_fail_the_profiled_block(profiling, monkeypatch):
+    class BrokenStore:
+        def add(self, profile_data):
+            raise ConnectionError("Redis is down")
+
+        def clear(self):
+            pass
+
+    monkeypatch.setattr(profiling_module, "_buffer", BrokenStore())
+    with profile("manual", "busy") as result:
+        _busy_wait(0.01)
+    assert "duration_ms" in result
@@ -0,0 +1,167 @@
+import pytest
+import redis
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.request import Request
+
+from core import ratelimit
+from core.metrics import get_registry
+from core.ratelimit import LocalBucketStore, RateLimiter, RedisBucketStore, parse_rule
+from core.throttling import LoginIPThrottle, WriteUserThrottle
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+def test_parse_rule():
+    assert parse_rule("30/min") == (30, 0.5)
+    assert parse_rule("5/s") == (5, 5.0)
+    assert parse_rule(None) is None
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    store = LocalBucketStore()
+    assert store.take("k", 2, 1.0) == (True, 0.0)
+    assert store.take("k", 2, 1.0) == (True, 0.0)
+    allowed, wait = store.take("k", 2, 1.0)
+    assert not allowed and wait == pytest.approx(1.0)
+
+    clock.now += 0.5
+    allowed, wait = store.take("k", 2, 1.0)
+    assert not allowed and wait == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert store.take("k", 2, 1.0)[0]
+    assert store.take("other", 2, 1.0)[0]
+
+
+def test_local_store_evicts_least_recently_used(clock):
+    store = LocalBucketStore(max_keys=2)
+    store.take("a", 1, 1.0)
+    store.take("b", 1, 1.0)
+    store.take("c", 1, 1.0)
+    assert store.take("a", 1, 1.0)[0]  # forgotten, so full again
+
+
+class FakeScriptClient:
+    def __init__(self, result=None, error=None):
+        self.calls = []
+        self.result, self.error = result, error
+
+    def register_script(self, source):
+        assert "redis.call('TIME')" in source
+
+        def script(keys, args):
+            self.calls.append((keys, args))
+            if self.error:
+                raise self.error
+            return self.result
+        return script
+
+
+def test_redis_store_runs_one_script_per_decision():
+    client = FakeScriptClient(result=[0, b"1.25"])
+    assert RedisBucketStore(client).take("login_ip:ip:1.2.3.4", 30, 0.5) == (False, 1.25)
+    assert client.calls == [(["ratelimit:login_ip:ip:1.2.3.4"], [30, 0.5])]
+
+
+def test_redis_outage_falls_back_to_local_buckets(clock):
+    client = FakeScriptClient(error=redis.ConnectionError("down"))
+    limiter = RateLimiter(RedisBucketStore(client), fallback=LocalBucketStore())
+    get_registry().store.reset()
+
+    assert limiter.take("login_ip", "ip:1", 1, 1.0) == (True, 0.0)
+    assert limiter.take("login_ip", "ip:1", 1, 1.0) == (False, 1.0)
+    assert len(client.calls) == 1  # Redis is not retried until the back-off passes
+
+    clock.now += 10
+    limiter.take("login_ip", "ip:1", 1, 1.0)
+    assert len(client.calls) == 2
+
+    rendered = get_registry().render()
+    assert 'ratelimit_decisions_total{decision="throttled",scope="login_ip",store="local"} 1' in rendered
+
+
+def test_metrics_failure_does_not_change_the_decision(clock, monkeypatch):
+    class BrokenRegistry:
+        def increment(self, *args, **kwargs):
+            raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(ratelimit, "get_registry", lambda: BrokenRegistry())
+    limiter = RateLimiter(LocalBucketStore())
+
+    assert limiter.take("login_ip", "ip:1", 1, 1.0) == (True, 0.0)
+    assert limiter.take("login_ip", "ip:1", 1, 1.0) == (False, 1.0)
+
+
+def test_ip_throttle_ignores_forwarded_for_without_trusted_proxies(settings):
+    settings.RATELIMITS = {"login_ip": "1/min"}
+    factory = APIRequestFactory()
+    throttle = LoginIPThrottle()
+
+    assert throttle.allow_request(Request(factory.post("/api/auth/login/", HTTP_X_FORWARDED_FOR="10.0.0.1")), None)
+    request = Request(factory.post("/api/auth/login/", HTTP_X_FORWARDED_FOR="10.0.0.2"))
+    assert throttle.get_ident_key(request, None) == "ip:127.0.0.1"
+    assert not throttle.allow_request(request, None)
+
+
+def test_ip_throttle_trusts_forwarded_for_behind_a_proxy(settings):
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+    request = Request(APIRequestFactory().post("/api/auth/login/", HTTP_X_FORWARDED_FOR="10.0.0.1, 10.0.0.9"))
+
+    assert LoginIPThrottle().get_ident_key(request, None) == "ip:10.0.0.9"
+
+
+def test_write_throttle_ignores_reads(settings):
+    settings.RATELIMITS = {"write_user": "1/min"}
+    factory = APIRequestFactory()
+    throttle = WriteUserThrottle()
+
+    for _ in range(3):
+        assert throttle.allow_request(Request(factory.get("/api/attendance/records/")), None)
+    assert throttle.allow_request(Request(factory.post("/api/attendance/records/")), None)
+    assert not throttle.allow_request(Request(factory.post("/api/attendance/records/")), None)
+    assert throttle.wait() == pytest.approx(60, abs=0.01)
+
+
+@pytest.mark.django_db
+def test_login_attempts_per_account_are_limited(settings):
+    settings.RATELIMITS = {"login_identifier": "2/min", "login_ip": "100/min"}
+    client = APIClient()
+    body = {"username": "victim@school.com", "password": "guess"}
+
+    assert client.post("/api/auth/login/", body, format="json").status_code == 400
+    assert client.post("/api/auth/login/", body, format="json").status_code == 400
+    response = client.post("/api/auth/login/", {**body, "username": " Victim@School.com"}, format="json")
+
+    assert response.status_code == 429
+    assert int(response["Retry-After"]) == 30
+    assert client.post("/api/auth/login/", {**body, "username": "other@school.com"}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("body", [[], "admin@school.com"])
+def test_login_body_that_is_not_an_object_is_a_400(settings, body):
+    settings.RATELIMITS = {"login_identifier": "2/min", "login_ip": "100/min"}
+
+    assert APIClient().post("/api/auth/login/", body, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_rate_limits_can_be_switched_off(settings):
+    settings.RATELIMIT_ENABLED = False
+    settings.RATELIMITS = {"login_ip": "1/min"}
+    client = APIClient()
+    for _ in range(3):
+        assert client.post("/api/auth/login/", {"username": "x@y.com", "password": "p"}, format="json").status_code == 400
@@ -0,0 +1,166 @@
+import io
+import re
+import zipfile
+import zlib
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from academics.models import ClassSessionAssignment
+from attendance.models import TermAttendanceSummary
+from core.pdf import PDFDocument
+from grades import report_cards, tasks
+from grades.cards import render_report_card
+from grades.engine import compute_class_results
+from grades.models import ReportCard, ReportCardBatch
+from grades.report_cards import ReportCardRenderer, class_cards, generate_report_cards
+from tests.utils import create_teacher_with_profile, create_user_with_role, login
+from users.models import Membership
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _page_text(pdf):
+    streams = re.findall(rb"stream\n(.*?)\nendstream", pdf, re.S)
+    return b"".join(zlib.decompress(stream) for stream in streams)
+
+
+def test_pdf_cross_reference_points_at_every_object():
+    pdf = PDFDocument()
+    pdf.text(40, 800, "Adé (Head) \\ Girl", bold=True)
+    pdf.add_page()
+    pdf.rect(40, 40, 100, 20, fill=0.9)
+    data = pdf.render()
+
+    assert data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    offsets = re.findall(rb"(\d{10}) 00000 n", data[xref:])
+    assert len(offsets) == 8  # catalog, pages, 2 fonts, 2 pages with a content stream each
+    for number, offset in enumerate(offsets, start=1):
+        assert data[int(offset):].startswith(b"%d 0 obj" % number)
+    assert b"(Ad\xe9 \\(Head\\) \\\\ Girl) Tj" in _page_text(data)
+
+
+@pytest.fixture
+def batch(gradebook, term):
+    school_class = gradebook[0]
+    compute_class_results(school_class, term)
+    return ReportCardBatch.all_objects.create(organization=school_class.organization, term=term)
+
+
+@pytest.mark.django_db
+def test_class_cards_in_a_few_queries(gradebook, term):
+    school_class, maths, english, (ada, ben, cal) = gradebook
+    compute_class_results(school_class, term)
+
+    with CaptureQueriesContext(connection) as queries:
+        cards = class_cards(school_class, term, "2025/2026 - First Term")
+
+    assert len(queries) <= 6
+    assert [student_id for student_id, _, _ in cards] == [ben.pk, ada.pk, cal.pk]
+    card = cards[0][2]
+    assert card["summary"]["position"] == 1 and card["summary"]["class_size"] == 3
+    assert [(s["name"], s["total"], s["position"]) for s in card["subjects"]] == [
+        ("English", "90.00", 1), ("Maths", "72.00", 2),
+    ]
+
+
+@pytest.mark.django_db
+def test_batch_zips_every_card_and_reuses_unchanged_ones(batch, gradebook, term):
+    school_class, _, _, (ada, ben, cal) = gradebook
+
+    generate_report_cards(batch, workers=1)
+    assert (batch.status, batch.total_cards, batch.rendered_cards, batch.reused_cards) == ("COMPLETED", 3, 3, 0)
+    assert batch.progress == 100.0
+    with zipfile.ZipFile(batch.file.path) as archive:
+        names = archive.namelist()
+        assert len(names) == 3 and all(name.startswith("JSS1A_-_A/") for name in names)
+        assert b"Report Card - 2025/2026 - First Term" in _page_text(archive.read(names[0]))
+
+    class_assignment = ClassSessionAssignment.objects.create(
+        organization=school_class.organization, class_ref=school_class, session=term.session
+    )
+    TermAttendanceSummary.objects.create(
+        organization=school_class.organization, class_assignment=class_assignment, student=cal, term=term,
+        total_sessions=120, attended_sessions=90, percentage=75,
+    )
+    rerun = ReportCardBatch.all_objects.create(organization=school_class.organization, term=term)
+    generate_report_cards(rerun, workers=1)
+
+    assert (rerun.rendered_cards, rerun.reused_cards) == (1, 2)
+    card = ReportCard.all_objects.get(student=cal)
+    assert b"Attendance: 90 of 120 sessions \\(75.00%\\)" in _page_text(card.file.read())
+    assert ReportCard.all_objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_worker_processes_render_the_same_bytes(gradebook, term):
+    compute_class_results(gradebook[0], term)
+    cards = [card for _, _, card in class_cards(gradebook[0], term)]
+
+    with ReportCardRenderer(workers=2) as renderer:
+        assert renderer.render(cards) == [render_report_card(card) for card in cards]
+
+
+@pytest.mark.django_db
+def test_command_reports_cards_per_core(batch, term):
+    out = io.StringIO()
+    call_command("generate_report_cards", term.id, workers=1, stdout=out)
+    assert "cards=3 rendered=3 reused=0" in out.getvalue()
+    assert "per_core=" in out.getvalue()
+
+    out = io.StringIO()
+    call_command("generate_report_cards", term.id, workers=1, force=True, stdout=out)
+    assert "rendered=3 reused=0" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_task_renders_in_process_inside_a_daemonic_worker(batch, settings, monkeypatch):
+    class PoolChild:
+        daemon = True
+
+    def no_children(*args, **kwargs):
+        raise AssertionError("daemonic processes are not allowed to have children")
+
+    settings.REPORT_CARD_WORKERS = 4
+    monkeypatch.setattr(report_cards.multiprocessing, "current_process", lambda: PoolChild())
+    monkeypatch.setattr(report_cards, "ProcessPoolExecutor", no_children)
+
+    tasks.generate_report_cards_task(batch.pk)
+
+    batch.refresh_from_db()
+    assert (batch.status, batch.rendered_cards) == ("COMPLETED", 3)
+
+
+@pytest.mark.django_db
+def test_report_cards_endpoint_queues_a_batch(
+    api_client, organization, gradebook, term, monkeypatch, django_capture_on_commit_callbacks
+):
+    compute_class_results(gradebook[0], term)
+    queued = []
+    monkeypatch.setattr(tasks.generate_report_cards_task, "delay", queued.append)
+    create_user_with_role("head@school.com", Membership.RoleChoices.PRINCIPAL, organization)
+    login(api_client, "head@school.com", "testpass123", organization.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post("/api/grades/report-cards/", {"term": term.pk}, format="json")
+    assert response.status_code == 202 and response.data["status"] == "PENDING"
+    assert queued == [response.data["id"]]
+    url = f"/api/grades/report-cards/{response.data['id']}/"
+    assert api_client.get(url + "download/").status_code == 409
+
+    tasks.generate_report_cards_task(response.data["id"])
+    polled = api_client.get(url)
+    assert polled.data["status"] == "COMPLETED" and polled.data["progress"] == 100.0
+    download = api_client.get(url + "download/")
+    assert download.status_code == 200
+    assert zipfile.ZipFile(io.BytesIO(b"".join(download.streaming_content))).namelist()
+
+    create_teacher_with_profile("teacher@school.com", organization)
+    login(api_client, "teacher@school.com", "testpass123", organization.id)
+    assert api_client.post("/api/grades/report-cards/", {"term": term.pk}, format="json").status_code == 403
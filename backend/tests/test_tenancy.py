@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from core.middleware import OrganizationMiddleware
+from core.tenancy import resolve_organization
+from core.utils import get_current_organization
+from tests.utils import create_user_with_role, login
+from users.models import Membership, Organization
+
+
+def _tenant_queries(queries):
+    return [q["sql"] for q in queries.captured_queries if '"users_membership"."organization_id"' in q["sql"]
+            and "users_organization" in q["sql"]]
+
+
+@pytest.fixture
+def principal(organization):
+    return create_user_with_role("head@school.com", Membership.RoleChoices.PRINCIPAL, organization)
+
+
+def _middleware_request(user, **headers):
+    request = RequestFactory().get("/", headers=headers)
+    request.user = user
+    OrganizationMiddleware(lambda r: r)(request)
+    return request
+
+
+@pytest.mark.django_db
+def test_api_request_resolves_tenant_with_one_query(api_client, principal, organization):
+    login(api_client, "head@school.com", "testpass123", organization.id)
+
+    for _ in range(2):
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get("/api/academics/classes/").status_code == 200
+        assert len(_tenant_queries(queries)) == 1
+
+
+@pytest.mark.django_db
+def test_middleware_resolves_nothing_until_asked(principal, organization):
+    with CaptureQueriesContext(connection) as queries:
+        request = _middleware_request(principal)
+    assert len(queries) == 0
+
+    with CaptureQueriesContext(connection) as queries:
+        assert get_current_organization() == organization
+        assert request.tenant == organization
+        assert request.organization.pk == organization.pk
+    assert len(queries) == 1
+
+
+@pytest.mark.django_db
+def test_header_picks_among_memberships(principal, organization):
+    other = Organization.objects.create(name="Night School")
+    Membership.all_objects.create(user=principal, organization=other, role=Membership.RoleChoices.TEACHER)
+    stranger = Organization.objects.create(name="Elsewhere")
+
+    assert _middleware_request(principal, **{"X-Organization-ID": str(other.pk)}).organization == other
+    assert _middleware_request(principal, **{"X-Organization-ID": str(stranger.pk)}).organization == organization
+    assert _middleware_request(principal, **{"X-Organization-ID": "nonsense"}).organization == organization
+
+
+@pytest.mark.django_db
+def test_deactivation_takes_effect_at_once(api_client, principal, organization):
+    login(api_client, "head@school.com", "testpass123", organization.id)
+    assert api_client.get("/api/academics/classes/").status_code == 200
+    assert resolve_organization(principal, organization.id) == organization
+
+    # A bulk update sends no signals; nothing may still hold the old answer.
+    Membership.all_objects.filter(user=principal).update(is_active=False)
+
+    assert resolve_organization(principal, organization.id) is None
+    assert resolve_organization(principal) is None
+    assert api_client.get("/api/academics/classes/").status_code == 403
+
+
+@pytest.mark.django_db
+def test_token_for_a_left_organization_has_no_tenant(api_client, principal, organization):
+    login(api_client, "head@school.com", "testpass123", organization.id)
+    Membership.all_objects.get(user=principal).delete()
+
+    assert api_client.get("/api/academics/classes/").status_code == 403
@@ -1,5 +1,6 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from .identifiers import login_memberships
 from .models import Membership
 
 User = get_user_model()
@@ -25,21 +26,22 @@ User = get_user_model()
 
 
 class UsernameOrPhoneBackend(ModelBackend):
+    """Email, phone or admission number plus password (see users.identifiers)."""
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         org = kwargs.get("organization")
+        if username is None or password is None:
+            return None
 
-        try:
-            if username.isdigit():  # assume digits = phone
-                user = User.objects.get(phone=username)
-            else:
-                user = User.objects.get(username=username)
-        except User.DoesNotExist:
+        user, memberships = login_memberships(username)
+        if user is None:
             return None
 
         if org:
-            if not Membership.objects.filter(user=user, organization=org).exists():
+            org_id = getattr(org, "pk", org)
+            if not any(str(membership.organization_id) == str(org_id) for membership in memberships):
                 return None
 
-        if user.check_password(password):
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,61 @@
+# users/identifiers.py
+"""
+Login identifiers: email, phone number or admission number.
+
+Identifiers are normalized the same way they are stored (phones keep only
+digits and a leading "+", see `UserManager.normalize_phone`), and every
+lookup hits an index: `User.email` and `StudentProfile.admission_number`
+are unique, `User.phone` is indexed. `login_memberships` resolves an identifier to the user's active
+memberships with the user and organization joined in, in one query.
+"""
+import re
+
+from django.db.models import Q
+
+from .models import Membership, StudentProfile, User
+
+_PHONE_CHARS = re.compile(r"^\+?[\d\s().-]+$")
+
+
+def identifier_filter(identifier):
+    """Q over Membership selecting the memberships of whoever `identifier` names."""
+    identifier = (identifier or "").strip()
+    if "@" in identifier:
+        return Q(user__email=User.objects.normalize_email(identifier))
+
+    by_admission = Q(user_id__in=StudentProfile.all_objects.filter(
+        admission_number=identifier
+    ).values("membership__user_id"))
+    if _PHONE_CHARS.match(identifier):
+        # Digits could be either; both sides are indexed.
+        return Q(user__phone=User.objects.normalize_phone(identifier)) | by_admission
+    return by_admission
+
+
+def login_memberships(identifier):
+    """
+    (user, active memberships) for the single user `identifier` names, with
+    each membership's user and organization loaded: one query. user is None
+    when nobody, or more than one user, matches. Users without an active
+    membership cost a second query.
+    """
+    memberships = list(
+        Membership.all_objects.select_related("user", "organization")
+        .filter(identifier_filter(identifier), is_active=True)
+        .order_by("id")
+    )
+    users = {membership.user_id for membership in memberships}
+    if len(users) == 1:
+        return memberships[0].user, memberships
+    if users:
+        return None, []
+
+    identifier = (identifier or "").strip()
+    if "@" in identifier:
+        candidates = User.objects.filter(email=User.objects.normalize_email(identifier))
+    elif _PHONE_CHARS.match(identifier):
+        candidates = User.objects.filter(phone=User.objects.normalize_phone(identifier))
+    else:
+        candidates = User.objects.filter(memberships__student_profile__admission_number=identifier)
+    candidates = list(candidates[:2])
+    return (candidates[0] if len(candidates) == 1 else None), []
@@ -0,0 +1,76 @@
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+
+def _cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test: many logins at once through /api/auth/login/. Reports "
+        "throughput (total and per core), latency percentiles and queries per login."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--identifier", required=True, help="Email, phone or admission number to log in as")
+        parser.add_argument("--password", required=True)
+        parser.add_argument("--organization", type=int)
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=_cores())
+
+    def handle(self, *args, **options):
+        host = next((host.lstrip(".") for host in settings.ALLOWED_HOSTS if host != "*"), "localhost")
+        body = {"username": options["identifier"], "password": options["password"]}
+        if options["organization"] is not None:
+            body["organization"] = options["organization"]
+
+        def login(_):
+            start = time.perf_counter()
+            response = Client(HTTP_HOST=host).post("/api/auth/login/", body, content_type="application/json")
+            return time.perf_counter() - start, response.status_code
+
+        # Measures hashing capacity, so the login rate limits must not kick in.
+        with override_settings(RATELIMIT_ENABLED=False):
+            with CaptureQueriesContext(connection) as queries:
+                _, status = login(None)
+            if status != 200:
+                raise CommandError(f"❌ Login failed with status {status}; check the identifier and password.")
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+                results = list(executor.map(login, range(options["requests"])))
+            elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+        failures = sum(status != 200 for _, status in results)
+        throughput = len(results) / elapsed
+        cores = _cores()
+        hasher = get_hasher()
+
+        self.stdout.write(
+            f"hasher={hasher.algorithm} iterations={getattr(hasher, 'iterations', 'n/a')} "
+            f"queries_per_login={len(queries)}"
+        )
+        self.stdout.write(
+            f"requests={len(results)} failures={failures} concurrency={options['concurrency']} cores={cores}"
+        )
+        self.stdout.write(f"throughput={throughput:.1f}/s per_core={throughput / cores:.1f}/s")
+        self.stdout.write(
+            f"latency_ms p50={statistics.median(latencies):.1f} p95={cuts[94]:.1f} "
+            f"p99={cuts[98]:.1f} max={latencies[-1]:.1f}"
+        )
+        self.stdout.write(self.style.SUCCESS("✅ Login burst finished"))
@@ -0,0 +1,54 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from users.models import Organization
+from users.onboarding import (
+    ONBOARDING_CHUNK_SIZE,
+    iter_result_report,
+    onboard_users,
+    rows_from_csv,
+    rows_from_json,
+)
+
+
+class Command(BaseCommand):
+    help = "Bulk-create users, memberships and profiles from a CSV or JSON file of rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("organization_id", type=int, help="ID of the organization")
+        parser.add_argument("path", help="Path to a .csv file or a .json list of rows")
+        parser.add_argument("--report", help="Write the per-row result report to this CSV path")
+        parser.add_argument("--workers", type=int, help="Password hashing processes (default: one per CPU)")
+        parser.add_argument("--chunk-size", type=int, default=ONBOARDING_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options["organization_id"])
+        except Organization.DoesNotExist:
+            raise CommandError(f"❌ Organization {options['organization_id']} does not exist")
+
+        start = time.perf_counter()
+        with open(options["path"], newline="", encoding="utf-8-sig") as stream:
+            try:
+                if options["path"].lower().endswith(".json"):
+                    rows = rows_from_json(json.load(stream))
+                else:
+                    rows = rows_from_csv(stream)
+            except (ValueError, json.JSONDecodeError) as exc:
+                raise CommandError(f"❌ {exc}")
+            result = onboard_users(
+                organization, rows, workers=options["workers"], chunk_size=options["chunk_size"]
+            )
+        elapsed = time.perf_counter() - start
+
+        if options["report"]:
+            with open(options["report"], "w", newline="", encoding="utf-8") as report:
+                csv.writer(report).writerows(iter_result_report(result))
+
+        summary = f"{result.created} of {result.rows} users created, {result.failed} failed in {elapsed:.1f}s"
+        if result.failed:
+            self.stdout.write(self.style.WARNING(f"⚠️ {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ {summary}"))
@@ -1,7 +1,20 @@
+import re
+
 from django.contrib.auth.base_user import BaseUserManager
 
 
 class UserManager(BaseUserManager):
+    @classmethod
+    def normalize_phone(cls, phone):
+        """'+234 (803) 123-4567' -> '+2348031234567'; None/'' -> None."""
+        if not phone:
+            return None
+        phone = phone.strip()
+        digits = re.sub(r"\D", "", phone)
+        if not digits:
+            return None
+        return f"+{digits}" if phone.startswith("+") else digits
+
     def create_user(self, email, first_name, last_name, password=None, **extra_fields):
         if not email:
             raise ValueError("Users must have an email address")
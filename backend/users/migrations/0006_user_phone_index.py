@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:33
+
+from django.db import migrations, models
+
+from users.managers import UserManager
+
+
+def normalize_phones(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    for user in User.objects.exclude(phone=None).only("id", "phone").iterator():
+        phone = UserManager.normalize_phone(user.phone)
+        if phone != user.phone:
+            User.objects.filter(pk=user.pk).update(phone=phone)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_alter_studentprofile_date_of_admission_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='phone',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.RunPython(normalize_phones, migrations.RunPython.noop),
+    ]
@@ -16,7 +16,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
-    phone = models.CharField(max_length=20, blank=True, null=True)
+    phone = models.CharField(max_length=20, blank=True, null=True, db_index=True)  # normalized, see save()
     profile_picture = models.ImageField(upload_to="profiles/", blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
 
@@ -33,6 +33,10 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+    def save(self, *args, **kwargs):
+        self.phone = UserManager.normalize_phone(self.phone)
+        super().save(*args, **kwargs)
     
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
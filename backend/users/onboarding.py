@@ -0,0 +1,246 @@
+# users/onboarding.py
+"""
+Bulk onboarding of users into an organization from CSV or JSON rows.
+
+Rows are validated up front against lookup sets built with one query per
+chunk (existing emails, admission numbers, employee ids) and against each
+other. Valid rows are written in chunks: passwords are hashed in parallel
+by a `PasswordHasherPool`, then `User`, `Membership` and the role's profile
+rows are inserted with `bulk_create` in that dependency order, one
+transaction per chunk. Every row gets a line in the result report.
+"""
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import (
+    AdminProfile,
+    Membership,
+    ParentProfile,
+    PrincipalProfile,
+    StudentProfile,
+    TeacherProfile,
+    User,
+)
+from .passwords import PasswordHasherPool
+
+REQUIRED_COLUMNS = ("email", "first_name", "last_name", "role")
+REPORT_COLUMNS = ("line", "email", "role", "status", "user_id", "error")
+ONBOARDING_CHUNK_SIZE = 500
+
+# role -> (profile model, columns copied onto it)
+PROFILES = {
+    Membership.RoleChoices.STUDENT: (
+        StudentProfile, ("admission_number", "grade", "section", "parent_contact", "date_of_admission")
+    ),
+    Membership.RoleChoices.TEACHER: (
+        TeacherProfile, ("employee_id", "specialization", "hire_date", "qualifications")
+    ),
+    Membership.RoleChoices.PARENT: (ParentProfile, ("occupation", "address")),
+    Membership.RoleChoices.PRINCIPAL: (PrincipalProfile, ("office_number", "years_of_experience")),
+    Membership.RoleChoices.ADMIN: (AdminProfile, ("office_location",)),
+}
+# profile column -> model whose unique values it must not repeat
+UNIQUE_PROFILE_COLUMNS = {"admission_number": StudentProfile, "employee_id": TeacherProfile}
+
+ROLES = {role.value for role in Membership.RoleChoices}
+
+
+class OnboardingResult:
+    """Counts plus one report line per input row."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.lines = []
+
+    @property
+    def failed(self):
+        return sum(line["status"] == "error" for line in self.lines)
+
+    def add(self, line, row, status, user_id=None, error=""):
+        self.lines.append({
+            "line": line,
+            "email": (row or {}).get("email", ""),
+            "role": (row or {}).get("role", ""),
+            "status": status,
+            "user_id": user_id or "",
+            "error": error,
+        })
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "results": self.lines,
+        }
+
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def _validate_row(row, seen, result, line):
+    """Normalized copy of `row` with the profile values parsed, or None."""
+    row = {key: _clean(value) for key, value in row.items() if value not in (None, "")}
+    row["role"] = str(row.get("role", "")).upper()
+    missing = [column for column in REQUIRED_COLUMNS if not row.get(column)]
+    if missing:
+        result.add(line, row, "error", error="Missing value(s): " + ", ".join(missing) + ".")
+        return None
+    if row["role"] not in ROLES:
+        result.add(line, row, "error", error=f"Invalid role '{row['role']}'.")
+        return None
+
+    row["email"] = User.objects.normalize_email(row["email"])
+    try:
+        validate_email(row["email"])
+    except ValidationError:
+        result.add(line, row, "error", error=f"Invalid email '{row['email']}'.")
+        return None
+    if row["email"] in seen["email"]:
+        result.add(line, row, "error", error="Email appears more than once in this file.")
+        return None
+
+    model, columns = PROFILES[row["role"]]
+    profile = {}
+    for column in columns:
+        if column not in row:
+            continue
+        try:
+            profile[column] = model._meta.get_field(column).to_python(row[column])
+        except ValidationError as exc:
+            result.add(line, row, "error", error=f"{column}: {' '.join(exc.messages)}")
+            return None
+    for column in UNIQUE_PROFILE_COLUMNS:
+        if column in profile:
+            if profile[column] in seen[column]:
+                result.add(line, row, "error", error=f"{column} '{profile[column]}' appears more than once in this file.")
+                return None
+            seen[column].add(profile[column])
+
+    seen["email"].add(row["email"])
+    row["profile"] = profile
+    return row
+
+
+def _reject_existing(chunk, result):
+    """Drop rows whose email or unique profile value is already taken."""
+    emails = set(User.objects.filter(email__in=[row["email"] for _, row in chunk]).values_list("email", flat=True))
+    taken = {
+        column: set(model.all_objects.filter(
+            **{f"{column}__in": {row["profile"][column] for _, row in chunk if column in row["profile"]}}
+        ).values_list(column, flat=True))
+        for column, model in UNIQUE_PROFILE_COLUMNS.items()
+    }
+
+    kept = []
+    for line, row in chunk:
+        if row["email"] in emails:
+            result.add(line, row, "error", error="A user with this email already exists.")
+            continue
+        clash = next((column for column in taken if row["profile"].get(column) in taken[column]), None)
+        if clash:
+            result.add(line, row, "error", error=f"{clash} '{row['profile'][clash]}' is already in use.")
+            continue
+        kept.append((line, row))
+    return kept
+
+
+def _write_chunk(organization, chunk, hasher, result):
+    chunk = _reject_existing(chunk, result)
+    if not chunk:
+        return
+
+    hashes = hasher.hash(row.get("password") for _, row in chunk)
+    users = [
+        User(
+            email=row["email"],
+            first_name=row["first_name"],
+            last_name=row["last_name"],
+            phone=User.objects.normalize_phone(row.get("phone")),
+            password=password_hash,
+        )
+        for (_, row), password_hash in zip(chunk, hashes)
+    ]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            memberships = Membership.all_objects.bulk_create([
+                Membership(user=user, organization=organization, role=row["role"])
+                for user, (_, row) in zip(users, chunk)
+            ])
+            profiles = {}
+            for membership, (_, row) in zip(memberships, chunk):
+                model = PROFILES[row["role"]][0]
+                profiles.setdefault(model, []).append(model(membership=membership, **row["profile"]))
+            for model, rows in profiles.items():
+                model.all_objects.bulk_create(rows)
+    except IntegrityError:
+        # Another writer took an email or id since _reject_existing looked.
+        for line, row in chunk:
+            result.add(line, row, "error", error="Conflicts with a concurrent change; retry this row.")
+        return
+
+    for user, (line, row) in zip(users, chunk):
+        result.add(line, row, "created", user_id=user.pk)
+    result.created += len(users)
+
+
+def onboard_users(organization, rows, workers=None, chunk_size=ONBOARDING_CHUNK_SIZE):
+    """
+    Create users, memberships and role profiles in `organization` from
+    `rows` (dicts with email, first_name, last_name, role and optionally
+    password, phone and the role's profile columns; see PROFILES). Rows
+    without a password get an unusable one. Returns an `OnboardingResult`.
+    """
+    result = OnboardingResult()
+    seen = {"email": set(), **{column: set() for column in UNIQUE_PROFILE_COLUMNS}}
+    chunk = []
+
+    with PasswordHasherPool(workers) as hasher:
+        for line, row in rows:
+            result.rows += 1
+            if not isinstance(row, dict):
+                result.add(line, None, "error", error="Each row must be an object.")
+                continue
+            validated = _validate_row(row, seen, result, line)
+            if validated is None:
+                continue
+            chunk.append((line, validated))
+            if len(chunk) >= chunk_size:
+                _write_chunk(organization, chunk, hasher, result)
+                chunk = []
+        if chunk:
+            _write_chunk(organization, chunk, hasher, result)
+
+    result.lines.sort(key=lambda line: line["line"])
+    return result
+
+
+def rows_from_csv(stream):
+    """(line, row) pairs from a CSV text stream, or a header error."""
+    reader = csv.DictReader(stream)
+    header = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError("Missing column(s): " + ", ".join(missing) + ".")
+    reader.fieldnames = header
+    return enumerate(reader, start=2)
+
+
+def rows_from_json(items):
+    """(line, row) pairs from a list of row objects (lines count from 1)."""
+    if not isinstance(items, list):
+        raise ValueError("Expected a list of rows.")
+    return enumerate(items, start=1)
+
+
+def iter_result_report(result):
+    """Rows (header first) of the per-row result report, for CSV/XLSX writers."""
+    yield list(REPORT_COLUMNS)
+    for line in result.lines:
+        yield [line[column] for column in REPORT_COLUMNS]
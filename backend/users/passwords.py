@@ -0,0 +1,59 @@
+# users/passwords.py
+"""
+Password hashing for bulk onboarding.
+
+PBKDF2 is deliberately slow (tens of milliseconds per password), so hashing
+thousands of new accounts one after another dominates an import.
+`PasswordHasherPool` spreads the work over worker processes. Workers are
+spawned rather than forked so a pool can be started safely from a threaded
+web or Celery worker; this module imports nothing that needs the app
+registry, so a fresh interpreter only has to load settings. The processes
+are only started once a batch actually has passwords to hash, so rows
+without one (which get an unusable password) never pay for them.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+def hash_password(password):
+    """make_password(), with empty passwords made unusable."""
+    return make_password(password or None)
+
+
+def default_workers():
+    return getattr(settings, "ONBOARDING_HASH_WORKERS", None) or os.cpu_count() or 1
+
+
+class PasswordHasherPool:
+    """
+    Context manager hashing batches of passwords in `workers` processes
+    (in this process when workers is 1).
+    """
+
+    def __init__(self, workers=None, chunksize=16):
+        self.workers = workers or default_workers()
+        self.chunksize = chunksize
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def hash(self, passwords):
+        """Hashes for `passwords`, in order."""
+        passwords = list(passwords)
+        if self.workers < 2 or sum(1 for password in passwords if password) < 2:
+            return [hash_password(password) for password in passwords]
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return list(self._executor.map(hash_password, passwords, chunksize=self.chunksize))
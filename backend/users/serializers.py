@@ -2,6 +2,7 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
 
+from .identifiers import login_memberships
 from .models import (
     Membership, 
     StudentProfile, 
@@ -87,12 +88,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             self.fields.pop("email")
 
     @classmethod
-    def get_token(cls, user):
+    def get_token(cls, user, membership=None):
         token = super().get_token(user)
 
-        membership = Membership.objects.filter(user=user, is_active=True).first()
+        if membership is None:
+            membership = Membership.objects.filter(user=user, is_active=True).first()
         if membership:
-            token["organization_id"] = str(membership.organization.id)
+            token["organization_id"] = str(membership.organization_id)
 
         return token
     
@@ -104,38 +106,29 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         if not username_or_phone or not password:
             raise serializers.ValidationError("Both username/phone and password are required")
 
-        try:
-            if "@" in username_or_phone:  # treat as email
-                user = User.objects.get(email=username_or_phone)
-            elif username_or_phone.isdigit():  # treat as phone
-                user = User.objects.get(phone=username_or_phone)
-            else:
-                user = User.objects.get(email=username_or_phone)
-        except User.DoesNotExist:
-            raise serializers.ValidationError("Invalid credentials")
-
-        membership = None
         if org_id is not None:
             try:
                 org_id = int(org_id)
             except (ValueError, TypeError):
                 raise serializers.ValidationError({"organization": "Invalid organization id"})
 
-            memberships = Membership.all_objects.filter(
-                user=user, 
-                organization_id=org_id,
-                is_active=True
-            )
+        # Email, phone or admission number -> user + active memberships, one query.
+        user, memberships = login_memberships(str(username_or_phone))
+        if user is None:
+            raise serializers.ValidationError("Invalid credentials")
 
-            if not memberships.exists():
+        membership = memberships[0] if memberships else None
+        if org_id is not None:
+            membership = next((m for m in memberships if m.organization_id == org_id), None)
+            if membership is None:
                 raise serializers.ValidationError({"non_field_errors": ["User not part of this organization"]})
-            membership = memberships.first()
 
+        # Re-hashes with the preferred PASSWORD_HASHERS entry when it changed.
         if not user.check_password(password):
             raise serializers.ValidationError("Invalid credentials")
         
-        refresh = self.get_token(user)
-        org_id_response = str(membership.organization.id) if membership else refresh.get("organization_id")
+        refresh = self.get_token(user, membership)
+        org_id_response = str(membership.organization_id) if membership else refresh.get("organization_id")
 
         return {
             "refresh": str(refresh),
@@ -145,4 +138,3 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             "phone": user.phone,
             "organization_id": org_id_response,
         }
-
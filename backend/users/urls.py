@@ -1,12 +1,14 @@
 from django.urls import path
 from .views import (
     RegistrationView, 
-    LoginView
+    LoginView,
+    OnboardingView
 )
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 urlpatterns = [
     path("register/", RegistrationView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
+    path("onboard/", OnboardingView.as_view(), name="onboard"),
     path("refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
@@ -1,9 +1,19 @@
+import io
+from itertools import islice
+
+from django.conf import settings
 from rest_framework import generics, status
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from core.exports import EXPORT_FORMATS, streaming_export_response
+from core.permissions import IsAdminOrPrincipal
+from core.throttling import AUTH_THROTTLES, RegistrationIPThrottle
+from .onboarding import iter_result_report, onboard_users, rows_from_csv, rows_from_json
 from .serializers import (
     RegistrationSerializer, 
     CustomTokenObtainPairSerializer
@@ -12,6 +22,7 @@ from .serializers import (
 class RegistrationView(generics.CreateAPIView):
     serializer_class = RegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [RegistrationIPThrottle]
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -33,4 +44,48 @@ class RegistrationView(generics.CreateAPIView):
 
 class LoginView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
-    permission_classes = [AllowAny]
\ No newline at end of file
+    permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
+
+
+class OnboardingView(APIView):
+    """
+    Bulk-create users in the caller's organization from a CSV upload
+    (multipart field `file`) or a JSON list of rows (optionally wrapped as
+    {"rows": [...]}). Columns: email, first_name, last_name, role, and
+    optionally password, phone and the role's profile fields.
+
+    Responds with counts and a per-row result; pass `report=csv` (or xlsx)
+    to get the result as a file instead. Uploads over ONBOARDING_MAX_ROWS
+    rows are refused with a 400; import those with `manage.py onboard_users`.
+    """
+    permission_classes = [IsAdminOrPrincipal]
+    parser_classes = [JSONParser, MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        try:
+            if upload is not None:
+                rows = rows_from_csv(io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline=""))
+            else:
+                data = request.data
+                rows = rows_from_json(data.get("rows") if isinstance(data, dict) else data)
+            max_rows = getattr(settings, "ONBOARDING_MAX_ROWS", 250)
+            rows = list(islice(rows, max_rows + 1))
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > max_rows:
+            return Response(
+                {"detail": f"At most {max_rows} rows can be onboarded per upload; split the file or ask "
+                           "an administrator to run the onboard_users command."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = onboard_users(request.organization, rows)
+
+        report = request.query_params.get("report")
+        if report in EXPORT_FORMATS:
+            return streaming_export_response(iter_result_report(result), "onboarding-results", fmt=report)
+
+        response_status = status.HTTP_200_OK if result.rows else status.HTTP_400_BAD_REQUEST
+        return Response(result.as_dict(), status=response_status)
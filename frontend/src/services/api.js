@@ -12,4 +12,9 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Several API calls in one round trip: batch([{ id, method, path, body }])
+// resolves to [{ id, status, body }] in the same order.
+export const batch = (requests) =>
+  api.post("batch/", { requests }).then((response) => response.data.responses);
+
 export default api;